@@ -60,18 +60,30 @@ def show_banner():
 # INSTALLATION COMMANDS
 # ============================================================================
 
+INSTALL_STEPS = ['system', 'binaries', 'software', 'database']
+
+
 @main.group(invoke_without_command=True)
 @click.option('--yes', '-y', is_flag=True, help='Skip confirmation prompts')
 @click.option('--all', 'run_all', is_flag=True, help='Install + run all TP labs (storage, security, RMAN, etc.)')
 @click.option('--config', type=click.Path(exists=True), help='Configuration YAML file')
+@click.option('--from-step', type=click.Choice(INSTALL_STEPS),
+              help='Start at this step (earlier steps are trusted)')
+@click.option('--force-step', multiple=True, type=click.Choice(INSTALL_STEPS),
+              help='Rerun this step even if checkpointed (repeatable)')
+@click.option('--no-resume', is_flag=True, help='Ignore checkpoints and run every step')
 @click.pass_context
-def install(ctx, yes, run_all, config):
+def install(ctx, yes, run_all, config, from_step, force_step, no_resume):
     """📦 Install and configure Oracle Database
 
     Run without subcommand for complete one-shot installation:
       oradba install              # base install (TP01-04)
       oradba install --yes        # skip confirmation
       oradba install --yes --all  # install + all post-config TPs
+
+    Steps finished by an earlier run are skipped when still in place:
+      oradba install --yes --force-step database
+      oradba install --yes --from-step software
     """
     ctx.ensure_object(dict)
     ctx.obj['yes'] = yes
@@ -79,7 +91,8 @@ def install(ctx, yes, run_all, config):
     if ctx.invoked_subcommand is None:
         from .modules.install import InstallManager
         mgr = InstallManager(config)
-        success = mgr.install_all(auto_yes=yes, run_all_tps=run_all)
+        success = mgr.install_all(auto_yes=yes, run_all_tps=run_all, from_step=from_step,
+                                  force_steps=force_step, resume=not no_resume)
         sys.exit(0 if success else 1)
 
 
@@ -89,11 +102,18 @@ def install(ctx, yes, run_all, config):
 @click.option('--skip-binaries', is_flag=True, help='Skip binary installation')
 @click.option('--skip-db', is_flag=True, help='Skip database creation')
 @click.option('--yes', '-y', is_flag=True, help='Skip confirmation')
-def install_all(config, skip_system, skip_binaries, skip_db, yes):
+@click.option('--from-step', type=click.Choice(INSTALL_STEPS),
+              help='Start at this step (earlier steps are trusted)')
+@click.option('--force-step', multiple=True, type=click.Choice(INSTALL_STEPS),
+              help='Rerun this step even if checkpointed (repeatable)')
+@click.option('--no-resume', is_flag=True, help='Ignore checkpoints and run every step')
+def install_all(config, skip_system, skip_binaries, skip_db, yes, from_step, force_step, no_resume):
     """🚀 Complete Oracle 19c installation from scratch"""
     from .modules.install import InstallManager
     mgr = InstallManager(config)
-    success = mgr.install_all(skip_system, skip_binaries, skip_db, auto_yes=yes)
+    success = mgr.install_all(skip_system, skip_binaries, skip_db, auto_yes=yes,
+                              from_step=from_step, force_steps=force_step,
+                              resume=not no_resume)
     sys.exit(0 if success else 1)
 
 
@@ -333,11 +353,12 @@ def configure_dataguard(config):
 
 @configure.command('all')
 @click.option('--config', type=click.Path(exists=True), help='Configuration file')
-def configure_all(config):
+@click.option('--workers', '-w', default=1, type=int, help='Labs to run concurrently (default: 1)')
+def configure_all(config, workers):
     """Run all post-installation configuration steps"""
     from .modules.install import InstallManager
     mgr = InstallManager(config)
-    success = mgr.run_all_labs(start_from='04', end_at='09')
+    success = mgr.run_all_labs(start_from='04', end_at='09', workers=workers)
     sys.exit(0 if success else 1)
 
 
@@ -425,12 +446,29 @@ def advanced_asm_rac(config):
 # LABS LIST COMMAND
 # ============================================================================
 
-@main.command('labs')
-def labs_list():
+@main.group('labs', invoke_without_command=True)
+@click.pass_context
+def labs_list(ctx):
     """📚 List all available configuration and advanced labs"""
+    if ctx.invoked_subcommand is None:
+        from .modules.install import InstallManager
+        mgr = InstallManager()
+        mgr.list_labs()
+
+
+@labs_list.command('run')
+@click.option('--from', 'start_from', default='01', help='First lab (default: 01)')
+@click.option('--to', 'end_at', default='15', help='Last lab (default: 15)')
+@click.option('--workers', '-w', default=1, type=int, help='Labs to run concurrently (default: 1)')
+@click.option('--log-dir', type=click.Path(), help='Directory for per-lab logs')
+@click.option('--config', type=click.Path(exists=True), help='Configuration file')
+def labs_run(start_from, end_at, workers, log_dir, config):
+    """Run a range of labs in dependency order (independent labs in parallel)"""
     from .modules.install import InstallManager
-    mgr = InstallManager()
-    mgr.list_labs()
+    mgr = InstallManager(config)
+    success = mgr.run_all_labs(start_from=start_from, end_at=end_at,
+                               workers=workers, log_dir=log_dir)
+    sys.exit(0 if success else 1)
 
 
 # ============================================================================
@@ -578,30 +616,238 @@ def rman():
 @rman.command('setup')
 @click.option('--retention', default=7, help='Retention policy in days')
 @click.option('--compression', is_flag=True, default=True, help='Enable compression')
-def rman_setup(retention, compression):
+@click.option('--auto-tune', is_flag=True,
+              help='Compute parallelism/section size first (see rman tune)')
+@click.option('--dest', default='/u01/backup',
+              help='Backup destination to measure (with --auto-tune)')
+@click.option('--yes', '-y', is_flag=True, help='Apply the tuning plan without confirmation')
+def rman_setup(retention, compression, auto_tune, dest, yes):
     """Configure RMAN"""
     from .modules.rman import RMANManager
     mgr = RMANManager()
-    mgr.setup(retention, compression)
+    plan = None
+    if auto_tune:
+        try:
+            plan = mgr.plan_tuning(dest, 'MEDIUM' if compression else None)
+        except RuntimeError as e:
+            rprint(f"[red]✗ Cannot tune RMAN:[/red] {e}")
+            sys.exit(1)
+        mgr.show_plan(plan)
+        if not yes and not click.confirm("Apply this plan?", default=True):
+            sys.exit(1)
+    success = mgr.setup(retention, compression, plan=plan)
+    sys.exit(0 if success else 1)
+
+
+@rman.command('tune')
+@click.option('--dest', default='/u01/backup', help='Backup destination to measure')
+@click.option('--compression', type=click.Choice(['NONE', 'BASIC', 'LOW', 'MEDIUM', 'HIGH']),
+              default='MEDIUM', help='Compression algorithm the backups use')
+@click.option('--no-measure', is_flag=True, help='Skip the destination write test')
+@click.option('--apply', 'apply_plan', is_flag=True, help='Apply the plan via rman setup')
+@click.option('--retention', default=7, help='Retention policy in days (with --apply)')
+def rman_tune(dest, compression, no_measure, apply_plan, retention):
+    """Plan channel parallelism and SECTION SIZE from CPUs, datafiles and destination speed"""
+    from .modules.rman import RMANManager
+    mgr = RMANManager()
+    compression = None if compression == 'NONE' else compression
+    try:
+        plan = mgr.plan_tuning(dest, compression, measure=not no_measure)
+    except RuntimeError as e:
+        rprint(f"[red]✗ Cannot tune RMAN:[/red] {e}")
+        sys.exit(1)
+    mgr.show_plan(plan)
+    if not apply_plan:
+        rprint("\n[dim]Apply with: oradba rman tune --apply  "
+               "(or oradba rman setup --auto-tune)[/dim]")
+        return
+    success = mgr.setup(retention, compression is not None, plan=plan)
+    sys.exit(0 if success else 1)
 
 
 @rman.command('backup')
 @click.option('--type', type=click.Choice(['full', 'incremental', 'archive']), default='full')
 @click.option('--tag', help='Backup tag')
-def rman_backup(type, tag):
+@click.option('--watch', is_flag=True, help='Show live progress (percent, MB/s per channel, ETA)')
+@click.option('--strategy', type=click.Choice(['backupset', 'incremental-merge']),
+              default='backupset',
+              help='incremental-merge: BCT + image copy rolled forward (ignores --type)')
+@click.option('--merge-lag-days', default=0, help='Keep the merged copy this many days behind')
+def rman_backup(type, tag, watch, strategy, merge_lag_days):
     """Perform RMAN backup"""
     from .modules.rman import RMANManager
     mgr = RMANManager()
-    mgr.backup(type, tag)
+    success = mgr.backup(type, tag, watch=watch, strategy=strategy, merge_lag_days=merge_lag_days)
+    sys.exit(0 if success else 1)
+
+
+@rman.command('fanout')
+@click.option('--dest', 'destinations', multiple=True,
+              help="Backup destination (repeatable): FRA or a directory, e.g. an NFS mount")
+@click.option('--rate', help='Default per-channel read RATE, e.g. 100M')
+@click.option('--maxpiecesize', help='MAXPIECESIZE per channel, e.g. 8G')
+@click.option('--throttle', multiple=True,
+              help="Throttle window (repeatable): 'mon-fri 08:00-18:00 20M'")
+@click.option('--show', is_flag=True, help='Show the current configuration only')
+def rman_fanout(destinations, rate, maxpiecesize, throttle, show):
+    """Spread backup channels over several destinations with RATE throttling"""
+    from .modules.rman import RMANManager, channel_allocations
+    mgr = RMANManager()
+    if not show:
+        try:
+            if not mgr.configure_fanout(destinations, rate, maxpiecesize, throttle):
+                sys.exit(1)
+        except ValueError as e:
+            rprint(f"[red]✗[/red] {e}")
+            sys.exit(1)
+    settings = mgr.settings
+    rprint(f"[cyan]Destinations:[/cyan] {', '.join(settings.get('destinations') or ['FRA'])}")
+    rprint(f"[cyan]Default rate:[/cyan] {settings.get('rate') or 'unlimited'}   "
+           f"[cyan]Max piece size:[/cyan] {settings.get('maxpiecesize') or '-'}")
+    for window in settings.get('throttle') or []:
+        rprint(f"[cyan]Throttle:[/cyan] {window['days']} {window['start']}-{window['end']} "
+               f"→ RATE {window['rate']}")
+    rprint(f"[cyan]Rate right now:[/cyan] {mgr.channel_rate() or 'unlimited'}\n")
+    console.print(channel_allocations(settings.get('destinations'), settings.get('parallelism', 2),
+                                      mgr.channel_rate(), settings.get('maxpiecesize')))
+
+
+@rman.command('bench')
+@click.option('--tablespace', default='USERS', help='Sample tablespace to back up')
+@click.option('--algorithms', default='BASIC,LOW,MEDIUM,HIGH', help='Comma-separated algorithms')
+@click.option('--channels', default='1,2,4', help='Comma-separated channel counts')
+@click.option('--dest', default='/u01/backup',
+              help='Backup destination (pieces go to <dest>/bench)')
+@click.option('--objective', type=click.Choice(['balanced', 'speed', 'size']), default='balanced')
+@click.option('--no-validate', is_flag=True, help='Skip the BACKUP VALIDATE read baseline')
+@click.option('--apply', 'apply_best', is_flag=True, help='Configure RMAN with the recommendation')
+@click.option('--retention', default=7, help='Retention policy in days (with --apply)')
+def rman_bench(tablespace, algorithms, channels, dest, objective, no_validate, apply_best,
+               retention):
+    """Benchmark compression algorithms and channel counts on this host"""
+    from .modules.rman import RMANManager, recommend_config
+    mgr = RMANManager()
+    try:
+        results = mgr.bench(tablespace,
+                            [a.strip().upper() for a in algorithms.split(',') if a.strip()],
+                            [int(c) for c in channels.split(',') if c.strip()],
+                            dest, validate=not no_validate)
+    except (RuntimeError, ValueError) as e:
+        rprint(f"[red]✗ Benchmark failed:[/red] {e}")
+        sys.exit(1)
+    best = recommend_config([r for r in results if r['algorithm'] != 'VALIDATE'], objective)
+    mgr.show_bench(results, best)
+    if best is None:
+        sys.exit(1)
+    if apply_best:
+        plan = {
+            'parallelism': best['channels'],
+            'compression': best['algorithm'],
+            'section_size': mgr.settings.get('section_size'),
+            'dest_mb_s': mgr.settings.get('dest_mb_s'),
+        }
+        sys.exit(0 if mgr.setup(retention, True, plan=plan) else 1)
+
+
+@rman.command('catalog')
+@click.option('--until', 'until_time',
+              help='Show what a restore to this time needs (YYYY-MM-DD HH:MM:SS)')
+def rman_catalog(until_time):
+    """Refresh the local backup catalog and answer restore questions from it"""
+    from .modules.rman_catalog import BackupCatalog
+    catalog = BackupCatalog()
+    try:
+        added = catalog.refresh()
+    except RuntimeError as e:
+        rprint(f"[yellow]Catalog not refreshed:[/yellow] {e}")
+        added = None
+    summary = catalog.summary()
+    if added is not None:
+        rprint(f"[green]✓[/green] Catalog refreshed (+{sum(added.values())} records)")
+    rprint(f"  {summary['sets']} backup sets, {summary['pieces']} available pieces, "
+           f"{summary['bytes'] / 1024 ** 3:.1f} GB "
+           f"({summary['oldest'] or '-'} → {summary['newest'] or '-'})")
+    if not until_time:
+        catalog.close()
+        return
+
+    plan = catalog.restore_plan(until_time)
+    catalog.close()
+    rprint(f"\n[bold cyan]Restore to {until_time}[/bold cyan]")
+    rprint(f"  Datafiles: {len(plan['datafiles'])}, archived logs: {len(plan['archivelogs'])}, "
+           f"pieces: {len(plan['pieces'])} ({plan['bytes'] / 1024 ** 3:.1f} GB)")
+    for piece in plan['pieces'] + plan['copies']:
+        rprint(f"  [dim]{piece['handle']}[/dim]")
+    if plan['missing']:
+        rprint(f"[red]✗ No usable backup for datafile(s):[/red] "
+               f"{', '.join(map(str, plan['missing']))}")
+    for gap in plan['gaps']:
+        rprint(f"[red]✗ Archived log gap:[/red] thread {gap['thread']} "
+               f"sequence {gap['from']}-{gap['to']}")
+    if plan['missing'] or plan['gaps']:
+        sys.exit(1)
+
+
+@rman.command('watch')
+@click.option('--interval', default=5, help='Seconds between polls')
+def rman_watch(interval):
+    """Watch a running RMAN job (e.g. one started from the web GUI)"""
+    from .modules.rman import RMANManager
+    mgr = RMANManager()
+    summary = mgr.watch(interval=interval)
+    if summary is None:
+        sys.exit(1)
+    rprint(f"[cyan]Latest RMAN job:[/cyan] {summary['status']}")
+
+
+@rman.command('archivelog-watch')
+@click.option('--interval', default=60, help='Seconds between checks')
+@click.option('--once', is_flag=True, help='Check once and exit (for cron)')
+@click.option('--fra-pct', type=int, help='Back up when the FRA is this % used (default 70)')
+@click.option('--fill-minutes', type=int,
+              help='Back up when redo would fill the FRA within N minutes (default 60)')
+@click.option('--min-mb', type=int, help='Minimum unbacked redo worth a backup (default 512)')
+@click.option('--max-age', 'max_age_minutes', type=int,
+              help='Back up logs older than N minutes regardless (default 240)')
+@click.option('--save', is_flag=True, help='Save these thresholds as the defaults')
+def rman_archivelog_watch(interval, once, fra_pct, fill_minutes, min_mb, max_age_minutes, save):
+    """Back up archived logs driven by redo rate and FRA usage"""
+    from .modules.rman_archwatch import ArchivelogWatcher
+    watcher = ArchivelogWatcher(fra_pct=fra_pct, fill_minutes=fill_minutes,
+                                min_mb=min_mb, max_age_minutes=max_age_minutes)
+    if save:
+        watcher.save_thresholds()
+    if once:
+        try:
+            result = watcher.run_once()
+        except RuntimeError as e:
+            rprint(f"[red]✗ Sample failed:[/red] {e}")
+            sys.exit(1)
+        sys.exit(0 if result['success'] is not False else 1)
+    watcher.run(interval=interval)
 
 
 @rman.command('restore')
 @click.option('--point-in-time', help='Point in time (YYYY-MM-DD HH:MI:SS)')
-def rman_restore(point_in_time):
+@click.option('--switch-to-copy', is_flag=True,
+              help='Use the incremental-merge image copy (no restore)')
+@click.option('--channels', type=int,
+              help='Allocate N disk channels (parallel/multisection restore)')
+@click.option('--preview', is_flag=True, help='Only show the plan, RTO estimate and RMAN PREVIEW')
+def rman_restore(point_in_time, switch_to_copy, channels, preview):
     """Restore database with RMAN"""
     from .modules.rman import RMANManager
     mgr = RMANManager()
-    mgr.restore(point_in_time)
+    if preview:
+        try:
+            result = mgr.plan_restore(point_in_time, channels)
+        except (RuntimeError, ValueError) as e:
+            rprint(f"[red]✗ Cannot plan restore:[/red] {e}")
+            sys.exit(1)
+        mgr.show_restore_plan(result)
+        sys.exit(1 if result['plan']['missing'] or result['plan']['gaps'] else 0)
+    success = mgr.restore(point_in_time, switch_to_copy=switch_to_copy, channels=channels)
+    sys.exit(0 if success else 1)
 
 
 @rman.command('list')
@@ -680,11 +926,83 @@ def tuning_analyze(deep):
 @tuning.command('awr')
 @click.option('--begin-snap', type=int, help='Begin snapshot ID')
 @click.option('--end-snap', type=int, help='End snapshot ID')
-def tuning_awr(begin_snap, end_snap):
+@click.option('--hours', default=1, help='Without snapshot IDs: report on the last N hours')
+@click.option('--peak', is_flag=True,
+              help='Without snapshot IDs: busiest interval (DB time) of the last 24h')
+@click.option('--format', 'fmt', type=click.Choice(['html', 'text']), default='html',
+              help='Report format')
+@click.option('--global', 'rac_global', is_flag=True, help='RAC: one report for all instances')
+@click.option('--output', '-o', type=click.Path(),
+              help='Report file (default ~/.oracledba/reports/)')
+def tuning_awr(begin_snap, end_snap, hours, peak, fmt, rac_global, output):
     """Generate AWR report"""
     from .modules.tuning import TuningManager
     mgr = TuningManager()
-    mgr.generate_awr(begin_snap, end_snap)
+    path = mgr.generate_awr(begin_snap, end_snap, hours=hours, peak=peak, fmt=fmt,
+                            rac_global=rac_global, output=output)
+    sys.exit(0 if path else 1)
+
+
+@tuning.command('top')
+@click.option('--interval', default=5, help='Seconds between ASH polls')
+@click.option('--window', default=300, help='Seconds of activity to aggregate')
+@click.option('--limit', '-n', default=10, help='Rows per table')
+def tuning_top(interval, window, limit):
+    """Live top activity (SQL, events, sessions) from ASH"""
+    from .modules.tuning import TuningManager
+    mgr = TuningManager()
+    mgr.top(interval=interval, window=window, n=limit)
+
+
+@tuning.command('compare')
+@click.option('--base', required=True, help='Base snapshot range, e.g. 100-110')
+@click.option('--target', required=True, help='Target snapshot range, e.g. 200-210')
+@click.option('--top', default=20, help='Regressions to show')
+def tuning_compare(base, target, top):
+    """Compare two AWR periods and rank the regressions"""
+    from .modules.awr_compare import parse_snap_range
+    from .modules.tuning import TuningManager
+    try:
+        base_range, target_range = parse_snap_range(base), parse_snap_range(target)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    mgr = TuningManager()
+    sys.exit(0 if mgr.compare(base_range, target_range, top=top) is not None else 1)
+
+
+@tuning.command('plans')
+@click.option('--factor', default=2.0, help='Flag plans this many times slower per execution')
+@click.option('--min-execs', default=5, help='Executions a plan needs before it is compared')
+@click.option('--no-capture', is_flag=True, help='Only analyse the stored history')
+@click.option('--baseline', is_flag=True, help='Pin the good plan of each flip (DBMS_SPM)')
+def tuning_plans(factor, min_execs, no_capture, baseline):
+    """Capture SQL plans and detect plan regressions (run from cron)"""
+    from .modules.tuning import TuningManager
+    mgr = TuningManager()
+    flips = mgr.plan_check(capture=not no_capture, factor=factor, min_execs=min_execs,
+                           baseline=baseline)
+    sys.exit(1 if flips is None else 0)
+
+
+@tuning.command('plan-baseline')
+@click.argument('sql_id')
+@click.argument('plan_hash', type=int)
+def tuning_plan_baseline(sql_id, plan_hash):
+    """Pin PLAN_HASH for SQL_ID with a SQL plan baseline"""
+    from .modules.tuning import TuningManager
+    mgr = TuningManager()
+    sys.exit(0 if mgr.plan_baseline(sql_id, plan_hash) else 1)
+
+
+@tuning.command('advise')
+@click.option('--top', default=20, help='Statements to tune (top by elapsed time)')
+@click.option('--time-limit', default=300, help='Seconds per tuning task')
+@click.option('--parallel', type=int, help='Tasks run at once (default: half the CPUs, max 4)')
+def tuning_advise(top, time_limit, parallel):
+    """Run the SQL Tuning Advisor on the top SQL statements"""
+    from .modules.tuning import TuningManager
+    mgr = TuningManager()
+    sys.exit(0 if mgr.advise(top, time_limit, parallel) is not None else 1)
 
 
 @tuning.command('addm')
@@ -704,6 +1022,24 @@ def tuning_sql_trace(session_id):
     mgr.sql_trace(session_id)
 
 
+@tuning.command('trace-report')
+@click.argument('trace_file', required=False)
+@click.option('--sid', type=int, help='Profile the trace file of this session')
+@click.option('--sort',
+              type=click.Choice(['elapsed', 'cpu', 'disk', 'query', 'executions', 'waits']),
+              default='elapsed', show_default=True, help='Rank statements by')
+@click.option('--top', default=20, show_default=True, help='Statements to show')
+@click.option('--output', '-o', help='Write a tkprof-style text report to this file')
+def tuning_trace_report(trace_file, sid, sort, top, output):
+    """Profile a 10046 SQL trace file (tkprof-style)"""
+    from .modules.tuning import TuningManager
+    if not trace_file and sid is None:
+        raise click.UsageError('Give a TRACE_FILE or --sid')
+    mgr = TuningManager()
+    profiler = mgr.trace_report(trace_file, sid, sort, top, output)
+    sys.exit(0 if profiler else 1)
+
+
 # ============================================================================
 # ASM COMMANDS
 # ============================================================================
@@ -963,11 +1299,12 @@ def nfs_setup_client(server, remote_path, mount_point):
 @click.option('--server', required=True, help='NFS server')
 @click.option('--path', required=True, help='Remote path')
 @click.option('--mount-point', required=True, help='Mount point')
-def nfs_mount(server, path, mount_point):
+@click.option('--for-rman', is_flag=True, help='Use the mount options Oracle requires for backups')
+def nfs_mount(server, path, mount_point, for_rman):
     """Mount NFS share"""
     from .modules.nfs import NFSManager
     mgr = NFSManager()
-    mgr.mount(server, path, mount_point)
+    mgr.mount(server, path, mount_point, for_rman=for_rman)
 
 
 @nfs.command('share')
@@ -1048,20 +1385,41 @@ def logs():
 
 @logs.command('alert')
 @click.option('--tail', default=50, help='Number of lines to show')
-def logs_alert(tail):
+@click.option('--follow', '-f', is_flag=True, help='Keep printing new lines (Ctrl+C to stop)')
+def logs_alert(tail, follow):
     """View alert log"""
     from .modules.database import DatabaseManager
     mgr = DatabaseManager()
-    mgr.view_alert_log(tail)
+    mgr.view_alert_log(tail, follow)
 
 
 @logs.command('listener')
 @click.option('--tail', default=50, help='Number of lines to show')
-def logs_listener(tail):
+@click.option('--follow', '-f', is_flag=True, help='Keep printing new lines (Ctrl+C to stop)')
+def logs_listener(tail, follow):
     """View listener log"""
     from .modules.database import DatabaseManager
     mgr = DatabaseManager()
-    mgr.view_listener_log(tail)
+    mgr.view_listener_log(tail, follow)
+
+
+@logs.command('listener-stats')
+@click.option('--file', 'log_file', type=click.Path(exists=True),
+              help='listener.log path (default: local listener)')
+@click.option('--workers', default=1, type=int, help='Parse chunks in N processes')
+@click.option('--no-cache', is_flag=True, help='Re-parse the whole file instead of only new bytes')
+@click.option('--storm-factor', default=5.0, type=float,
+              help='Storm = N x median connections/minute')
+@click.option('--storm-min-rate', default=60, type=int,
+              help='Minimum connections/minute for a storm')
+@click.option('--top', default=10, type=int, help='Rows per table')
+def logs_listener_stats(log_file, workers, no_cache, storm_factor, storm_min_rate, top):
+    """Connection-rate statistics from listener log"""
+    from .modules.database import DatabaseManager
+    mgr = DatabaseManager()
+    stats = mgr.analyze_listener_log(log_file, workers, not no_cache,
+                                     storm_factor, storm_min_rate, top)
+    sys.exit(0 if stats is not None else 1)
 
 
 @main.group()
@@ -16,6 +16,16 @@ from . import precheck
 from . import testing
 from . import downloader
 from . import response_files
+from . import listener_log
+from . import labs
+from . import rman_catalog
+from . import rman_archwatch
+from . import rman_output
+from . import ash
+from . import awr_compare
+from . import plan_history
+from . import sqltune
+from . import trace
 
 __all__ = [
     'install',
@@ -33,4 +43,14 @@ __all__ = [
     'testing',
     'downloader',
     'response_files',
+    'listener_log',
+    'labs',
+    'rman_catalog',
+    'rman_archwatch',
+    'rman_output',
+    'ash',
+    'awr_compare',
+    'plan_history',
+    'sqltune',
+    'trace',
 ]
@@ -0,0 +1,161 @@
+"""
+ASH Top Activity - incremental v$active_session_history sampler
+
+Each poll fetches only the ASH rows newer than the last sample_id seen and
+appends them to a sliding window held in compact column arrays (string
+dimensions are interned to small integer codes), so re-aggregating the
+window by SQL_ID, wait class, event, module or session costs no database
+round trip. ASH is part of the Diagnostics Pack license.
+
+Usage (Python):
+    from oracledba.modules.ash import ASHSampler
+    sampler = ASHSampler(window=300)
+    sampler.poll()
+    sampler.top('sql_id', 10)
+    sampler.timeline(bucket=10)
+"""
+
+import time
+from array import array
+from datetime import datetime
+
+from ..utils.oracle_client import OracleClient
+
+DIMENSIONS = ('sql_id', 'wait_class', 'event', 'module', 'session')
+DEFAULT_WINDOW = 300
+CPU = 'CPU'
+
+
+class ActivityWindow:
+    """Sliding window of ASH samples stored column-wise"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.times = array('d')
+        self.codes = {dim: array('l') for dim in DIMENSIONS}
+        self.names = {dim: [] for dim in DIMENSIONS}
+        self._index = {dim: {} for dim in DIMENSIONS}
+        self._start = 0
+
+    def _code(self, dim, value):
+        index = self._index[dim]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.names[dim])
+            self.names[dim].append(value)
+        return code
+
+    def add(self, sample_time, values):
+        """Add one sample; values maps every dimension to a string"""
+        self.times.append(sample_time)
+        for dim in DIMENSIONS:
+            self.codes[dim].append(self._code(dim, values[dim]))
+
+    def prune(self, now):
+        """Drop samples older than the window (compacting now and then)"""
+        cutoff = now - self.window
+        times = self.times
+        while self._start < len(times) and times[self._start] < cutoff:
+            self._start += 1
+        if self._start > 1024 and self._start * 2 > len(times):
+            del times[:self._start]
+            for column in self.codes.values():
+                del column[:self._start]
+            self._start = 0
+
+    def __len__(self):
+        return len(self.times) - self._start
+
+    def top(self, dim, n=10, seconds=None):
+        """[(value, samples, percent, average active sessions)] by sample
+        count over the window (or the last `seconds` of it)"""
+        start = self._start
+        if seconds is not None and len(self):
+            cutoff = self.times[-1] - seconds
+            while start < len(self.times) and self.times[start] < cutoff:
+                start += 1
+        counts = [0] * len(self.names[dim])
+        column = self.codes[dim]
+        for i in range(start, len(column)):
+            counts[column[i]] += 1
+        total = len(column) - start
+        span = seconds or self.window
+        ranked = sorted((c, code) for code, c in enumerate(counts) if c)
+        return [(self.names[dim][code], c, round(100.0 * c / total, 1), round(c / span, 2))
+                for c, code in reversed(ranked[-n:])]
+
+    def timeline(self, bucket=10, dim='wait_class'):
+        """[(bucket_start_epoch, {value: samples})] oldest first"""
+        buckets = {}
+        column = self.codes[dim]
+        for i in range(self._start, len(self.times)):
+            key = int(self.times[i] // bucket * bucket)
+            slot = buckets.setdefault(key, {})
+            name = self.names[dim][column[i]]
+            slot[name] = slot.get(name, 0) + 1
+        return sorted(buckets.items())
+
+
+def ash_row(row):
+    """(sample_id, epoch, dimension values) from one v$active_session_history
+    row as selected by ASHSampler.poll(); None for malformed rows"""
+    try:
+        sample_id = int(row[0])
+        when = datetime.strptime(row[1], '%Y-%m-%d %H:%M:%S').timestamp()
+    except (IndexError, ValueError):
+        return None
+    sid, serial, sql_id, state, wait_class, event, module = row[2:9]
+    on_cpu = state == 'ON CPU'
+    return sample_id, when, {
+        'sql_id': sql_id or '-',
+        'wait_class': CPU if on_cpu else (wait_class or 'Other'),
+        'event': 'ON CPU' if on_cpu else (event or '-'),
+        'module': module or '-',
+        'session': f"{sid},{serial}",
+    }
+
+
+class ASHSampler:
+    """Incremental ASH fetcher feeding an ActivityWindow"""
+
+    def __init__(self, client=None, window=DEFAULT_WINDOW):
+        self.client = client or OracleClient()
+        self.activity = ActivityWindow(window)
+        self.last_sample_id = None
+        self.last_poll = None
+        self.poll_seconds = None
+
+    def poll(self):
+        """Fetch new ASH rows; returns how many were added"""
+        started = time.time()
+        if self.last_sample_id is None:
+            window = int(self.activity.window)
+            where = f"sample_time > SYSTIMESTAMP - NUMTODSINTERVAL({window}, 'SECOND')"
+        else:
+            where = f"sample_id > {self.last_sample_id}"
+        success, rows, error = self.client.query(
+            "SELECT sample_id, TO_CHAR(sample_time, 'YYYY-MM-DD HH24:MI:SS'), session_id, "
+            "session_serial#, sql_id, session_state, wait_class, event, module "
+            f"FROM v$active_session_history WHERE {where} ORDER BY sample_id")
+        if not success:
+            raise RuntimeError(error or "ASH query failed")
+        added = 0
+        for row in rows:
+            parsed = ash_row(row)
+            if parsed is None:
+                continue
+            sample_id, when, values = parsed
+            self.activity.add(when, values)
+            self.last_sample_id = max(self.last_sample_id or 0, sample_id)
+            added += 1
+        if self.activity.times:
+            self.activity.prune(max(self.activity.times[-1], time.time()))
+        self.last_poll = time.time()
+        self.poll_seconds = round(self.last_poll - started, 2)
+        return added
+
+    def top(self, dim='sql_id', n=10, seconds=None):
+        return self.activity.top(dim, n, seconds)
+
+    def timeline(self, bucket=10, dim='wait_class'):
+        return self.activity.timeline(bucket, dim)
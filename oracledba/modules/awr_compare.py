@@ -0,0 +1,243 @@
+"""
+AWR Compare - period-over-period regression analysis
+
+Builds a normalized profile of two AWR snapshot ranges from
+DBA_HIST_SYS_TIME_MODEL, DBA_HIST_SYSSTAT, DBA_HIST_SYSTEM_EVENT and
+DBA_HIST_SQLSTAT (per second, per transaction and per execution, summed
+over instances) and ranks what got worse. Regressions are ranked by the
+DB time they add per second (average active sessions), so a 10x slower
+statement that runs twice a day sorts below a 20% slower one that runs
+all the time.
+
+Usage (Python):
+    from oracledba.modules.awr_compare import AWRComparer
+    comparer = AWRComparer()
+    result = comparer.compare((100, 110), (200, 210))
+"""
+
+from ..utils.oracle_client import OracleClient
+
+LOAD_STATS = (
+    'redo size', 'session logical reads', 'physical reads', 'physical writes',
+    'user calls', 'parse count (total)', 'parse count (hard)', 'execute count',
+    'user commits', 'user rollbacks', 'logons cumulative',
+)
+TIME_MODEL_STATS = ('DB time', 'DB CPU', 'sql execute elapsed time',
+                    'parse time elapsed', 'hard parse elapsed time',
+                    'PL/SQL execution elapsed time',
+                    'connection management call elapsed time')
+MIN_IMPACT = 0.01      # extra average active sessions worth reporting
+MIN_LOAD_CHANGE = 20   # % change of a load statistic worth reporting
+
+
+def parse_snap_range(text):
+    """'100-110' -> (100, 110)"""
+    try:
+        begin, end = (int(part) for part in text.split('-'))
+    except ValueError:
+        raise ValueError(
+            f"Invalid snapshot range '{text}' (expected BEGIN-END, e.g. 100-110)") from None
+    if begin >= end:
+        raise ValueError(f"Invalid snapshot range '{text}': begin must be before end")
+    return begin, end
+
+
+def deltas(begin, end):
+    """{name: end - begin} for cumulative counters; names missing from
+    either side or going backwards (instance restart) are dropped"""
+    return {name: end[name] - begin[name] for name in end
+            if name in begin and end[name] >= begin[name]}
+
+
+def _pct(base, target):
+    if not base:
+        return None
+    return round(100.0 * (target - base) / base, 1)
+
+
+def build_profile(seconds, time_model, sysstat, events, sql):
+    """Normalized profile of one period.
+
+    time_model/sysstat: {name: delta}; events: {event: (wait_class, waits,
+    time_waited_us)}; sql: {sql_id: (executions, elapsed_us, cpu_us,
+    buffer_gets, disk_reads)}; all already deltas over the period.
+    """
+    seconds = max(float(seconds), 1.0)
+    transactions = sysstat.get('user commits', 0) + sysstat.get('user rollbacks', 0)
+    profile = {
+        'seconds': seconds,
+        'time_model': {name: value / 1e6 / seconds for name, value in time_model.items()},
+        'load': {name: {'per_sec': sysstat[name] / seconds,
+                        'per_txn': sysstat[name] / transactions if transactions else None}
+                 for name in LOAD_STATS if name in sysstat},
+        'events': {},
+        'sql': {},
+    }
+    for event, (wait_class, waits, waited) in events.items():
+        if wait_class == 'Idle':
+            continue
+        profile['events'][event] = {
+            'wait_class': wait_class,
+            'waits_per_sec': waits / seconds,
+            'aas': waited / 1e6 / seconds,
+            'avg_ms': waited / 1000.0 / waits if waits else 0.0,
+        }
+    for sql_id, (execs, elapsed, cpu, gets, reads) in sql.items():
+        per = max(execs, 1)
+        profile['sql'][sql_id] = {
+            'execs_per_sec': execs / seconds,
+            'aas': elapsed / 1e6 / seconds,
+            'ela_ms_per_exec': elapsed / 1000.0 / per,
+            'cpu_ms_per_exec': cpu / 1000.0 / per,
+            'gets_per_exec': gets / per,
+            'reads_per_exec': reads / per,
+        }
+    return profile
+
+
+def compare_profiles(base, target, min_impact=MIN_IMPACT, min_load_change=MIN_LOAD_CHANGE):
+    """Rank what got worse from base to target.
+
+    Returns {'regressions': [...], 'load': [...]}. Regressions carry kind,
+    name, metric, base, target, change_pct and impact (added average
+    active sessions), highest impact first. 'load' lists workload
+    statistics whose per-second rate changed by at least min_load_change %.
+    """
+    regressions = []
+
+    def add(kind, name, metric, base_value, target_value, impact, detail=None):
+        if impact >= min_impact:
+            regressions.append({
+                'kind': kind, 'name': name, 'metric': metric,
+                'base': round(base_value, 3), 'target': round(target_value, 3),
+                'change_pct': _pct(base_value, target_value),
+                'impact': round(impact, 3), 'detail': detail,
+            })
+
+    for name in TIME_MODEL_STATS:
+        b = base['time_model'].get(name, 0.0)
+        t = target['time_model'].get(name, 0.0)
+        add('time model', name, 'AAS', b, t, t - b)
+
+    for event, t in target['events'].items():
+        b = base['events'].get(event)
+        b_aas = b['aas'] if b else 0.0
+        detail = (f"{t['wait_class']}, avg {b['avg_ms'] if b else 0:.2f} -> "
+                  f"{t['avg_ms']:.2f} ms, {b['waits_per_sec'] if b else 0:.1f} -> "
+                  f"{t['waits_per_sec']:.1f} waits/s")
+        add('event', event, 'AAS', b_aas, t['aas'], t['aas'] - b_aas, detail)
+
+    for sql_id, t in target['sql'].items():
+        b = base['sql'].get(sql_id)
+        if b is None:
+            add('sql', sql_id, 'new SQL, AAS', 0.0, t['aas'], t['aas'],
+                f"{t['ela_ms_per_exec']:.2f} ms/exec, {t['execs_per_sec']:.2f} execs/s")
+            continue
+        # Only the part explained by slower executions, not by more of them
+        slower = (t['ela_ms_per_exec'] - b['ela_ms_per_exec']) / 1000.0 * t['execs_per_sec']
+        detail = (f"gets/exec {b['gets_per_exec']:.0f} -> {t['gets_per_exec']:.0f}, "
+                  f"cpu ms/exec {b['cpu_ms_per_exec']:.2f} -> {t['cpu_ms_per_exec']:.2f}, "
+                  f"{b['execs_per_sec']:.2f} -> {t['execs_per_sec']:.2f} execs/s")
+        add('sql', sql_id, 'ms/exec', b['ela_ms_per_exec'], t['ela_ms_per_exec'], slower, detail)
+
+    regressions.sort(key=lambda r: r['impact'], reverse=True)
+
+    load = []
+    for name in LOAD_STATS:
+        b = base['load'].get(name)
+        t = target['load'].get(name)
+        if not b or not t:
+            continue
+        change = _pct(b['per_sec'], t['per_sec'])
+        if change is not None and abs(change) >= min_load_change:
+            load.append({'name': name, 'base_per_sec': round(b['per_sec'], 2),
+                         'target_per_sec': round(t['per_sec'], 2), 'change_pct': change,
+                         'base_per_txn': b['per_txn'], 'target_per_txn': t['per_txn']})
+    load.sort(key=lambda item: abs(item['change_pct']), reverse=True)
+    return {'regressions': regressions, 'load': load}
+
+
+class AWRComparer:
+    """Fetch AWR deltas for snapshot ranges and compare them"""
+
+    def __init__(self, client=None, dbid=None):
+        self.client = client or OracleClient()
+        self.dbid = dbid
+
+    def _query(self, sql):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return rows
+
+    def _dbid(self):
+        if self.dbid is None:
+            self.dbid = int(self._query("SELECT dbid FROM v$database")[0][0])
+        return self.dbid
+
+    def _counters(self, view, name_column, begin, end, extra=''):
+        """({name: value} at begin, {name: value} at end), summed over instances.
+
+        Sums are read with TO_CHAR and kept as exact ints: cumulative
+        counters pass 1e10 and deltas of rounded values would be noise.
+        """
+        rows = self._query(
+            f"SELECT snap_id, {name_column}, TO_CHAR(SUM(value)) FROM {view} "
+            f"WHERE dbid = {self._dbid()} AND snap_id IN ({begin}, {end}) {extra} "
+            f"GROUP BY snap_id, {name_column}")
+        values = {begin: {}, end: {}}
+        for snap_id, name, value in (r for r in rows if len(r) == 3):
+            values.setdefault(int(snap_id), {})[name] = int(value or 0)
+        return values[begin], values[end]
+
+    def profile(self, begin, end):
+        """Normalized profile (build_profile) of snapshot range begin-end"""
+        dbid = self._dbid()
+        rows = self._query(
+            "SELECT ROUND((CAST(MAX(end_interval_time) AS DATE) - "
+            "CAST(MIN(end_interval_time) AS DATE)) * 86400) FROM dba_hist_snapshot "
+            f"WHERE dbid = {dbid} AND snap_id IN ({begin}, {end})")
+        seconds = float(rows[0][0]) if rows and rows[0][0] else 0.0
+        if seconds <= 0:
+            raise RuntimeError(f"Snapshots {begin}-{end} not found in AWR")
+
+        time_model = deltas(*self._counters('dba_hist_sys_time_model', 'stat_name', begin, end))
+        sysstat = deltas(*self._counters(
+            'dba_hist_sysstat', 'stat_name', begin, end,
+            "AND stat_name IN (" + ', '.join(f"'{s}'" for s in LOAD_STATS) + ")"))
+
+        events = {}
+        event_rows = self._query(
+            "SELECT snap_id, event_name, wait_class, TO_CHAR(SUM(total_waits)), "
+            "TO_CHAR(SUM(time_waited_micro)) "
+            f"FROM dba_hist_system_event WHERE dbid = {dbid} AND snap_id IN ({begin}, {end}) "
+            "AND wait_class <> 'Idle' GROUP BY snap_id, event_name, wait_class")
+        by_snap = {begin: {}, end: {}}
+        for snap_id, event, wait_class, waits, waited in (r for r in event_rows if len(r) == 5):
+            by_snap.setdefault(int(snap_id), {})[event] = (wait_class, int(waits or 0),
+                                                           int(waited or 0))
+        for event, (wait_class, waits, waited) in by_snap[end].items():
+            prev = by_snap[begin].get(event, (wait_class, 0, 0))
+            if waits >= prev[1] and waited >= prev[2]:
+                events[event] = (wait_class, waits - prev[1], waited - prev[2])
+
+        sql = {}
+        for row in self._query(
+                "SELECT sql_id, TO_CHAR(SUM(executions_delta)), "
+                "TO_CHAR(SUM(elapsed_time_delta)), TO_CHAR(SUM(cpu_time_delta)), "
+                "TO_CHAR(SUM(buffer_gets_delta)), TO_CHAR(SUM(disk_reads_delta)) "
+                f"FROM dba_hist_sqlstat WHERE dbid = {dbid} AND snap_id > {begin} "
+                f"AND snap_id <= {end} GROUP BY sql_id"):
+            if len(row) == 6:
+                sql[row[0]] = tuple(int(v or 0) for v in row[1:])
+        return build_profile(seconds, time_model, sysstat, events, sql)
+
+    def compare(self, base, target, **limits):
+        """compare_profiles() of two (begin, end) snapshot ranges, plus
+        the profiles themselves"""
+        base_profile = self.profile(*base)
+        target_profile = self.profile(*target)
+        result = compare_profiles(base_profile, target_profile, **limits)
+        result['base'] = base_profile
+        result['target'] = target_profile
+        return result
@@ -3,6 +3,7 @@ Database Manager - Core database operations
 """
 
 import os
+import sys
 import subprocess
 from pathlib import Path
 from rich.console import Console
@@ -134,24 +135,101 @@ class DatabaseManager:
             rprint(f"[red]Error:[/red] Unsupported script type: {script.suffix}")
             return False
     
-    def view_alert_log(self, tail=50):
+    def _print_log(self, log_path, tail=50, follow=False):
+        """Print the last lines of a log, optionally following appended lines"""
+        from ..utils.tail import tail_lines, follow as follow_log
+
+        if not follow:
+            for line in tail_lines(log_path, tail):
+                sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+            return
+
+        try:
+            for line in follow_log(log_path, tail):
+                sys.stdout.write(line + "\n")
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+
+    def view_alert_log(self, tail=50, follow=False):
         """View alert log"""
         alert_log = Path(f"{self.oracle_home}/../diag/rdbms/{self.oracle_sid.lower()}/{self.oracle_sid}/trace/alert_{self.oracle_sid}.log")
         
         if alert_log.exists():
-            os.system(f"tail -n {tail} {alert_log}")
+            self._print_log(alert_log, tail, follow)
         else:
             rprint(f"[red]Alert log not found:[/red] {alert_log}")
     
-    def view_listener_log(self, tail=50):
+    def _listener_log_path(self):
+        """Path of the default listener's text log"""
+        return Path(f"{self.oracle_home}/../diag/tnslsnr/{os.uname().nodename}"
+                    "/listener/trace/listener.log")
+
+    def view_listener_log(self, tail=50, follow=False):
         """View listener log"""
-        listener_log = Path(f"{self.oracle_home}/../diag/tnslsnr/{os.uname().nodename}/listener/trace/listener.log")
+        listener_log = self._listener_log_path()
         
         if listener_log.exists():
-            os.system(f"tail -n {tail} {listener_log}")
+            self._print_log(listener_log, tail, follow)
         else:
             rprint(f"[red]Listener log not found:[/red] {listener_log}")
     
+    def analyze_listener_log(self, log_file=None, workers=1, use_cache=True,
+                             storm_factor=5.0, storm_min_rate=60, top=10):
+        """Connection-rate statistics, connection storms and TNS errors from listener.log"""
+        from .listener_log import ListenerLogAnalyzer
+
+        listener_log = Path(log_file) if log_file else self._listener_log_path()
+        if not listener_log.exists():
+            rprint(f"[red]Listener log not found:[/red] {listener_log}")
+            return None
+
+        console.print(f"\n[bold cyan]Listener Log Analysis[/bold cyan] [dim]{listener_log}[/dim]\n")
+
+        analyzer = ListenerLogAnalyzer(listener_log)
+        stats = analyzer.analyze(workers=workers, use_cache=use_cache)
+        storms = analyzer.find_storms(stats, factor=storm_factor, min_rate=storm_min_rate)
+
+        rprint(f"[green]✓[/green] {stats['new_bytes']:,} new bytes parsed "
+               f"({stats['lines']:,} lines total)")
+        rprint(f"  Connections: {stats['total_connections']:,}  "
+               f"Failed: {stats['failed_connections']:,}")
+
+        for title, key in (("Service", 'by_service'), ("Client Host", 'by_host'),
+                           ("Program", 'by_program'), ("Return Code", 'by_return_code')):
+            table = Table(title=f"Connections by {title}", show_header=True,
+                          header_style="bold magenta")
+            table.add_column(title, style="white")
+            table.add_column("Connections", style="cyan", justify="right")
+            for name, count in list(stats[key].items())[:top]:
+                table.add_row(str(name), f"{count:,}")
+            console.print(table)
+
+        if stats['tns_errors']:
+            table = Table(title="TNS Errors", show_header=True, header_style="bold magenta")
+            table.add_column("Error", style="red")
+            table.add_column("Count", style="cyan", justify="right")
+            for code, count in list(stats['tns_errors'].items())[:top]:
+                table.add_row(code, f"{count:,}")
+            console.print(table)
+
+        if storms:
+            table = Table(title="Connection Storms", show_header=True, header_style="bold red")
+            table.add_column("Minute", style="white")
+            table.add_column("Connections", style="red", justify="right")
+            table.add_column("Threshold", style="dim", justify="right")
+            table.add_column("Top Service", style="cyan")
+            table.add_column("Top Host", style="cyan")
+            for storm in storms:
+                table.add_row(storm['minute'], f"{storm['connections']:,}", str(storm['threshold']),
+                              storm['top_service'], storm['top_host'])
+            console.print(table)
+        else:
+            rprint("[green]✓[/green] No connection storms detected")
+
+        return stats
+
     def monitor_tablespaces(self):
         """Monitor tablespace usage"""
         console.print("\n[bold cyan]Tablespace Usage[/bold cyan]\n")
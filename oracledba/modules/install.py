@@ -18,6 +18,10 @@ Usage (Python):
 
 import os
 import sys
+import grp
+import pwd
+import glob
+import json
 import subprocess
 import yaml
 import time
@@ -25,21 +29,28 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich import print as rprint
+from ..utils.logger import QueuedLogFile, default_log_dir
+from ..utils.events import EventStream
+from ..utils.history import DurationHistory, HISTORY_FILE_NAME
+from ..utils.procstats import ProcessTreeSampler, empty_usage, merge_usage, format_usage
+from .labs import LABS, LAB_ORDER, LabExecutor, lab_range
 
 console = Console()
 
+# install_all steps, in order; also the keys of the checkpoint file
+STEP_IDS = ('system', 'binaries', 'software', 'database')
+
+ORA_INVENTORY_XML = '/u01/app/oraInventory/ContentsXML/inventory.xml'
+
 
 class InstallManager:
     def __init__(self, config_file=None):
         self.config = self._load_config(config_file)
         self.scripts_dir = Path(__file__).parent.parent / "scripts"
         self._log_handle = None
-        try:
-            self.log_dir = Path("/var/log/oracledba")
-            self.log_dir.mkdir(parents=True, exist_ok=True)
-        except (PermissionError, OSError):
-            self.log_dir = Path("/tmp/oracledba-logs")
-            self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._events = None
+        self._step_usage = None
+        self.log_dir = default_log_dir()
 
     def _load_config(self, config_file):
         """Load configuration from YAML file"""
@@ -72,12 +83,25 @@ class InstallManager:
     # =========================================================================
 
     def _out(self, text, end='\n'):
-        """Write text to stdout and log file"""
+        """Write text to stdout and queue it for the log file.
+
+        stdout is still flushed per line (the GUI streams it live); the log
+        file is written in batches by a background thread.
+        """
         sys.stdout.write(text + end)
         sys.stdout.flush()
         if self._log_handle:
             self._log_handle.write(text + end)
-            self._log_handle.flush()
+
+    def _emit(self, event, **fields):
+        """Append a structured event to the current run's events file"""
+        if self._events:
+            self._events.emit(event, **fields)
+
+    def _warn(self, text):
+        """Print a warning and record it as an event"""
+        self._out(f"\u26a0 {text}")
+        self._emit('warning', message=text)
 
     def _step_header(self, step_num, total, title):
         """Print a visible step header"""
@@ -87,26 +111,59 @@ class InstallManager:
         self._out("\u2501" * 60)
         self._out("")
 
-    def _step_result(self, step_num, success, elapsed_seconds):
-        """Print step result with timing"""
+    def _step_result(self, step_num, success, elapsed_seconds, usage=None):
+        """Print step result with timing (and resource usage, if sampled)"""
         mins = int(elapsed_seconds // 60)
         secs = int(elapsed_seconds % 60)
         if success:
             self._out(f"\n\u2713 Step {step_num} complete ({mins}m {secs}s)")
         else:
             self._out(f"\n\u2717 Step {step_num} FAILED ({mins}m {secs}s)")
+        if usage and usage.get('processes'):
+            self._out(f"  Resources: {format_usage(usage, wall=elapsed_seconds)}")
+
+    def _begin_step_usage(self):
+        """Start accumulating resource usage of the commands a step runs"""
+        self._step_usage = empty_usage()
+
+    def _end_step_usage(self):
+        usage, self._step_usage = self._step_usage, None
+        return usage
+
+    def _account(self, usage):
+        """Add one finished command's usage to the current step"""
+        if self._step_usage is not None:
+            merge_usage(self._step_usage, usage)
 
     def _open_log(self, name):
-        """Open a log file for writing"""
+        """Open a queued, size-rotated log file (and its events file) for writing"""
+        self._close_log()
         log_file = self.log_dir / f"{name}.log"
-        self._log_handle = open(log_file, 'w')
+        self._log_handle = QueuedLogFile(log_file)
+        self._open_events(name)
         return log_file
 
     def _close_log(self):
-        """Close the log file"""
+        """Flush queued output and close the log file"""
         if self._log_handle:
             self._log_handle.close()
             self._log_handle = None
+        self._close_events()
+
+    def _open_events(self, name):
+        """Open <log_dir>/<name>.events.jsonl for structured events"""
+        self._close_events()
+        events_file = self.log_dir / f"{name}.events.jsonl"
+        try:
+            self._events = EventStream(events_file)
+        except OSError:
+            self._events = None
+        return events_file
+
+    def _close_events(self):
+        if self._events:
+            self._events.close()
+            self._events = None
 
     # =========================================================================
     # PROCESS EXECUTION — always streams output live
@@ -141,13 +198,20 @@ class InstallManager:
         if env is None:
             env = self._build_env()
         try:
+            started = time.time()
             process = subprocess.Popen(
                 cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
                 env=env, text=True, bufsize=1
             )
-            for line in process.stdout:
-                self._out(line, end='')
-            process.wait()
+            self._emit('cmd_spawn', pid=process.pid, cmd=cmd)
+            with ProcessTreeSampler(process.pid) as sampler:
+                for line in process.stdout:
+                    self._out(line, end='')
+                process.wait()
+            usage = sampler.usage()
+            self._account(usage)
+            self._emit('cmd_exit', pid=process.pid, rc=process.returncode,
+                       duration=round(time.time() - started, 3), usage=usage)
             return process.returncode
         except Exception as e:
             self._out(f"Error running command: {e}")
@@ -159,14 +223,21 @@ class InstallManager:
             env = self._build_env()
         output_lines = []
         try:
+            started = time.time()
             process = subprocess.Popen(
                 cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
                 env=env, text=True, bufsize=1
             )
-            for line in process.stdout:
-                self._out(line, end='')
-                output_lines.append(line)
-            process.wait()
+            self._emit('cmd_spawn', pid=process.pid, cmd=cmd)
+            with ProcessTreeSampler(process.pid) as sampler:
+                for line in process.stdout:
+                    self._out(line, end='')
+                    output_lines.append(line)
+                process.wait()
+            usage = sampler.usage()
+            self._account(usage)
+            self._emit('cmd_exit', pid=process.pid, rc=process.returncode,
+                       duration=round(time.time() - started, 3), usage=usage)
             return process.returncode, ''.join(output_lines)
         except Exception as e:
             self._out(f"Error running command: {e}")
@@ -324,19 +395,23 @@ class InstallManager:
             if rc == 0:
                 self._out("\u2713 orainstRoot.sh completed")
             else:
-                self._out(f"\u26a0 orainstRoot.sh returned {rc} (continuing)")
+                self._warn(f"orainstRoot.sh returned {rc} (continuing)")
         else:
-            self._out(f"\u26a0 {orainstRoot} not found, skipping")
+            self._warn(f"{orainstRoot} not found, skipping")
 
         if os.path.exists(root_sh):
             self._out(f"\n\u2192 {root_sh}")
             rc = self._stream_cmd(['bash', root_sh])
             if rc == 0:
                 self._out("\u2713 root.sh completed")
+                try:
+                    self._root_sh_marker().write_text(oracle_home)
+                except OSError:
+                    pass
             else:
-                self._out(f"\u26a0 root.sh returned {rc} (continuing)")
+                self._warn(f"root.sh returned {rc} (continuing)")
         else:
-            self._out(f"\u26a0 {root_sh} not found, skipping")
+            self._warn(f"{root_sh} not found, skipping")
 
         return True
 
@@ -381,7 +456,7 @@ class InstallManager:
                            capture_output=True, check=False)
             self._out(f"\u2713 listener.ora written to {listener_path}")
         except (PermissionError, OSError) as e:
-            self._out(f"\u26a0 Could not write listener.ora directly: {e}")
+            self._warn(f"Could not write listener.ora directly: {e}")
             self._out("  Trying via su - oracle...")
             lsn_cmd = (
                 f"mkdir -p {oracle_home}/network/admin && "
@@ -453,24 +528,197 @@ class InstallManager:
                         f.write(f"\n{oratab_line}\n")
                     self._out(f"\u2713 Added {db_config['sid']} to /etc/oratab")
             except Exception:
-                self._out(f"\u26a0 Could not update /etc/oratab (add: {oratab_line})")
+                self._warn(f"Could not update /etc/oratab (add: {oratab_line})")
 
             return True
         else:
             self._out(f"\n\u2717 Database creation failed (exit code: {returncode})")
             return False
 
+    # =========================================================================
+    # CHECKPOINTS — completed steps are skipped on rerun if still in place
+    # =========================================================================
+
+    def _history(self):
+        """Step-duration history used for ETAs (next to the checkpoints)"""
+        return DurationHistory(self.log_dir / HISTORY_FILE_NAME)
+
+    def _expected_note(self, history, phase, key):
+        """'Expected: ~Xm Ys' line for a step header, if there is history"""
+        durations, same_profile = history.samples(phase, key)
+        expected = history.expected(phase, key)
+        if expected is None:
+            return
+        mins, secs = divmod(int(expected), 60)
+        where = "this host profile" if same_profile else "other hosts"
+        self._out(f"  Expected: ~{mins}m {secs}s (median of {len(durations)} "
+                  f"run{'s' if len(durations) != 1 else ''} on {where})\n")
+
+    def _checkpoint_file(self):
+        return self.log_dir / "install-checkpoints.json"
+
+    def _root_sh_marker(self):
+        return self.log_dir / "root.sh.done"
+
+    def _load_checkpoints(self):
+        try:
+            with open(self._checkpoint_file(), 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoints(self, checkpoints):
+        path = self._checkpoint_file()
+        try:
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(checkpoints, f, indent=2)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _record_checkpoint(self, step_id, duration):
+        checkpoints = self._load_checkpoints()
+        checkpoints[step_id] = {
+            'completed': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': round(duration, 1),
+            'oracle_home': self.config['oracle']['oracle_home'],
+            'sid': self.config['database']['sid'],
+        }
+        self._save_checkpoints(checkpoints)
+
+    def _clear_checkpoint(self, step_id):
+        checkpoints = self._load_checkpoints()
+        if checkpoints.pop(step_id, None) is not None:
+            self._save_checkpoints(checkpoints)
+
+    @staticmethod
+    def _file_contains(path, text):
+        try:
+            with open(path, 'r', errors='replace') as f:
+                return text in f.read()
+        except OSError:
+            return False
+
+    @staticmethod
+    def _pmon_running(sid):
+        """True if an ora_pmon_<sid> process exists (reads /proc, no spawn)"""
+        target = f"ora_pmon_{sid}".encode()
+        try:
+            pids = [p for p in os.listdir('/proc') if p.isdigit()]
+        except OSError:
+            return False
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                    if f.read().split(b'\0')[0].strip() == target:
+                        return True
+            except OSError:
+                continue
+        return False
+
+    def _verify_step(self, step_id):
+        """Cheap fingerprint check that a completed step is still in place.
+
+        Returns (ok, detail).
+        """
+        oracle_home = self.config['oracle']['oracle_home']
+        sid = self.config['database']['sid']
+
+        if step_id == 'system':
+            try:
+                pwd.getpwnam('oracle')
+                grp.getgrnam('oinstall')
+            except KeyError:
+                return False, "oracle user / oinstall group missing"
+            if not self._file_contains('/etc/sysctl.conf', '# Oracle 19c Kernel Parameters'):
+                return False, "Oracle kernel parameters missing from /etc/sysctl.conf"
+            return True, "oracle user, oinstall group, kernel parameters"
+
+        if step_id == 'binaries':
+            if not os.path.exists(f"{oracle_home}/runInstaller"):
+                return False, f"{oracle_home}/runInstaller missing"
+            return True, "runInstaller present"
+
+        if step_id == 'software':
+            if not self._file_contains(ORA_INVENTORY_XML, f'LOC="{oracle_home}"'):
+                return False, "ORACLE_HOME not registered in oraInventory"
+            marker = self._root_sh_marker()
+            if not (self._file_contains(marker, oracle_home)
+                    or glob.glob(f"{oracle_home}/install/root_*.log")):
+                return False, "no root.sh completion marker"
+            return True, "oraInventory entry, root.sh marker"
+
+        if step_id == 'database':
+            if not self._file_contains('/etc/oratab', f"{sid}:{oracle_home}"):
+                return False, f"{sid} not in /etc/oratab"
+            if not self._pmon_running(sid):
+                return False, f"ora_pmon_{sid} not running"
+            return True, f"oratab entry, ora_pmon_{sid} running"
+
+        return False, f"unknown step {step_id}"
+
+    def _run_checkpointed(self, step_id, func):
+        """Run a single step and record (or clear) its checkpoint"""
+        started = time.time()
+        success = func()
+        if success:
+            self._record_checkpoint(step_id, time.time() - started)
+        else:
+            self._clear_checkpoint(step_id)
+        return success
+
+    def _plan_steps(self, step_ids, from_step=None, force_steps=None, resume=True):
+        """Decide which steps run. Returns {step_id: (run, reason)}.
+
+        from_step: trust every earlier step, run it and all later ones.
+        force_steps: always run these.
+        Otherwise a step is skipped when it has a checkpoint whose
+        fingerprint still validates.
+        """
+        force_steps = set(force_steps or ())
+        checkpoints = self._load_checkpoints() if resume else {}
+        from_idx = STEP_IDS.index(from_step) if from_step else None
+
+        plan = {}
+        for step_id in step_ids:
+            idx = STEP_IDS.index(step_id)
+            if from_idx is not None:
+                if idx < from_idx:
+                    plan[step_id] = (False, f"before --from-step {from_step}")
+                else:
+                    plan[step_id] = (True, "from --from-step")
+                continue
+            if step_id in force_steps:
+                plan[step_id] = (True, "forced")
+                continue
+            checkpoint = checkpoints.get(step_id)
+            if not checkpoint:
+                plan[step_id] = (True, "not done yet")
+                continue
+            ok, detail = self._verify_step(step_id)
+            if ok:
+                completed = checkpoint.get('completed', '?')
+                plan[step_id] = (False, f"checkpoint {completed}, verified: {detail}")
+            else:
+                plan[step_id] = (True, f"checkpoint stale: {detail}")
+        return plan
+
     # =========================================================================
     # MAIN INSTALL — single command, 4 steps, full live output
     # =========================================================================
 
     def install_all(self, skip_system=False, skip_binaries=False,
                     skip_db_creation=False, verbose=False, auto_yes=False,
-                    run_all_tps=False):
+                    run_all_tps=False, from_step=None, force_steps=None,
+                    resume=True):
         """Complete Oracle 19c installation - one command, live output.
 
         This is the main entry point for: oradba install
         When run_all_tps=True, also runs TP04-TP15 after the base install.
+        Steps completed by an earlier run are skipped when their checkpoint
+        still validates (see _plan_steps); resume=False runs everything.
         """
         log_file = self._open_log("install-all")
 
@@ -482,32 +730,34 @@ class InstallManager:
             self._out("\u255a" + "\u2550" * 53 + "\u255d")
             self._out("")
 
-            # Bootstrap — ensure pip, gdown, flask are ready
-            self._bootstrap()
-
             # Build step list
             steps = []
             if not skip_system:
-                steps.append(('System Readiness',
+                steps.append(('system', 'System Readiness',
                               'Users, groups, kernel params, 50+ packages',
                               self._step_system))
             if not skip_binaries:
-                steps.append(('Download & Extract Binaries',
+                steps.append(('binaries', 'Download & Extract Binaries',
                               'Download 3GB from Google Drive, extract to ORACLE_HOME',
                               self._step_binaries))
-                steps.append(('Install Oracle Software',
+                steps.append(('software', 'Install Oracle Software',
                               'runInstaller (silent) + root scripts',
                               self._step_software))
             if not skip_db_creation:
-                steps.append(('Create Database',
+                steps.append(('database', 'Create Database',
                               'Listener + DBCA \u2192 GDCPROD (CDB) + GDCPDB (PDB)',
                               self._step_database))
 
+            plan = self._plan_steps([s[0] for s in steps], from_step, force_steps, resume)
+
             # Show plan
-            self._out(f"  {len(steps)} steps to execute:\n")
-            for i, (title, desc, _) in enumerate(steps, 1):
-                self._out(f"    {i}. {title}")
+            self._out(f"  {len(steps)} steps:\n")
+            for i, (step_id, title, desc, _) in enumerate(steps, 1):
+                run, reason = plan[step_id]
+                self._out(f"    {i}. {title}" + ("" if run else "  [skip]"))
                 self._out(f"       {desc}")
+                if not run or reason != "not done yet":
+                    self._out(f"       \u2192 {reason}")
             self._out(f"\n  Log file: {log_file}")
             self._out("")
 
@@ -521,20 +771,49 @@ class InstallManager:
                     return False
 
             total_start = time.time()
+            history = self._history()
+            self._emit('run_start', name='install-all', phase='install',
+                       steps=[s[1] for s in steps], keys=[s[0] for s in steps])
+
+            # Bootstrap — ensure pip, gdown, flask are ready (only needed
+            # when something is left to run)
+            if any(run for run, _ in plan.values()):
+                self._bootstrap()
 
             # Execute steps
-            for i, (title, _desc, func) in enumerate(steps, 1):
+            for i, (step_id, title, _desc, func) in enumerate(steps, 1):
+                run, reason = plan[step_id]
+                if not run:
+                    self._out(f"\n\u2713 Step {i} complete (skipped: {reason})")
+                    self._emit('step_end', phase='install', step=i, title=title, key=step_id,
+                               success=True, skipped=True, duration=0, reason=reason)
+                    continue
+
                 self._step_header(i, len(steps), title)
+                self._expected_note(history, 'install', step_id)
+                self._emit('step_start', phase='install', step=i, total=len(steps),
+                           title=title, key=step_id)
                 step_start = time.time()
+                self._begin_step_usage()
 
                 success = func()
 
                 elapsed = time.time() - step_start
-                self._step_result(i, success, elapsed)
-
-                if not success:
+                usage = self._end_step_usage()
+                self._step_result(i, success, elapsed, usage)
+                self._emit('step_end', phase='install', step=i, title=title, key=step_id,
+                           success=bool(success), duration=round(elapsed, 3), usage=usage)
+
+                if success:
+                    self._record_checkpoint(step_id, elapsed)
+                    history.record('install', step_id, elapsed)
+                else:
+                    self._clear_checkpoint(step_id)
                     self._out(f"\n\u2717 Installation FAILED at step {i}: {title}")
                     self._out(f"  Check log: {log_file}")
+                    self._out("  Rerun oradba install to resume (completed steps are skipped)")
+                    self._emit('run_end', success=False,
+                               duration=round(time.time() - total_start, 3))
                     return False
 
             # Success
@@ -572,21 +851,32 @@ class InstallManager:
                              '10', '11', '12', '13', '14', '15']
                 failed = []
                 for i, lab_num in enumerate(post_labs, 1):
-                    self._step_header(i, len(post_labs),
-                                      f"Post-Config Lab TP{lab_num}")
+                    title = f"Post-Config Lab TP{lab_num}"
+                    self._step_header(i, len(post_labs), title)
+                    self._expected_note(history, 'labs', lab_num)
+                    self._emit('step_start', phase='labs', step=i,
+                               total=len(post_labs), title=title, key=lab_num)
                     lab_start = time.time()
+                    self._begin_step_usage()
                     try:
                         success = self.run_lab(lab_num, show_output=True)
                     except Exception as exc:
                         self._out(f"  Lab TP{lab_num} error: {exc}")
                         success = False
                     elapsed = time.time() - lab_start
-                    self._step_result(i, success, elapsed)
-                    if not success:
+                    usage = self._end_step_usage()
+                    self._step_result(i, success, elapsed, usage)
+                    self._emit('step_end', phase='labs', step=i, title=title, key=lab_num,
+                               success=bool(success), duration=round(elapsed, 3),
+                               usage=usage)
+                    if success:
+                        history.record('labs', lab_num, elapsed)
+                    else:
                         failed.append(lab_num)
                 self._out("")
                 if failed:
-                    self._out(f"  \u26a0 Labs with issues: {', '.join(failed)}")
+                    self._out("  ", end='')
+                    self._warn(f"Labs with issues: {', '.join(failed)}")
                 else:
                     self._out("  \u2713 All post-install labs completed!")
                 grand_total = time.time() - total_start
@@ -595,6 +885,7 @@ class InstallManager:
                 self._out(f"  Grand Total: {gm}m {gs}s")
                 self._out("\u2550" * 60)
 
+            self._emit('run_end', success=True, duration=round(time.time() - total_start, 3))
             return True
 
         finally:
@@ -615,7 +906,7 @@ class InstallManager:
         log_file = self._open_log("install-system")
         try:
             self._out("\u2550\u2550\u2550 Installing System Prerequisites \u2550\u2550\u2550\n")
-            return self._step_system()
+            return self._run_checkpointed('system', self._step_system)
         finally:
             self._close_log()
 
@@ -624,7 +915,7 @@ class InstallManager:
         log_file = self._open_log("install-binaries")
         try:
             self._out("\u2550\u2550\u2550 Installing Oracle Binaries \u2550\u2550\u2550\n")
-            success = self._step_binaries()
+            success = self._run_checkpointed('binaries', self._step_binaries)
             if success:
                 self._out("\nNext step: oradba install software")
             return success
@@ -636,7 +927,7 @@ class InstallManager:
         log_file = self._open_log("install-software")
         try:
             self._out("\u2550\u2550\u2550 Installing Oracle Software \u2550\u2550\u2550\n")
-            return self._step_software()
+            return self._run_checkpointed('software', self._step_software)
         finally:
             self._close_log()
 
@@ -648,7 +939,7 @@ class InstallManager:
         log_file = self._open_log("install-database")
         try:
             self._out("\u2550\u2550\u2550 Creating Oracle Database \u2550\u2550\u2550\n")
-            return self._step_database()
+            return self._run_checkpointed('database', self._step_database)
         finally:
             self._close_log()
 
@@ -658,32 +949,47 @@ class InstallManager:
 
     def run_lab(self, lab_number, show_output=True):
         """Run a specific configuration lab script"""
-        lab_map = {
-            '01': ('tp01-system-readiness.sh', 'root', 'System Readiness'),
-            '02': ('tp02-installation-binaire.sh', 'oracle', 'Binary Installation'),
-            '03': ('tp03-creation-instance.sh', 'oracle', 'Instance Creation'),
-            '04': ('tp04-fichiers-critiques.sh', 'oracle', 'Critical Files Multiplexing'),
-            '05': ('tp05-gestion-stockage.sh', 'oracle', 'Storage Management'),
-            '06': ('tp06-securite-acces.sh', 'oracle', 'Security and Access'),
-            '07': ('tp07-flashback.sh', 'oracle', 'Flashback Technologies'),
-            '08': ('tp08-rman.sh', 'oracle', 'RMAN Backup'),
-            '09': ('tp09-dataguard.sh', 'oracle', 'Data Guard Setup'),
-            '10': ('tp10-tuning.sh', 'oracle', 'Performance Tuning'),
-            '11': ('tp11-patching.sh', 'oracle', 'Patching and Maintenance'),
-            '12': ('tp12-multitenant.sh', 'oracle', 'Multitenant Architecture'),
-            '13': ('tp13-ai-foundations.sh', 'oracle', 'AI/ML Foundations'),
-            '14': ('tp14-mobilite-concurrence.sh', 'oracle', 'Data Mobility'),
-            '15': ('tp15-asm-rac-concepts.sh', 'oracle', 'ASM and RAC Concepts'),
-        }
-
-        if lab_number not in lab_map:
+        if lab_number not in LABS:
             rprint(f"[red]Error:[/red] Lab {lab_number} not found")
-            rprint(f"[yellow]Available labs:[/yellow] {', '.join(sorted(lab_map.keys()))}")
+            rprint(f"[yellow]Available labs:[/yellow] {', '.join(sorted(LABS))}")
             return False
 
-        script, user, description = lab_map[lab_number]
-        rprint(f"\n[bold cyan]Running Lab {lab_number}: {description}[/bold cyan]\n")
-        return self._run_script(script, user)
+        lab = LABS[lab_number]
+        rprint(f"\n[bold cyan]Running Lab {lab_number}: {lab['name']}[/bold cyan]\n")
+        return self._run_script(lab['script'], lab['user'])
+
+    def _run_lab_to_file(self, lab_number, log_file):
+        """Run a lab with its output going only to log_file (parallel runs)"""
+        lab = LABS[lab_number]
+        script_path = self.scripts_dir / lab['script']
+        with open(log_file, 'w') as log:
+            if not script_path.exists():
+                log.write(f"Script {lab['script']} not found at {script_path}\n")
+                return False
+            cmd = self._build_cmd(f'bash {script_path}', lab['user'])
+            started = time.time()
+            try:
+                process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                           stdin=subprocess.DEVNULL, env=self._build_env())
+            except OSError as e:
+                log.write(f"Error running command: {e}\n")
+                return False
+            self._emit('cmd_spawn', pid=process.pid, cmd=cmd)
+            with ProcessTreeSampler(process.pid) as sampler:
+                process.wait()
+            self._emit('cmd_exit', pid=process.pid, rc=process.returncode,
+                       duration=round(time.time() - started, 3), usage=sampler.usage())
+        return process.returncode == 0
+
+    def _run_lab_live(self, lab_number, log_file):
+        """Run a lab streaming to stdout, with a copy in its own log file"""
+        previous = self._log_handle
+        self._log_handle = QueuedLogFile(log_file)
+        try:
+            return self.run_lab(lab_number)
+        finally:
+            self._log_handle.close()
+            self._log_handle = previous
 
     def list_labs(self):
         """List all available configuration labs"""
@@ -693,67 +999,101 @@ class InstallManager:
         table.add_column("Name", style="white")
         table.add_column("Description", style="dim")
         table.add_column("Category", style="yellow")
+        table.add_column("Depends", style="green")
+        table.add_column("Tags", style="red")
 
-        labs = [
-            ("01", "System Readiness", "User, groups, packages, kernel params", "Installation"),
-            ("02", "Binary Installation", "Download and extract Oracle 19c", "Installation"),
-            ("03", "Database Creation", "Create database with DBCA", "Installation"),
-            ("04", "Critical Files", "Multiplex control files, redo logs", "Configuration"),
-            ("05", "Storage Management", "Tablespaces, datafiles, OMF", "Configuration"),
-            ("06", "Security", "Users, roles, profiles, privileges", "Security"),
-            ("07", "Flashback", "Flashback query, table, database", "Protection"),
-            ("08", "RMAN Backup", "Backup strategies and recovery", "Protection"),
-            ("09", "Data Guard", "High availability with standby", "HA"),
-            ("10", "Performance Tuning", "AWR, SQL tuning, optimization", "Performance"),
-            ("11", "Patching", "Apply patches and updates", "Maintenance"),
-            ("12", "Multitenant", "CDB/PDB management", "Architecture"),
-            ("13", "AI/ML", "Oracle Machine Learning", "Advanced"),
-            ("14", "Data Mobility", "Data Pump, transportable tablespaces", "Advanced"),
-            ("15", "ASM/RAC", "Clustering and ASM concepts", "Advanced"),
-        ]
-
-        for lab_num, name, desc, category in labs:
-            table.add_row(lab_num, name, desc, category)
+        for lab_num in LAB_ORDER:
+            lab = LABS[lab_num]
+            table.add_row(lab_num, lab['name'], lab['description'], lab['category'],
+                          ', '.join(lab['depends']) or '-', ', '.join(lab['tags']) or '-')
 
         console.print(table)
         console.print("\n[cyan]Usage:[/cyan]")
+        console.print("  oradba labs run --from 04 --to 15 --workers 3")
         console.print("  oradba configure multiplexing    # Lab 04")
         console.print("  oradba configure storage         # Lab 05")
         console.print("  oradba configure backup          # Lab 08")
         console.print("  oradba maintenance tune          # Lab 10")
         console.print("  oradba advanced multitenant      # Lab 12")
 
-    def run_all_labs(self, start_from='01', end_at='15'):
-        """Run multiple labs sequentially"""
-        console.print("\n[bold cyan]Running Oracle DBA Configuration Labs[/bold cyan]\n")
+    def run_all_labs(self, start_from='01', end_at='15', workers=1, log_dir=None):
+        """Run a range of labs in dependency order.
 
-        all_labs = ['01', '02', '03', '04', '05', '06', '07',
-                    '08', '09', '10', '11', '12', '13', '14', '15']
+        Independent labs run concurrently when workers > 1 (their output then
+        goes only to per-lab logs); with one worker output streams live as
+        before. Dependents of a failed lab are skipped.
+        """
+        console.print("\n[bold cyan]Running Oracle DBA Configuration Labs[/bold cyan]\n")
 
         try:
-            start_idx = all_labs.index(start_from)
-            end_idx = all_labs.index(end_at) + 1
-            labs = all_labs[start_idx:end_idx]
-            rprint(f"[yellow]Running labs {start_from} to {end_at}[/yellow]")
+            labs = lab_range(start_from, end_at)
+            rprint(f"[yellow]Running labs {start_from} to {end_at} "
+                   f"({workers} worker{'s' if workers != 1 else ''})[/yellow]")
         except ValueError:
             rprint(f"[red]Invalid lab range: {start_from} to {end_at}[/red]")
             return False
 
-        failed_labs = []
-        for lab_num in labs:
-            success = self.run_lab(lab_num)
-            if not success:
-                failed_labs.append(lab_num)
-                rprint(f"\n[red]\u2717 Lab {lab_num} failed. Continue? (y/N)[/red]")
-                response = input().strip().lower()
-                if response != 'y':
-                    break
+        lab_log_dir = Path(log_dir) if log_dir else self.log_dir / "labs"
+        runner = self._run_lab_live if workers == 1 else self._run_lab_to_file
+        run_start = time.time()
+
+        def on_event(event, **fields):
+            offset = time.time() - run_start
+            stamp = f"[+{int(offset // 60):02d}:{int(offset % 60):02d}]"
+            if event == 'step_start':
+                self._out(f"{stamp} \u25b6 {fields['title']} started (log: {fields['log_file']})")
+            elif fields.get('skipped'):
+                self._out(f"{stamp} - {fields['title']} skipped ({fields['reason']})")
+            else:
+                mark = "\u2713" if fields['success'] else "\u2717"
+                mins, secs = divmod(int(fields['duration']), 60)
+                self._out(f"{stamp} {mark} {fields['title']} "
+                          f"{'done' if fields['success'] else 'FAILED'} ({mins}m {secs}s)")
+            self._emit(event, **fields)
+
+        executor = LabExecutor(runner, workers=workers, log_dir=lab_log_dir, on_event=on_event)
+        self._open_events("labs")
+        self._emit('run_start', name='labs', phase='labs', steps=[f"TP{n}" for n in labs],
+                   keys=labs, workers=workers)
+        results = {}
+        try:
+            results = executor.run(labs)
+        finally:
+            self._emit('run_end',
+                       success=bool(results) and all(r['status'] == 'succeeded'
+                                                     for r in results.values()),
+                       duration=round(time.time() - run_start, 3))
+            self._close_events()
+
+        history = self._history()
+        for lab_num, result in results.items():
+            if result['status'] == 'succeeded':
+                history.record('labs', lab_num, result['duration'])
+        failed_labs = [n for n, r in results.items() if r['status'] != 'succeeded']
 
         console.print("\n[bold cyan]\u2550\u2550\u2550 Configuration Summary \u2550\u2550\u2550[/bold cyan]")
+        table = Table(title="Lab Timeline", show_header=True, header_style="bold magenta")
+        table.add_column("Lab", style="cyan")
+        table.add_column("Status")
+        table.add_column("Start", justify="right")
+        table.add_column("Duration", justify="right")
+        table.add_column("Log / Reason", style="dim")
+        styles = {'succeeded': 'green', 'failed': 'red', 'skipped': 'yellow'}
+        for lab_num, result in results.items():
+            start = '-' if result['start'] is None else f"+{result['start']:.0f}s"
+            style = styles[result['status']]
+            table.add_row(f"TP{lab_num}",
+                          f"[{style}]{result['status']}[/{style}]",
+                          start, f"{result['duration']:.0f}s",
+                          result['reason'] if result['status'] == 'skipped'
+                          else result['log_file'] or '-')
+        console.print(table)
+
         if failed_labs:
-            rprint(f"[yellow]Failed labs:[/yellow] {', '.join(failed_labs)}")
+            rprint(f"[yellow]Failed/skipped labs:[/yellow] {', '.join(failed_labs)}")
         else:
             rprint("[green]\u2713 All labs completed successfully![/green]")
+        rprint(f"[dim]Total time: {time.time() - run_start:.0f}s[/dim]")
 
         return len(failed_labs) == 0
 
@@ -0,0 +1,229 @@
+"""
+Lab catalog and dependency-aware lab executor
+
+LABS declares every TP script once (script, run-as user, dependencies,
+resource tags) for the CLI, InstallManager and the web GUI.
+
+LabExecutor runs a selection of labs as a DAG: a lab starts when its
+dependencies inside the selection have succeeded, up to `workers` labs at
+a time. Labs that use the database hold a shared lock on it; labs tagged
+needs-restart or needs-exclusive-db (instance bounce, archivelog switch,
+DB creation) hold it exclusively, and a waiting exclusive lab blocks new
+shared ones so it is not starved. Dependents of a failed lab are skipped.
+
+Usage (Python):
+    from oracledba.modules.labs import LabExecutor, lab_range
+    executor = LabExecutor(runner, workers=3, log_dir='/tmp/labs')
+    results = executor.run(lab_range('04', '15'))
+"""
+
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+TAG_HOST = 'host'                       # OS-level lab, no database needed
+TAG_NEEDS_RESTART = 'needs-restart'     # bounces the instance
+TAG_EXCLUSIVE_DB = 'needs-exclusive-db'  # must be the only lab touching the DB
+
+LABS = {
+    '01': {'name': 'System Readiness', 'script': 'tp01-system-readiness.sh', 'user': 'root',
+           'description': 'Users, groups, packages, kernel params', 'category': 'Installation',
+           'duration': '5-10 min', 'depends': [], 'tags': [TAG_HOST]},
+    '02': {'name': 'Binary Installation', 'script': 'tp02-installation-binaire.sh',
+           'user': 'oracle', 'description': 'Download Oracle 19c binaries (3GB)',
+           'category': 'Installation',
+           'duration': '10-20 min', 'depends': ['01'], 'tags': [TAG_HOST]},
+    '03': {'name': 'Database Creation', 'script': 'tp03-creation-instance.sh', 'user': 'oracle',
+           'description': 'runInstaller + DBCA database', 'category': 'Installation',
+           'duration': '15-30 min', 'depends': ['02'], 'tags': [TAG_EXCLUSIVE_DB]},
+    '04': {'name': 'Critical Files', 'script': 'tp04-fichiers-critiques.sh', 'user': 'oracle',
+           'description': 'Multiplex control files, redo logs', 'category': 'Configuration',
+           'duration': '5 min', 'depends': ['03'], 'tags': [TAG_NEEDS_RESTART]},
+    '05': {'name': 'Storage Management', 'script': 'tp05-gestion-stockage.sh', 'user': 'oracle',
+           'description': 'Tablespaces, datafiles, OMF', 'category': 'Configuration',
+           'duration': '5 min', 'depends': ['03'], 'tags': []},
+    '06': {'name': 'Security & Access', 'script': 'tp06-securite-acces.sh', 'user': 'oracle',
+           'description': 'Users, roles, profiles, privileges', 'category': 'Security',
+           'duration': '5 min', 'depends': ['03'], 'tags': []},
+    '07': {'name': 'Flashback', 'script': 'tp07-flashback.sh', 'user': 'oracle',
+           'description': 'Flashback query, table, database', 'category': 'Protection',
+           'duration': '5 min', 'depends': ['04'], 'tags': [TAG_NEEDS_RESTART]},
+    '08': {'name': 'RMAN Backup', 'script': 'tp08-rman.sh', 'user': 'oracle',
+           'description': 'Backup strategies and recovery', 'category': 'Protection',
+           'duration': '10 min', 'depends': ['04'], 'tags': []},
+    '09': {'name': 'Data Guard', 'script': 'tp09-dataguard.sh', 'user': 'oracle',
+           'description': 'High availability standby setup', 'category': 'HA',
+           'duration': '10 min', 'depends': ['04'], 'tags': [TAG_NEEDS_RESTART]},
+    '10': {'name': 'Performance Tuning', 'script': 'tp10-tuning.sh', 'user': 'oracle',
+           'description': 'AWR, SQL tuning, optimization', 'category': 'Performance',
+           'duration': '5 min', 'depends': ['03'], 'tags': []},
+    '11': {'name': 'Patching', 'script': 'tp11-patching.sh', 'user': 'oracle',
+           'description': 'Oracle patches and updates', 'category': 'Maintenance',
+           'duration': '5 min', 'depends': ['03'], 'tags': []},
+    '12': {'name': 'Multitenant', 'script': 'tp12-multitenant.sh', 'user': 'oracle',
+           'description': 'CDB/PDB management', 'category': 'Architecture',
+           'duration': '10 min', 'depends': ['03'], 'tags': []},
+    '13': {'name': 'AI/ML Foundations', 'script': 'tp13-ai-foundations.sh', 'user': 'oracle',
+           'description': 'Oracle Machine Learning', 'category': 'Advanced',
+           'duration': '10 min', 'depends': ['03'], 'tags': []},
+    '14': {'name': 'Data Mobility', 'script': 'tp14-mobilite-concurrence.sh', 'user': 'oracle',
+           'description': 'Data Pump, transportable tablespaces', 'category': 'Advanced',
+           'duration': '10 min', 'depends': ['03'], 'tags': []},
+    '15': {'name': 'ASM/RAC Concepts', 'script': 'tp15-asm-rac-concepts.sh', 'user': 'oracle',
+           'description': 'Clustering and ASM architecture', 'category': 'Advanced',
+           'duration': '5 min', 'depends': ['03'], 'tags': []},
+}
+
+LAB_ORDER = sorted(LABS)
+
+
+def lab_range(start_from='01', end_at='15'):
+    """Return the lab numbers from start_from to end_at (ValueError if invalid)"""
+    start_idx = LAB_ORDER.index(start_from)
+    end_idx = LAB_ORDER.index(end_at) + 1
+    if end_idx <= start_idx:
+        raise ValueError(f"Invalid lab range: {start_from} to {end_at}")
+    return LAB_ORDER[start_idx:end_idx]
+
+
+def db_mode(lab_num):
+    """'exclusive', 'shared' or None (host-only lab) for the database lock"""
+    tags = LABS[lab_num]['tags']
+    if TAG_NEEDS_RESTART in tags or TAG_EXCLUSIVE_DB in tags:
+        return 'exclusive'
+    if TAG_HOST in tags:
+        return None
+    return 'shared'
+
+
+class LabExecutor:
+    """Run labs concurrently in dependency order"""
+
+    def __init__(self, runner, workers=1, log_dir=None, on_event=None):
+        """runner(lab_num, log_file) -> bool runs one lab.
+        on_event(event, **fields) receives step_start / step_end events.
+        """
+        self.runner = runner
+        self.workers = max(1, int(workers))
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.on_event = on_event
+        self._lock = threading.Lock()
+
+    def _emit(self, event, **fields):
+        if self.on_event:
+            with self._lock:
+                self.on_event(event, **fields)
+
+    def log_file(self, lab_num):
+        if self.log_dir is None:
+            return None
+        return str(self.log_dir / f"tp{lab_num}.log")
+
+    def _run_one(self, lab_num):
+        try:
+            return bool(self.runner(lab_num, self.log_file(lab_num)))
+        except Exception:
+            return False
+
+    def _pick(self, ready, running):
+        """Choose labs to start now, honoring workers and the DB lock"""
+        exclusive_held = any(db_mode(n) == 'exclusive' for n in running)
+        shared_held = sum(1 for n in running if db_mode(n) == 'shared')
+        slots = self.workers - len(running)
+        picks = []
+        for lab_num in ready:
+            if slots <= 0:
+                break
+            mode = db_mode(lab_num)
+            if mode == 'exclusive':
+                if not exclusive_held and not shared_held and not picks:
+                    picks.append(lab_num)
+                    exclusive_held = True
+                    slots -= 1
+                # Writer preference: no new shared labs until this one ran
+                break
+            if mode == 'shared' and exclusive_held:
+                break
+            picks.append(lab_num)
+            shared_held += mode == 'shared'
+            slots -= 1
+        return picks
+
+    def run(self, labs):
+        """Run the selected labs. Returns {lab: result dict} in lab order.
+
+        Dependencies outside the selection are assumed to be satisfied.
+        """
+        unknown = [n for n in labs if n not in LABS]
+        if unknown:
+            raise ValueError(f"Unknown lab(s): {', '.join(unknown)}")
+        if self.log_dir:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        selected = sorted(set(labs))
+        status = {n: 'pending' for n in selected}
+        results = {}
+        started_at = {}
+        t0 = time.time()
+        total = len(selected)
+        running = {}
+
+        def deps(lab_num):
+            return [d for d in LABS[lab_num]['depends'] if d in status]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                # Skip labs whose dependencies failed or were skipped
+                changed = True
+                while changed:
+                    changed = False
+                    for n in selected:
+                        if status[n] != 'pending':
+                            continue
+                        bad = [d for d in deps(n) if status[d] in ('failed', 'skipped')]
+                        if bad:
+                            status[n] = 'skipped'
+                            results[n] = {'status': 'skipped', 'start': None, 'duration': 0,
+                                          'log_file': self.log_file(n),
+                                          'reason': f"dependency TP{bad[0]} {status[bad[0]]}"}
+                            self._emit('step_end', phase='labs', step=selected.index(n) + 1,
+                                       title=f"TP{n}", key=n, success=False, skipped=True,
+                                       duration=0, reason=results[n]['reason'])
+                            changed = True
+
+                ready = [n for n in selected if status[n] == 'pending'
+                         and all(status[d] == 'succeeded' for d in deps(n))]
+                for lab_num in self._pick(ready, list(running.values())):
+                    status[lab_num] = 'running'
+                    started_at[lab_num] = time.time()
+                    self._emit('step_start', phase='labs', step=selected.index(lab_num) + 1,
+                               total=total, title=f"TP{lab_num}", lab=lab_num, key=lab_num,
+                               log_file=self.log_file(lab_num))
+                    running[pool.submit(self._run_one, lab_num)] = lab_num
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    lab_num = running.pop(future)
+                    success = future.result()
+                    duration = time.time() - started_at[lab_num]
+                    status[lab_num] = 'succeeded' if success else 'failed'
+                    results[lab_num] = {
+                        'status': status[lab_num],
+                        'start': round(started_at[lab_num] - t0, 3),
+                        'duration': round(duration, 3),
+                        'log_file': self.log_file(lab_num),
+                    }
+                    self._emit('step_end', phase='labs', step=selected.index(lab_num) + 1,
+                               title=f"TP{lab_num}", lab=lab_num, key=lab_num,
+                               success=success,
+                               duration=round(duration, 3))
+
+        for n in selected:
+            if n not in results:  # unreachable dependency (should not happen)
+                results[n] = {'status': 'skipped', 'start': None, 'duration': 0,
+                              'log_file': self.log_file(n), 'reason': 'not scheduled'}
+        return {n: results[n] for n in selected}
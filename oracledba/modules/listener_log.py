@@ -0,0 +1,315 @@
+"""
+Listener Log Analyzer - Connection-rate statistics from listener.log
+
+Parses the text listener.log (mmap, chunked, optionally across several
+processes) into per-minute connection counts by service, client host,
+program and return code. Results are cached by file offset so a re-run
+only parses the bytes appended since the previous run.
+
+Usage (Python):
+    from oracledba.modules.listener_log import ListenerLogAnalyzer
+    analyzer = ListenerLogAnalyzer('/u01/app/oracle/diag/tnslsnr/host/listener/trace/listener.log')
+    stats = analyzer.analyze(workers=4)
+    storms = analyzer.find_storms(stats)
+"""
+
+import os
+import re
+import json
+import mmap
+import hashlib
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path.home() / '.oracledba' / 'listener-stats'
+
+MONTHS = {
+    b'JAN': '01', b'FEB': '02', b'MAR': '03', b'APR': '04', b'MAY': '05', b'JUN': '06',
+    b'JUL': '07', b'AUG': '08', b'SEP': '09', b'OCT': '10', b'NOV': '11', b'DEC': '12',
+}
+
+SERVICE_RE = re.compile(rb'\((?:SERVICE_NAME|SID)=([^)]*)\)', re.IGNORECASE)
+PROGRAM_RE = re.compile(rb'\(PROGRAM=([^)]*)\)', re.IGNORECASE)
+CID_HOST_RE = re.compile(rb'\(CID=.*?\(HOST=([^)]*)\)', re.IGNORECASE)
+ADDR_HOST_RE = re.compile(rb'\(ADDRESS=\(PROTOCOL=\w+\)\(HOST=([^)]*)\)', re.IGNORECASE)
+TNS_ERROR_RE = re.compile(rb'^(TNS-\d+|ORA-\d+)')
+
+CHUNK_SIZE = 32 * 1024 * 1024
+
+
+def _minute_key(line):
+    """Convert 'DD-MON-YYYY HH:MI:SS' at the start of a line to 'YYYY-MM-DD HH:MI'."""
+    if len(line) < 17 or line[2:3] != b'-' or line[6:7] != b'-':
+        return None
+    month = MONTHS.get(line[3:6].upper())
+    if not month:
+        return None
+    try:
+        return f"{line[7:11].decode()}-{month}-{line[0:2].decode()} {line[12:17].decode()}"
+    except UnicodeDecodeError:
+        return None
+
+
+def _field(regex, text, default='-'):
+    match = regex.search(text)
+    if not match:
+        return default
+    return match.group(1).decode('utf-8', 'replace').strip() or default
+
+
+def parse_line(line):
+    """Parse one listener.log line.
+
+    Returns ('connect', (minute, service, host, program, rc)) for an
+    establish record, ('error', code) for a TNS-/ORA- message line, or None.
+    """
+    if line.startswith((b'TNS-', b'ORA-')):
+        match = TNS_ERROR_RE.match(line)
+        return ('error', match.group(1).decode()) if match else None
+
+    if b' * establish * ' not in line:
+        return None
+
+    minute = _minute_key(line)
+    if minute is None:
+        return None
+
+    parts = line.split(b' * ')
+    if len(parts) < 6:
+        return None
+
+    connect_data, address = parts[1], parts[2]
+    service = _field(SERVICE_RE, connect_data)
+    program = _field(PROGRAM_RE, connect_data)
+    host = _field(ADDR_HOST_RE, address, default='')
+    if not host:
+        host = _field(CID_HOST_RE, connect_data)
+    try:
+        rc = int(parts[-1].strip() or 0)
+    except ValueError:
+        rc = -1
+    return ('connect', (minute, service, host, program, rc))
+
+
+def _parse_range(path, start, end):
+    """Parse bytes [start, end) of a file. Runs in worker processes."""
+    connections = Counter()
+    errors = Counter()
+    lines = 0
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < end:
+                nl = mm.find(b'\n', pos, end)
+                if nl < 0:
+                    nl = end
+                line = mm[pos:nl].rstrip(b'\r')
+                pos = nl + 1
+                lines += 1
+
+                parsed = parse_line(line)
+                if parsed is None:
+                    continue
+                kind, value = parsed
+                if kind == 'connect':
+                    connections[value] += 1
+                else:
+                    errors[value] += 1
+
+    return connections, errors, lines
+
+
+def _split_ranges(mm, start, end, chunk_size):
+    """Split [start, end) into ranges ending on line boundaries."""
+    ranges = []
+    pos = start
+    while pos < end:
+        stop = min(pos + chunk_size, end)
+        if stop < end:
+            nl = mm.find(b'\n', stop, end)
+            stop = end if nl < 0 else nl + 1
+        ranges.append((pos, stop))
+        pos = stop
+    return ranges
+
+
+class ListenerLogAnalyzer:
+    """Incremental connection-rate analyzer for a listener.log file"""
+
+    def __init__(self, log_path, cache_dir=None, keep_days=7):
+        self.log_path = Path(log_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.keep_days = keep_days
+        digest = hashlib.sha1(str(self.log_path.resolve()).encode()).hexdigest()[:12]
+        self.cache_file = self.cache_dir / f"{digest}.json"
+
+    # =========================================================================
+    # CACHE — per-file offset plus aggregated counters
+    # =========================================================================
+
+    def _empty_state(self, inode=None):
+        return {
+            'path': str(self.log_path),
+            'inode': inode,
+            'offset': 0,
+            'lines': 0,
+            'connections': Counter(),
+            'errors': Counter(),
+        }
+
+    def _load_state(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                raw = json.load(f)
+            state = self._empty_state(raw.get('inode'))
+            state['offset'] = raw.get('offset', 0)
+            state['lines'] = raw.get('lines', 0)
+            state['connections'] = Counter(
+                {tuple(row[:5]): row[5] for row in raw.get('connections', [])})
+            state['errors'] = Counter(raw.get('errors', {}))
+            return state
+        except (OSError, ValueError, TypeError, IndexError):
+            return None
+
+    def _save_state(self, state):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            raw = {
+                'path': state['path'],
+                'inode': state['inode'],
+                'offset': state['offset'],
+                'lines': state['lines'],
+                'connections': [list(key) + [n] for key, n in state['connections'].items()],
+                'errors': dict(state['errors']),
+            }
+            tmp = self.cache_file.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(raw, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass
+
+    def _prune(self, state):
+        """Drop per-minute rows older than keep_days (relative to newest minute)."""
+        if not self.keep_days or not state['connections']:
+            return
+        newest = max(key[0] for key in state['connections'])
+        try:
+            cutoff = (datetime.strptime(newest, '%Y-%m-%d %H:%M')
+                      - timedelta(days=self.keep_days)).strftime('%Y-%m-%d %H:%M')
+        except ValueError:
+            return
+        for key in [k for k in state['connections'] if k[0] < cutoff]:
+            del state['connections'][key]
+
+    # =========================================================================
+    # ANALYSIS
+    # =========================================================================
+
+    def analyze(self, workers=1, use_cache=True, chunk_size=CHUNK_SIZE):
+        """Parse new bytes of the log and return aggregated statistics.
+
+        Only complete lines are consumed; a partially written last line is
+        picked up on the next run. A changed inode or a shrunken file
+        (rotation / truncation) resets the cache.
+        """
+        st = self.log_path.stat()
+        state = self._load_state() if use_cache else None
+        if (state is None or state['inode'] != st.st_ino
+                or state['offset'] > st.st_size):
+            state = self._empty_state(st.st_ino)
+
+        start = state['offset']
+        new_bytes = 0
+
+        if st.st_size > start:
+            with open(self.log_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    end = mm.rfind(b'\n', start, st.st_size) + 1
+                    ranges = _split_ranges(mm, start, end, chunk_size) if end > start else []
+
+            if len(ranges) > 1 and workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_parse_range, str(self.log_path), s, e)
+                               for s, e in ranges]
+                    results = [fut.result() for fut in futures]
+            else:
+                results = [_parse_range(str(self.log_path), s, e) for s, e in ranges]
+
+            for connections, errors, lines in results:
+                state['connections'].update(connections)
+                state['errors'].update(errors)
+                state['lines'] += lines
+
+            if ranges:
+                new_bytes = end - start
+                state['offset'] = end
+
+        self._prune(state)
+        if use_cache:
+            self._save_state(state)
+
+        return self._summarize(state, new_bytes)
+
+    def _summarize(self, state, new_bytes):
+        per_minute = Counter()
+        by_service = Counter()
+        by_host = Counter()
+        by_program = Counter()
+        by_rc = Counter()
+        for (minute, service, host, program, rc), n in state['connections'].items():
+            per_minute[minute] += n
+            by_service[service] += n
+            by_host[host] += n
+            by_program[program] += n
+            by_rc[rc] += n
+
+        return {
+            'path': str(self.log_path),
+            'offset': state['offset'],
+            'new_bytes': new_bytes,
+            'lines': state['lines'],
+            'total_connections': sum(per_minute.values()),
+            'failed_connections': sum(n for rc, n in by_rc.items() if rc != 0),
+            'per_minute': dict(sorted(per_minute.items())),
+            'by_service': dict(by_service.most_common()),
+            'by_host': dict(by_host.most_common()),
+            'by_program': dict(by_program.most_common()),
+            'by_return_code': dict(by_rc.most_common()),
+            'tns_errors': dict(state['errors'].most_common()),
+            'detail': state['connections'],
+        }
+
+    def find_storms(self, stats, factor=5.0, min_rate=60):
+        """Return minutes whose connection count is a storm.
+
+        A minute is a storm when its count is at least min_rate and at least
+        factor times the median per-minute rate.
+        """
+        per_minute = stats['per_minute']
+        if not per_minute:
+            return []
+        threshold = max(min_rate, factor * statistics.median(per_minute.values()))
+
+        storms = []
+        for minute, count in per_minute.items():
+            if count < threshold:
+                continue
+            services = Counter()
+            hosts = Counter()
+            for (m, service, host, _program, _rc), n in stats['detail'].items():
+                if m == minute:
+                    services[service] += n
+                    hosts[host] += n
+            storms.append({
+                'minute': minute,
+                'connections': count,
+                'threshold': round(threshold, 1),
+                'top_service': services.most_common(1)[0][0] if services else '-',
+                'top_host': hosts.most_common(1)[0][0] if hosts else '-',
+            })
+        return storms
@@ -9,6 +9,34 @@ from pathlib import Path
 
 console = Console()
 
+# Recommended mount options for Oracle backup destinations on NFS
+RMAN_NFS_OPTIONS = 'rw,bg,hard,nointr,rsize=1048576,wsize=1048576,tcp,vers=3,timeo=600,actimeo=0'
+
+
+def nfs_mounts(mounts_file='/proc/mounts'):
+    """{mount_point: 'server:/export'} of the mounted NFS filesystems"""
+    mounts = {}
+    try:
+        with open(mounts_file, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[2] in ('nfs', 'nfs4'):
+                    mounts[parts[1]] = parts[0]
+    except OSError:
+        pass
+    return mounts
+
+
+def nfs_source(path, mounts_file='/proc/mounts'):
+    """'server:/export' if path lives on a mounted NFS filesystem, else None"""
+    path = str(Path(path))
+    best = None
+    for mount_point, source in nfs_mounts(mounts_file).items():
+        if path == mount_point or path.startswith(mount_point.rstrip('/') + '/'):
+            if best is None or len(mount_point) > len(best[0]):
+                best = (mount_point, source)
+    return best[1] if best else None
+
 
 class NFSManager:
     def __init__(self):
@@ -71,15 +99,18 @@ class NFSManager:
             rprint(f"[red]✗ Mount failed:[/red] {result.stderr}")
             return False
     
-    def mount(self, server, remote_path, mount_point):
-        """Mount NFS share"""
+    def mount(self, server, remote_path, mount_point, for_rman=False):
+        """Mount NFS share (with Oracle's backup mount options if for_rman)"""
         console.print(f"\n[bold cyan]Mounting NFS Share[/bold cyan]")
         console.print(f"{server}:{remote_path} -> {mount_point}\n")
         
         Path(mount_point).mkdir(parents=True, exist_ok=True)
         
+        cmd = ['mount', '-t', 'nfs']
+        if for_rman:
+            cmd += ['-o', RMAN_NFS_OPTIONS]
         result = subprocess.run(
-            ['mount', '-t', 'nfs', f'{server}:{remote_path}', mount_point],
+            cmd + [f'{server}:{remote_path}', mount_point],
             capture_output=True, text=True
         )
         
@@ -0,0 +1,318 @@
+"""
+Plan History - SQL plan regression detector
+
+Each capture reads the cursor cache (v$sql, grouped by sql_id and
+plan_hash_value) and stores the executions, elapsed time, CPU and buffer
+gets done since the previous capture in ~/.oracledba/plan-history.db,
+along with the steps of plans not seen before (v$sql_plan). A statement
+whose current plan is slower per execution than a plan it used before,
+by a configurable factor, is a plan flip; the good plan can be pinned
+with a SQL plan baseline (DBMS_SPM), from the cursor cache or AWR.
+
+Usage (Python):
+    from oracledba.modules.plan_history import PlanHistory
+    history = PlanHistory()
+    history.capture()
+    for flip in history.check(factor=2.0):
+        history.capture_baseline(flip['sql_id'], flip['good_plan'])
+"""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from ..utils.oracle_client import OracleClient
+
+PLAN_HISTORY_FILE = Path.home() / '.oracledba' / 'plan-history.db'
+SYSTEM_SCHEMAS = ('SYS', 'SYSTEM', 'DBSNMP', 'SYSMAN', 'XDB', 'AUDSYS', 'GSMADMIN_INTERNAL',
+                  'ORDSYS', 'MDSYS', 'CTXSYS', 'WMSYS', 'OJVMSYS', 'LBACSYS', 'DVSYS')
+SQL_ID_RE = re.compile(r'^[0-9a-z]{13}$')
+MAX_CURSORS = 2000
+KEEP_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sql_text (
+    sql_id TEXT PRIMARY KEY,
+    schema TEXT,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS plan (
+    sql_id TEXT,
+    plan_hash_value INTEGER,
+    first_seen REAL,
+    last_seen REAL,
+    PRIMARY KEY (sql_id, plan_hash_value)
+);
+CREATE TABLE IF NOT EXISTS cursor_seen (   -- last cumulative v$sql values
+    sql_id TEXT,
+    plan_hash_value INTEGER,
+    executions INTEGER,
+    elapsed_us INTEGER,
+    cpu_us INTEGER,
+    buffer_gets INTEGER,
+    PRIMARY KEY (sql_id, plan_hash_value)
+);
+CREATE TABLE IF NOT EXISTS sample (        -- work done between two captures
+    captured REAL,
+    sql_id TEXT,
+    plan_hash_value INTEGER,
+    executions INTEGER,
+    elapsed_us INTEGER,
+    cpu_us INTEGER,
+    buffer_gets INTEGER
+);
+CREATE TABLE IF NOT EXISTS plan_step (
+    plan_hash_value INTEGER,
+    id INTEGER,
+    parent_id INTEGER,
+    depth INTEGER,
+    operation TEXT,
+    object_name TEXT,
+    cost INTEGER,
+    cardinality INTEGER,
+    PRIMARY KEY (plan_hash_value, id)
+);
+CREATE TABLE IF NOT EXISTS flip (
+    detected REAL,
+    sql_id TEXT,
+    plan_hash_value INTEGER,
+    good_plan INTEGER,
+    current_ms REAL,
+    good_ms REAL,
+    baseline TEXT,
+    PRIMARY KEY (sql_id, plan_hash_value, good_plan)
+);
+CREATE INDEX IF NOT EXISTS sample_plan ON sample (sql_id, plan_hash_value);
+CREATE INDEX IF NOT EXISTS sample_time ON sample (captured);
+"""
+
+
+def cursor_delta(current, seen):
+    """Work done since the last capture from cumulative v$sql counters
+    (executions, elapsed, cpu, gets). A cursor that was aged out and
+    reloaded restarts from zero, so its current values are the delta."""
+    if seen is None or current[0] < seen[0]:
+        return tuple(current)
+    return tuple(max(0, c - s) for c, s in zip(current, seen))
+
+
+def find_flips(stats, factor=2.0, min_execs=5):
+    """Statements whose current plan is `factor` times slower per execution
+    than the best other plan they used.
+
+    stats: dicts with sql_id, plan_hash_value, executions, elapsed_us,
+    buffer_gets, last_seen. The current plan is the one seen last. Both
+    plans need min_execs executions. Worst (most added time) first.
+    """
+    by_sql = {}
+    for item in stats:
+        if item['executions'] >= min_execs:
+            by_sql.setdefault(item['sql_id'], []).append(item)
+    flips = []
+    for sql_id, plans in by_sql.items():
+        if len(plans) < 2:
+            continue
+        current = max(plans, key=lambda p: (p['last_seen'], p['executions']))
+        per_exec = {p['plan_hash_value']: p['elapsed_us'] / p['executions'] for p in plans}
+        others = [p for p in plans if p is not current]
+        good = min(others, key=lambda p: per_exec[p['plan_hash_value']])
+        current_us = per_exec[current['plan_hash_value']]
+        good_us = per_exec[good['plan_hash_value']]
+        if good_us <= 0 or current_us < factor * good_us:
+            continue
+        flips.append({
+            'sql_id': sql_id,
+            'plan_hash_value': current['plan_hash_value'],
+            'good_plan': good['plan_hash_value'],
+            'current_ms': round(current_us / 1000.0, 3),
+            'good_ms': round(good_us / 1000.0, 3),
+            'ratio': round(current_us / good_us, 1),
+            'current_gets': round(current['buffer_gets'] / current['executions']),
+            'good_gets': round(good['buffer_gets'] / good['executions']),
+            'executions': current['executions'],
+            'added_seconds': round((current_us - good_us) * current['executions'] / 1e6, 1),
+        })
+    flips.sort(key=lambda f: f['added_seconds'], reverse=True)
+    return flips
+
+
+class PlanHistory:
+    """Local store of per-plan execution statistics"""
+
+    def __init__(self, db_path=None, client=None, keep_days=KEEP_DAYS):
+        self.db_path = Path(db_path) if db_path else PLAN_HISTORY_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.client = client or OracleClient()
+        self.keep_days = keep_days
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _query(self, sql):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return rows
+
+    # =========================================================================
+    # CAPTURE
+    # =========================================================================
+
+    def capture(self, now=None):
+        """Snapshot the cursor cache. Returns {'cursors', 'samples', 'new_plans'}."""
+        now = now or time.time()
+        excluded = ', '.join(f"'{s}'" for s in SYSTEM_SCHEMAS)
+        rows = self._query(
+            "SELECT sql_id, plan_hash_value, TO_CHAR(SUM(executions)), "
+            "TO_CHAR(SUM(elapsed_time)), TO_CHAR(SUM(cpu_time)), TO_CHAR(SUM(buffer_gets)), "
+            "MAX(parsing_schema_name), "
+            "MAX(REPLACE(REPLACE(REPLACE(SUBSTR(sql_text, 1, 200), '|', ' '), CHR(10), ' '), "
+            "CHR(13), ' ')) "
+            "FROM v$sql WHERE plan_hash_value <> 0 AND executions > 0 "
+            f"AND parsing_schema_name NOT IN ({excluded}) "
+            "GROUP BY sql_id, plan_hash_value "
+            f"ORDER BY SUM(elapsed_time) DESC FETCH FIRST {MAX_CURSORS} ROWS ONLY")
+        samples = 0
+        new_plans = []
+        with self.conn:
+            for row in rows:
+                if len(row) != 8:
+                    continue
+                # Busy cursors pass 1e10 us/gets: read the sums exactly, and
+                # fail rather than compute deltas from rounded values
+                try:
+                    sql_id, phv = row[0], int(row[1])
+                    current = tuple(int(v or 0) for v in row[2:6])
+                except ValueError:
+                    raise RuntimeError(f"Unexpected v$sql values: {row[:6]}") from None
+                seen = self.conn.execute(
+                    "SELECT executions, elapsed_us, cpu_us, buffer_gets FROM cursor_seen "
+                    "WHERE sql_id = ? AND plan_hash_value = ?", (sql_id, phv)).fetchone()
+                delta = cursor_delta(current, tuple(seen) if seen else None)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cursor_seen VALUES (?, ?, ?, ?, ?, ?)",
+                    (sql_id, phv) + current)
+                known = self.conn.execute(
+                    "SELECT 1 FROM plan WHERE sql_id = ? AND plan_hash_value = ?",
+                    (sql_id, phv)).fetchone()
+                if not known:
+                    self.conn.execute("INSERT INTO plan VALUES (?, ?, ?, ?)",
+                                      (sql_id, phv, now, now))
+                    new_plans.append(phv)
+                self.conn.execute("INSERT OR IGNORE INTO sql_text VALUES (?, ?, ?)",
+                                  (sql_id, row[6], row[7]))
+                if delta[0] > 0:
+                    self.conn.execute(
+                        "UPDATE plan SET last_seen = ? WHERE sql_id = ? AND plan_hash_value = ?",
+                        (now, sql_id, phv))
+                    self.conn.execute("INSERT INTO sample VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                      (now, sql_id, phv) + delta)
+                    samples += 1
+            self.conn.execute("DELETE FROM sample WHERE captured < ?",
+                              (now - self.keep_days * 86400,))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('captured', ?)", (str(now),))
+        self._capture_steps(sorted(set(new_plans)))
+        return {'cursors': len(rows), 'samples': samples, 'new_plans': len(set(new_plans))}
+
+    def _capture_steps(self, plan_hashes, chunk=200):
+        for i in range(0, len(plan_hashes), chunk):
+            hashes = ', '.join(str(h) for h in plan_hashes[i:i + chunk])
+            try:
+                rows = self._query(
+                    "SELECT DISTINCT plan_hash_value, id, NVL(parent_id, -1), depth, "
+                    "TRIM(operation || ' ' || options), object_name, cost, cardinality "
+                    f"FROM v$sql_plan WHERE plan_hash_value IN ({hashes})")
+            except RuntimeError:
+                return
+            with self.conn:
+                for row in rows:
+                    if len(row) != 8:
+                        continue
+                    values = [int(row[0]), int(row[1]), int(row[2]), int(row[3]), row[4],
+                              row[5] or None,
+                              int(row[6]) if row[6] else None, int(row[7]) if row[7] else None]
+                    self.conn.execute("INSERT OR IGNORE INTO plan_step VALUES "
+                                      "(?, ?, ?, ?, ?, ?, ?, ?)", values)
+
+    # =========================================================================
+    # ANALYSIS
+    # =========================================================================
+
+    def plan_stats(self, sql_id=None):
+        """Per-plan totals over the kept history"""
+        sql = ("SELECT s.sql_id, s.plan_hash_value, SUM(s.executions) AS executions, "
+               "SUM(s.elapsed_us) AS elapsed_us, SUM(s.cpu_us) AS cpu_us, "
+               "SUM(s.buffer_gets) AS buffer_gets, MAX(p.first_seen) AS first_seen, "
+               "MAX(p.last_seen) AS last_seen "
+               "FROM sample s JOIN plan p ON p.sql_id = s.sql_id "
+               "AND p.plan_hash_value = s.plan_hash_value ")
+        params = ()
+        if sql_id:
+            sql += "WHERE s.sql_id = ? "
+            params = (sql_id,)
+        sql += "GROUP BY s.sql_id, s.plan_hash_value"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def check(self, factor=2.0, min_execs=5):
+        """Detect plan flips (find_flips) and remember them"""
+        flips = find_flips(self.plan_stats(), factor, min_execs)
+        with self.conn:
+            for flip in flips:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO flip (detected, sql_id, plan_hash_value, good_plan, "
+                    "current_ms, good_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                    (time.time(), flip['sql_id'], flip['plan_hash_value'], flip['good_plan'],
+                     flip['current_ms'], flip['good_ms']))
+                row = self.conn.execute("SELECT text FROM sql_text WHERE sql_id = ?",
+                                        (flip['sql_id'],)).fetchone()
+                flip['sql_text'] = row['text'] if row else None
+        return flips
+
+    def plan_steps(self, plan_hash_value):
+        return [dict(row) for row in self.conn.execute(
+            "SELECT * FROM plan_step WHERE plan_hash_value = ? ORDER BY id", (plan_hash_value,))]
+
+    # =========================================================================
+    # SQL PLAN MANAGEMENT
+    # =========================================================================
+
+    def capture_baseline(self, sql_id, plan_hash_value, fixed=True):
+        """Load plan_hash_value of sql_id as an accepted SQL plan baseline,
+        from the cursor cache or else from AWR. Returns plans loaded."""
+        if not SQL_ID_RE.match(str(sql_id)):
+            raise ValueError(f"Invalid SQL_ID '{sql_id}' (13 characters, 0-9 and a-z)")
+        fixed_flag = 'YES' if fixed else 'NO'
+        success, lines, error = self.client.plsql(f"""
+DECLARE
+  n PLS_INTEGER;
+BEGIN
+  n := DBMS_SPM.LOAD_PLANS_FROM_CURSOR_CACHE(
+         sql_id => '{sql_id}', plan_hash_value => {int(plan_hash_value)}, fixed => '{fixed_flag}');
+  IF n = 0 THEN
+    FOR s IN (SELECT MIN(snap_id) b, MAX(snap_id) e FROM dba_hist_snapshot
+               WHERE dbid = (SELECT dbid FROM v$database)) LOOP
+      n := DBMS_SPM.LOAD_PLANS_FROM_AWR(
+             begin_snap => s.b, end_snap => s.e,
+             basic_filter => 'sql_id = ''{sql_id}'' AND plan_hash_value = {int(plan_hash_value)}',
+             fixed => '{fixed_flag}');
+    END LOOP;
+  END IF;
+  DBMS_OUTPUT.PUT_LINE(n);
+END;""")
+        if not success:
+            raise RuntimeError(error or "DBMS_SPM failed")
+        loaded = int(lines[-1]) if lines and lines[-1].strip().isdigit() else 0
+        if loaded:
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE flip SET baseline = ? WHERE sql_id = ? AND good_plan = ?",
+                    (time.strftime('%Y-%m-%d %H:%M:%S'), sql_id, int(plan_hash_value)))
+        return loaded
@@ -2,72 +2,909 @@
 RMAN Manager - Backup and Recovery Management
 """
 
+import os
+import re
+import json
+import math
+import sqlite3
+import time
+import threading
 import subprocess
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
+from rich.table import Table
 from rich import print as rprint
 from datetime import datetime
+from ..utils.oracle_client import OracleClient
+from ..utils.procstats import ProcessTreeSampler
+from .rman_output import RMANOutputParser
 
 console = Console()
 
+SETTINGS_FILE = Path.home() / '.oracledba' / 'rman.json'
+BACKUP_DEST = '/u01/backup'
+
+# Image copy rolled forward by the incremental-merge strategy
+MERGE_TAG = 'ORADBA_MERGE'
+
+MB = 1024 ** 2
+GB = 1024 ** 3
+MAX_CHANNELS = 16
+IDENTIFIER_RE = re.compile(r'^[A-Za-z][A-Za-z0-9_$#]{0,127}$')
+# RATE / MAXPIECESIZE values: bytes, or a K/M/G suffix
+SIZE_RE = re.compile(r'^\d+[KMG]?$')
+MIN_SECTION_BYTES = 1 * GB
+
+# Rough per-channel throughput (MB/s of datafile read) by compression
+# algorithm; compressed channels are CPU-bound, one core each.
+CHANNEL_MB_S = {
+    None: 200,
+    'BASIC': 25,
+    'LOW': 120,
+    'MEDIUM': 60,
+    'HIGH': 15,
+}
+
+
+def load_settings(path=None):
+    """Saved RMAN tuning (parallelism, section size, ...) or {}"""
+    try:
+        with open(path or SETTINGS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_settings(settings, path=None):
+    path = Path(path or SETTINGS_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(settings, f, indent=1)
+    os.replace(tmp, path)
+
+
+def format_size(n_bytes):
+    """RMAN size literal: whole gigabytes, else megabytes"""
+    if n_bytes % GB == 0:
+        return f"{n_bytes // GB}G"
+    return f"{math.ceil(n_bytes / 1024 ** 2)}M"
+
+
+def compute_rman_plan(cpu_count, file_sizes, dest_mb_s=None, compression='MEDIUM'):
+    """Channel parallelism and multisection size for a set of datafiles.
+
+    file_sizes are datafile sizes in bytes. Parallelism is the number of
+    channels needed to saturate the destination, capped by the CPUs (one
+    core is left for the instance when compressing). When the largest file
+    is bigger than an even per-channel share it would keep one channel busy
+    long after the others finish, so a SECTION SIZE of half a share
+    (at least 1G) splits it across channels.
+    """
+    per_channel = CHANNEL_MB_S.get(compression, CHANNEL_MB_S['MEDIUM'])
+    cpu_count = max(1, cpu_count)
+    cpu_limit = max(1, cpu_count - 1) if compression else cpu_count
+    reasons = []
+
+    if dest_mb_s:
+        io_limit = max(1, math.ceil(dest_mb_s / per_channel))
+        reasons.append(f"destination writes ~{dest_mb_s:.0f} MB/s, one channel "
+                       f"reads ~{per_channel} MB/s ({compression or 'no'} compression) "
+                       f"\u2192 {io_limit} channel(s) to saturate it")
+    else:
+        io_limit = cpu_limit
+        reasons.append("destination throughput unknown \u2192 limited by CPUs only")
+    parallelism = min(cpu_limit, io_limit, MAX_CHANNELS)
+    if cpu_limit < io_limit:
+        reasons.append(f"capped at {cpu_limit} by {cpu_count} CPU(s)")
+
+    total = sum(file_sizes)
+    largest = max(file_sizes) if file_sizes else 0
+    section_size = None
+    if file_sizes and parallelism > 1:
+        share = total / parallelism
+        if largest > share:
+            section_size = max(MIN_SECTION_BYTES, math.ceil(share / 2 / GB) * GB)
+            reasons.append(f"largest datafile ({largest / GB:.1f}G) exceeds a channel's "
+                           f"share ({share / GB:.1f}G) \u2192 "
+                           f"SECTION SIZE {format_size(section_size)}")
+        else:
+            reasons.append("datafiles balance across channels \u2192 no SECTION SIZE needed")
+
+    rate = parallelism * per_channel
+    if dest_mb_s:
+        rate = min(rate, dest_mb_s)
+    return {
+        'cpu_count': cpu_count,
+        'datafiles': len(file_sizes),
+        'total_bytes': total,
+        'largest_bytes': largest,
+        'dest_mb_s': dest_mb_s,
+        'compression': compression,
+        'parallelism': parallelism,
+        'section_size': section_size,
+        'estimated_seconds': round(total / (rate * 1024 ** 2)) if total else 0,
+        'reasons': reasons,
+    }
+
+
+# Destination name meaning "the Fast Recovery Area" (no FORMAT clause)
+FRA = 'FRA'
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def _day_set(spec):
+    """'mon-fri', 'sat,sun' or '*' -> set of weekday indexes (Monday = 0)"""
+    spec = spec.strip().lower()
+    if spec in ('*', 'all', ''):
+        return set(range(7))
+    days = set()
+    for part in spec.split(','):
+        if '-' in part:
+            start, end = (WEEKDAYS.index(d.strip()[:3]) for d in part.split('-', 1))
+            days.update(range(start, end + 1) if start <= end
+                        else list(range(start, 7)) + list(range(0, end + 1)))
+        else:
+            days.add(WEEKDAYS.index(part.strip()[:3]))
+    return days
+
+
+def check_size(value, option):
+    """Upper-cased RATE/MAXPIECESIZE value ('20m' -> '20M'); ValueError
+    unless it is a number with an optional K/M/G suffix"""
+    value = str(value).strip().upper()
+    if not SIZE_RE.match(value):
+        raise ValueError(f"Bad {option} '{value}' (expected e.g. 20M, 8G or 1048576)")
+    return value
+
+
+def parse_throttle(text):
+    """'mon-fri 08:00-18:00 20M' -> {'days', 'start', 'end', 'rate'}"""
+    try:
+        days, window, rate = text.split()
+        start, end = window.split('-')
+        _day_set(days)
+        for hhmm in (start, end):
+            datetime.strptime(hhmm, '%H:%M')
+    except ValueError:
+        raise ValueError(f"Bad throttle window '{text}' (expected e.g. 'mon-fri 08:00-18:00 20M')")
+    return {'days': days, 'start': start, 'end': end, 'rate': check_size(rate, 'RATE')}
+
+
+def current_rate(schedule, default_rate=None, now=None):
+    """Per-channel RATE in force at `now`: the first matching throttle
+    window, else default_rate. Windows may cross midnight (22:00-06:00);
+    the day refers to the window's start."""
+    now = now or datetime.now()
+    minute = now.strftime('%H:%M')
+    for window in schedule or []:
+        start, end = window['start'], window['end']
+        if start <= end:
+            if now.weekday() in _day_set(window['days']) and start <= minute < end:
+                return window['rate']
+        elif minute >= start and now.weekday() in _day_set(window['days']):
+            return window['rate']
+        elif minute < end and (now.weekday() - 1) % 7 in _day_set(window['days']):
+            return window['rate']
+    return default_rate
+
+
+def channel_allocations(destinations, parallelism, rate=None, maxpiecesize=None, prefix='d'):
+    """ALLOCATE CHANNEL lines spreading `parallelism` channels round-robin
+    over the destinations (FRA = the recovery area, else a directory)."""
+    destinations = destinations or [FRA]
+    lines = []
+    for i in range(parallelism):
+        dest = destinations[i % len(destinations)]
+        line = f"  ALLOCATE CHANNEL {prefix}{i + 1} DEVICE TYPE DISK"
+        if dest != FRA:
+            line += f" FORMAT '{dest.rstrip('/')}/%d_%U'"
+        if maxpiecesize:
+            line += f" MAXPIECESIZE {maxpiecesize}"
+        if rate:
+            line += f" RATE {rate}"
+        lines.append(line + ";")
+    return "\n".join(lines)
+
+
+def merge_commands(tag=MERGE_TAG, lag_days=0, allocate=''):
+    """RMAN script for one incremental-merge (incremental forever) run.
+
+    The first run creates the level 0 image copy (in the FRA); later runs
+    back up only changed blocks (read via block change tracking) and roll
+    the copy forward. With lag_days the copy is kept that many days behind
+    so it can still serve a point-in-time restore.
+    """
+    until = f" UNTIL TIME 'SYSDATE-{int(lag_days)}'" if lag_days else ""
+    return (
+        "RUN {\n"
+        + (allocate + "\n" if allocate else "") +
+        f"  RECOVER COPY OF DATABASE WITH TAG '{tag}'{until};\n"
+        f"  BACKUP INCREMENTAL LEVEL 1 FOR RECOVER OF COPY WITH TAG '{tag}' DATABASE;\n"
+        "  BACKUP AS COMPRESSED BACKUPSET ARCHIVELOG ALL NOT BACKED UP DELETE INPUT;\n"
+        "}"
+    )
+
+
+# Media recovery rate assumed when estimating restores (MB of redo per second)
+REDO_APPLY_MB_S = 40
+
+
+def estimate_restore(plan, backup_mb_s, channels, history_channels=2, dest_mb_s=None,
+                     redo_mb_s=REDO_APPLY_MB_S):
+    """Estimate restore + recovery time for a catalog restore_plan().
+
+    The restore rate is the historical backup throughput scaled from the
+    channel count it was measured with to `channels`, capped by the
+    destination write speed when known. Recovery time is the archived
+    redo volume over an assumed apply rate.
+    """
+    rate = None
+    if backup_mb_s:
+        rate = backup_mb_s * channels / max(1, history_channels)
+        if dest_mb_s:
+            rate = min(rate, dest_mb_s)
+    restore_bytes = plan.get('datafile_bytes') or plan.get('bytes') or 0
+    restore_seconds = round(restore_bytes / MB / rate) if rate else None
+    recover_seconds = round((plan.get('redo_bytes') or 0) / MB / redo_mb_s)
+    return {
+        'channels': channels,
+        'restore_mb_s': round(rate, 1) if rate else None,
+        'restore_bytes': restore_bytes,
+        'restore_seconds': restore_seconds,
+        'redo_bytes': plan.get('redo_bytes') or 0,
+        'recover_seconds': recover_seconds,
+        'total_seconds': None if restore_seconds is None else restore_seconds + recover_seconds,
+    }
+
+
+def restore_commands(point_in_time=None, channels=None, preview=False, switch_to_copy=False):
+    """RUN block for a (multichannel) restore and recover.
+
+    point_in_time is 'YYYY-MM-DD HH:MM:SS' (ValueError otherwise). Backups
+    taken with SECTION SIZE are restored section by section across the
+    allocated channels automatically. switch_to_copy switches to the
+    incremental-merge image copy instead of restoring; the channels then
+    serve the recovery. With preview=True only RESTORE ... PREVIEW SUMMARY
+    is run (nothing is restored).
+    """
+    if point_in_time:
+        try:
+            datetime.strptime(point_in_time, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            raise ValueError(f"Invalid point in time '{point_in_time}' "
+                             "(expected YYYY-MM-DD HH:MM:SS)") from None
+    lines = ["RUN {"]
+    for i in range(1, (channels or 0) + 1):
+        lines.append(f"  ALLOCATE CHANNEL r{i} DEVICE TYPE DISK;")
+    if point_in_time:
+        lines.append(f"  SET UNTIL TIME \"TO_DATE('{point_in_time}', 'YYYY-MM-DD HH24:MI:SS')\";")
+    if preview:
+        lines.append("  RESTORE DATABASE PREVIEW SUMMARY;")
+    else:
+        lines.append("  SWITCH DATABASE TO COPY;" if switch_to_copy else "  RESTORE DATABASE;")
+        lines.append("  RECOVER DATABASE;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+BENCH_TAG = 'ORADBA_BENCH'
+BENCH_ALGORITHMS = ('BASIC', 'LOW', 'MEDIUM', 'HIGH')
+# Keep this much of the host's CPU for the instance while backing up
+MAX_BENCH_CPU_PCT = 80
+
+
+def recommend_config(results, objective='balanced'):
+    """Pick the best benchmark result.
+
+    objective 'speed' maximizes MB/s, 'size' the compression ratio, and
+    'balanced' the sum of both normalized to the best observed values.
+    Configurations using more than MAX_BENCH_CPU_PCT of the host's CPU are
+    only chosen when nothing else succeeded; ties go to fewer channels.
+    """
+    ok = [r for r in results if r.get('success') and r.get('mb_s')]
+    if not ok:
+        return None
+    calm = [r for r in ok if r.get('cpu_pct', 0) <= MAX_BENCH_CPU_PCT]
+    candidates = calm or ok
+    best_speed = max(r['mb_s'] for r in candidates)
+    best_ratio = max(r.get('ratio') or 1 for r in candidates)
+
+    def score(r):
+        speed = r['mb_s'] / best_speed
+        size = (r.get('ratio') or 1) / best_ratio
+        if objective == 'speed':
+            value = speed
+        elif objective == 'size':
+            value = size
+        else:
+            value = speed + size
+        return (round(value, 3), -r['channels'])
+
+    return max(candidates, key=score)
+
+
+def _num(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def summarize_progress(job, longops, aio):
+    """Combine one poll of the RMAN views into a progress summary.
+
+    job      latest v$rman_backup_job_details row (dict) or None
+    longops  in-progress RMAN rows of v$session_longops: sid, opname,
+             sofar, totalwork, elapsed, remaining
+    aio      in-progress v$backup_async_io rows: sid, type, bytes_per_sec
+
+    The 'RMAN: aggregate input' long op gives the overall percentage;
+    every other RMAN long op is one channel, whose MB/s is the sum of its
+    INPUT async I/O rates.
+    """
+    rates = {}
+    for row in aio:
+        if row.get('type') == 'INPUT':
+            rates[row['sid']] = rates.get(row['sid'], 0.0) + _num(row.get('bytes_per_sec'))
+
+    aggregate = None
+    channels = []
+    for op in longops:
+        totalwork = _num(op.get('totalwork'))
+        percent = 100.0 * _num(op.get('sofar')) / totalwork if totalwork else 0.0
+        if 'aggregate input' in op.get('opname', '').lower():
+            aggregate = dict(op, percent=percent)
+            continue
+        if 'aggregate' in op.get('opname', '').lower():
+            continue
+        channels.append({
+            'sid': op['sid'],
+            'operation': op.get('opname', '').replace('RMAN: ', ''),
+            'percent': round(percent, 1),
+            'mb_s': round(rates.get(op['sid'], 0.0) / MB, 1),
+            'remaining': int(_num(op.get('remaining'))),
+        })
+    channels.sort(key=lambda c: str(c['sid']))
+
+    status = (job or {}).get('status') or ('RUNNING' if longops else 'IDLE')
+    elapsed = _num((job or {}).get('elapsed_seconds'))
+    percent = None
+    eta = None
+    if aggregate:
+        percent = round(aggregate['percent'], 1)
+        elapsed = elapsed or _num(aggregate.get('elapsed'))
+        eta = int(_num(aggregate.get('remaining'))) or None
+        if eta is None and percent > 0:
+            eta = int(elapsed * (100 - percent) / percent)
+    elif status.startswith('COMPLETED'):
+        percent = 100.0
+        eta = 0
+
+    mb_s = sum(c['mb_s'] for c in channels)
+    if not mb_s and job:
+        mb_s = _num(job.get('input_bytes_per_sec')) / MB
+    return {
+        'status': status,
+        'input_type': (job or {}).get('input_type'),
+        'percent': percent,
+        'mb_s': round(mb_s, 1),
+        'eta_seconds': eta,
+        'elapsed': int(elapsed),
+        'input_bytes': int(_num((job or {}).get('input_bytes'))),
+        'output_bytes': int(_num((job or {}).get('output_bytes'))),
+        'channels': channels,
+    }
+
+
+def measure_write_throughput(path, size_mb=256):
+    """MB/s of a sequential, fsync'd write to `path` (None on error)"""
+    target = Path(path) / '.oradba-throughput-test'
+    block = b'\0' * (1024 * 1024)
+    try:
+        Path(path).mkdir(parents=True, exist_ok=True)
+        started = time.time()
+        with open(target, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        elapsed = time.time() - started
+    except OSError:
+        return None
+    finally:
+        try:
+            target.unlink()
+        except OSError:
+            pass
+    return size_mb / elapsed if elapsed > 0 else None
+
 
 class RMANManager:
     def __init__(self):
         self.scripts_dir = Path(__file__).parent.parent / "scripts"
+        self.client = OracleClient()
+        self.settings = load_settings()
+        self.last_result = None
     
+    def _start_rman(self, commands):
+        cmd = f"rman target / << EOF\n{commands}\nEOF"
+        return subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True)
+
+    def _collect_rman(self, proc):
+        """Read a running rman's output line by line through the parser;
+        the parsed result is left in self.last_result"""
+        parser = RMANOutputParser()
+        stdout, stderr = [], []
+        reader = threading.Thread(target=lambda: stderr.append(proc.stderr.read()),
+                                  daemon=True)
+        reader.start()
+        for line in proc.stdout:
+            stdout.append(line)
+            parser.feed(line)
+        proc.wait()
+        reader.join()
+        self.last_result = parser.resolve_sizes().result()
+        return proc.returncode == 0, ''.join(stdout), ''.join(stderr)
+
     def _run_rman(self, commands):
         """Execute RMAN commands"""
+        self.last_result = None
         try:
-            cmd = f"rman target / << EOF\n{commands}\nEOF"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            return result.returncode == 0, result.stdout, result.stderr
+            return self._collect_rman(self._start_rman(commands))
         except Exception as e:
             return False, "", str(e)
+
+    def _error_text(self, stderr):
+        """RMAN reports errors on stdout; prefer the parsed error stack"""
+        return (self.last_result or {}).get('error_stack') or stderr
     
-    def setup(self, retention_days=7, compression=True):
-        """Configure RMAN"""
+    def _datafile_sizes(self):
+        """Sizes in bytes of all datafiles (v$datafile)"""
+        success, rows, error = self.client.query("SELECT TO_CHAR(bytes) FROM v$datafile")
+        if not success:
+            raise RuntimeError(error or "v$datafile query failed")
+        sizes = []
+        for row in rows:
+            if not row or not row[0].isdigit():
+                raise RuntimeError(f"Unexpected v$datafile size: {row!r}")
+            sizes.append(int(row[0]))
+        return sizes
+
+    def plan_tuning(self, dest=BACKUP_DEST, compression='MEDIUM', measure=True):
+        """Read CPUs, datafile sizes and destination throughput; return a plan"""
+        sizes = self._datafile_sizes()
+        dest_mb_s = measure_write_throughput(dest) if measure else None
+        plan = compute_rman_plan(os.cpu_count() or 1, sizes, dest_mb_s, compression)
+        plan['dest'] = dest
+        return plan
+
+    def show_plan(self, plan):
+        """Print a tuning plan"""
+        table = Table(title="RMAN Tuning Plan", show_header=True, header_style="bold magenta")
+        table.add_column("Setting", style="cyan")
+        table.add_column("Value")
+        table.add_row("CPUs", str(plan['cpu_count']))
+        table.add_row("Datafiles", f"{plan['datafiles']} ({plan['total_bytes'] / GB:.1f} GB, "
+                                   f"largest {plan['largest_bytes'] / GB:.1f} GB)")
+        speed = f"(~{plan['dest_mb_s']:.0f} MB/s)" if plan['dest_mb_s'] else "(not measured)"
+        table.add_row("Destination", f"{plan.get('dest', '-')} {speed}")
+        table.add_row("Compression", plan['compression'] or "none")
+        table.add_row("Parallelism", f"[bold]{plan['parallelism']}[/bold]")
+        table.add_row("Section size",
+                      format_size(plan['section_size']) if plan['section_size'] else "-")
+        mins, secs = divmod(plan['estimated_seconds'], 60)
+        table.add_row("Est. full backup", f"~{mins}m {secs}s")
+        console.print(table)
+        for reason in plan['reasons']:
+            rprint(f"  [dim]\u2022 {reason}[/dim]")
+
+    def _rows(self, sql, columns):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def progress(self):
+        """Poll the RMAN views once; see summarize_progress()"""
+        jobs = self._rows(
+            "SELECT status, input_type, elapsed_seconds, input_bytes, output_bytes, "
+            "input_bytes_per_sec FROM v$rman_backup_job_details "
+            "ORDER BY start_time DESC FETCH FIRST 1 ROWS ONLY",
+            ('status', 'input_type', 'elapsed_seconds', 'input_bytes', 'output_bytes',
+             'input_bytes_per_sec'))
+        longops = self._rows(
+            "SELECT sid, opname, sofar, totalwork, elapsed_seconds, NVL(time_remaining, 0) "
+            "FROM v$session_longops WHERE opname LIKE 'RMAN%' "
+            "AND totalwork > 0 AND sofar < totalwork",
+            ('sid', 'opname', 'sofar', 'totalwork', 'elapsed', 'remaining'))
+        aio = self._rows(
+            "SELECT sid, type, effective_bytes_per_second FROM v$backup_async_io "
+            "WHERE status = 'IN PROGRESS'",
+            ('sid', 'type', 'bytes_per_sec'))
+        return summarize_progress(jobs[0] if jobs else None, longops, aio)
+
+    def _progress_table(self, summary):
+        eta = summary['eta_seconds']
+        percent = summary['percent']
+        title = (f"RMAN {summary['input_type'] or 'backup'} \u2014 {summary['status']}"
+                 f" \u2014 {'-' if percent is None else f'{percent:.1f}%'}"
+                 f" \u2014 {summary['mb_s']:.1f} MB/s"
+                 f" \u2014 ETA {'-' if eta is None else f'{eta // 60}m {eta % 60}s'}")
+        table = Table(title=title, show_header=True, header_style="bold magenta")
+        table.add_column("SID", style="cyan")
+        table.add_column("Operation")
+        table.add_column("Done", justify="right")
+        table.add_column("MB/s", justify="right")
+        table.add_column("Remaining", justify="right")
+        for channel in summary['channels']:
+            table.add_row(str(channel['sid']), channel['operation'], f"{channel['percent']:.1f}%",
+                          f"{channel['mb_s']:.1f}", f"{channel['remaining']}s")
+        return table
+
+    def watch(self, interval=5, is_running=None):
+        """Show live progress until the backup finishes.
+
+        is_running is an optional callable (e.g. the backup thread's
+        is_alive); without it, watching stops once the latest RMAN job is
+        no longer RUNNING.
+        """
+        summary = None
+        with Live(console=console, refresh_per_second=1) as live:
+            while True:
+                try:
+                    summary = self.progress()
+                    live.update(self._progress_table(summary))
+                except RuntimeError as e:
+                    live.update(f"[yellow]Progress unavailable:[/yellow] {e}")
+                running = is_running() if is_running else (
+                    summary is not None and summary['status'] == 'RUNNING')
+                if not running:
+                    return summary
+                time.sleep(interval)
+
+    def _record_run(self, kind, success, tag=None):
+        """Keep the parsed output of the last run in the local catalog"""
+        if not self.last_result:
+            return
+        from .rman_catalog import BackupCatalog
+        try:
+            catalog = BackupCatalog(client=self.client)
+        except (OSError, sqlite3.Error):
+            return
+        try:
+            catalog.record_run(kind, self.last_result, success, tag)
+        except sqlite3.Error:
+            pass
+        finally:
+            catalog.close()
+
+    def _list_from_catalog(self, limit=50):
+        """Print backup sets from the SQLite catalog; False if it can't refresh"""
+        from .rman_catalog import BackupCatalog
+        try:
+            catalog = BackupCatalog(client=self.client)
+        except OSError:
+            return False
+        try:
+            catalog.refresh()
+            sets = catalog.backup_sets(limit=limit)
+            summary = catalog.summary()
+        except RuntimeError:
+            return False
+        finally:
+            catalog.close()
+
+        table = Table(title="Backup Sets", show_header=True, header_style="bold magenta")
+        table.add_column("Completed", style="cyan")
+        table.add_column("Type")
+        table.add_column("Level", justify="right")
+        table.add_column("Files", justify="right")
+        table.add_column("Size", justify="right")
+        table.add_column("Ratio", justify="right")
+        table.add_column("Elapsed", justify="right")
+        table.add_column("Tag", style="dim")
+        types = {'D': 'Full', 'I': 'Incr', 'L': 'Archlog'}
+        for item in sets:
+            level = item['incremental_level']
+            table.add_row(item['completion_time'] or '-',
+                          types.get(item['backup_type'], item['backup_type'] or '-'),
+                          '-' if level is None or level < 0 else str(level),
+                          str(item['datafiles'] or '-'),
+                          f"{(item['bytes'] or 0) / MB:.0f} MB",
+                          f"{item['compression_ratio']:.1f}" if item['compression_ratio'] else '-',
+                          f"{item['elapsed_seconds'] or 0:.0f}s",
+                          item['tag'] or '')
+        console.print(table)
+        rprint(f"[dim]{summary['sets']} sets, {summary['pieces']} available pieces, "
+               f"{summary['bytes'] / GB:.1f} GB; catalog refreshed {summary['refreshed']}[/dim]")
+        return True
+
+    def enable_block_change_tracking(self):
+        """Enable block change tracking so level 1 backups read only changed blocks.
+
+        Returns True if BCT is (now) enabled. Without db_create_file_dest
+        the tracking file goes next to the datafiles.
+        """
+        success, rows, error = self.client.query("SELECT status FROM v$block_change_tracking")
+        if not success:
+            rprint(f"[red]✗ Cannot read block change tracking status:[/red] {error}")
+            return False
+        if rows and rows[0][0] == 'ENABLED':
+            rprint("[green]✓[/green] Block change tracking already enabled")
+            return True
+
+        _, rows, _ = self.client.query(
+            "SELECT value FROM v$parameter WHERE name = 'db_create_file_dest'")
+        sql = "ALTER DATABASE ENABLE BLOCK CHANGE TRACKING"
+        if not rows or not rows[0][0]:
+            _, rows, _ = self.client.query(
+                "SELECT SUBSTR(name, 1, INSTR(name, '/', -1)) FROM v$datafile WHERE file# = 1")
+            directory = rows[0][0] if rows and rows[0][0] else '/u01/app/oracle/oradata/'
+            sql += f" USING FILE '{directory}bct.chg'"
+        success, _, error = self.client.query(sql)
+        if success:
+            rprint("[green]✓[/green] Block change tracking enabled")
+        else:
+            rprint(f"[red]✗ Enabling block change tracking failed:[/red] {error}")
+        return success
+
+    def _fanout_configured(self):
+        return any(self.settings.get(key) for key in
+                   ('destinations', 'rate', 'maxpiecesize', 'throttle'))
+
+    def channel_rate(self, now=None):
+        """Per-channel RATE for a backup starting now (throttle schedule)"""
+        return current_rate(self.settings.get('throttle'), self.settings.get('rate'), now)
+
+    def configure_fanout(self, destinations=None, rate=None, maxpiecesize=None, throttle=None):
+        """Save backup destinations, RATE, MAXPIECESIZE and throttle windows.
+
+        Directory destinations must exist and be writable; NFS ones are
+        reported with their export. Returns False if one is unusable;
+        malformed sizes or windows raise ValueError.
+        """
+        from .nfs import nfs_source
+        rate = check_size(rate, 'RATE') if rate else None
+        maxpiecesize = check_size(maxpiecesize, 'MAXPIECESIZE') if maxpiecesize else None
+        windows = [parse_throttle(text) for text in throttle or []]
+        ok = True
+        for dest in destinations or []:
+            if dest == FRA:
+                rprint("[green]✓[/green] FRA (db_recovery_file_dest)")
+                continue
+            if not os.path.isdir(dest) or not os.access(dest, os.W_OK):
+                rprint(f"[red]✗ {dest} is not a writable directory[/red]")
+                ok = False
+                continue
+            source = nfs_source(dest)
+            rprint(f"[green]✓[/green] {dest}" + (f" [dim](NFS {source})[/dim]" if source else ""))
+        if not ok:
+            return False
+        if maxpiecesize and self.settings.get('section_size'):
+            rprint("[yellow]MAXPIECESIZE is left out of multisection (SECTION SIZE) database "
+                   "backups; it applies to archived log backups only[/yellow]")
+        self.settings.update(destinations=list(destinations or []) or None, rate=rate,
+                             maxpiecesize=maxpiecesize, throttle=windows or None)
+        save_settings(self.settings)
+        return True
+
+    def _run_rman_sampled(self, commands):
+        """Like _run_rman, also returning wall time and the process tree's
+        resource usage (the local channel server processes are children
+        of the rman client)"""
+        self.last_result = None
+        started = time.time()
+        try:
+            proc = self._start_rman(commands)
+        except OSError as e:
+            return False, "", str(e), {}, 0.0
+        with ProcessTreeSampler(proc.pid) as sampler:
+            ok, stdout, stderr = self._collect_rman(proc)
+        return ok, stdout, stderr, sampler.usage(), time.time() - started
+
+    def _dir_bytes(self, path):
+        total = 0
+        for item in Path(path).glob('*'):
+            try:
+                total += item.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def bench(self, tablespace='USERS', algorithms=BENCH_ALGORITHMS, channel_counts=(1, 2, 4),
+              dest=BACKUP_DEST, validate=True):
+        """Back up `tablespace` under each compression algorithm and channel
+        count; return one result dict per run.
+
+        A BACKUP VALIDATE run first gives the uncompressed read rate. Bench
+        pieces go to <dest>/bench and are deleted after each run.
+        """
+        if not IDENTIFIER_RE.match(tablespace):
+            raise ValueError(f"Invalid tablespace name: {tablespace}")
+        success, rows, error = self.client.query(
+            "SELECT TO_CHAR(SUM(bytes)) FROM dba_data_files "
+            f"WHERE tablespace_name = '{tablespace.upper()}'")
+        if not success or not rows or not rows[0][0]:
+            raise RuntimeError(error or f"Tablespace {tablespace} not found")
+        if not rows[0][0].isdigit():
+            raise RuntimeError(f"Unexpected size for tablespace {tablespace}: {rows[0][0]}")
+        input_bytes = int(rows[0][0])
+        bench_dir = Path(dest) / 'bench'
+        bench_dir.mkdir(parents=True, exist_ok=True)
+
+        runs = [('VALIDATE', max(channel_counts))] if validate else []
+        runs += [(algorithm, channels) for algorithm in algorithms for channels in channel_counts]
+        # Each BACKUP would also write a controlfile autobackup that neither
+        # the bench tag nor the timing should include
+        autobackup = self._autobackup_setting()
+        if autobackup != 'OFF':
+            self._run_rman("CONFIGURE CONTROLFILE AUTOBACKUP OFF;")
+        try:
+            return self._bench_runs(runs, tablespace, input_bytes, bench_dir)
+        finally:
+            if autobackup == 'ON':
+                self._run_rman("CONFIGURE CONTROLFILE AUTOBACKUP ON;")
+            elif autobackup is None:
+                self._run_rman("CONFIGURE CONTROLFILE AUTOBACKUP CLEAR;")
+
+    def _autobackup_setting(self):
+        """'ON' or 'OFF' as configured, None when left at the default"""
+        success, rows, _ = self.client.query(
+            "SELECT value FROM v$rman_configuration WHERE name = 'CONTROLFILE AUTOBACKUP'")
+        if success and rows and rows[0][0]:
+            return rows[0][0].strip().upper()
+        return None
+
+    def _bench_runs(self, runs, tablespace, input_bytes, bench_dir):
+        cpus = os.cpu_count() or 1
+        results = []
+        for algorithm, channels in runs:
+            allocate = ''.join(
+                f"  ALLOCATE CHANNEL b{i} DEVICE TYPE DISK FORMAT '{bench_dir}/%U';\n"
+                for i in range(1, channels + 1))
+            if algorithm == 'VALIDATE':
+                body = f"  BACKUP VALIDATE TABLESPACE {tablespace};\n"
+            else:
+                body = (f"  SET COMPRESSION ALGORITHM '{algorithm}';\n"
+                        f"  BACKUP AS COMPRESSED BACKUPSET TAG '{BENCH_TAG}' "
+                        f"TABLESPACE {tablespace};\n")
+            rprint(f"[cyan]\u25b6 {algorithm} with {channels} channel(s)...[/cyan]")
+            ok, _, stderr, usage, elapsed = self._run_rman_sampled(
+                "RUN {\n" + allocate + body + "}")
+            parsed = self.last_result or {}
+            error = parsed.get('error_stack') or stderr
+            # Only the bench's own pieces, never a controlfile autobackup
+            pieces = [p for p in parsed.get('pieces', []) if p['kind'] == 'backup piece'
+                      and (p['tag'] == BENCH_TAG or Path(p['handle']).parent == bench_dir)]
+            sizes = [p['bytes'] for p in pieces if p['bytes'] is not None]
+            output_bytes = sum(sizes) if sizes else self._dir_bytes(bench_dir)
+            if algorithm != 'VALIDATE':
+                self._run_rman(f"DELETE NOPROMPT BACKUP TAG '{BENCH_TAG}';")
+            cpu_seconds = usage.get('cpu_seconds', 0)
+            results.append({
+                'algorithm': algorithm,
+                'channels': channels,
+                'success': ok,
+                'error': None if ok else error.strip()[-300:],
+                'pieces': len(pieces),
+                'elapsed': round(elapsed, 1),
+                'input_bytes': input_bytes,
+                'output_bytes': output_bytes if algorithm != 'VALIDATE' else 0,
+                'mb_s': round(input_bytes / MB / elapsed, 1) if ok and elapsed else 0,
+                'ratio': (round(input_bytes / output_bytes, 2)
+                          if ok and algorithm != 'VALIDATE' and output_bytes else None),
+                'cpu_seconds': cpu_seconds,
+                'cpu_pct': round(100.0 * cpu_seconds / elapsed / cpus, 1) if elapsed else 0,
+            })
+        return results
+
+    def show_bench(self, results, best=None):
+        """Print benchmark results, marking the recommendation"""
+        table = Table(title="RMAN Compression Benchmark", show_header=True,
+                      header_style="bold magenta")
+        table.add_column("Algorithm", style="cyan")
+        table.add_column("Channels", justify="right")
+        table.add_column("Elapsed", justify="right")
+        table.add_column("MB/s", justify="right")
+        table.add_column("Output", justify="right")
+        table.add_column("Ratio", justify="right")
+        table.add_column("CPU", justify="right")
+        for r in results:
+            marker = " [green]\u2605[/green]" if r is best else ""
+            if not r['success']:
+                table.add_row(r['algorithm'], str(r['channels']), "[red]failed[/red]",
+                              "-", "-", "-", "-")
+                continue
+            table.add_row(r['algorithm'] + marker, str(r['channels']), f"{r['elapsed']:.0f}s",
+                          f"{r['mb_s']:.0f}",
+                          f"{r['output_bytes'] / MB:.0f} MB" if r['output_bytes'] else "-",
+                          f"{r['ratio']:.1f}" if r['ratio'] else "-",
+                          f"{r['cpu_seconds']:.0f}s ({r['cpu_pct']:.0f}%)")
+        console.print(table)
+        if best:
+            rprint(f"[green]Recommended:[/green] COMPRESSION ALGORITHM '{best['algorithm']}', "
+                   f"PARALLELISM {best['channels']}")
+            if best['algorithm'] != 'BASIC':
+                rprint("[dim]LOW/MEDIUM/HIGH require the Advanced Compression Option "
+                       "license.[/dim]")
+
+    def setup(self, retention_days=7, compression=True, plan=None):
+        """Configure RMAN (with a tuning plan from plan_tuning(), if given)"""
         console.print("\n[bold cyan]Configuring RMAN[/bold cyan]\n")
-        
+
+        if plan:
+            parallelism = plan['parallelism']
+        else:
+            parallelism = self.settings.get('parallelism', 2)
+
         commands = f"""
         CONFIGURE RETENTION POLICY TO RECOVERY WINDOW OF {retention_days} DAYS;
         CONFIGURE CONTROLFILE AUTOBACKUP ON;
         CONFIGURE CONTROLFILE AUTOBACKUP FORMAT FOR DEVICE TYPE DISK TO '/u01/backup/cf_%F';
-        CONFIGURE DEVICE TYPE DISK PARALLELISM 2 BACKUP TYPE TO BACKUPSET;
+        CONFIGURE DEVICE TYPE DISK PARALLELISM {parallelism} BACKUP TYPE TO BACKUPSET;
         """
         
         if compression:
-            commands += "CONFIGURE COMPRESSION ALGORITHM 'MEDIUM' AS OF RELEASE DEFAULT OPTIMIZE FOR LOAD TRUE;\n"
+            algorithm = (plan or {}).get('compression') or 'MEDIUM'
+            commands += (f"CONFIGURE COMPRESSION ALGORITHM '{algorithm}' "
+                         "AS OF RELEASE DEFAULT OPTIMIZE FOR LOAD TRUE;\n")
         
         commands += "SHOW ALL;"
         
         success, stdout, stderr = self._run_rman(commands)
         
         if success:
+            if plan:
+                self.settings.update(
+                    parallelism=plan['parallelism'],
+                    section_size=plan['section_size'],
+                    compression=plan['compression'],
+                    dest_mb_s=plan['dest_mb_s'],
+                    tuned=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                )
+                save_settings(self.settings)
             rprint("[green]✓[/green] RMAN configured successfully")
             console.print(stdout)
             return True
         else:
-            rprint(f"[red]✗ RMAN configuration failed:[/red] {stderr}")
+            rprint(f"[red]✗ RMAN configuration failed:[/red] {self._error_text(stderr)}")
             return False
     
-    def backup(self, backup_type='full', tag=None):
-        """Perform RMAN backup"""
+    def backup(self, backup_type='full', tag=None, watch=False, strategy='backupset',
+               merge_lag_days=0):
+        """Perform RMAN backup (with live progress when watch=True).
+
+        strategy='incremental-merge' ignores backup_type: it enables block
+        change tracking, then rolls the FRA image copy forward (see
+        merge_commands()); restore with switch_to_copy=True.
+        """
+        if strategy == 'incremental-merge':
+            backup_type = 'incremental-merge'
         console.print(f"\n[bold cyan]Starting {backup_type} backup[/bold cyan]\n")
         
         if not tag:
             tag = f"{backup_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        # Multisection size from `oradba rman tune`
+        section = ""
+        if self.settings.get('section_size'):
+            section = f"SECTION SIZE {format_size(self.settings['section_size'])}"
         
         if backup_type == 'full':
             commands = f"""
             BACKUP AS COMPRESSED BACKUPSET 
-            TAG '{tag}'
+            TAG '{tag}' {section}
             DATABASE PLUS ARCHIVELOG DELETE INPUT;
             """
         elif backup_type == 'incremental':
             commands = f"""
             BACKUP AS COMPRESSED BACKUPSET 
             INCREMENTAL LEVEL 1 
-            TAG '{tag}'
+            TAG '{tag}' {section}
             DATABASE PLUS ARCHIVELOG DELETE INPUT;
             """
         elif backup_type == 'archive':
@@ -76,42 +913,161 @@ class RMANManager:
             TAG '{tag}'
             ARCHIVELOG ALL DELETE INPUT;
             """
+        elif backup_type == 'incremental-merge':
+            if not self.enable_block_change_tracking():
+                return False
+            # The copy's tag must stay the same from run to run; it stays in
+            # the FRA, so only RATE applies (no fan-out)
+            allocate = ''
+            if self._fanout_configured():
+                allocate = channel_allocations([FRA], self.settings.get('parallelism', 2),
+                                               rate=self.channel_rate())
+            commands = merge_commands(self.settings.get('merge_tag', MERGE_TAG), merge_lag_days,
+                                      allocate)
         else:
             rprint(f"[red]Unknown backup type:[/red] {backup_type}")
             return False
+
+        if backup_type != 'incremental-merge' and self._fanout_configured():
+            rate = self.channel_rate()
+            if rate:
+                rprint(f"[yellow]Throttled to RATE {rate} per channel[/yellow]")
+            # RMAN rejects MAXPIECESIZE together with SECTION SIZE
+            maxpiecesize = None if section and backup_type != 'archive' \
+                else self.settings.get('maxpiecesize')
+            commands = ("RUN {\n"
+                        + channel_allocations(self.settings.get('destinations'),
+                                              self.settings.get('parallelism', 2), rate,
+                                              maxpiecesize)
+                        + "\n" + commands.strip() + "\n}")
         
-        success, stdout, stderr = self._run_rman(commands)
+        if watch:
+            result = []
+            runner = threading.Thread(target=lambda: result.extend(self._run_rman(commands)),
+                                      daemon=True)
+            runner.start()
+            self.watch(is_running=runner.is_alive)
+            runner.join()
+            success, stdout, stderr = result
+        else:
+            success, stdout, stderr = self._run_rman(commands)
+        self._record_run(backup_type, success, tag)
         
         if success:
             rprint(f"[green]✓[/green] {backup_type} backup completed successfully")
+            parsed = self.last_result or {}
+            if parsed.get('piece_count'):
+                size = f", {format_size(parsed['bytes'])}" if parsed['bytes'] else ""
+                rprint(f"  {parsed['piece_count']} piece(s) on "
+                       f"{len(parsed['channels'])} channel(s){size}")
+            for warning in parsed.get('warnings', []):
+                rprint(f"[yellow]  {warning['code']}: {warning['message']}[/yellow]")
             return True
         else:
-            rprint(f"[red]✗ Backup failed:[/red] {stderr}")
+            rprint(f"[red]✗ Backup failed:[/red] {self._error_text(stderr)}")
             return False
     
-    def restore(self, point_in_time=None):
-        """Restore database"""
+    def plan_restore(self, point_in_time=None, channels=None, preview=True):
+        """Catalog restore plan plus a time estimate (and RMAN's PREVIEW).
+
+        Returns {'plan', 'estimate', 'preview'}; the catalog is refreshed
+        first. preview holds RMAN's RESTORE ... PREVIEW SUMMARY output.
+        """
+        from .rman_catalog import BackupCatalog
+        channels = channels or self.settings.get('parallelism', 2)
+        catalog = BackupCatalog(client=self.client)
+        try:
+            catalog.refresh()
+            plan = catalog.restore_plan(point_in_time)
+            backup_mb_s = catalog.throughput()
+        finally:
+            catalog.close()
+        estimate = estimate_restore(plan, backup_mb_s, channels,
+                                    history_channels=self.settings.get('parallelism', 2),
+                                    dest_mb_s=self.settings.get('dest_mb_s'))
+        output = None
+        if preview:
+            ok, stdout, stderr = self._run_rman(restore_commands(point_in_time, channels,
+                                                                 preview=True))
+            output = stdout if ok else self._error_text(stderr) or stdout
+        return {'plan': plan, 'estimate': estimate, 'preview': output}
+
+    def show_restore_plan(self, result):
+        """Print a plan_restore() result"""
+        plan, estimate = result['plan'], result['estimate']
+
+        def duration(seconds):
+            return '-' if seconds is None else f"{seconds // 60}m {seconds % 60}s"
+
+        table = Table(title=f"Restore to {plan['until'] or 'latest'}", show_header=True,
+                      header_style="bold magenta")
+        table.add_column("Item", style="cyan")
+        table.add_column("Value")
+        table.add_row("Datafiles", f"{len(plan['datafiles'])} "
+                                   f"({plan['datafile_bytes'] / GB:.1f} GB)")
+        table.add_row("Backup pieces", f"{len(plan['pieces'])} ({plan['bytes'] / GB:.1f} GB)")
+        if plan.get('copies'):
+            table.add_row("Image copies", str(len(plan['copies'])))
+        table.add_row("Archived logs", f"{len(plan['archivelogs'])} "
+                                       f"({plan['redo_bytes'] / GB:.1f} GB of redo)")
+        table.add_row("Channels", str(estimate['channels']))
+        table.add_row("Restore rate", f"~{estimate['restore_mb_s']} MB/s"
+                      if estimate['restore_mb_s'] else "unknown (no backup history)")
+        table.add_row("Restore", duration(estimate['restore_seconds']))
+        table.add_row("Recover", duration(estimate['recover_seconds']))
+        table.add_row("[bold]Estimated RTO[/bold]",
+                      f"[bold]{duration(estimate['total_seconds'])}[/bold]")
+        console.print(table)
+        if plan['missing']:
+            rprint(f"[red]✗ No usable backup for datafile(s):[/red] "
+                   f"{', '.join(map(str, plan['missing']))}")
+        for gap in plan['gaps']:
+            rprint(f"[red]✗ Archived log gap:[/red] thread {gap['thread']} "
+                   f"sequence {gap['from']}-{gap['to']}")
+        if result.get('preview'):
+            console.print("\n[bold]RMAN preview:[/bold]")
+            console.print(result['preview'])
+
+    def restore(self, point_in_time=None, switch_to_copy=False, channels=None):
+        """Restore database.
+
+        switch_to_copy points the controlfile at the incremental-merge image
+        copy instead of restoring from backup sets: only the redo since the
+        last merge has to be applied. channels allocates that many disk
+        channels for a parallel (and multisection) restore.
+        """
         console.print("\n[bold red]⚠️  WARNING: Database restore operation[/bold red]\n")
-        
-        commands = "RESTORE DATABASE;\nRECOVER DATABASE;"
-        
-        if point_in_time:
-            commands = f"RESTORE DATABASE UNTIL TIME \"{point_in_time}\";\nRECOVER DATABASE UNTIL TIME \"{point_in_time}\";"
-        
-        commands += "\nALTER DATABASE OPEN RESETLOGS;"
+
+        try:
+            commands = restore_commands(point_in_time, channels, switch_to_copy=switch_to_copy)
+        except ValueError as e:
+            rprint(f"[red]✗ {e}[/red]")
+            return False
+
+        if switch_to_copy and not point_in_time:
+            commands += "\nALTER DATABASE OPEN;"
+        else:
+            commands += "\nALTER DATABASE OPEN RESETLOGS;"
         
         success, stdout, stderr = self._run_rman(commands)
+        self._record_run('restore', success)
         
         if success:
             rprint("[green]✓[/green] Database restored successfully")
+            if switch_to_copy:
+                rprint("[yellow]Datafiles now live in the FRA image copy; the next "
+                       "incremental-merge backup creates a new copy.[/yellow]")
             return True
         else:
-            rprint(f"[red]✗ Restore failed:[/red] {stderr}")
+            rprint(f"[red]✗ Restore failed:[/red] {self._error_text(stderr)}")
             return False
     
     def list_backups(self, backup_type='backup'):
-        """List RMAN backups"""
+        """List RMAN backups (from the local catalog, RMAN LIST as fallback)"""
         console.print(f"\n[bold cyan]Listing {backup_type}s[/bold cyan]\n")
+
+        if backup_type == 'backup' and self._list_from_catalog():
+            return True
         
         if backup_type == 'backup':
             commands = "LIST BACKUP SUMMARY;"
@@ -126,5 +1082,5 @@ class RMANManager:
             console.print(stdout)
             return True
         else:
-            rprint(f"[red]Error:[/red] {stderr}")
+            rprint(f"[red]Error:[/red] {self._error_text(stderr)}")
             return False
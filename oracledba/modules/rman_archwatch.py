@@ -0,0 +1,148 @@
+"""
+Archivelog Watcher - redo-rate driven archivelog backups
+
+Polls redo generation (v$archived_log, v$log_history) and FRA pressure
+(v$recovery_file_dest, v$recovery_area_usage) and runs an archivelog
+backup + delete input only when it is worth it: the FRA is getting full,
+the current redo rate would fill it soon, enough redo has piled up, or
+the oldest unbacked log is older than the RPO. Idle periods produce no
+tiny backups; batch loads trigger backups early.
+
+Usage (Python):
+    from oracledba.modules.rman_archwatch import ArchivelogWatcher
+    watcher = ArchivelogWatcher(fra_pct=70, min_mb=512)
+    watcher.run_once()            # one decision, e.g. from cron
+    watcher.run(interval=60)
+"""
+
+import time
+from datetime import datetime
+from rich.console import Console
+from rich import print as rprint
+
+from .rman import RMANManager, MB, load_settings, save_settings
+
+console = Console()
+
+DEFAULT_THRESHOLDS = {
+    'fra_pct': 70,            # FRA used (minus reclaimable) at which to back up
+    'fill_minutes': 60,       # back up if the redo rate fills the FRA within this
+    'min_mb': 512,            # don't back up less unbacked redo than this...
+    'max_age_minutes': 240,   # ...unless the oldest unbacked log is this old (RPO)
+}
+
+
+def decide_archivelog_backup(state, thresholds=None):
+    """(backup_now, reason) for one sample of the database state.
+
+    state keys: unbacked_count, unbacked_bytes, oldest_unbacked_minutes,
+    fra_pct_used, fra_free_bytes, redo_bytes_per_min.
+    """
+    limits = dict(DEFAULT_THRESHOLDS)
+    limits.update(thresholds or {})
+    unbacked_mb = state.get('unbacked_bytes', 0) / MB
+
+    if not state.get('unbacked_count'):
+        return False, "no unbacked archived logs"
+    if state.get('fra_pct_used', 0) >= limits['fra_pct']:
+        return True, f"FRA {state['fra_pct_used']:.0f}% used (threshold {limits['fra_pct']}%)"
+    rate = state.get('redo_bytes_per_min', 0)
+    if rate > 0 and state.get('fra_free_bytes') is not None:
+        minutes_left = state['fra_free_bytes'] / rate
+        if minutes_left < limits['fill_minutes']:
+            return True, (f"redo at {rate / MB:.0f} MB/min fills the FRA in "
+                          f"~{minutes_left:.0f} min")
+    if unbacked_mb >= limits['min_mb']:
+        return True, f"{unbacked_mb:.0f} MB of unbacked redo (threshold {limits['min_mb']} MB)"
+    if state.get('oldest_unbacked_minutes', 0) >= limits['max_age_minutes']:
+        return True, (f"oldest unbacked log is {state['oldest_unbacked_minutes']:.0f} min old "
+                      f"(RPO {limits['max_age_minutes']} min)")
+    return False, (f"only {unbacked_mb:.0f} MB unbacked, FRA "
+                   f"{state.get('fra_pct_used', 0):.0f}% used")
+
+
+class ArchivelogWatcher:
+    """Samples redo/FRA state and backs up archived logs when needed"""
+
+    def __init__(self, manager=None, **thresholds):
+        self.manager = manager or RMANManager()
+        # Saved thresholds (rman.json 'archivelog_watch'), overridden per call
+        self.thresholds = dict(self.manager.settings.get('archivelog_watch', {}))
+        self.thresholds.update({k: v for k, v in thresholds.items() if v is not None})
+
+    def save_thresholds(self):
+        settings = load_settings()
+        settings['archivelog_watch'] = self.thresholds
+        save_settings(settings)
+
+    def _value(self, sql, default=0.0):
+        success, rows, error = self.manager.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        try:
+            return [float(v) if v != '' else default for v in rows[0]]
+        except (IndexError, ValueError):
+            return None
+
+    def sample(self):
+        """Current redo and FRA state (see decide_archivelog_backup)"""
+        count, unbacked, oldest = self._value(
+            "SELECT COUNT(*), NVL(SUM(blocks * block_size), 0), "
+            "NVL(ROUND((SYSDATE - MIN(completion_time)) * 1440), 0) FROM v$archived_log "
+            "WHERE backup_count = 0 AND deleted = 'NO' AND standby_dest = 'NO' "
+            "AND name IS NOT NULL") or (0, 0, 0)
+        recent = self._value(
+            "SELECT NVL(SUM(blocks * block_size), 0) FROM v$archived_log "
+            "WHERE completion_time > SYSDATE - 1/24 AND standby_dest = 'NO'") or [0]
+        switches = self._value(
+            "SELECT COUNT(*) FROM v$log_history WHERE first_time > SYSDATE - 1/24") or [0]
+        used = self._value(
+            "SELECT NVL(SUM(percent_space_used - percent_space_reclaimable), 0) "
+            "FROM v$recovery_area_usage") or [0]
+        dest = self._value(
+            "SELECT space_limit, space_used, space_reclaimable FROM v$recovery_file_dest")
+        fra_free = None
+        if dest and dest[0]:
+            fra_free = max(0.0, dest[0] - dest[1] + dest[2])
+        return {
+            'unbacked_count': int(count),
+            'unbacked_bytes': unbacked,
+            'oldest_unbacked_minutes': oldest,
+            'redo_bytes_per_min': recent[0] / 60.0,
+            'log_switches_per_hour': int(switches[0]),
+            'fra_pct_used': used[0],
+            'fra_free_bytes': fra_free,
+        }
+
+    def run_once(self):
+        """Sample, decide and back up if needed. Returns the decision dict."""
+        state = self.sample()
+        backup, reason = decide_archivelog_backup(state, self.thresholds)
+        stamp = datetime.now().strftime('%H:%M:%S')
+        rprint(f"[dim]{stamp}[/dim] redo {state['redo_bytes_per_min'] / MB:.1f} MB/min "
+               f"({state['log_switches_per_hour']} switches/h), "
+               f"{state['unbacked_count']} unbacked logs "
+               f"({state['unbacked_bytes'] / MB:.0f} MB), FRA {state['fra_pct_used']:.0f}% "
+               f"→ {'[yellow]backup[/yellow]' if backup else 'wait'}: {reason}")
+        success = None
+        if backup:
+            tag = f"ARCH_AUTO_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            success = self.manager.backup('archive', tag)
+        return {'state': state, 'backup': backup, 'reason': reason, 'success': success}
+
+    def run(self, interval=60, cycles=None):
+        """Watch until interrupted (or for `cycles` polls)"""
+        console.print("\n[bold cyan]Watching redo generation and FRA usage[/bold cyan]\n")
+        done = 0
+        try:
+            while cycles is None or done < cycles:
+                try:
+                    self.run_once()
+                except RuntimeError as e:
+                    rprint(f"[red]✗ Sample failed:[/red] {e}")
+                done += 1
+                if cycles is None or done < cycles:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            rprint("\n[yellow]Archivelog watcher stopped[/yellow]")
+        return True
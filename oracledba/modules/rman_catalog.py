@@ -0,0 +1,458 @@
+"""
+RMAN Backup Catalog - local SQLite index of backup metadata
+
+Copies backup sets, pieces, datafile coverage (checkpoint SCN/time),
+archived-log coverage and datafile image copies from the controlfile views
+(v$backup_set, v$backup_piece, v$backup_datafile, v$backup_redolog,
+v$datafile_copy) into ~/.oracledba/rman-catalog.db. Each refresh only
+fetches backup records newer than the last recid seen, so it is cheap
+enough to run before every query; image copies are few and are rolled
+forward by RECOVER COPY, so they are re-read in full.
+Runs started by this tool are recorded from their parsed RMAN output
+(channels, pieces, error stacks) so failures are kept next to the sets.
+Restore questions ("what do I need to restore to time T") are then
+answered from SQLite without starting RMAN.
+
+Usage (Python):
+    from oracledba.modules.rman_catalog import BackupCatalog
+    catalog = BackupCatalog()
+    catalog.refresh()
+    plan = catalog.restore_plan('2024-05-01 12:00:00')
+"""
+
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from ..utils.oracle_client import OracleClient
+
+CATALOG_FILE = Path.home() / '.oracledba' / 'rman-catalog.db'
+
+DATE_FMT = 'YYYY-MM-DD HH24:MI:SS'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS backup_set (
+    recid INTEGER PRIMARY KEY,
+    set_stamp INTEGER,
+    set_count INTEGER,
+    backup_type TEXT,           -- D datafile, I incremental, L archivelog
+    incremental_level INTEGER,
+    pieces INTEGER,
+    start_time TEXT,
+    completion_time TEXT,
+    elapsed_seconds REAL,
+    controlfile_included TEXT,
+    UNIQUE (set_stamp, set_count)
+);
+CREATE TABLE IF NOT EXISTS backup_piece (
+    recid INTEGER PRIMARY KEY,
+    set_stamp INTEGER,
+    set_count INTEGER,
+    piece INTEGER,
+    handle TEXT,
+    tag TEXT,
+    status TEXT,                -- A available, X expired, D deleted
+    device_type TEXT,
+    bytes INTEGER,
+    compressed TEXT,
+    completion_time TEXT
+);
+CREATE TABLE IF NOT EXISTS backup_datafile (
+    recid INTEGER PRIMARY KEY,
+    set_stamp INTEGER,
+    set_count INTEGER,
+    file INTEGER,               -- 0 is the controlfile
+    incremental_level INTEGER,
+    checkpoint_change INTEGER,
+    checkpoint_time TEXT,
+    datafile_blocks INTEGER,
+    blocks INTEGER,
+    block_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS backup_redolog (
+    recid INTEGER PRIMARY KEY,
+    set_stamp INTEGER,
+    set_count INTEGER,
+    thread INTEGER,
+    sequence INTEGER,
+    first_change INTEGER,
+    first_time TEXT,
+    next_change INTEGER,
+    next_time TEXT,
+    blocks INTEGER,
+    block_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS rman_run (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    finished TEXT,
+    kind TEXT,                  -- full, incremental, archive, restore, ...
+    tag TEXT,
+    success INTEGER,
+    channels INTEGER,
+    pieces INTEGER,
+    bytes INTEGER,
+    elapsed_seconds REAL,
+    error_stack TEXT            -- parsed RMAN-/ORA- stacks, empty on success
+);
+CREATE TABLE IF NOT EXISTS datafile_copy (
+    recid INTEGER PRIMARY KEY,
+    file INTEGER,
+    name TEXT,
+    tag TEXT,
+    status TEXT,                -- A available, X expired, D deleted
+    checkpoint_change INTEGER,
+    checkpoint_time TEXT,
+    blocks INTEGER,
+    block_size INTEGER,
+    completion_time TEXT
+);
+CREATE INDEX IF NOT EXISTS piece_set ON backup_piece (set_stamp, set_count);
+CREATE INDEX IF NOT EXISTS datafile_ckp ON backup_datafile (file, checkpoint_time);
+CREATE INDEX IF NOT EXISTS redolog_time ON backup_redolog (thread, first_time);
+"""
+
+# table -> (query template with {recid}, columns)
+SOURCES = {
+    'backup_set': (
+        "SELECT recid, set_stamp, set_count, backup_type, NVL(incremental_level, -1), pieces, "
+        f"TO_CHAR(start_time, '{DATE_FMT}'), TO_CHAR(completion_time, '{DATE_FMT}'), "
+        "elapsed_seconds, controlfile_included "
+        "FROM v$backup_set WHERE recid > {recid} ORDER BY recid",
+        ('recid', 'set_stamp', 'set_count', 'backup_type', 'incremental_level', 'pieces',
+         'start_time', 'completion_time', 'elapsed_seconds', 'controlfile_included'),
+    ),
+    'backup_piece': (
+        "SELECT recid, set_stamp, set_count, piece#, handle, tag, status, device_type, "
+        f"TO_CHAR(bytes), compressed, TO_CHAR(completion_time, '{DATE_FMT}') "
+        "FROM v$backup_piece WHERE recid > {recid} ORDER BY recid",
+        ('recid', 'set_stamp', 'set_count', 'piece', 'handle', 'tag', 'status', 'device_type',
+         'bytes', 'compressed', 'completion_time'),
+    ),
+    'backup_datafile': (
+        "SELECT recid, set_stamp, set_count, file#, NVL(incremental_level, -1), "
+        f"TO_CHAR(checkpoint_change#), TO_CHAR(checkpoint_time, '{DATE_FMT}'), "
+        "datafile_blocks, blocks, block_size "
+        "FROM v$backup_datafile WHERE recid > {recid} ORDER BY recid",
+        ('recid', 'set_stamp', 'set_count', 'file', 'incremental_level', 'checkpoint_change',
+         'checkpoint_time', 'datafile_blocks', 'blocks', 'block_size'),
+    ),
+    'backup_redolog': (
+        "SELECT recid, set_stamp, set_count, thread#, sequence#, TO_CHAR(first_change#), "
+        f"TO_CHAR(first_time, '{DATE_FMT}'), TO_CHAR(next_change#), "
+        f"TO_CHAR(next_time, '{DATE_FMT}'), "
+        "blocks, block_size "
+        "FROM v$backup_redolog WHERE recid > {recid} ORDER BY recid",
+        ('recid', 'set_stamp', 'set_count', 'thread', 'sequence', 'first_change',
+         'first_time', 'next_change', 'next_time', 'blocks', 'block_size'),
+    ),
+}
+
+COPY_QUERY = (
+    "SELECT recid, file#, name, tag, status, TO_CHAR(checkpoint_change#), "
+    f"TO_CHAR(checkpoint_time, '{DATE_FMT}'), blocks, block_size, "
+    f"TO_CHAR(completion_time, '{DATE_FMT}') "
+    "FROM v$datafile_copy WHERE file# > 0 ORDER BY recid")
+COPY_COLUMNS = ('recid', 'file', 'name', 'tag', 'status', 'checkpoint_change',
+                'checkpoint_time', 'blocks', 'block_size', 'completion_time')
+
+INTEGER_COLUMNS = {'recid', 'set_stamp', 'set_count', 'incremental_level', 'pieces', 'piece',
+                   'bytes', 'file', 'checkpoint_change', 'datafile_blocks', 'blocks',
+                   'block_size', 'thread', 'sequence', 'first_change', 'next_change'}
+
+
+def _convert(column, value):
+    """SQLite value of a query column; RuntimeError if a number does not parse
+    (storing NULL would silently drop SCNs and sizes from restore plans)"""
+    if value in ('', None):
+        return None
+    try:
+        if column in INTEGER_COLUMNS:
+            return int(value)
+        if column == 'elapsed_seconds':
+            return float(value)
+    except ValueError:
+        raise RuntimeError(f"Unexpected value for {column}: {value!r}") from None
+    return value
+
+
+class BackupCatalog:
+    """Incrementally refreshed SQLite copy of RMAN backup metadata"""
+
+    def __init__(self, db_path=None, client=None):
+        self.db_path = Path(db_path) if db_path else CATALOG_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.client = client or OracleClient()
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Bring catalogs created by older versions up to SCHEMA"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(backup_redolog)")}
+        if 'blocks' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE backup_redolog ADD COLUMN blocks INTEGER")
+                self.conn.execute("ALTER TABLE backup_redolog ADD COLUMN block_size INTEGER")
+                # Re-read all archived-log records to fill in their sizes
+                self.conn.execute("DELETE FROM meta WHERE key = 'backup_redolog_recid'")
+
+    def close(self):
+        self.conn.close()
+
+    # =========================================================================
+    # REFRESH
+    # =========================================================================
+
+    def _meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                          (key, str(value)))
+
+    def _query(self, sql):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return rows
+
+    def refresh(self):
+        """Fetch records newer than the last known recid of each view.
+
+        Returns {table: new_rows}. Status changes of known pieces
+        (expired/deleted) are re-read as well, since they keep their recid.
+        """
+        added = {}
+        with self.conn:
+            for table, (template, columns) in SOURCES.items():
+                last = int(self._meta(f"{table}_recid", 0))
+                rows = self._query(template.format(recid=last))
+                records = [[_convert(c, v) for c, v in zip(columns, row)]
+                           for row in rows if len(row) == len(columns)]
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})", records)
+                if records:
+                    self._set_meta(f"{table}_recid", max(r[0] for r in records))
+                added[table] = len(records)
+
+            for recid, status in self._query(
+                    "SELECT recid, status FROM v$backup_piece WHERE status <> 'A'"):
+                self.conn.execute("UPDATE backup_piece SET status = ? WHERE recid = ?",
+                                  (status, int(recid)))
+
+            copies = [[_convert(c, v) for c, v in zip(COPY_COLUMNS, row)]
+                      for row in self._query(COPY_QUERY) if len(row) == len(COPY_COLUMNS)]
+            self.conn.execute("DELETE FROM datafile_copy")
+            self.conn.executemany(
+                f"INSERT INTO datafile_copy ({', '.join(COPY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COPY_COLUMNS))})", copies)
+            added['datafile_copy'] = len(copies)
+            self._set_meta('refreshed', time.strftime('%Y-%m-%d %H:%M:%S'))
+        return added
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def backup_sets(self, limit=None):
+        """Backup sets with size, compression ratio and elapsed time, newest first"""
+        sql = """
+            SELECT s.*,
+                   (SELECT SUM(p.bytes) FROM backup_piece p
+                     WHERE p.set_stamp = s.set_stamp AND p.set_count = s.set_count
+                       AND p.status = 'A') AS bytes,
+                   (SELECT MIN(p.tag) FROM backup_piece p
+                     WHERE p.set_stamp = s.set_stamp AND p.set_count = s.set_count) AS tag,
+                   (SELECT SUM(d.datafile_blocks * d.block_size) FROM backup_datafile d
+                     WHERE d.set_stamp = s.set_stamp AND d.set_count = s.set_count
+                       AND d.file > 0) AS input_bytes,
+                   (SELECT COUNT(*) FROM backup_datafile d
+                     WHERE d.set_stamp = s.set_stamp AND d.set_count = s.set_count
+                       AND d.file > 0) AS datafiles
+              FROM backup_set s
+             ORDER BY s.completion_time DESC
+        """
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        sets = []
+        for row in self.conn.execute(sql):
+            item = dict(row)
+            item['compression_ratio'] = (round(item['input_bytes'] / item['bytes'], 2)
+                                         if item['input_bytes'] and item['bytes'] else None)
+            sets.append(item)
+        return sets
+
+    def _pieces(self, set_keys):
+        pieces = []
+        for set_stamp, set_count in sorted(set_keys):
+            pieces.extend(dict(r) for r in self.conn.execute(
+                "SELECT handle, bytes, tag, completion_time FROM backup_piece "
+                "WHERE set_stamp = ? AND set_count = ? AND status = 'A' ORDER BY piece",
+                (set_stamp, set_count)))
+        return pieces
+
+    def _available(self):
+        """SQL condition: the row's backup set has an available piece"""
+        return ("EXISTS (SELECT 1 FROM backup_piece p WHERE p.set_stamp = {t}.set_stamp "
+                "AND p.set_count = {t}.set_count AND p.status = 'A')")
+
+    def restore_plan(self, until_time=None):
+        """What is needed to restore and recover to `until_time`
+        ('YYYY-MM-DD HH:MM:SS', default: latest backup).
+
+        Per datafile: the newest level 0/full backup or image copy taken at
+        or before the target, then the level 1 backups between it and the
+        target (an incremental-merge copy rolled forward past the target is
+        not usable). Archived logs are those from the oldest datafile
+        checkpoint used up to the target. Returns datafiles, controlfile,
+        archivelogs, pieces, copies, bytes, missing (datafiles without a
+        usable base) and gaps (log sequence holes).
+        """
+        until = until_time or '9999-12-31 23:59:59'
+        available = self._available().format(t='d')
+        files = [r['file'] for r in self.conn.execute(
+            "SELECT file FROM backup_datafile WHERE file > 0 "
+            "UNION SELECT file FROM datafile_copy ORDER BY file")]
+
+        datafiles = {}
+        missing = []
+        set_keys = set()
+        copies = []
+        recover_from = None
+        for file_no in files:
+            base = self.conn.execute(
+                f"SELECT * FROM backup_datafile d WHERE file = ? AND incremental_level IN (-1, 0) "
+                f"AND checkpoint_time <= ? AND {available} "
+                f"ORDER BY checkpoint_change DESC LIMIT 1", (file_no, until)).fetchone()
+            copy = self.conn.execute(
+                "SELECT * FROM datafile_copy WHERE file = ? AND status = 'A' "
+                "AND checkpoint_time <= ? ORDER BY checkpoint_change DESC LIMIT 1",
+                (file_no, until)).fetchone()
+            if copy is not None and (base is None
+                                     or copy['checkpoint_change'] > base['checkpoint_change']):
+                base = copy
+            if base is None:
+                missing.append(file_no)
+                continue
+            incrementals = self.conn.execute(
+                f"SELECT * FROM backup_datafile d WHERE file = ? AND incremental_level >= 1 "
+                f"AND checkpoint_change > ? AND checkpoint_time <= ? AND {available} "
+                f"ORDER BY checkpoint_change", (file_no, base['checkpoint_change'], until)
+            ).fetchall()
+            is_copy = base is copy
+            if is_copy:
+                size = (base['blocks'] or 0) * (base['block_size'] or 0)
+                copies.append({'handle': base['name'], 'bytes': size, 'tag': base['tag'],
+                               'completion_time': base['completion_time']})
+            else:
+                size = (base['datafile_blocks'] or 0) * (base['block_size'] or 0)
+            chain = [base] + list(incrementals)
+            for item in chain[1:] if is_copy else chain:
+                set_keys.add((item['set_stamp'], item['set_count']))
+            last = chain[-1]
+            datafiles[file_no] = {
+                'base': {'checkpoint_change': base['checkpoint_change'],
+                         'checkpoint_time': base['checkpoint_time'],
+                         'source': 'image copy' if is_copy else 'backup set'},
+                'bytes': size,
+                'incrementals': len(incrementals),
+                'checkpoint_change': last['checkpoint_change'],
+                'checkpoint_time': last['checkpoint_time'],
+            }
+            if recover_from is None or last['checkpoint_change'] < recover_from:
+                recover_from = last['checkpoint_change']
+
+        controlfile = self.conn.execute(
+            f"SELECT * FROM backup_datafile d WHERE file = 0 AND checkpoint_time <= ? "
+            f"AND {available} ORDER BY checkpoint_change DESC LIMIT 1", (until,)).fetchone()
+        if controlfile is not None:
+            set_keys.add((controlfile['set_stamp'], controlfile['set_count']))
+
+        archivelogs = []
+        gaps = []
+        if recover_from is not None:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT thread, sequence, first_change, next_change, first_time, "
+                f"next_time, blocks, block_size, set_stamp, set_count FROM backup_redolog d "
+                f"WHERE next_change > ? AND first_time <= ? AND {available} "
+                f"ORDER BY thread, sequence", (recover_from, until)).fetchall()
+            seen = {}
+            for row in rows:
+                key = (row['thread'], row['sequence'])
+                if key in seen:
+                    continue
+                seen[key] = True
+                set_keys.add((row['set_stamp'], row['set_count']))
+                archivelogs.append({'thread': row['thread'], 'sequence': row['sequence'],
+                                    'first_time': row['first_time'],
+                                    'next_time': row['next_time'],
+                                    'bytes': (row['blocks'] or 0) * (row['block_size'] or 0)})
+            for thread in sorted({log['thread'] for log in archivelogs}):
+                sequences = [log['sequence'] for log in archivelogs if log['thread'] == thread]
+                for previous, current in zip(sequences, sequences[1:]):
+                    if current != previous + 1:
+                        gaps.append({'thread': thread, 'from': previous + 1, 'to': current - 1})
+
+        pieces = self._pieces(set_keys)
+        return {
+            'until': until_time,
+            'datafiles': datafiles,
+            'controlfile': dict(controlfile) if controlfile is not None else None,
+            'archivelogs': archivelogs,
+            'pieces': pieces,
+            'copies': copies,
+            'bytes': sum(p['bytes'] or 0 for p in pieces + copies),
+            'datafile_bytes': sum(d['bytes'] for d in datafiles.values()),
+            'redo_bytes': sum(log['bytes'] for log in archivelogs),
+            'missing': missing,
+            'gaps': gaps,
+        }
+
+    def throughput(self, recent=10):
+        """Median MB/s (datafile bytes read per elapsed second) of the most
+        recent datafile backup sets, or None without history"""
+        rates = []
+        for item in self.backup_sets():
+            if item['backup_type'] in ('D', 'I') and item['input_bytes'] \
+                    and item['elapsed_seconds']:
+                rates.append(item['input_bytes'] / 1024 ** 2 / item['elapsed_seconds'])
+            if len(rates) >= recent:
+                break
+        return statistics.median(rates) if rates else None
+
+    def summary(self):
+        """Counts and totals for a quick overview"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS pieces, SUM(bytes) AS bytes, MIN(completion_time) AS oldest, "
+            "MAX(completion_time) AS newest FROM backup_piece WHERE status = 'A'").fetchone()
+        sets = self.conn.execute("SELECT COUNT(*) FROM backup_set").fetchone()[0]
+        return {'sets': sets, 'pieces': row['pieces'], 'bytes': row['bytes'] or 0,
+                'oldest': row['oldest'], 'newest': row['newest'],
+                'refreshed': self._meta('refreshed')}
+
+    # =========================================================================
+    # RUNS
+    # =========================================================================
+
+    def record_run(self, kind, result, success, tag=None):
+        """Store one RMAN run parsed by rman_output.RMANOutputParser"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO rman_run (finished, kind, tag, success, channels, pieces, bytes, "
+                "elapsed_seconds, error_stack) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.strftime('%Y-%m-%d %H:%M:%S'), kind, tag, int(bool(success)),
+                 len(result['channels']), result['piece_count'], result['bytes'],
+                 result['elapsed'], result['error_stack']))
+
+    def runs(self, limit=20):
+        """Recorded runs, newest first"""
+        rows = self.conn.execute("SELECT * FROM rman_run ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
@@ -0,0 +1,220 @@
+"""
+RMAN Output Parser - structured results from RMAN's text output
+
+Reads RMAN output one line at a time (a running process, a job log file
+or captured text) and keeps only what callers need: commands with their
+start/finish lines, allocated channels (SID, device type, pieces, elapsed
+time), backup pieces and image copies (handle, tag, channel, size),
+controlfile/SPFILE autobackup pieces (kept apart from the backup's own),
+archived logs read/deleted, warnings, and the RMAN-/ORA- error stacks.
+Memory is bounded by the number of pieces, not the length of the output.
+
+Usage (Python):
+    from oracledba.modules.rman_output import RMANOutputParser, parse_rman_log
+    parser = RMANOutputParser()
+    for line in proc.stdout:
+        parser.feed(line)
+    result = parser.result()
+    result = parse_rman_log('/tmp/rman-backup.log')
+"""
+
+import os
+import re
+
+CHANNEL_ALLOC_RE = re.compile(r'^allocated channel: (\S+)')
+CHANNEL_INFO_RE = re.compile(r'^channel (\S+): SID=(\d+)(?:.*?device type=(\S+))?')
+CHANNEL_LINE_RE = re.compile(r'^channel (\S+): (.*)$')
+HANDLE_RE = re.compile(r'piece handle=(\S+)(?:\s+tag=(\S+))?')
+COPY_RE = re.compile(r'^output file name=(\S+)(?:\s+tag=(\S+))?')
+ELAPSED_RE = re.compile(r'elapsed time: (\d+):(\d\d):(\d\d)')
+COMMAND_RE = re.compile(r'^(Starting|Finished) (.+?) at (.+)$')
+CODE_RE = re.compile(r'^((?:RMAN|ORA)-\d+):\s*(.*)$')
+STACK_BANNER = 'ERROR MESSAGE STACK FOLLOWS'
+# Piece kinds written by the command itself (not 'read' or 'autobackup')
+WRITTEN = ('backup piece', 'image copy')
+
+
+def _seconds(match):
+    hours, minutes, seconds = (int(g) for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+class RMANOutputParser:
+    """Incremental parser: feed() lines, then result()"""
+
+    def __init__(self):
+        self.commands = []
+        self.channels = {}
+        self.pieces = []
+        self.warnings = []
+        self.errors = []
+        self.archived_logs = 0
+        self.deleted_logs = 0
+        self.lines = 0
+        self._stack = None
+        self._piece_channel = None
+        self._autobackup = False
+
+    def _channel(self, name):
+        return self.channels.setdefault(name, {
+            'name': name, 'sid': None, 'device': None,
+            'pieces': 0, 'elapsed': 0, 'bytes': 0,
+        })
+
+    def feed(self, line):
+        """Parse one output line (with or without its newline)"""
+        self.lines += 1
+        line = line.strip()
+        if line.startswith('RMAN> '):
+            line = line[6:].strip()
+        code = CODE_RE.match(line)
+
+        # Error stacks: banner, then RMAN-/ORA- lines until anything else
+        if self._stack is not None:
+            if code and not code.group(2).startswith('='):
+                self._stack.append({'code': code.group(1), 'message': code.group(2)})
+                return
+            if code:
+                return
+            self.errors.append(self._stack)
+            self._stack = None
+        if code:
+            if STACK_BANNER in line:
+                self._stack = []
+            elif code.group(2).startswith('='):
+                pass
+            elif 'WARNING' in code.group(2):
+                self.warnings.append({'code': code.group(1), 'message': code.group(2)})
+            else:
+                self.errors.append([{'code': code.group(1), 'message': code.group(2)}])
+            return
+        if not line:
+            return
+
+        match = COMMAND_RE.match(line)
+        if match:
+            # Pieces never belong to a channel of the previous command
+            self._piece_channel = None
+            self._autobackup = (match.group(1) == 'Starting'
+                                and match.group(2).endswith('Autobackup'))
+            if match.group(1) == 'Starting':
+                self.commands.append({'command': match.group(2), 'started': match.group(3),
+                                      'finished': None})
+            else:
+                for command in reversed(self.commands):
+                    if command['command'] == match.group(2) and not command['finished']:
+                        command['finished'] = match.group(3)
+                        break
+            return
+
+        match = CHANNEL_ALLOC_RE.match(line)
+        if match:
+            self._channel(match.group(1))
+            return
+        match = CHANNEL_INFO_RE.match(line)
+        if match:
+            channel = self._channel(match.group(1))
+            channel['sid'] = int(match.group(2))
+            channel['device'] = match.group(3)
+            return
+
+        match = CHANNEL_LINE_RE.match(line)
+        if match:
+            name, text = match.groups()
+            channel = self._channel(name)
+            elapsed = ELAPSED_RE.search(text)
+            if elapsed:
+                channel['elapsed'] += _seconds(elapsed)
+            if text.startswith('finished piece'):
+                self._piece_channel = name
+            handle = HANDLE_RE.search(text)
+            if handle:
+                # Restores report the pieces they read with a channel prefix
+                self._add_piece(handle.group(1), handle.group(2), name, 'read')
+            return
+
+        match = HANDLE_RE.match(line)
+        if match:
+            if self._autobackup:
+                self._add_piece(match.group(1), match.group(2), None, 'autobackup')
+            else:
+                self._add_piece(match.group(1), match.group(2), self._piece_channel,
+                                'backup piece')
+            return
+        match = COPY_RE.match(line)
+        if match:
+            self._add_piece(match.group(1), match.group(2), self._piece_channel, 'image copy')
+            return
+
+        if line.startswith('input archived log'):
+            self.archived_logs += 1
+        elif line.startswith('archived log file name=') or line.startswith('deleted archived log'):
+            self.deleted_logs += 1
+
+    def _add_piece(self, handle, tag, channel, kind):
+        self.pieces.append({'handle': handle, 'tag': tag, 'channel': channel,
+                            'kind': kind, 'bytes': None})
+        if channel and kind in WRITTEN:
+            self._channel(channel)['pieces'] += 1
+
+    def feed_lines(self, lines):
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def resolve_sizes(self):
+        """Fill in piece sizes for handles readable from this host (disk
+        channels); tape/SBT handles stay None"""
+        for channel in self.channels.values():
+            channel['bytes'] = 0
+        for piece in self.pieces:
+            if piece['kind'] not in WRITTEN + ('autobackup',):
+                continue
+            try:
+                piece['bytes'] = os.path.getsize(piece['handle'])
+            except OSError:
+                continue
+            if piece['channel'] in self.channels:
+                self.channels[piece['channel']]['bytes'] += piece['bytes']
+        return self
+
+    def result(self):
+        """Everything parsed so far as a dict"""
+        errors = self.errors + ([self._stack] if self._stack else [])
+        written = [p for p in self.pieces if p['kind'] in WRITTEN]
+        sizes = [p['bytes'] for p in written if p['bytes'] is not None]
+        return {
+            'commands': list(self.commands),
+            'channels': [dict(c) for c in self.channels.values()],
+            'pieces': [dict(p) for p in self.pieces],
+            'piece_count': len(written),
+            'autobackups': [p['handle'] for p in self.pieces if p['kind'] == 'autobackup'],
+            'bytes': sum(sizes) if sizes else None,
+            'elapsed': max((c['elapsed'] for c in self.channels.values()), default=0),
+            'archived_logs': self.archived_logs,
+            'deleted_logs': self.deleted_logs,
+            'warnings': list(self.warnings),
+            'errors': errors,
+            'error_stack': format_errors(errors),
+            'lines': self.lines,
+        }
+
+
+def format_errors(errors):
+    """Error stacks as text, one 'CODE: message' per line, stacks separated
+    by a blank line"""
+    return '\n\n'.join('\n'.join(f"{e['code']}: {e['message']}" for e in stack)
+                       for stack in errors)
+
+
+def parse_rman_output(text):
+    """Parse captured RMAN output (a string)"""
+    return RMANOutputParser().feed_lines(text.splitlines()).resolve_sizes().result()
+
+
+def parse_rman_log(path):
+    """Parse an RMAN log file line by line"""
+    parser = RMANOutputParser()
+    with open(path, 'r', errors='replace') as f:
+        parser.feed_lines(f)
+    return parser.resolve_sizes().result()
@@ -0,0 +1,184 @@
+"""
+SQL Tuning Advisor - batch tuning of the top statements
+
+Loads the top-N statements by elapsed time from the cursor cache into a
+SQL tuning set, then runs one DBMS_SQLTUNE task per statement, several at
+a time (each in its own sqlplus session, each with a time limit). The
+findings of all tasks (SQL profiles, indexes, statistics, restructuring,
+alternative plans) are merged into one list ranked by the elapsed time
+they are estimated to save; the full advisor reports go to one text file.
+The SQL Tuning Advisor is part of the Tuning Pack license.
+
+Usage (Python):
+    from oracledba.modules.sqltune import SQLTuneAdvisor
+    advisor = SQLTuneAdvisor()
+    result = advisor.advise(top=20, time_limit=300, parallel=4)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..utils.oracle_client import OracleClient
+from .plan_history import SYSTEM_SCHEMAS
+
+REPORTS_DIR = Path.home() / '.oracledba' / 'reports'
+TASK_PREFIX = 'ORADBA'
+
+
+def default_parallelism():
+    """Concurrent advisor sessions: half the CPUs, at most 4"""
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def tune_block(sqlset, owner, sql_id, task, time_limit):
+    """PL/SQL that creates and executes the tuning task for one statement"""
+    return f"""
+DECLARE
+  t VARCHAR2(128);
+BEGIN
+  t := DBMS_SQLTUNE.CREATE_TUNING_TASK(
+         sqlset_name => '{sqlset}', sqlset_owner => '{owner}',
+         basic_filter => 'sql_id = ''{sql_id}''',
+         scope => 'COMPREHENSIVE', time_limit => {int(time_limit)},
+         task_name => '{task}');
+  DBMS_SQLTUNE.EXECUTE_TUNING_TASK(task_name => '{task}');
+  DBMS_OUTPUT.PUT_LINE(t);
+END;"""
+
+
+def rank_recommendations(statements, recommendations):
+    """Merge advisor recommendations with statement costs.
+
+    statements: {sql_id: {'elapsed_s', 'executions', 'sql_text'}};
+    recommendations: dicts with sql_id, task, type, benefit_pct, message.
+    Adds saved_s (benefit applied to the statement's elapsed time) and
+    sorts by it, biggest first; unknown benefits sort last.
+    """
+    ranked = []
+    for rec in recommendations:
+        stmt = statements.get(rec['sql_id'], {})
+        benefit = rec.get('benefit_pct')
+        saved = (round(stmt.get('elapsed_s', 0.0) * benefit / 100.0, 1)
+                 if benefit is not None else None)
+        ranked.append(dict(rec, saved_s=saved, elapsed_s=stmt.get('elapsed_s'),
+                           sql_text=stmt.get('sql_text')))
+    ranked.sort(key=lambda r: (r['saved_s'] is not None, r['saved_s'] or 0), reverse=True)
+    return ranked
+
+
+class SQLTuneAdvisor:
+    """Runs DBMS_SQLTUNE over a tuning set of the top statements"""
+
+    def __init__(self, client=None, reports_dir=None):
+        self.client = client or OracleClient()
+        self.reports_dir = Path(reports_dir) if reports_dir else REPORTS_DIR
+
+    def _query(self, sql):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return rows
+
+    def create_sqlset(self, name, top=20):
+        """Tuning set with the top statements by elapsed time; returns
+        {sql_id: {'elapsed_s', 'executions', 'sql_text'}}"""
+        excluded = ', '.join(f"''{s}''" for s in SYSTEM_SCHEMAS)
+        success, _, error = self.client.plsql(f"""
+DECLARE
+  c DBMS_SQLTUNE.SQLSET_CURSOR;
+BEGIN
+  DBMS_SQLTUNE.CREATE_SQLSET(sqlset_name => '{name}',
+                             description => 'oradba tuning advise, top {int(top)}');
+  OPEN c FOR
+    SELECT VALUE(p) FROM TABLE(DBMS_SQLTUNE.SELECT_CURSOR_CACHE(
+      basic_filter => 'parsing_schema_name NOT IN ({excluded})',
+      ranking_measure1 => 'elapsed_time', result_limit => {int(top)})) p;
+  DBMS_SQLTUNE.LOAD_SQLSET(sqlset_name => '{name}', populate_cursor => c);
+END;""")
+        if not success:
+            raise RuntimeError(error or "Cannot create SQL tuning set")
+        rows = self._query(
+            "SELECT sql_id, ROUND(elapsed_time / 1e6, 1), executions, "
+            "REPLACE(REPLACE(REPLACE(SUBSTR(sql_text, 1, 120), '|', ' '), CHR(10), ' '), "
+            "CHR(13), ' ') "
+            f"FROM dba_sqlset_statements WHERE sqlset_name = '{name}' "
+            "ORDER BY elapsed_time DESC")
+        return {r[0]: {'elapsed_s': float(r[1] or 0), 'executions': int(r[2] or 0),
+                       'sql_text': r[3]}
+                for r in rows if len(r) == 4}
+
+    def _owner(self):
+        return self._query("SELECT USER FROM dual")[0][0]
+
+    def run_tasks(self, sqlset, sql_ids, time_limit=300, parallel=None, prefix=None):
+        """Create and execute one tuning task per statement, `parallel` at a
+        time. Returns {sql_id: (task_name, error or None)}."""
+        owner = self._owner()
+        prefix = prefix or sqlset
+
+        def tune(sql_id):
+            task = f"{prefix}_{sql_id}"
+            success, _, error = self.client.plsql(
+                tune_block(sqlset, owner, sql_id, task, time_limit), timeout=time_limit + 120)
+            return sql_id, (task, None if success else (error or 'failed'))
+
+        with ThreadPoolExecutor(max_workers=parallel or default_parallelism()) as pool:
+            return dict(pool.map(tune, sql_ids))
+
+    def findings(self, tasks):
+        """Recommendations of tasks ({sql_id: task_name}), benefit in percent"""
+        if not tasks:
+            return []
+        names = ', '.join(f"'{t}'" for t in tasks.values())
+        rows = self._query(
+            "SELECT t.task_name, r.type, r.benefit, "
+            "REPLACE(REPLACE(SUBSTR(f.message, 1, 300), '|', ' '), CHR(10), ' ') "
+            "FROM dba_advisor_tasks t "
+            "JOIN dba_advisor_recommendations r ON r.task_id = t.task_id "
+            "LEFT JOIN dba_advisor_findings f "
+            "ON f.task_id = r.task_id AND f.finding_id = r.finding_id "
+            f"WHERE t.task_name IN ({names}) ORDER BY t.task_name, r.rec_id")
+        by_task = {t: sql_id for sql_id, t in tasks.items()}
+        results = []
+        for task, rec_type, benefit, message in (r for r in rows if len(r) == 4):
+            try:
+                # Stored in hundredths of a percent
+                benefit_pct = round(float(benefit) / 100.0, 1) if benefit else None
+            except ValueError:
+                benefit_pct = None
+            results.append({'sql_id': by_task.get(task), 'task': task, 'type': rec_type,
+                            'benefit_pct': benefit_pct, 'message': message})
+        return results
+
+    def write_report(self, tasks, path):
+        """Full DBMS_SQLTUNE text reports of all tasks into one file"""
+        names = ', '.join(f"'{t}'" for t in tasks)
+        return self.client.spool(
+            "SELECT DBMS_SQLTUNE.REPORT_TUNING_TASK(task_name) FROM dba_advisor_tasks "
+            f"WHERE task_name IN ({names}) ORDER BY task_name", path, linesize=400)
+
+    def advise(self, top=20, time_limit=300, parallel=None):
+        """Tuning set -> parallel tasks -> ranked, consolidated findings.
+
+        Returns {'sqlset', 'statements', 'tasks', 'errors', 'recommendations',
+        'report'}; the tasks are kept so their profiles can be accepted.
+        """
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        sqlset = f"{TASK_PREFIX}_STS_{stamp}"
+        statements = self.create_sqlset(sqlset, top)
+        outcome = self.run_tasks(sqlset, list(statements), time_limit, parallel,
+                                 prefix=f"{TASK_PREFIX}_{stamp}")
+        tasks = {sql_id: task for sql_id, (task, error) in outcome.items() if error is None}
+        errors = {sql_id: error for sql_id, (task, error) in outcome.items() if error}
+        recommendations = rank_recommendations(statements, self.findings(tasks))
+        report = None
+        if tasks:
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            report = self.reports_dir / f"sqltune_{stamp}.txt"
+            ok, _ = self.write_report(tasks.values(), report)
+            if not ok:
+                report = None
+        return {'sqlset': sqlset, 'statements': statements, 'tasks': tasks, 'errors': errors,
+                'recommendations': recommendations, 'report': report}
@@ -0,0 +1,301 @@
+"""
+SQL Trace Profiler - tkprof-style profile of 10046 trace files
+
+Reads a SQL trace (event 10046 / DBMS_MONITOR) one line at a time and
+aggregates per statement: PARSE/EXEC/FETCH counts with CPU, elapsed,
+disk, query, current and rows; wait events with a latency histogram;
+the row source plan (STAT lines); and the recursive call tree (which
+statements a cursor's calls executed, and how long they took). Memory
+grows with the number of distinct statements, not the file size, so
+multi-GB traces are fine.
+
+Usage (Python):
+    from oracledba.modules.trace import TraceProfiler
+    profiler = TraceProfiler()
+    profiler.parse_file('/u01/app/oracle/diag/rdbms/orcl/ORCL/trace/ORCL_ora_1234.trc')
+    for stmt in profiler.statements(sort='elapsed', top=20):
+        print(stmt['sql_id'], stmt['totals']['elapsed'])
+"""
+
+import re
+from bisect import bisect_right
+
+CALLS = ('PARSE', 'EXEC', 'FETCH')
+CALL_FIELDS = ('count', 'cpu', 'elapsed', 'disk', 'query', 'current', 'rows', 'misses')
+# Latency histogram upper bounds in microseconds; the last bucket is open
+HIST_BOUNDS = (128, 256, 512, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000,
+               256000, 512000, 1000000)
+HIST_LABELS = ('<128us', '<256us', '<512us', '<1ms', '<2ms', '<4ms', '<8ms', '<16ms', '<32ms',
+               '<64ms', '<128ms', '<256ms', '<512ms', '<1s', '>=1s')
+IDLE_EVENTS = ('SQL*Net message from client', 'SQL*Net message from dblink',
+               'PL/SQL lock timer', 'pipe get', 'rdbms ipc message', 'jobq slave wait',
+               'Streams AQ: waiting for messages in the queue')
+MAX_SQL_TEXT = 4000
+SORT_KEYS = ('elapsed', 'cpu', 'disk', 'query', 'executions', 'waits')
+
+PARSING_RE = re.compile(r"^PARSING IN CURSOR #(\d+) .*?dep=(\d+).*?hv=(\d+)(?:.*?sqlid='(\w+)')?")
+CALL_RE = re.compile(r'^(PARSE|EXEC|FETCH) #(\d+):(.*)$')
+WAIT_RE = re.compile(r"^WAIT #(\d+): nam='([^']*)' ela=\s*(\d+)")
+STAT_RE = re.compile(r"^STAT #(\d+) id=(\d+) cnt=(\d+) pid=(\d+) pos=\d+ obj=\d+ op='(.*)'")
+TIM_RE = re.compile(r'tim=(\d+)')
+
+
+def _fields(text):
+    """'c=0,e=123,p=0,...' -> {'c': 0, 'e': 123, ...} (integers only)"""
+    values = {}
+    for item in text.split(','):
+        key, _, value = item.partition('=')
+        if value.isdigit():
+            values[key] = int(value)
+    return values
+
+
+def _statement(key, sql_id=None, hv=None, depth=0):
+    return {
+        'key': key, 'sql_id': sql_id, 'hv': hv, 'depth': depth, 'text': None,
+        'plan_hash': None,
+        'calls': {call: [0] * len(CALL_FIELDS) for call in CALLS},
+        'waits': {},            # event -> [count, total_us, max_us, histogram]
+        'children': {},         # key -> [calls, elapsed_us]
+        'plan': [],             # (id, pid, rows, operation) of the first STAT set
+    }
+
+
+class TraceProfiler:
+    """Streaming 10046 trace parser; feed() lines or parse_file()"""
+
+    def __init__(self):
+        self.stmts = {}
+        self.cursors = {}       # cursor number -> statement key
+        self._pending = {}      # depth -> {key: [calls, elapsed]} not yet attributed
+        self._text = None       # (key, [lines]) while inside PARSING IN CURSOR
+        self._plans_done = set()
+        self.lines = 0
+        self.first_tim = None
+        self.last_tim = None
+        self.transactions = 0
+
+    def _stmt_for(self, cursor):
+        key = self.cursors.get(cursor)
+        if key is None:
+            # Cursor parsed before tracing started (or WAIT #0)
+            key = f"#{cursor}"
+            self.cursors[cursor] = key
+        if key not in self.stmts:
+            self.stmts[key] = _statement(key)
+        return self.stmts[key]
+
+    def _tim(self, line):
+        match = TIM_RE.search(line)
+        if match:
+            tim = int(match.group(1))
+            if self.first_tim is None:
+                self.first_tim = tim
+            self.last_tim = tim
+
+    def feed(self, line):
+        self.lines += 1
+        if self._text is not None:
+            if line.startswith('END OF STMT'):
+                key, parts = self._text
+                if self.stmts[key]['text'] is None:
+                    self.stmts[key]['text'] = ''.join(parts).strip()[:MAX_SQL_TEXT]
+                self._text = None
+            elif sum(len(p) for p in self._text[1]) < MAX_SQL_TEXT:
+                self._text[1].append(line)
+            return
+
+        head = line[:4]
+        if head == 'WAIT':
+            match = WAIT_RE.match(line)
+            if match:
+                self._wait(match.group(1), match.group(2), int(match.group(3)))
+                self._tim(line)
+        elif head in ('EXEC', 'FETC', 'PARS'):
+            if line.startswith('PARSING IN CURSOR'):
+                self._parsing(line)
+            else:
+                match = CALL_RE.match(line)
+                if match:
+                    self._call(match.group(1), match.group(2), _fields(match.group(3)))
+                    self._tim(line)
+        elif head == 'STAT':
+            match = STAT_RE.match(line)
+            if match:
+                self._stat(*match.groups())
+        elif head == 'XCTE':
+            self.transactions += 1
+            self._tim(line)
+
+    def _parsing(self, line):
+        match = PARSING_RE.match(line)
+        if not match:
+            return
+        cursor, depth, hv, sql_id = match.groups()
+        key = sql_id or f"hv:{hv}"
+        if key not in self.stmts:
+            self.stmts[key] = _statement(key, sql_id, hv, int(depth))
+        self.cursors[cursor] = key
+        self._text = (key, [])
+        self._tim(line)
+
+    def _call(self, call, cursor, fields):
+        stmt = self._stmt_for(cursor)
+        depth = fields.get('dep', 0)
+        stmt['depth'] = depth
+        if fields.get('plh'):
+            stmt['plan_hash'] = fields['plh']
+        totals = stmt['calls'][call]
+        totals[0] += 1
+        for i, name in enumerate(('c', 'e', 'p', 'cr', 'cu', 'r', 'mis'), 1):
+            totals[i] += fields.get(name, 0)
+
+        # Recursive calls are written before the parent call that ran them
+        children = self._pending.pop(depth + 1, None)
+        if children:
+            for key, (calls, elapsed) in children.items():
+                child = stmt['children'].setdefault(key, [0, 0])
+                child[0] += calls
+                child[1] += elapsed
+        if depth > 0:
+            pending = self._pending.setdefault(depth, {}).setdefault(stmt['key'], [0, 0])
+            pending[0] += 1
+            pending[1] += fields.get('e', 0)
+
+    def _wait(self, cursor, event, ela):
+        stmt = self._stmt_for(cursor)
+        wait = stmt['waits'].get(event)
+        if wait is None:
+            wait = stmt['waits'][event] = [0, 0, 0, [0] * len(HIST_LABELS)]
+        wait[0] += 1
+        wait[1] += ela
+        wait[2] = max(wait[2], ela)
+        wait[3][bisect_right(HIST_BOUNDS, ela)] += 1
+
+    def _stat(self, cursor, row_id, rows, parent, operation):
+        stmt = self._stmt_for(cursor)
+        key = stmt['key']
+        if key in self._plans_done:
+            return
+        if row_id == '1' and stmt['plan']:
+            self._plans_done.add(key)
+            return
+        stmt['plan'].append((int(row_id), int(parent), int(rows), operation))
+
+    def parse_lines(self, lines):
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def parse_file(self, path):
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                self.feed(line)
+        return self
+
+    # =========================================================================
+    # RESULTS
+    # =========================================================================
+
+    def _summary(self, stmt):
+        totals = dict(zip(CALL_FIELDS, [sum(stmt['calls'][c][i] for c in CALLS)
+                                        for i in range(len(CALL_FIELDS))]))
+        waits = []
+        for event, (count, total, longest, hist) in stmt['waits'].items():
+            waits.append({'event': event, 'count': count, 'total_us': total,
+                          'max_us': longest, 'avg_us': round(total / count) if count else 0,
+                          'idle': event in IDLE_EVENTS,
+                          'histogram': {HIST_LABELS[i]: n for i, n in enumerate(hist) if n}})
+        waits.sort(key=lambda w: w['total_us'], reverse=True)
+        return {
+            'key': stmt['key'], 'sql_id': stmt['sql_id'], 'hv': stmt['hv'],
+            'depth': stmt['depth'], 'text': stmt['text'], 'plan_hash': stmt['plan_hash'],
+            'calls': {c: dict(zip(CALL_FIELDS, stmt['calls'][c])) for c in CALLS},
+            'totals': totals,
+            'executions': stmt['calls']['EXEC'][0],
+            'wait_us': sum(w['total_us'] for w in waits if not w['idle']),
+            'waits': waits,
+            'children': sorted(({'key': k, 'calls': c, 'elapsed_us': e}
+                                for k, (c, e) in stmt['children'].items()),
+                               key=lambda child: child['elapsed_us'], reverse=True),
+            'plan': [{'id': i, 'parent': p, 'rows': r, 'operation': op}
+                     for i, p, r, op in stmt['plan']],
+        }
+
+    def statements(self, sort='elapsed', top=None, include_recursive=True):
+        """Per-statement summaries, most expensive first"""
+        items = [self._summary(s) for s in self.stmts.values()
+                 if include_recursive or s['depth'] == 0]
+        if sort == 'executions':
+            items.sort(key=lambda s: s['executions'], reverse=True)
+        elif sort == 'waits':
+            items.sort(key=lambda s: s['wait_us'], reverse=True)
+        else:
+            items.sort(key=lambda s: s['totals'][sort], reverse=True)
+        return items[:top] if top else items
+
+    def overall(self):
+        """Totals for non-recursive and recursive statements"""
+        result = {}
+        for label, recursive in (('user', False), ('recursive', True)):
+            stmts = [s for s in self.stmts.values() if (s['depth'] > 0) == recursive]
+            totals = {call: [sum(s['calls'][call][i] for s in stmts)
+                             for i in range(len(CALL_FIELDS))] for call in CALLS}
+            result[label] = {
+                'statements': len(stmts),
+                'calls': {c: dict(zip(CALL_FIELDS, totals[c])) for c in CALLS},
+            }
+        span = (self.last_tim - self.first_tim) if self.first_tim is not None else 0
+        result['trace_seconds'] = round(span / 1e6, 3)
+        result['transactions'] = self.transactions
+        result['lines'] = self.lines
+        return result
+
+
+def format_report(profiler, sort='elapsed', top=20):
+    """tkprof-like text report"""
+    out = []
+    overall = profiler.overall()
+    out.append(f"Trace span {overall['trace_seconds']}s, {overall['lines']} lines, "
+               f"{overall['transactions']} transactions")
+    header = f"{'call':<8}{'count':>8}{'cpu':>10}{'elapsed':>10}{'disk':>10}" \
+             f"{'query':>10}{'current':>10}{'rows':>10}"
+    for stmt in profiler.statements(sort=sort, top=top):
+        out.append('')
+        out.append('*' * 78)
+        out.append(f"SQL ID: {stmt['sql_id'] or stmt['key']}  Plan Hash: {stmt['plan_hash'] or '-'}"
+                   f"  Depth: {stmt['depth']}")
+        out.append('')
+        out.append(stmt['text'] or '(statement text not in trace)')
+        out.append('')
+        out.append(header)
+        out.append('-' * len(header))
+        for call in CALLS + ('total',):
+            values = stmt['totals'] if call == 'total' else stmt['calls'][call]
+            out.append(f"{call.capitalize():<8}{values['count']:>8}"
+                       f"{values['cpu'] / 1e6:>10.2f}{values['elapsed'] / 1e6:>10.2f}"
+                       f"{values['disk']:>10}{values['query']:>10}{values['current']:>10}"
+                       f"{values['rows']:>10}")
+        misses = stmt['calls']['PARSE']['misses']
+        out.append(f"\nMisses in library cache during parse: {misses}")
+        if stmt['plan']:
+            out.append('\nRows     Row Source Operation')
+            out.append('-------  ---------------------------------------------------')
+            depth = {0: -1}
+            for step in stmt['plan']:
+                depth[step['id']] = depth.get(step['parent'], -1) + 1
+                out.append(f"{step['rows']:>7}  {'  ' * depth[step['id']]}{step['operation']}")
+        if stmt['waits']:
+            out.append('\nEvent waited on                           '
+                       'Times   Max. Wait  Total Waited')
+            out.append('----------------------------------------  -----  ----------  ------------')
+            for wait in stmt['waits']:
+                out.append(f"{wait['event'][:40]:<40}  {wait['count']:>5}  "
+                           f"{wait['max_us'] / 1e6:>10.4f}  {wait['total_us'] / 1e6:>12.4f}")
+                out.append('    ' + '  '.join(f"{k}:{v}" for k, v in wait['histogram'].items()))
+        if stmt['children']:
+            out.append('\nRecursive calls                           Calls      Elapsed')
+            for child in stmt['children']:
+                out.append(f"{child['key'][:40]:<40}  {child['calls']:>5}  "
+                           f"{child['elapsed_us'] / 1e6:>11.4f}")
+    return '\n'.join(out) + '\n'
@@ -2,17 +2,103 @@
 Performance Tuning Manager
 """
 
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
 from rich import print as rprint
 import subprocess
 
+from ..utils.oracle_client import OracleClient
+
 console = Console()
 
+REPORTS_DIR = Path.home() / '.oracledba' / 'reports'
+DATE_FMT = 'YYYY-MM-DD HH24:MI:SS'
+AWR_FORMATS = ('html', 'text')
+
+
+def _parse_time(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+
+
+def select_window(snaps, hours=1, now=None):
+    """(begin_snap, end_snap) covering the last `hours` of snapshots.
+
+    snaps: dicts with snap_id, startup and end_time (one instance). The
+    begin snapshot is the last one ending before the window, moved
+    forward past any instance restart (AWR can't span one). None when
+    fewer than two usable snapshots exist.
+    """
+    snaps = sorted(snaps, key=lambda s: s['snap_id'])
+    if len(snaps) < 2:
+        return None
+    end = snaps[-1]
+    start = (now or end['end_time']) - timedelta(hours=hours)
+    same_startup = [s for s in snaps[:-1] if s['startup'] == end['startup']]
+    if not same_startup:
+        return None
+    before = [s for s in same_startup if s['end_time'] <= start]
+    begin = before[-1] if before else same_startup[0]
+    return begin['snap_id'], end['snap_id']
+
+
+def peak_window(samples, width=1):
+    """(begin_snap, end_snap, db_time_seconds) of the busiest `width`
+    consecutive snapshot intervals by DB time, summed over instances.
+
+    samples: (snap_id, instance, startup, cumulative DB time in
+    microseconds) from dba_hist_sys_time_model. Intervals across an
+    instance restart are skipped. None without a usable interval.
+    """
+    by_instance = {}
+    for snap_id, instance, startup, value in samples:
+        by_instance.setdefault(instance, []).append((snap_id, startup, value))
+    deltas = {}
+    for rows in by_instance.values():
+        rows.sort()
+        for (prev_id, prev_startup, prev), (snap_id, startup, value) in zip(rows, rows[1:]):
+            if startup == prev_startup and value >= prev:
+                deltas.setdefault(snap_id, [prev_id, 0.0])
+                deltas[snap_id][1] += value - prev
+    best = None
+    ends = sorted(deltas)
+    for i in range(len(ends) - width + 1):
+        chunk = ends[i:i + width]
+        # Consecutive: each interval starts where the previous one ended
+        if any(deltas[b][0] != a for a, b in zip(chunk, chunk[1:])):
+            continue
+        total = sum(deltas[e][1] for e in chunk)
+        if best is None or total > best[2]:
+            best = (deltas[chunk[0]][0], chunk[-1], total)
+    if best is None:
+        return None
+    return best[0], best[1], round(best[2] / 1e6, 1)
+
+
+def awr_report_sql(dbid, instance, begin_snap, end_snap, fmt='html', rac_global=False):
+    """SELECT that returns the AWR report, one line per row"""
+    kind = 'HTML' if fmt == 'html' else 'TEXT'
+    # Everything goes into a sysdba script: accept numbers only
+    dbid, begin_snap, end_snap = int(dbid), int(begin_snap), int(end_snap)
+    if rac_global:
+        # '' (NULL as VARCHAR2) selects every instance
+        return (f"SELECT output FROM TABLE(DBMS_WORKLOAD_REPOSITORY.AWR_GLOBAL_REPORT_{kind}"
+                f"({dbid}, '', {begin_snap}, {end_snap}))")
+    return (f"SELECT output FROM TABLE(DBMS_WORKLOAD_REPOSITORY.AWR_REPORT_{kind}"
+            f"({dbid}, {int(instance)}, {begin_snap}, {end_snap}))")
+
 
 class TuningManager:
-    def __init__(self):
+    def __init__(self, client=None, reports_dir=None):
         self.scripts_dir = Path(__file__).parent.parent / "scripts"
+        self.client = client or OracleClient()
+        self.reports_dir = Path(reports_dir) if reports_dir else REPORTS_DIR
     
     def analyze(self, deep=False):
         """Analyze performance"""
@@ -27,23 +113,301 @@ class TuningManager:
         rprint("[red]Tuning script not found[/red]")
         return False
     
-    def generate_awr(self, begin_snap=None, end_snap=None):
-        """Generate AWR report"""
-        console.print("\n[bold cyan]Generating AWR Report[/bold cyan]\n")
-        
-        if not begin_snap or not end_snap:
-            # Get last 2 snapshots
-            sql = "SELECT snap_id FROM dba_hist_snapshot ORDER BY snap_id DESC FETCH FIRST 2 ROWS ONLY;"
-            cmd = f"echo \"{sql}\" | sqlplus -S / as sysdba"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            # Parse snap IDs from result
-        
-        sql = f"""
-        @?/rdbms/admin/awrrpt.sql
+    def _query(self, sql):
+        success, rows, error = self.client.query(sql)
+        if not success:
+            raise RuntimeError(error or "query failed")
+        return rows
+
+    def _database(self):
+        """(dbid, instance_number) of the connected instance"""
+        rows = self._query("SELECT d.dbid, i.instance_number FROM v$database d, v$instance i")
+        return int(rows[0][0]), int(rows[0][1])
+
+    def snapshots(self, hours=24, instance=None):
+        """AWR snapshots of the last `hours` for one instance, oldest first"""
+        dbid, own = self._database()
+        rows = self._query(
+            f"SELECT snap_id, TO_CHAR(startup_time, '{DATE_FMT}'), "
+            f"TO_CHAR(begin_interval_time, '{DATE_FMT}'), TO_CHAR(end_interval_time, '{DATE_FMT}') "
+            f"FROM dba_hist_snapshot WHERE dbid = {dbid} AND instance_number = {instance or own} "
+            f"AND end_interval_time > SYSDATE - {float(hours)}/24 ORDER BY snap_id")
+        return [{'snap_id': int(r[0]), 'startup': r[1], 'begin_time': _parse_time(r[2]),
+                 'end_time': _parse_time(r[3])} for r in rows if len(r) == 4]
+
+    def peak_snapshots(self, hours=24, width=1):
+        """Busiest snapshot window of the last `hours` (see peak_window)"""
+        dbid, _ = self._database()
+        rows = self._query(
+            "SELECT s.snap_id, s.instance_number, "
+            f"TO_CHAR(s.startup_time, '{DATE_FMT}'), TO_CHAR(t.value) "
+            "FROM dba_hist_snapshot s JOIN dba_hist_sys_time_model t "
+            "ON t.dbid = s.dbid AND t.snap_id = s.snap_id "
+            "AND t.instance_number = s.instance_number "
+            f"WHERE s.dbid = {dbid} AND t.stat_name = 'DB time' "
+            f"AND s.end_interval_time > SYSDATE - {float(hours)}/24 ORDER BY s.snap_id")
+        # Cumulative DB time (us) is read exactly: past ~2.8 hours the default
+        # NUMWIDTH would round it to 5 digits and the deltas to noise
+        samples = [(int(r[0]), int(r[1]), r[2], int(r[3])) for r in rows if len(r) == 4]
+        return peak_window(samples, width)
+
+    def generate_awr(self, begin_snap=None, end_snap=None, hours=1, peak=False, fmt='html',
+                     rac_global=False, output=None):
+        """Generate an AWR report into a file and return its path (None on error).
+
+        Without explicit snapshots the window is the last `hours`, or with
+        peak=True the busiest interval (by DB time) of the last 24 hours.
         """
-        # Execute AWR report generation
-        rprint("[green]AWR report generated[/green]")
+        console.print("\n[bold cyan]Generating AWR Report[/bold cyan]\n")
+        if fmt not in AWR_FORMATS:
+            rprint(f"[red]✗ Unknown report format:[/red] {fmt}")
+            return None
+        try:
+            begin_snap = int(begin_snap) if begin_snap else None
+            end_snap = int(end_snap) if end_snap else None
+        except (TypeError, ValueError):
+            rprint(f"[red]✗ Invalid snapshot IDs:[/red] {begin_snap} {end_snap}")
+            return None
+        try:
+            dbid, instance = self._database()
+            if not begin_snap or not end_snap:
+                if peak:
+                    window = self.peak_snapshots()
+                    if window:
+                        rprint(f"[cyan]Peak DB time:[/cyan] {window[2]:.0f}s "
+                               f"between snapshots {window[0]} and {window[1]}")
+                else:
+                    window = select_window(self.snapshots(hours=hours + 2), hours)
+                if not window:
+                    rprint("[red]✗ Not enough AWR snapshots[/red] (need two since the last "
+                           "instance startup; take one with "
+                           "DBMS_WORKLOAD_REPOSITORY.CREATE_SNAPSHOT)")
+                    return None
+                begin_snap, end_snap = window[0], window[1]
+        except (RuntimeError, IndexError, ValueError) as e:
+            rprint(f"[red]✗ Cannot read AWR snapshots:[/red] {e}")
+            return None
+
+        scope = 'global' if rac_global else str(instance)
+        path = Path(output) if output else self.reports_dir / (
+            f"awr_{dbid}_{scope}_{begin_snap}_{end_snap}.{'html' if fmt == 'html' else 'txt'}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rprint(f"[cyan]Snapshots {begin_snap} → {end_snap}"
+               f"{' (all instances)' if rac_global else ''}[/cyan]")
+        success, error = self.client.spool(
+            awr_report_sql(dbid, instance, begin_snap, end_snap, fmt, rac_global), path,
+            linesize=1500 if fmt == 'html' else 400)
+        if not success:
+            rprint(f"[red]✗ AWR report failed:[/red] {error}")
+            return None
+        rprint(f"[green]✓[/green] AWR report written to {path}")
+        return path
     
+    def _activity_table(self, title, label, rows):
+        table = Table(title=title, show_header=True, header_style="bold magenta")
+        table.add_column(label, style="cyan")
+        table.add_column("Samples", justify="right")
+        table.add_column("%", justify="right")
+        table.add_column("AAS", justify="right")
+        for value, samples, percent, aas in rows:
+            table.add_row(value, str(samples), f"{percent:.1f}", f"{aas:.2f}")
+        return table
+
+    def _top_view(self, sampler, n):
+        activity = sampler.activity
+        header = (f"[bold cyan]Top activity[/bold cyan] — last {activity.window}s, "
+                  f"{len(activity)} ASH samples — fetched in {sampler.poll_seconds}s")
+        return Group(
+            header,
+            self._activity_table("Wait class", "Wait class", sampler.top('wait_class', n)),
+            self._activity_table("Top SQL", "SQL_ID", sampler.top('sql_id', n)),
+            self._activity_table("Top events", "Event", sampler.top('event', n)),
+            self._activity_table("Top sessions", "SID,SERIAL#", sampler.top('session', n)),
+            self._activity_table("Top modules", "Module", sampler.top('module', n)),
+        )
+
+    def top(self, interval=5, window=300, n=10, iterations=None):
+        """Live top-activity view from ASH until interrupted"""
+        from .ash import ASHSampler
+        sampler = ASHSampler(self.client, window)
+        done = 0
+        try:
+            with Live(console=console, refresh_per_second=1) as live:
+                while iterations is None or done < iterations:
+                    try:
+                        sampler.poll()
+                        live.update(self._top_view(sampler, n))
+                    except RuntimeError as e:
+                        live.update(f"[yellow]ASH unavailable:[/yellow] {e}")
+                    done += 1
+                    if iterations is None or done < iterations:
+                        time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        return sampler
+
+    def compare(self, base, target, top=20):
+        """Compare two AWR snapshot ranges and print the ranked regressions"""
+        from .awr_compare import AWRComparer
+        console.print(f"\n[bold cyan]AWR compare: {base[0]}-{base[1]} → "
+                      f"{target[0]}-{target[1]}[/bold cyan]\n")
+        try:
+            result = AWRComparer(self.client).compare(base, target)
+        except (RuntimeError, IndexError, ValueError) as e:
+            rprint(f"[red]✗ Cannot compare:[/red] {e}")
+            return None
+
+        db_time = (result['base']['time_model'].get('DB time', 0.0),
+                   result['target']['time_model'].get('DB time', 0.0))
+        rprint(f"DB time: {db_time[0]:.2f} → {db_time[1]:.2f} average active sessions")
+
+        if result['load']:
+            table = Table(title="Load profile changes", show_header=True,
+                          header_style="bold magenta")
+            table.add_column("Statistic", style="cyan")
+            table.add_column("Base /s", justify="right")
+            table.add_column("Target /s", justify="right")
+            table.add_column("Change", justify="right")
+            for item in result['load']:
+                table.add_row(item['name'], f"{item['base_per_sec']:,.1f}",
+                              f"{item['target_per_sec']:,.1f}", f"{item['change_pct']:+.0f}%")
+            console.print(table)
+
+        table = Table(title="Regressions (ranked by added DB time)", show_header=True,
+                      header_style="bold magenta")
+        table.add_column("#", justify="right")
+        table.add_column("Kind")
+        table.add_column("Name", style="cyan")
+        table.add_column("Metric")
+        table.add_column("Base", justify="right")
+        table.add_column("Target", justify="right")
+        table.add_column("Change", justify="right")
+        table.add_column("+AAS", justify="right", style="red")
+        table.add_column("Detail", style="dim")
+        for i, item in enumerate(result['regressions'][:top], 1):
+            change = '-' if item['change_pct'] is None else f"{item['change_pct']:+.0f}%"
+            table.add_row(str(i), item['kind'], item['name'], item['metric'],
+                          f"{item['base']:.2f}", f"{item['target']:.2f}", change,
+                          f"{item['impact']:.2f}", item['detail'] or '')
+        console.print(table)
+        if not result['regressions']:
+            rprint("[green]✓[/green] No regressions above the reporting threshold")
+        return result
+
+    def plan_check(self, capture=True, factor=2.0, min_execs=5, baseline=False):
+        """Capture the cursor cache and report plan flips; with baseline=True
+        pin each flipped statement's good plan. Returns the flips (None on error)."""
+        from .plan_history import PlanHistory
+        console.print("\n[bold cyan]Checking for SQL plan regressions[/bold cyan]\n")
+        history = PlanHistory(client=self.client)
+        try:
+            if capture:
+                stats = history.capture()
+                rprint(f"[green]✓[/green] Captured {stats['cursors']} cursors "
+                       f"({stats['samples']} with new executions, {stats['new_plans']} new plans)")
+            flips = history.check(factor=factor, min_execs=min_execs)
+        except RuntimeError as e:
+            rprint(f"[red]✗ Plan capture failed:[/red] {e}")
+            history.close()
+            return None
+
+        if not flips:
+            rprint(f"[green]✓[/green] No plan flips slower than {factor}x")
+            history.close()
+            return flips
+
+        table = Table(title=f"Plan flips (>= {factor}x slower per execution)",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("SQL_ID", style="cyan")
+        table.add_column("Plan now → before")
+        table.add_column("ms/exec", justify="right")
+        table.add_column("Gets/exec", justify="right")
+        table.add_column("Slower", justify="right", style="red")
+        table.add_column("Added", justify="right")
+        table.add_column("SQL", style="dim", max_width=40)
+        for flip in flips:
+            table.add_row(flip['sql_id'], f"{flip['plan_hash_value']} → {flip['good_plan']}",
+                          f"{flip['current_ms']:.2f} vs {flip['good_ms']:.2f}",
+                          f"{flip['current_gets']} vs {flip['good_gets']}",
+                          f"{flip['ratio']}x", f"{flip['added_seconds']:.0f}s",
+                          flip.get('sql_text') or '')
+        console.print(table)
+
+        for flip in flips if baseline else []:
+            try:
+                loaded = history.capture_baseline(flip['sql_id'], flip['good_plan'])
+            except (RuntimeError, ValueError) as e:
+                rprint(f"[red]✗ Baseline for {flip['sql_id']} failed:[/red] {e}")
+                continue
+            if loaded:
+                rprint(f"[green]✓[/green] {flip['sql_id']}: plan {flip['good_plan']} pinned "
+                       f"with a SQL plan baseline")
+            else:
+                rprint(f"[yellow]{flip['sql_id']}: plan {flip['good_plan']} is in neither "
+                       f"the cursor cache nor AWR[/yellow]")
+        if not baseline:
+            rprint("[dim]Pin a good plan with: oradba tuning plan-baseline SQL_ID PLAN_HASH[/dim]")
+        history.close()
+        return flips
+
+    def plan_baseline(self, sql_id, plan_hash_value):
+        """Create a fixed SQL plan baseline for one plan"""
+        from .plan_history import PlanHistory
+        history = PlanHistory(client=self.client)
+        try:
+            loaded = history.capture_baseline(sql_id, plan_hash_value)
+        except ValueError as e:
+            rprint(f"[red]✗ {e}[/red]")
+            return False
+        except RuntimeError as e:
+            rprint(f"[red]✗ DBMS_SPM failed:[/red] {e}")
+            return False
+        finally:
+            history.close()
+        if not loaded:
+            rprint(f"[red]✗ Plan {plan_hash_value} of {sql_id} not found in the cursor "
+                   f"cache or AWR[/red]")
+            return False
+        rprint(f"[green]✓[/green] Baseline created for {sql_id} (plan {plan_hash_value})")
+        return True
+
+    def advise(self, top=20, time_limit=300, parallel=None):
+        """Run the SQL Tuning Advisor on the top statements and print the
+        consolidated recommendations. Returns the advise() result or None."""
+        from .sqltune import SQLTuneAdvisor, default_parallelism
+        parallel = parallel or default_parallelism()
+        console.print(f"\n[bold cyan]SQL Tuning Advisor: top {top} statements, "
+                      f"{parallel} at a time, {time_limit}s each[/bold cyan]\n")
+        try:
+            result = SQLTuneAdvisor(self.client, self.reports_dir).advise(top, time_limit, parallel)
+        except (RuntimeError, IndexError) as e:
+            rprint(f"[red]✗ SQL Tuning Advisor failed:[/red] {e}")
+            return None
+
+        for sql_id, error in result['errors'].items():
+            rprint(f"[yellow]{sql_id}: task failed:[/yellow] {error}")
+        table = Table(title=f"Recommendations ({len(result['tasks'])} statements tuned)",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("SQL_ID", style="cyan")
+        table.add_column("Type")
+        table.add_column("Benefit", justify="right")
+        table.add_column("Saves", justify="right", style="green")
+        table.add_column("Finding", max_width=60)
+        for rec in result['recommendations']:
+            table.add_row(rec['sql_id'] or '-', rec['type'] or '-',
+                          '-' if rec['benefit_pct'] is None else f"{rec['benefit_pct']:.1f}%",
+                          '-' if rec['saved_s'] is None else f"{rec['saved_s']:.0f}s",
+                          rec['message'] or '')
+        console.print(table)
+        if not result['recommendations']:
+            rprint("[green]✓[/green] No recommendations for the top statements")
+        if result['report']:
+            rprint(f"[cyan]Full advisor reports:[/cyan] {result['report']}")
+        if any(r['type'] == 'SQL PROFILE' for r in result['recommendations']):
+            rprint("[dim]Accept a profile with DBMS_SQLTUNE.ACCEPT_SQL_PROFILE(task_name => "
+                   "'<task>')[/dim]")
+        return result
+
     def generate_addm(self):
         """Generate ADDM report"""
         console.print("\n[bold cyan]Generating ADDM Report[/bold cyan]\n")
@@ -62,3 +426,64 @@ class TuningManager:
         result = subprocess.run(cmd, shell=True)
         
         rprint("[green]SQL Trace enabled[/green]")
+        if session_id:
+            rprint(f"[dim]Profile it with: oradba tuning trace-report --sid {session_id}[/dim]")
+
+    def trace_file(self, sid):
+        """Trace file of a session (v$process.tracefile, from the ADR trace dir)"""
+        rows = self._query(
+            "SELECT p.tracefile FROM v$session s JOIN v$process p ON p.addr = s.paddr "
+            f"WHERE s.sid = {int(sid)}")
+        if not rows or not rows[0][0]:
+            raise RuntimeError(f"Session {sid} not found")
+        return rows[0][0]
+
+    def trace_report(self, path=None, sid=None, sort='elapsed', top=20, output=None):
+        """Profile a 10046 trace file (or the trace file of session `sid`).
+        Prints the top statements; output writes a tkprof-style text report.
+        Returns the TraceProfiler or None."""
+        from .trace import TraceProfiler, format_report
+        try:
+            path = path or self.trace_file(sid)
+        except (RuntimeError, IndexError) as e:
+            rprint(f"[red]✗ Cannot locate trace file:[/red] {e}")
+            return None
+        console.print(f"\n[bold cyan]Profiling {path}[/bold cyan]\n")
+        try:
+            profiler = TraceProfiler().parse_file(path)
+        except OSError as e:
+            rprint(f"[red]✗ Cannot read trace file:[/red] {e}")
+            return None
+
+        overall = profiler.overall()
+        table = Table(title=f"Top statements by {sort} ({overall['trace_seconds']}s traced)",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("SQL_ID", style="cyan")
+        table.add_column("Dep", justify="right")
+        table.add_column("Execs", justify="right")
+        table.add_column("Elapsed s", justify="right", style="green")
+        table.add_column("CPU s", justify="right")
+        table.add_column("Disk", justify="right")
+        table.add_column("Query", justify="right")
+        table.add_column("Rows", justify="right")
+        table.add_column("Top wait")
+        table.add_column("SQL", max_width=50)
+        for stmt in profiler.statements(sort=sort, top=top):
+            totals = stmt['totals']
+            waits = [w for w in stmt['waits'] if not w['idle']]
+            top_wait = f"{waits[0]['event']} ({waits[0]['total_us'] / 1e6:.2f}s)" if waits else '-'
+            table.add_row(stmt['sql_id'] or stmt['key'], str(stmt['depth']),
+                          str(stmt['executions']), f"{totals['elapsed'] / 1e6:.2f}",
+                          f"{totals['cpu'] / 1e6:.2f}", str(totals['disk']), str(totals['query']),
+                          str(totals['rows']), top_wait,
+                          (stmt['text'] or '').replace('\n', ' ')[:120])
+        console.print(table)
+        for label in ('user', 'recursive'):
+            calls = overall[label]['calls']
+            rprint(f"{label.capitalize()}: {overall[label]['statements']} statements, "
+                   f"{sum(c['count'] for c in calls.values())} calls, "
+                   f"{sum(c['elapsed'] for c in calls.values()) / 1e6:.2f}s elapsed")
+        if output:
+            Path(output).write_text(format_report(profiler, sort=sort, top=top))
+            rprint(f"[green]✓[/green] Report written to {output}")
+        return profiler
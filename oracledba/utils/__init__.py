@@ -2,7 +2,13 @@
 Utilities package
 """
 
+from . import events
+from . import history
+from . import jobs
 from . import logger
 from . import oracle_client
+from . import procstats
+from . import scheduler
+from . import tail
 
-__all__ = ['logger', 'oracle_client']
+__all__ = ['events', 'history', 'jobs', 'logger', 'oracle_client', 'procstats', 'scheduler', 'tail']
@@ -0,0 +1,112 @@
+"""
+Structured event stream for install and lab runs
+
+Runs append one JSON object per line to <log_dir>/<name>.events.jsonl next
+to the human-readable log. Every event has 'ts' (epoch seconds) and
+'event'; the other fields depend on the event type:
+
+    run_start   name, phase, steps, keys
+    step_start  phase, step, total, title, key
+    step_end    phase, step, title, key, success, duration, usage
+    cmd_spawn   pid, cmd
+    cmd_exit    pid, rc, duration, usage
+    warning     message
+    run_end     success, duration
+
+Consumers (web GUI, progress APIs) read the file with read_events() and
+never have to parse the text log.
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+
+
+class EventStream:
+    """Append-only JSONL event writer (line-buffered, thread-safe)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fh = open(self.path, 'w', buffering=1, encoding='utf-8')
+
+    def emit(self, event, **fields):
+        """Write one event and return it as a dict"""
+        record = {'ts': round(time.time(), 3), 'event': event}
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if self._fh:
+                self._fh.write(line + '\n')
+        return record
+
+    def close(self):
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+
+
+def read_events(path):
+    """Return all complete events from a JSONL file ([] if missing)"""
+    events = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # partially written last line
+    except OSError:
+        return []
+    return events
+
+
+def step_progress(events, phase='install'):
+    """Summarize step events of one phase.
+
+    Returns current_step, total_steps, step_statuses ({step: 'running' |
+    'complete' | 'failed'}), step_durations, step_keys (step id or lab
+    number per step), step_started, warnings, finished and success.
+    """
+    progress = {
+        'current_step': 0,
+        'total_steps': 0,
+        'step_statuses': {},
+        'step_durations': {},
+        'step_keys': {},
+        'step_started': {},
+        'warnings': [],
+        'finished': False,
+        'success': None,
+    }
+    for event in events:
+        kind = event.get('event')
+        if kind == 'run_start':
+            progress['total_steps'] = len(event.get('steps', [])) or progress['total_steps']
+            if event.get('phase', phase) == phase:
+                for step, key in enumerate(event.get('keys', []), 1):
+                    progress['step_keys'][step] = key
+        elif kind == 'step_start' and event.get('phase', phase) == phase:
+            progress['current_step'] = event['step']
+            progress['total_steps'] = event.get('total', progress['total_steps'])
+            progress['step_statuses'][event['step']] = 'running'
+            progress['step_started'][event['step']] = event.get('ts')
+            if event.get('key'):
+                progress['step_keys'][event['step']] = event['key']
+        elif kind == 'step_end' and event.get('phase', phase) == phase:
+            status = 'complete' if event.get('success') else 'failed'
+            progress['step_statuses'][event['step']] = status
+            progress['step_durations'][event['step']] = event.get('duration')
+        elif kind == 'warning':
+            progress['warnings'].append(event.get('message'))
+        elif kind == 'run_end':
+            progress['finished'] = True
+            progress['success'] = event.get('success')
+    if progress['success']:
+        progress['current_step'] = progress['total_steps']
+    return progress
@@ -0,0 +1,155 @@
+"""
+Step-duration history and ETA prediction
+
+Durations of successful install steps and labs are kept across runs in
+<log_dir>/step-history.json, keyed by host profile (CPU count, RAM, disk
+type of /u01) so a laptop VM and a 32-core server don't share estimates.
+Expected durations are medians of the recorded runs: same profile first,
+then any profile.
+
+Usage (Python):
+    from oracledba.utils.history import DurationHistory
+    history = DurationHistory('/var/log/oracledba/step-history.json')
+    history.record('install', 'database', 1312.5)
+    history.expected('install', 'database')
+    history.estimate(step_progress(events))   # per-step and overall ETA
+"""
+
+import os
+import json
+import time
+import statistics
+import threading
+from pathlib import Path
+
+import psutil
+
+HISTORY_FILE_NAME = 'step-history.json'
+MAX_SAMPLES = 20
+
+
+def _disk_type(path):
+    """'ssd', 'hdd' or 'unknown' for the block device holding path"""
+    while path and not os.path.exists(path):
+        path = os.path.dirname(path)
+    try:
+        dev = os.stat(path or '/').st_dev
+        sys_dir = Path(f'/sys/dev/block/{os.major(dev)}:{os.minor(dev)}')
+        # Partitions keep queue/ in the parent device directory
+        for candidate in (sys_dir / 'queue' / 'rotational',
+                          sys_dir.resolve().parent / 'queue' / 'rotational'):
+            if candidate.exists():
+                return 'hdd' if candidate.read_text().strip() == '1' else 'ssd'
+    except (OSError, ValueError):
+        pass
+    return 'unknown'
+
+
+def host_profile(path='/u01'):
+    """CPU count, RAM (GB) and disk type of this host"""
+    return {
+        'cpus': os.cpu_count() or 1,
+        'ram_gb': round(psutil.virtual_memory().total / 1024 ** 3),
+        'disk': _disk_type(path),
+    }
+
+
+def profile_key(profile):
+    return f"cpu{profile['cpus']}-ram{profile['ram_gb']}g-{profile['disk']}"
+
+
+class DurationHistory:
+    """Per-host-profile record of step durations"""
+
+    def __init__(self, path, profile=None):
+        self.path = Path(path)
+        self.profile = profile or host_profile()
+        self.key = profile_key(self.profile)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {'profiles': {}}
+        data.setdefault('profiles', {})
+        return data
+
+    def _save(self, data):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def record(self, phase, step, duration):
+        """Add one successful run of `step` (install step id or lab number)"""
+        with self._lock:
+            data = self._load()
+            profile = data['profiles'].setdefault(
+                self.key, {'profile': self.profile, 'steps': {}})
+            samples = profile['steps'].setdefault(f"{phase}/{step}", [])
+            samples.append(round(duration, 1))
+            del samples[:-MAX_SAMPLES]
+            profile['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._save(data)
+
+    def samples(self, phase, step):
+        """(durations, same_profile) - this host's profile, else all profiles"""
+        name = f"{phase}/{step}"
+        profiles = self._load()['profiles']
+        own = profiles.get(self.key, {}).get('steps', {}).get(name)
+        if own:
+            return list(own), True
+        pooled = []
+        for profile in profiles.values():
+            pooled.extend(profile.get('steps', {}).get(name, []))
+        return pooled, False
+
+    def expected(self, phase, step):
+        """Median past duration in seconds, or None without history"""
+        durations, _ = self.samples(phase, step)
+        return statistics.median(durations) if durations else None
+
+    def estimate(self, progress, phase='install', now=None):
+        """ETA for a run summarized by events.step_progress().
+
+        Returns {'steps': {step: {'expected', 'remaining'}}, 'remaining',
+        'eta', 'complete'}; 'complete' is False when some pending step has
+        no history (the overall figure then undercounts).
+        """
+        now = now or time.time()
+        steps = {}
+        remaining = 0.0
+        complete = True
+        for step in range(1, (progress.get('total_steps') or 0) + 1):
+            key = progress.get('step_keys', {}).get(step)
+            expected = self.expected(phase, key) if key else None
+            status = progress.get('step_statuses', {}).get(step)
+            if status in ('complete', 'failed'):
+                left = 0.0
+            elif expected is None:
+                left = None
+                complete = False
+            elif status == 'running':
+                started = progress.get('step_started', {}).get(step, now)
+                left = max(0.0, expected - (now - started))
+            else:
+                left = expected
+            steps[step] = {
+                'expected': None if expected is None else round(expected),
+                'remaining': None if left is None else round(left),
+            }
+            remaining += left or 0.0
+        if progress.get('finished'):
+            remaining = 0.0
+        return {
+            'steps': steps,
+            'remaining': round(remaining),
+            'eta': round(now + remaining),
+            'complete': complete,
+        }
@@ -0,0 +1,323 @@
+"""
+Job registry for long-running background commands
+
+JobManager starts commands as direct children (own session / process
+group, output redirected to a log file) and tracks PID, state, exit code,
+start/end time and log path. A watcher thread per job records the exit
+code, so status checks never spawn a process. State is persisted to
+~/.oracledba/jobs.json; after a restart, jobs that are still alive are
+re-adopted (liveness via signal 0) and finished ones pick up their exit
+code from the rc file written by the job's own shell.
+
+Usage (Python):
+    from oracledba.utils.jobs import JobManager
+    jobs = JobManager()
+    job = jobs.start('TP04', 'bash tp04-fichiers-critiques.sh', '/tmp/tp04.log',
+                     as_user='oracle', key='tp04')
+    jobs.is_running('tp04')
+    jobs.cancel(job.id)
+"""
+
+import os
+import json
+import time
+import shlex
+import signal
+import secrets
+import threading
+import subprocess
+from pathlib import Path
+
+JOBS_DIR = Path.home() / '.oracledba' / 'jobs'
+JOBS_FILE = Path.home() / '.oracledba' / 'jobs.json'
+MAX_HISTORY = 200
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+LOST = 'lost'  # process gone and no exit code recorded
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class Job:
+    """One background command"""
+
+    FIELDS = ('id', 'name', 'key', 'command', 'log_file', 'rc_file', 'as_user',
+              'state', 'pid', 'rc', 'created', 'started', 'ended', 'meta')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
+        if self.meta is None:
+            self.meta = {}
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    @property
+    def duration(self):
+        if not self.started:
+            return None
+        return round((self.ended or time.time()) - self.started, 1)
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['duration'] = self.duration
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: v for k, v in data.items() if k in cls.FIELDS})
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # A zombie child still answers signal 0
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (OSError, IndexError):
+        return True
+
+
+def _is_root():
+    try:
+        return os.geteuid() == 0
+    except AttributeError:
+        return False
+
+
+class JobManager:
+    """Start, track, cancel and persist background jobs"""
+
+    def __init__(self, state_file=None, jobs_dir=None):
+        self.state_file = Path(state_file) if state_file else JOBS_FILE
+        self.jobs_dir = Path(jobs_dir) if jobs_dir else self.state_file.parent / 'jobs'
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._procs = {}
+        self._load()
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def _load(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        for data in raw.get('jobs', []):
+            job = Job.from_dict(data)
+            if job.id:
+                self._jobs[job.id] = job
+        self._refresh_adopted()
+
+    def _save(self):
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created or 0)
+            finished = [j for j in jobs if not j.active]
+            for job in finished[:max(0, len(jobs) - MAX_HISTORY)]:
+                del self._jobs[job.id]
+            kept = [j for j in jobs if j.id in self._jobs]
+            raw = {'jobs': [j.to_dict() for j in kept]}
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_file.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(raw, f, indent=1)
+            os.replace(tmp, self.state_file)
+        except OSError:
+            pass
+
+    def _read_rc(self, job):
+        try:
+            with open(job.rc_file, 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _refresh_adopted(self):
+        """Update jobs started by a previous server process (no Popen handle)"""
+        finished = []
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state != RUNNING or job.id in self._procs:
+                    continue
+                if _pid_alive(job.pid):
+                    continue
+                rc = self._read_rc(job)
+                job.rc = rc
+                job.ended = job.ended or time.time()
+                if job.meta.get('cancel_requested'):
+                    job.state = CANCELLED
+                elif rc is None:
+                    job.state = LOST
+                else:
+                    job.state = SUCCEEDED if rc == 0 else FAILED
+                finished.append(job)
+        if finished:
+            self._save()
+            for job in finished:
+                self._on_finished(job)
+
+    # =========================================================================
+    # START / WATCH / CANCEL
+    # =========================================================================
+
+    def _new_job(self, name, command, log_file, as_user=None, key=None, meta=None):
+        job_id = time.strftime('%Y%m%d-%H%M%S-') + secrets.token_hex(3)
+        job = Job(id=job_id, name=name, key=key or name, command=command,
+                  log_file=str(log_file), as_user=as_user, state=QUEUED,
+                  created=time.time(), meta=dict(meta or {}))
+        job.rc_file = str(self.jobs_dir / f"{job_id}.rc")
+        return job
+
+    def _argv(self, job):
+        """bash -c wrapper that records the exit code, optionally via su - user"""
+        command = job.command
+        if job.as_user and job.as_user != 'root' and _is_root():
+            command = f"su - {job.as_user} -c {shlex.quote(command)}"
+        script = f"trap 'echo $? > {shlex.quote(job.rc_file)}' EXIT\n{command}"
+        return ['bash', '-c', script]
+
+    def start(self, name, command, log_file, as_user=None, key=None, env=None, meta=None):
+        """Start `command` (a bash command string) in the background.
+
+        stdout/stderr go to log_file (truncated). `key` groups jobs of the
+        same kind for is_running()/latest(); it defaults to the name.
+        """
+        job = self._new_job(name, command, log_file, as_user, key, meta)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._launch(job, env)
+        return job
+
+    def _launch(self, job, env=None):
+        try:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            Path(job.log_file).parent.mkdir(parents=True, exist_ok=True)
+            with open(job.log_file, 'w') as log:
+                proc = subprocess.Popen(
+                    self._argv(job), stdin=subprocess.DEVNULL, stdout=log,
+                    stderr=subprocess.STDOUT, env=env, start_new_session=True
+                )
+        except OSError as e:
+            with self._lock:
+                job.state = FAILED
+                job.ended = time.time()
+                job.meta['error'] = str(e)
+            self._save()
+            self._on_finished(job)
+            return job
+
+        with self._lock:
+            job.pid = proc.pid
+            job.state = RUNNING
+            job.started = time.time()
+            self._procs[job.id] = proc
+        self._save()
+
+        watcher = threading.Thread(target=self._watch, args=(job, proc),
+                                   name=f"job-{job.id}", daemon=True)
+        watcher.start()
+        return job
+
+    def _watch(self, job, proc):
+        rc = proc.wait()
+        with self._lock:
+            self._procs.pop(job.id, None)
+            job.rc = rc
+            job.ended = time.time()
+            if job.meta.get('cancel_requested'):
+                job.state = CANCELLED
+            else:
+                job.state = SUCCEEDED if rc == 0 else FAILED
+        self._save()
+        self._on_finished(job)
+
+    def _on_finished(self, job):
+        """Hook for subclasses (e.g. a scheduler releasing resources)"""
+
+    def cancel(self, job_id, grace=10):
+        """SIGTERM the job's process group, SIGKILL it after `grace` seconds"""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+
+        with self._lock:
+            job.meta['cancel_requested'] = True
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.ended = time.time()
+        self._save()
+        if job.state == CANCELLED:
+            self._on_finished(job)
+            return True
+
+        try:
+            os.killpg(job.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            return True
+
+        def _kill_later():
+            deadline = time.time() + grace
+            while time.time() < deadline:
+                if not _pid_alive(job.pid):
+                    break
+                time.sleep(0.2)
+            else:
+                try:
+                    os.killpg(job.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            self._refresh_adopted()
+
+        threading.Thread(target=_kill_later, daemon=True).start()
+        return True
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def get(self, job_id):
+        self._refresh_adopted()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, key=None, active_only=False):
+        """Jobs, newest first"""
+        self._refresh_adopted()
+        with self._lock:
+            jobs = [j for j in self._jobs.values()
+                    if (key is None or j.key == key) and (j.active or not active_only)]
+        return sorted(jobs, key=lambda j: j.created or 0, reverse=True)
+
+    def latest(self, key):
+        jobs = self.list(key=key)
+        return jobs[0] if jobs else None
+
+    def is_running(self, key):
+        return any(j.active for j in self.list(key=key))
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes (for CLI/tests). Returns the job."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or not job.active:
+                return job
+            if deadline is not None and time.time() >= deadline:
+                return job
+            time.sleep(0.1)
@@ -1,28 +1,191 @@
 """
 Logger utility
+
+Log records are put on a queue and written by a background listener
+thread in batches (one flush per batch) to a size-rotated file whose
+rotated copies are gzipped. Callers never wait on log file I/O.
 """
 
+import os
+import gzip
+import queue
+import atexit
+import shutil
 import logging
+import logging.handlers
 from pathlib import Path
 from datetime import datetime
 
-def setup_logger(name='oracledba', log_dir='/var/log/oracledba'):
-    """Setup logger"""
-    log_path = Path(log_dir)
-    log_path.mkdir(parents=True, exist_ok=True)
-    
-    log_file = log_path / f"oracledba_{datetime.now().strftime('%Y%m%d')}.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    
-    return logging.getLogger(name)
-
-
-logger = setup_logger()
+DEFAULT_LOG_DIR = '/var/log/oracledba'
+FALLBACK_LOG_DIR = '/tmp/oracledba-logs'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+MAX_BYTES = 20 * 1024 * 1024
+BACKUP_COUNT = 5
+BATCH_SIZE = 512
+
+_listeners = {}
+
+
+def default_log_dir(log_dir=DEFAULT_LOG_DIR):
+    """Return a writable log directory, falling back to /tmp/oracledba-logs"""
+    for candidate in (log_dir, FALLBACK_LOG_DIR):
+        try:
+            path = Path(candidate)
+            path.mkdir(parents=True, exist_ok=True)
+            if os.access(path, os.W_OK):
+                return path
+        except (PermissionError, OSError):
+            continue
+    return Path(FALLBACK_LOG_DIR)
+
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotated file handler that gzips rotated files.
+
+    emit() does not flush; the BatchingQueueListener flushes once per batch.
+    The size check uses a running byte counter instead of seeking the stream
+    (a seek would flush the buffer on every record).
+    """
+
+    def __init__(self, filename, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+                 encoding='utf-8'):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount,
+                         encoding=encoding, delay=True)
+        self.namer = self._gzip_name
+        self.rotator = self._gzip_rotate
+        self._bytes = 0
+
+    @staticmethod
+    def _gzip_name(name):
+        return name + '.gz'
+
+    @staticmethod
+    def _gzip_rotate(source, dest):
+        with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+                self._bytes = self.stream.tell()
+            size = len(msg.encode(self.encoding or 'utf-8'))
+            if self.maxBytes > 0 and self._bytes and self._bytes + size >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                self._bytes = 0
+            self.stream.write(msg)
+            self._bytes += size
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers once per batch instead of once
+    per record: after batch_size records, or when the queue runs empty.
+
+    Only the public handle()/stop() hooks are overridden, so the listener
+    thread loop is the standard library's own.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size=BATCH_SIZE,
+                 respect_handler_level=True):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def _flush(self):
+        for handler in self.handlers:
+            handler.flush()
+        self._pending = 0
+
+    def handle(self, record):
+        super().handle(record)
+        self._pending += 1
+        if self._pending >= self.batch_size or self.queue.empty():
+            self._flush()
+
+    def stop(self):
+        """Stop the thread, then flush whatever the last batch left buffered"""
+        super().stop()
+        self._flush()
+
+
+class QueuedLogFile:
+    """Plain-text log file written by a background thread.
+
+    write() only enqueues the text; a BatchingQueueListener appends it to a
+    GzipRotatingFileHandler. Used for the raw runInstaller/DBCA output logs.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, truncate=True):
+        self.path = Path(path)
+        if truncate:
+            open(self.path, 'w').close()
+
+        handler = GzipRotatingFileHandler(str(self.path), maxBytes=max_bytes,
+                                          backupCount=backup_count)
+        handler.terminator = ''
+        handler.setFormatter(logging.Formatter('%(message)s'))
+
+        self._queue = queue.SimpleQueue()
+        self._listener = BatchingQueueListener(self._queue, handler)
+        self._listener.start()
+        self._handler = handler
+
+    def write(self, text):
+        """Enqueue text (include the line terminator yourself)"""
+        self._queue.put_nowait(logging.makeLogRecord({
+            'msg': text, 'levelno': logging.INFO, 'levelname': 'INFO',
+        }))
+
+    def close(self):
+        """Drain the queue, flush and close the file"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._handler.close()
+
+
+def setup_logger(name='oracledba', log_dir=DEFAULT_LOG_DIR, level=logging.INFO):
+    """Setup logger (queue-based; safe to call more than once)"""
+    log = logging.getLogger(name)
+    if name in _listeners:
+        return log
+
+    log_file = default_log_dir(log_dir) / f"oracledba_{datetime.now().strftime('%Y%m%d')}.log"
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = GzipRotatingFileHandler(str(log_file))
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    _listeners[name] = listener
+
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(level)
+    log.propagate = False
+    return log
+
+
+@atexit.register
+def shutdown():
+    """Stop all listeners, writing out any queued records"""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
+
+def __getattr__(name):
+    # `logger` is created on first use, not when the module is imported
+    if name == 'logger':
+        return setup_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
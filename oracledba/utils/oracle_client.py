@@ -32,6 +32,118 @@ class OracleClient:
         except Exception as e:
             return False, "", str(e)
     
+    def _sqlplus_cmd(self, connect_str):
+        if hasattr(os, 'geteuid') and os.geteuid() == 0:
+            # root is not in the dba group: connect as oracle
+            return ['su', '-', 'oracle', '-c', f'{self.sqlplus} -S -L "{connect_str}"']
+        return [self.sqlplus, '-S', '-L', connect_str]
+
+    def _run(self, script, as_sysdba=True, timeout=120):
+        """Feed script to sqlplus; (success, stdout lines, error)"""
+        connect_str = "/ as sysdba" if as_sysdba else "/"
+        try:
+            result = subprocess.run(
+                self._sqlplus_cmd(connect_str),
+                input=script,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env={**os.environ, 'ORACLE_HOME': self.oracle_home, 'ORACLE_SID': self.oracle_sid}
+            )
+        except Exception as e:
+            return False, [], str(e)
+        lines = result.stdout.splitlines()
+        errors = [line for line in lines if line.startswith(('ORA-', 'SP2-'))]
+        if result.returncode != 0 or errors:
+            return False, [], '\n'.join(errors) or result.stderr or result.stdout
+        return True, lines, ''
+
+    def query(self, sql, as_sysdba=True, timeout=120):
+        """Run a SELECT and return (success, rows, error).
+
+        rows is a list of tuples of strings, one per result row; columns
+        are separated with COLSEP so values may contain spaces. NUMWIDTH
+        is wide enough for any NUMBER, so large values print in full
+        instead of in scientific notation (the default width is 10).
+        """
+        script = (
+            "SET PAGESIZE 0 FEEDBACK OFF VERIFY OFF HEADING OFF ECHO OFF TAB OFF\n"
+            "SET LINESIZE 32767 TRIMSPOOL ON TRIMOUT ON COLSEP '|'\n"
+            "SET NUMWIDTH 40\n"
+            "WHENEVER SQLERROR EXIT SQL.SQLCODE\n"
+            f"{sql.rstrip().rstrip(';')};\n"
+            "EXIT;\n"
+        )
+        success, lines, error = self._run(script, as_sysdba, timeout)
+        if not success:
+            return False, [], error
+        rows = [tuple(col.strip() for col in line.split('|'))
+                for line in lines if line.strip()]
+        return True, rows, ''
+
+    def plsql(self, block, as_sysdba=True, timeout=120):
+        """Run an anonymous PL/SQL block and return (success, lines, error);
+        lines is what the block wrote with DBMS_OUTPUT"""
+        script = (
+            "SET PAGESIZE 0 FEEDBACK OFF VERIFY OFF HEADING OFF ECHO OFF TAB OFF\n"
+            "SET LINESIZE 32767 TRIMSPOOL ON TRIMOUT ON SERVEROUTPUT ON SIZE UNLIMITED\n"
+            "WHENEVER SQLERROR EXIT SQL.SQLCODE\n"
+            f"{block.strip()}\n/\n"
+            "EXIT;\n"
+        )
+        success, lines, error = self._run(script, as_sysdba, timeout)
+        return success, [line.rstrip() for line in lines if line.strip()], error
+
+    def spool(self, sql, path, as_sysdba=True, timeout=1800, linesize=8000):
+        """Run a single-column SELECT and write its rows straight to `path`.
+
+        sqlplus output goes directly to the file (nothing is held in
+        memory), so multi-megabyte results such as AWR reports are cheap.
+        Returns (success, error); a failed run removes the file.
+        """
+        connect_str = "/ as sysdba" if as_sysdba else "/"
+        script = (
+            "SET PAGESIZE 0 FEEDBACK OFF VERIFY OFF HEADING OFF ECHO OFF TAB OFF\n"
+            f"SET LINESIZE {linesize} LONG 10000000 LONGCHUNKSIZE {linesize}\n"
+            "SET TRIMSPOOL ON TRIMOUT ON NUMWIDTH 40\n"
+            "WHENEVER SQLERROR EXIT SQL.SQLCODE\n"
+            f"{sql.rstrip().rstrip(';')};\n"
+            "EXIT;\n"
+        )
+        proc = None
+        try:
+            with open(path, 'w') as out:
+                proc = subprocess.Popen(
+                    self._sqlplus_cmd(connect_str),
+                    stdin=subprocess.PIPE,
+                    stdout=out,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    env={**os.environ, 'ORACLE_HOME': self.oracle_home,
+                         'ORACLE_SID': self.oracle_sid}
+                )
+                _, stderr = proc.communicate(script, timeout=timeout)
+        except Exception as e:
+            if proc is not None:
+                proc.kill()
+            self._discard(path)
+            return False, str(e)
+        errors = []
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                if line.startswith(('ORA-', 'SP2-')):
+                    errors.append(line.rstrip())
+        if proc.returncode != 0 or errors:
+            self._discard(path)
+            return False, '\n'.join(errors) or stderr or f"sqlplus exited with {proc.returncode}"
+        return True, ''
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
     def execute_script(self, script_path, as_sysdba=True):
         """Execute SQL script"""
         connect_str = "/ as sysdba" if as_sysdba else "/"
@@ -0,0 +1,166 @@
+"""
+Resource accounting for child process trees
+
+ProcessTreeSampler polls a process and all its descendants with psutil
+while it runs and reports CPU seconds (user/system), peak RSS of the whole
+tree, bytes read/written and context switches. Each process keeps its
+last sampled counters, so processes that exit mid-run are still counted
+(up to their last sample; processes shorter than one interval can be
+missed).
+
+Usage (Python):
+    from oracledba.utils.procstats import ProcessTreeSampler, format_usage
+    proc = subprocess.Popen(...)
+    with ProcessTreeSampler(proc.pid) as sampler:
+        proc.wait()
+    print(format_usage(sampler.usage(), wall=elapsed))
+"""
+
+import threading
+import psutil
+
+SAMPLE_INTERVAL = 0.5
+
+USAGE_KEYS = ('cpu_user', 'cpu_system', 'cpu_seconds', 'peak_rss',
+              'read_bytes', 'write_bytes', 'ctx_switches', 'processes')
+
+
+def empty_usage():
+    return {key: 0 for key in USAGE_KEYS}
+
+
+def merge_usage(total, usage):
+    """Add one command's usage to a running total (peak RSS is a max)"""
+    if not usage:
+        return total
+    for key in USAGE_KEYS:
+        if key == 'peak_rss':
+            total[key] = max(total[key], usage.get(key, 0))
+        else:
+            total[key] = round(total[key] + usage.get(key, 0), 3)
+    return total
+
+
+def _bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024.0
+
+
+def classify(usage, wall):
+    """Rough bottleneck label from CPU utilisation over wall time"""
+    if not wall or wall <= 0:
+        return 'unknown'
+    cpu_ratio = usage.get('cpu_seconds', 0) / wall
+    io_rate = (usage.get('read_bytes', 0) + usage.get('write_bytes', 0)) / wall
+    if cpu_ratio >= 0.7:
+        return 'cpu-bound'
+    if io_rate >= 5 * 1024 * 1024:
+        return 'io-bound'
+    if cpu_ratio < 0.2:
+        return 'waiting (io/network/sleep)'
+    return 'mixed'
+
+
+def format_usage(usage, wall=None):
+    """One-line human summary"""
+    text = (f"CPU {usage.get('cpu_seconds', 0):.1f}s "
+            f"(user {usage.get('cpu_user', 0):.1f}s / sys {usage.get('cpu_system', 0):.1f}s), "
+            f"peak RSS {_bytes(usage.get('peak_rss', 0))}, "
+            f"read {_bytes(usage.get('read_bytes', 0))}, "
+            f"write {_bytes(usage.get('write_bytes', 0))}, "
+            f"{usage.get('ctx_switches', 0)} ctx switches")
+    if wall:
+        cpu_pct = 100.0 * usage.get('cpu_seconds', 0) / wall
+        text += f", {cpu_pct:.0f}% CPU -> {classify(usage, wall)}"
+    return text
+
+
+class ProcessTreeSampler:
+    """Background sampler for a process and its descendants"""
+
+    def __init__(self, pid, interval=SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last = {}       # (pid, create_time) -> counters
+        self._peak_rss = 0
+        self._samples = 0
+
+    def _tree(self):
+        try:
+            root = psutil.Process(self.pid)
+            return [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return []
+
+    def sample(self):
+        """Take one sample of the whole tree"""
+        rss_total = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    key = (proc.pid, proc.create_time())
+                    cpu = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    ctx = proc.num_ctx_switches()
+                    try:
+                        io = proc.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        read_bytes = write_bytes = 0
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            rss_total += rss
+            with self._lock:
+                self._last[key] = {
+                    'cpu_user': cpu.user,
+                    'cpu_system': cpu.system,
+                    'read_bytes': read_bytes,
+                    'write_bytes': write_bytes,
+                    'ctx_switches': ctx.voluntary + ctx.involuntary,
+                }
+        with self._lock:
+            self._peak_rss = max(self._peak_rss, rss_total)
+            self._samples += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{self.pid}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the usage totals"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.usage()
+
+    def usage(self):
+        with self._lock:
+            usage = empty_usage()
+            for counters in self._last.values():
+                for key, value in counters.items():
+                    usage[key] += value
+            usage['cpu_user'] = round(usage['cpu_user'], 2)
+            usage['cpu_system'] = round(usage['cpu_system'], 2)
+            usage['cpu_seconds'] = round(usage['cpu_user'] + usage['cpu_system'], 2)
+            usage['peak_rss'] = self._peak_rss
+            usage['processes'] = len(self._last)
+            return usage
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,191 @@
+"""
+Concurrency-limited scheduler for heavy database operations
+
+OperationScheduler is a JobManager whose jobs are queued by priority and
+started only when their resource class has capacity:
+
+    instance-exclusive  instance restart, DBCA, archivelog switch, flashback
+                        database: runs alone; while one is waiting, nothing
+                        queued behind it may start
+    io-heavy            RMAN backups, downloads, PDB creation (limit 1)
+    cpu-heavy           installers, lab scripts (limit: half the CPUs)
+    light               no limit
+
+Synchronous endpoints (e.g. an archivelog restart done inside the request)
+take a slot with hold(), which fails fast with SchedulerBusy instead of
+waiting.
+
+Usage (Python):
+    from oracledba.utils.scheduler import OperationScheduler, IO_HEAVY
+    jobs = OperationScheduler()
+    job = jobs.submit('RMAN full backup', cmd, '/tmp/rman-backup.log', resource=IO_HEAVY)
+    jobs.queue_position(job.id)
+    with jobs.hold('Enable ARCHIVELOG'):
+        ...
+"""
+
+import os
+import itertools
+from contextlib import contextmanager
+
+from .jobs import JobManager, QUEUED, RUNNING
+
+INSTANCE_EXCLUSIVE = 'instance-exclusive'
+IO_HEAVY = 'io-heavy'
+CPU_HEAVY = 'cpu-heavy'
+LIGHT = 'light'
+RESOURCE_CLASSES = (INSTANCE_EXCLUSIVE, IO_HEAVY, CPU_HEAVY, LIGHT)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+
+def default_limits():
+    return {
+        IO_HEAVY: 1,
+        CPU_HEAVY: max(1, (os.cpu_count() or 2) // 2),
+    }
+
+
+class SchedulerBusy(RuntimeError):
+    """Raised by hold() when the resource is not free right now"""
+
+
+class OperationScheduler(JobManager):
+    """JobManager with resource classes, limits and a priority queue"""
+
+    def __init__(self, state_file=None, jobs_dir=None, limits=None):
+        # Set before JobManager.__init__: loading state may dispatch
+        self.limits = default_limits()
+        self.limits.update(limits or {})
+        self._holds = {}
+        self._envs = {}
+        self._hold_ids = itertools.count(1)
+        super().__init__(state_file, jobs_dir)
+        self._dispatch()
+
+    # =========================================================================
+    # ADMISSION
+    # =========================================================================
+
+    @staticmethod
+    def _resource(job):
+        return job.meta.get('resource', LIGHT)
+
+    def _running(self):
+        """(name, resource) of running jobs and active holds"""
+        running = [(j.name, self._resource(j)) for j in self._jobs.values()
+                   if j.state == RUNNING]
+        return running + list(self._holds.values())
+
+    def _fits(self, resource, running):
+        if resource == LIGHT:
+            return True
+        heavy = [r for _, r in running if r != LIGHT]
+        if INSTANCE_EXCLUSIVE in heavy:
+            return False
+        if resource == INSTANCE_EXCLUSIVE:
+            return not heavy
+        limit = self.limits.get(resource)
+        return limit is None or heavy.count(resource) < limit
+
+    def _queued(self):
+        """Queued jobs in dispatch order (priority, then submission time)"""
+        queued = [j for j in self._jobs.values() if j.state == QUEUED]
+        return sorted(queued, key=lambda j: (j.meta.get('priority', PRIORITY_NORMAL),
+                                             j.created or 0))
+
+    def _dispatch(self):
+        """Start every queued job that fits, in priority order"""
+        with self._lock:
+            running = self._running()
+            for job in self._queued():
+                if job.state != QUEUED:  # started by a nested dispatch
+                    continue
+                resource = self._resource(job)
+                if self._fits(resource, running):
+                    running.append((job.name, resource))
+                    self._launch(job, self._envs.pop(job.id, None))
+                elif resource == INSTANCE_EXCLUSIVE:
+                    # Don't let later jobs starve the waiting exclusive one
+                    break
+
+    def _on_finished(self, job):
+        self._envs.pop(job.id, None)
+        self._dispatch()
+
+    # =========================================================================
+    # PUBLIC API
+    # =========================================================================
+
+    def submit(self, name, command, log_file, resource=LIGHT, priority=PRIORITY_NORMAL,
+               as_user=None, key=None, env=None, meta=None):
+        """Queue a background command; it starts as soon as its resource
+        class has capacity. Returns the Job (state queued or running)."""
+        if resource not in RESOURCE_CLASSES:
+            raise ValueError(f"Unknown resource class: {resource}")
+        meta = dict(meta or {})
+        meta.update(resource=resource, priority=priority)
+        job = self._new_job(name, command, log_file, as_user, key, meta)
+        with self._lock:
+            self._jobs[job.id] = job
+            if env is not None:
+                self._envs[job.id] = env
+            self._save()
+            self._dispatch()
+        return job
+
+    def queue_position(self, job_id):
+        """1-based position in the queue, or None if the job is not queued"""
+        with self._lock:
+            for position, job in enumerate(self._queued(), 1):
+                if job.id == job_id:
+                    return position
+        return None
+
+    def blockers(self, resource):
+        """Names of running operations that keep `resource` from starting"""
+        with self._lock:
+            running = self._running()
+        if self._fits(resource, running):
+            return []
+        if resource == INSTANCE_EXCLUSIVE:
+            return [name for name, r in running if r != LIGHT]
+        return [name for name, r in running if r in (resource, INSTANCE_EXCLUSIVE)]
+
+    @contextmanager
+    def hold(self, name, resource=INSTANCE_EXCLUSIVE):
+        """Occupy a resource for a synchronous operation.
+
+        Raises SchedulerBusy immediately if it is not free, or if an
+        instance-exclusive job is already waiting in the queue.
+        """
+        with self._lock:
+            running = self._running()
+            waiting_exclusive = [j.name for j in self._queued()
+                                 if self._resource(j) == INSTANCE_EXCLUSIVE]
+            if not self._fits(resource, running) or (resource != LIGHT and waiting_exclusive):
+                busy = self.blockers(resource) or waiting_exclusive
+                raise SchedulerBusy(f"{name} cannot start now; busy with: {', '.join(busy)}")
+            hold_id = next(self._hold_ids)
+            self._holds[hold_id] = (name, resource)
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._holds[hold_id]
+            self._dispatch()
+
+    def status(self):
+        """Running operations, queue and limits (for the GUI)"""
+        with self._lock:
+            return {
+                'limits': dict(self.limits),
+                'running': [{'name': name, 'resource': resource}
+                            for name, resource in self._running()],
+                'queue': [{'id': j.id, 'name': j.name, 'resource': self._resource(j),
+                           'priority': j.meta.get('priority', PRIORITY_NORMAL),
+                           'position': i}
+                          for i, j in enumerate(self._queued(), 1)],
+            }
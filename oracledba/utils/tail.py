@@ -0,0 +1,190 @@
+"""
+Native tail / follow for log files
+
+tail_lines() reads backwards from the end of the file in fixed-size blocks,
+so the cost depends on the number of lines requested, not the file size.
+follow() yields appended lines, waking on inotify events when available
+(Linux) and falling back to polling otherwise. Log rotation (new inode)
+and truncation are detected and the new file is followed from its start.
+"""
+
+import os
+import time
+import select
+import ctypes
+import ctypes.util
+
+BLOCK_SIZE = 8192
+
+# inotify flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+def _split_tail(f, end, n, block_size=BLOCK_SIZE):
+    """Split the bytes before offset `end` of binary file f into lines,
+    reading backwards only far enough for the last n complete ones.
+
+    The last item is what follows the final newline: b'' or a partial line.
+    """
+    pos = end
+    blocks = []
+    newlines = 0
+    # n lines need n+1 newlines when the data ends with one
+    while pos > 0 and newlines <= n:
+        size = min(block_size, pos)
+        pos -= size
+        f.seek(pos)
+        block = f.read(size)
+        blocks.append(block)
+        newlines += block.count(b'\n')
+    return b''.join(reversed(blocks)).split(b'\n')
+
+
+def tail_lines(path, n=50, block_size=BLOCK_SIZE, encoding='utf-8'):
+    """Return the last n lines of a file (without line terminators)."""
+    if n <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        lines = _split_tail(f, f.seek(0, os.SEEK_END), n, block_size)
+    if lines and lines[-1] == b'':
+        lines.pop()
+    return [line.rstrip(b'\r').decode(encoding, 'replace') for line in lines[-n:]]
+
+
+class _PollWatcher:
+    """Wake-up source that simply sleeps"""
+
+    def __init__(self, path, interval):
+        self.interval = interval
+
+    def wait(self):
+        time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class _InotifyWatcher:
+    """Wake-up source backed by inotify on the log's directory.
+
+    Watching the directory (not the file) also reports the creation of a
+    new file after rotation. wait() still returns after `interval` seconds
+    so missed events only delay, never stall, the follower.
+    """
+
+    def __init__(self, path, interval):
+        self.interval = interval
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify not available")
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        directory = os.path.dirname(os.path.abspath(path)) or '.'
+        mask = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+                | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, "inotify_add_watch failed")
+
+    def wait(self):
+        ready, _, _ = select.select([self.fd], [], [], self.interval)
+        if ready:
+            # Drain; the follower re-checks the file regardless of event type
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _make_watcher(path, interval, use_inotify=True):
+    if use_inotify:
+        try:
+            return _InotifyWatcher(path, interval)
+        except (OSError, AttributeError):
+            pass
+    return _PollWatcher(path, interval)
+
+
+def follow(path, lines=10, interval=1.0, stop_event=None, use_inotify=True,
+           encoding='utf-8'):
+    """Yield the last `lines` lines of a file, then every line appended to it.
+
+    Runs until stop_event (a threading.Event) is set or the caller stops
+    iterating. A partially written last line is held back until complete.
+    """
+    f = None
+    buffer = b''
+    if os.path.exists(path):
+        f = open(path, 'rb')
+        # Tail only what precedes `end`; anything appended later is read
+        # by the loop below, so no line is yielded twice
+        end = f.seek(0, os.SEEK_END)
+        tail = _split_tail(f, end, max(lines, 0))
+        f.seek(end)
+        buffer = tail.pop()
+        for line in tail[-lines:] if lines > 0 else []:
+            yield line.rstrip(b'\r').decode(encoding, 'replace')
+
+    watcher = _make_watcher(path, interval, use_inotify)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if f is None:
+                try:
+                    f = open(path, 'rb')  # created or rotated: read from the start
+                except FileNotFoundError:
+                    watcher.wait()
+                    continue
+
+            chunk = f.read()
+            if chunk:
+                buffer += chunk
+                *complete, buffer = buffer.split(b'\n')
+                for line in complete:
+                    yield line.rstrip(b'\r').decode(encoding, 'replace')
+                continue
+
+            # No new data: check for rotation or truncation
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            current = os.fstat(f.fileno())
+            if st is None or st.st_ino != current.st_ino:
+                f.close()
+                f = None
+                buffer = b''
+                continue
+            if st.st_size < f.tell():
+                f.seek(0)
+                buffer = b''
+                continue
+
+            watcher.wait()
+    finally:
+        watcher.close()
+        if f is not None:
+            f.close()
@@ -8,6 +8,7 @@ import os
 import sys
 import json
 import subprocess
+import threading
 import hashlib
 import hmac
 import secrets
@@ -15,12 +16,23 @@ from datetime import datetime, timedelta
 from functools import wraps
 from pathlib import Path
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import (Flask, render_template, request, jsonify, session, redirect, url_for, flash,
+                   send_from_directory, abort)
 from flask_cors import CORS
 
 # Import our CLI modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from oracledba.utils.tail import tail_lines  # noqa: E402
+from oracledba.utils.logger import default_log_dir  # noqa: E402
+from oracledba.utils.events import read_events, step_progress  # noqa: E402
+from oracledba.utils.history import DurationHistory, HISTORY_FILE_NAME  # noqa: E402
+from oracledba.utils.scheduler import (  # noqa: E402
+    OperationScheduler, SchedulerBusy, INSTANCE_EXCLUSIVE, IO_HEAVY, CPU_HEAVY, LIGHT,
+)
+from oracledba.modules.rman import load_settings as load_rman_settings  # noqa: E402
+from oracledba.modules.labs import LABS, LAB_ORDER, lab_range  # noqa: E402
+
 # Simple system detector stub (replace with full implementation later if needed)
 class SystemDetector:
     """Basic system detection for Oracle environment"""
@@ -329,6 +341,13 @@ CONFIG_DIR = Path.home() / '.oracledba'
 CONFIG_FILE = CONFIG_DIR / 'gui_config.json'
 USERS_FILE = CONFIG_DIR / 'gui_users.json'
 
+# Log endpoints return only the last N lines (override with ?lines=N)
+LOG_TAIL_LINES = 2000
+
+# Background jobs (TP scripts, installs, backups) owned by this process;
+# heavy ones are queued so they don't run on top of each other
+jobs = OperationScheduler()
+
 # Create system detector instance
 detector = SystemDetector()
 
@@ -685,10 +704,14 @@ def api_features_toggle():
     
     try:
         if feature == 'archivelog':
-            if action == 'enable':
-                result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\nALTER DATABASE ARCHIVELOG;\nALTER DATABASE OPEN;")
-            else:
-                result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\nALTER DATABASE NOARCHIVELOG;\nALTER DATABASE OPEN;")
+            # Instance restart: refused while backups/installs are running
+            with jobs.hold(f'ARCHIVELOG {action}'):
+                if action == 'enable':
+                    result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\n"
+                                         "ALTER DATABASE ARCHIVELOG;\nALTER DATABASE OPEN;")
+                else:
+                    result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\n"
+                                         "ALTER DATABASE NOARCHIVELOG;\nALTER DATABASE OPEN;")
         elif feature == 'fra':
             if action == 'enable':
                 result = run_sqlplus("ALTER SYSTEM SET db_recovery_file_dest_size = 10G SCOPE=BOTH;\nALTER SYSTEM SET db_recovery_file_dest = '/u01/app/oracle/fast_recovery_area' SCOPE=BOTH;")
@@ -835,7 +858,8 @@ def api_databases_create():
   FILE_NAME_CONVERT = ('/u01/app/oracle/oradata/GDCPROD/pdbseed/', '/u01/app/oracle/oradata/GDCPROD/{sid}/');
 ALTER PLUGGABLE DATABASE {sid} OPEN;
 ALTER PLUGGABLE DATABASE {sid} SAVE STATE;"""
-        result = run_sqlplus(sql)
+        with jobs.hold(f'Create PDB {sid}', IO_HEAVY):
+            result = run_sqlplus(sql)
         return jsonify({'success': True, 'output': f'PDB {sid} created successfully.\n{result}'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -978,7 +1002,9 @@ def api_protection_archivelog_status():
 def api_protection_archivelog_enable():
     """API: Enable ARCHIVELOG"""
     try:
-        result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\nALTER DATABASE ARCHIVELOG;\nALTER DATABASE OPEN;")
+        with jobs.hold('Enable ARCHIVELOG'):
+            result = run_sqlplus("SHUTDOWN IMMEDIATE;\nSTARTUP MOUNT;\n"
+                                 "ALTER DATABASE ARCHIVELOG;\nALTER DATABASE OPEN;")
         return jsonify({'success': True, 'output': result})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -1000,13 +1026,147 @@ def api_rman_backup():
         
         # Run RMAN in background since backups take time
         log_file = '/tmp/rman-backup.log'
-        cmd = f'source ~/.bash_profile 2>/dev/null; echo "{rman_cmd}" | {oracle_home}/bin/rman target / > {log_file} 2>&1'
-        run_shell_command(f'nohup bash -c \'{cmd}\' &', as_oracle=True, timeout=10)
-        return jsonify({'success': True, 'output': f'RMAN {backup_type} backup started. Check log: {log_file}'})
+        cmd = (f'source ~/.bash_profile 2>/dev/null; '
+               f'echo "{rman_cmd}" | {oracle_home}/bin/rman target /')
+        result = start_job(f'RMAN {backup_type} backup', cmd, log_file, key='rman-backup',
+                           as_user='oracle', resource=IO_HEAVY)
+        if result['success']:
+            result['output'] = (result.get('message')
+                                or f'RMAN {backup_type} backup started. Check log: {log_file}')
+        return jsonify(result)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/rman/progress')
+@login_required
+def api_rman_progress():
+    """API: Live RMAN progress (percent, MB/s per channel, ETA) and job state.
+
+    Once the backup job has finished, 'output' holds its parsed log
+    (channels, pieces, RMAN-/ORA- error stacks).
+    """
+    from oracledba.modules.rman import RMANManager
+    from oracledba.modules.rman_output import parse_rman_log
+    job = jobs.latest('rman-backup')
+    output = None
+    if job and not job.active:
+        try:
+            output = parse_rman_log(job.log_file)
+        except OSError:
+            pass
+    try:
+        progress = RMANManager().progress()
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e),
+                        'job': job.to_dict() if job else None, 'output': output})
+    return jsonify({'success': True, 'progress': progress,
+                    'job': job.to_dict() if job else None, 'output': output})
+
+
+# ============================================================================
+# PERFORMANCE ROUTES
+# ============================================================================
+
+@app.route('/api/tuning/awr/snapshots')
+@login_required
+def api_tuning_awr_snapshots():
+    """API: AWR snapshots of the last ?hours=24"""
+    from oracledba.modules.tuning import TuningManager
+    hours = request.args.get('hours', 24, type=float)
+    try:
+        snaps = TuningManager().snapshots(hours=hours)
+    except (RuntimeError, IndexError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)})
+    return jsonify({'success': True, 'snapshots': [
+        {'snap_id': s['snap_id'], 'startup': s['startup'],
+         'begin': s['begin_time'].isoformat(sep=' ') if s['begin_time'] else None,
+         'end': s['end_time'].isoformat(sep=' ') if s['end_time'] else None}
+        for s in snaps]})
+
+
+@app.route('/api/tuning/awr/generate', methods=['POST'])
+@login_required
+def api_tuning_awr_generate():
+    """API: Generate an AWR report (explicit snapshots, last N hours or peak
+    DB time window); returns its download URL"""
+    from oracledba.modules.tuning import TuningManager
+    data = request.json or {}
+    try:
+        begin = int(data['begin']) if data.get('begin') is not None else None
+        end = int(data['end']) if data.get('end') is not None else None
+        hours = float(data.get('hours', 1))
+    except (TypeError, ValueError):
+        return jsonify({'success': False,
+                        'error': 'begin/end must be snapshot IDs and hours a number'}), 400
+    path = TuningManager().generate_awr(
+        begin, end, hours=hours, peak=bool(data.get('peak')), fmt=data.get('format', 'html'),
+        rac_global=bool(data.get('global')))
+    if not path:
+        return jsonify({'success': False, 'error': 'AWR report failed (see server log)'})
+    return jsonify({'success': True, 'report': path.name,
+                    'url': url_for('api_tuning_awr_download', name=path.name)})
+
+
+@app.route('/api/tuning/awr/reports')
+@login_required
+def api_tuning_awr_reports():
+    """API: Generated AWR reports, newest first"""
+    from oracledba.modules.tuning import REPORTS_DIR
+    reports = sorted(REPORTS_DIR.glob('awr_*'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return jsonify({'success': True, 'reports': [
+        {'name': p.name, 'bytes': p.stat().st_size,
+         'created': datetime.fromtimestamp(p.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+         'url': url_for('api_tuning_awr_download', name=p.name)} for p in reports]})
+
+
+# One ASH sampler per server process: each poll only fetches new sample_ids
+ash_sampler = None
+ash_lock = threading.Lock()
+
+
+@app.route('/api/tuning/top')
+@login_required
+def api_tuning_top():
+    """API: Top activity from ASH (?n=10) plus a per-wait-class timeline"""
+    global ash_sampler
+    from oracledba.modules.ash import ASHSampler
+    n = request.args.get('n', 10, type=int)
+    with ash_lock:
+        if ash_sampler is None:
+            ash_sampler = ASHSampler()
+        try:
+            ash_sampler.poll()
+        except RuntimeError as e:
+            return jsonify({'success': False, 'error': str(e)})
+
+        def rows(dim):
+            return [{'value': v, 'samples': c, 'percent': p, 'aas': a}
+                    for v, c, p, a in ash_sampler.top(dim, n)]
+        return jsonify({
+            'success': True,
+            'window': ash_sampler.activity.window,
+            'samples': len(ash_sampler.activity),
+            'poll_seconds': ash_sampler.poll_seconds,
+            'wait_class': rows('wait_class'),
+            'sql_id': rows('sql_id'),
+            'event': rows('event'),
+            'session': rows('session'),
+            'module': rows('module'),
+            'timeline': [{'time': t, 'counts': c} for t, c in ash_sampler.timeline(bucket=10)],
+        })
+
+
+@app.route('/api/tuning/awr/download/<name>')
+@login_required
+def api_tuning_awr_download(name):
+    """Download a generated AWR report (streamed from disk)"""
+    from oracledba.modules.tuning import REPORTS_DIR
+    if not name.startswith('awr_'):
+        abort(404)
+    return send_from_directory(REPORTS_DIR, name, as_attachment=True)
+
+
 # ============================================================================
 # SECURITY ROUTES
 # ============================================================================
@@ -1516,15 +1676,12 @@ fi
             os.chmod(script_path, 0o755)
             
             # Execute script in background
-            cmd = f"nohup bash {script_path} > /tmp/oracle-download.log 2>&1 &"
-            subprocess.Popen(cmd, shell=True)
-            
-            return jsonify({
-                'success': True,
-                'message': 'Download started in background',
-                'log_file': '/tmp/oracle-download.log',
-                'download_path': download_path
-            })
+            result = start_job('Oracle binaries download', f'bash {script_path}',
+                               '/tmp/oracle-download.log', key='download', resource=IO_HEAVY)
+            if result['success']:
+                result.setdefault('message', 'Download started in background')
+                result['download_path'] = download_path
+            return jsonify(result)
         else:
             return jsonify({
                 'success': False,
@@ -1613,6 +1770,11 @@ def api_installation_database():
         return jsonify({'success': False, 'error': str(e)})
 
 
+def install_events_file():
+    """Events file written by InstallManager.install_all (oradba install)"""
+    return default_log_dir() / 'install-all.events.jsonl'
+
+
 @app.route('/api/installation/quick', methods=['POST'])
 @login_required
 @admin_required
@@ -1625,13 +1787,24 @@ def api_installation_quick():
         # oradba install --yes  →  InstallManager.install_all(auto_yes=True)
         # stdout is redirected to the log file; install.py also writes its own
         # log under /var/log/oracledba/install-all.log.
-        cmd = f"nohup oradba install --yes > {log_file} 2>&1 &"
-        subprocess.Popen(cmd, shell=True)
+        # Drop the previous run's events so progress starts from scratch
+        try:
+            install_events_file().unlink()
+        except OSError:
+            pass
+        result = start_job('Oracle installation', 'oradba install --yes', log_file, key='install',
+                           resource=INSTANCE_EXCLUSIVE)
+        if not result['success']:
+            return jsonify(result)
 
         return jsonify({
             'success': True,
-            'message': 'Automated installation started (oradba install --yes). This will take 30-60 minutes.',
+            'message': result.get('message') or ('Automated installation started '
+                                                 '(oradba install --yes). '
+                                                 'This will take 30-60 minutes.'),
             'log_file': log_file,
+            'job_id': result['job_id'],
+            'queued': result['queued'],
             'steps': [
                 {'step': 1, 'name': 'System Readiness', 'status': 'running'},
                 {'step': 2, 'name': 'Download & Extract Binaries', 'status': 'pending'},
@@ -1677,43 +1850,62 @@ def api_installation_logs(log_type):
         # Get file size
         file_size = os.path.getsize(log_file)
         
-        # Read all content
-        with open(log_file, 'r', errors='replace') as f:
-            content = f.read()
+        # Only the tail is sent back; step markers are scanned line by line
+        lines = request.args.get('lines', LOG_TAIL_LINES, type=int)
+        content = '\n'.join(tail_lines(log_file, lines))
         
-        # Check if process is still running
-        is_running = False
-        if log_type == 'quick':
-            # For unified install, check for the oradba install process
-            proc = subprocess.run(['pgrep', '-f', 'oradba install'], capture_output=True)
-            is_running = proc.returncode == 0
-        else:
-            script_file = log_file.replace('.log', '.sh')
-            if os.path.exists(script_file):
-                proc = subprocess.run(['pgrep', '-f', script_file], capture_output=True)
-                is_running = proc.returncode == 0
+        # Check if the job is still running
+        job_keys = {
+            'download': 'download',
+            'system': 'tp01',
+            'binaries': 'tp02',
+            'database': 'tp03',
+            'quick': 'install'
+        }
+        is_running = jobs.is_running(job_keys[log_type])
         
-        # Parse step progress from log content (from InstallManager step markers)
+        # Step progress: prefer InstallManager's JSONL events, fall back to
+        # scanning the text log for step markers
         current_step = 0
         total_steps = 4
         step_statuses = {}
-        if content:
+        step_durations = {}
+        warnings = []
+        eta = None
+        events = read_events(install_events_file()) if log_type == 'quick' else []
+        if events:
+            progress = step_progress(events)
+            current_step = progress['current_step']
+            total_steps = progress['total_steps'] or total_steps
+            step_statuses = progress['step_statuses']
+            step_durations = progress['step_durations']
+            warnings = progress['warnings']
+            # Per-step and overall ETA from medians of past runs
+            eta = DurationHistory(default_log_dir() / HISTORY_FILE_NAME).estimate(progress)
+        elif file_size:
             import re
-            # Detect "Step X/Y" headers from install.py _step_header()
-            step_matches = re.findall(r'Step (\d+)/(\d+)', content)
-            if step_matches:
-                current_step = int(step_matches[-1][0])
-                total_steps = int(step_matches[-1][1])
-            # Detect completed steps from _step_result()
-            completed = re.findall(r'[✓✓] Step (\d+) complete', content)
-            for s in completed:
-                step_statuses[int(s)] = 'complete'
-            # Detect failed steps
-            failed = re.findall(r'[✗✗] Step (\d+) FAILED', content)
-            for s in failed:
-                step_statuses[int(s)] = 'failed'
+            header_re = re.compile(r'Step (\d+)/(\d+)')
+            complete_re = re.compile(r'[✓✓] Step (\d+) complete')
+            failed_re = re.compile(r'[✗✗] Step (\d+) FAILED')
+            installation_complete = False
+            with open(log_file, 'r', errors='replace') as f:
+                for line in f:
+                    # Detect "Step X/Y" headers from install.py _step_header()
+                    match = header_re.search(line)
+                    if match:
+                        current_step = int(match.group(1))
+                        total_steps = int(match.group(2))
+                    # Detect completed / failed steps from _step_result()
+                    match = complete_re.search(line)
+                    if match:
+                        step_statuses[int(match.group(1))] = 'complete'
+                    match = failed_re.search(line)
+                    if match:
+                        step_statuses[int(match.group(1))] = 'failed'
+                    if 'Installation Complete' in line:
+                        installation_complete = True
             # Detect overall completion
-            if 'Installation Complete' in content:
+            if installation_complete:
                 current_step = total_steps
         
         return jsonify({
@@ -1723,7 +1915,10 @@ def api_installation_logs(log_type):
             'is_running': is_running,
             'current_step': current_step,
             'total_steps': total_steps,
-            'step_statuses': step_statuses
+            'step_statuses': step_statuses,
+            'step_durations': step_durations,
+            'warnings': warnings,
+            'eta': eta
         })
     except Exception as e:
         return jsonify({
@@ -1824,28 +2019,10 @@ def run_tp_script(tp_number, background=True, as_user='oracle'):
     """Run a TP script from the scripts directory"""
     scripts_dir = Path(__file__).parent / 'scripts'
     
-    tp_map = {
-        '01': ('tp01-system-readiness.sh', 'root'),
-        '02': ('tp02-installation-binaire.sh', 'oracle'),
-        '03': ('tp03-creation-instance.sh', 'oracle'),
-        '04': ('tp04-fichiers-critiques.sh', 'oracle'),
-        '05': ('tp05-gestion-stockage.sh', 'oracle'),
-        '06': ('tp06-securite-acces.sh', 'oracle'),
-        '07': ('tp07-flashback.sh', 'oracle'),
-        '08': ('tp08-rman.sh', 'oracle'),
-        '09': ('tp09-dataguard.sh', 'oracle'),
-        '10': ('tp10-tuning.sh', 'oracle'),
-        '11': ('tp11-patching.sh', 'oracle'),
-        '12': ('tp12-multitenant.sh', 'oracle'),
-        '13': ('tp13-ai-foundations.sh', 'oracle'),
-        '14': ('tp14-mobilite-concurrence.sh', 'oracle'),
-        '15': ('tp15-asm-rac-concepts.sh', 'oracle'),
-    }
-    
-    if tp_number not in tp_map:
+    if tp_number not in LABS:
         return {'success': False, 'error': f'Unknown TP: {tp_number}'}
     
-    script_name, default_user = tp_map[tp_number]
+    script_name, default_user = LABS[tp_number]['script'], LABS[tp_number]['user']
     script_path = scripts_dir / script_name
     
     if not script_path.exists():
@@ -1864,17 +2041,16 @@ def run_tp_script(tp_number, background=True, as_user='oracle'):
     
     if background:
         if run_user == 'oracle' and is_root:
-            cmd = f'nohup su - oracle -c "{env_setup} bash {script_path}" > {log_file} 2>&1 &'
+            cmd = f'{env_setup} bash {script_path}'
         else:
-            cmd = f'nohup bash {script_path} > {log_file} 2>&1 &'
+            cmd = f'bash {script_path}'
         
-        subprocess.Popen(cmd, shell=True)
-        return {
-            'success': True,
-            'message': f'TP{tp_number} ({script_name}) started in background',
-            'log_file': log_file,
-            'script': script_name
-        }
+        result = start_job(f'TP{tp_number}', cmd, log_file, key=f'tp{tp_number}', as_user=run_user,
+                           resource=lab_resource(tp_number))
+        if result['success']:
+            result.setdefault('message', f'TP{tp_number} ({script_name}) started in background')
+            result['script'] = script_name
+        return result
     else:
         try:
             if run_user == 'oracle' and is_root:
@@ -1902,6 +2078,41 @@ def run_tp_script(tp_number, background=True, as_user='oracle'):
             return {'success': False, 'error': str(e)}
 
 
+def start_job(name, command, log_file, key, as_user=None, resource=LIGHT):
+    """Submit a background job unless one with the same key is still active.
+
+    Heavy jobs may be queued; the result then carries a 'message' with the
+    queue position.
+    """
+    current = jobs.latest(key)
+    if current and current.active:
+        return {'success': False, 'error': f'{current.name} is already {current.state}',
+                'job_id': current.id, 'log_file': current.log_file}
+
+    job = jobs.submit(name, command, log_file, resource=resource, as_user=as_user, key=key)
+    if not job.active:
+        return {'success': False, 'error': job.meta.get('error', f'{name} failed to start'),
+                'job_id': job.id}
+
+    result = {'success': True, 'job_id': job.id, 'log_file': log_file,
+              'queued': job.state == 'queued'}
+    if result['queued']:
+        result['queue_position'] = jobs.queue_position(job.id)
+        result['message'] = (f"{name} queued (position {result['queue_position']}); "
+                             f"waiting for: {', '.join(jobs.blockers(resource)) or 'queued jobs'}")
+    return result
+
+
+def lab_resource(tp_number):
+    """Scheduler resource class for a TP lab"""
+    tags = LABS[tp_number]['tags']
+    if 'needs-restart' in tags or 'needs-exclusive-db' in tags:
+        return INSTANCE_EXCLUSIVE
+    if tp_number == '02':
+        return IO_HEAVY  # 3GB download + unzip
+    return CPU_HEAVY
+
+
 def run_shell_command(command, as_oracle=True, timeout=120):
     """Run a shell command and return output"""
     try:
@@ -1937,44 +2148,23 @@ def labs():
 @login_required
 def api_labs_list():
     """API: List all available TP labs"""
-    labs_info = [
-        {'number': '01', 'name': 'System Readiness', 'description': 'Users, groups, packages, kernel params', 'category': 'Installation', 'user': 'root', 'duration': '5-10 min'},
-        {'number': '02', 'name': 'Binary Installation', 'description': 'Download Oracle 19c binaries (3GB)', 'category': 'Installation', 'user': 'oracle', 'duration': '10-20 min'},
-        {'number': '03', 'name': 'Database Creation', 'description': 'runInstaller + DBCA database', 'category': 'Installation', 'user': 'oracle', 'duration': '15-30 min'},
-        {'number': '04', 'name': 'Critical Files', 'description': 'Multiplex control files, redo logs', 'category': 'Configuration', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '05', 'name': 'Storage Management', 'description': 'Tablespaces, datafiles, OMF', 'category': 'Configuration', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '06', 'name': 'Security & Access', 'description': 'Users, roles, profiles, privileges', 'category': 'Security', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '07', 'name': 'Flashback', 'description': 'Flashback query, table, database', 'category': 'Protection', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '08', 'name': 'RMAN Backup', 'description': 'Backup strategies and recovery', 'category': 'Protection', 'user': 'oracle', 'duration': '10 min'},
-        {'number': '09', 'name': 'Data Guard', 'description': 'High availability standby setup', 'category': 'HA', 'user': 'oracle', 'duration': '10 min'},
-        {'number': '10', 'name': 'Performance Tuning', 'description': 'AWR, SQL tuning, optimization', 'category': 'Performance', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '11', 'name': 'Patching', 'description': 'Oracle patches and updates', 'category': 'Maintenance', 'user': 'oracle', 'duration': '5 min'},
-        {'number': '12', 'name': 'Multitenant', 'description': 'CDB/PDB management', 'category': 'Architecture', 'user': 'oracle', 'duration': '10 min'},
-        {'number': '13', 'name': 'AI/ML Foundations', 'description': 'Oracle Machine Learning', 'category': 'Advanced', 'user': 'oracle', 'duration': '10 min'},
-        {'number': '14', 'name': 'Data Mobility', 'description': 'Data Pump, transportable tablespaces', 'category': 'Advanced', 'user': 'oracle', 'duration': '10 min'},
-        {'number': '15', 'name': 'ASM/RAC Concepts', 'description': 'Clustering and ASM architecture', 'category': 'Advanced', 'user': 'oracle', 'duration': '5 min'},
-    ]
-    
-    # Check which scripts exist
+    labs_info = []
     scripts_dir = Path(__file__).parent / 'scripts'
-    for lab in labs_info:
-        tp_map = {
-            '01': 'tp01-system-readiness.sh', '02': 'tp02-installation-binaire.sh',
-            '03': 'tp03-creation-instance.sh', '04': 'tp04-fichiers-critiques.sh',
-            '05': 'tp05-gestion-stockage.sh', '06': 'tp06-securite-acces.sh',
-            '07': 'tp07-flashback.sh', '08': 'tp08-rman.sh',
-            '09': 'tp09-dataguard.sh', '10': 'tp10-tuning.sh',
-            '11': 'tp11-patching.sh', '12': 'tp12-multitenant.sh',
-            '13': 'tp13-ai-foundations.sh', '14': 'tp14-mobilite-concurrence.sh',
-            '15': 'tp15-asm-rac-concepts.sh',
-        }
-        script_file = tp_map.get(lab['number'], '')
-        lab['script'] = script_file
-        lab['exists'] = (scripts_dir / script_file).exists() if script_file else False
-        
-        # Check if log exists
-        log_file = f"/tmp/tp{lab['number']}.log"
-        lab['has_log'] = os.path.exists(log_file)
+    for number in LAB_ORDER:
+        lab = LABS[number]
+        labs_info.append({
+            'number': number,
+            'name': lab['name'],
+            'description': lab['description'],
+            'category': lab['category'],
+            'user': lab['user'],
+            'duration': lab['duration'],
+            'depends': lab['depends'],
+            'tags': lab['tags'],
+            'script': lab['script'],
+            'exists': (scripts_dir / lab['script']).exists(),
+            'has_log': os.path.exists(f'/tmp/tp{number}.log'),
+        })
     
     return jsonify({'success': True, 'labs': labs_info})
 
@@ -2006,17 +2196,10 @@ def api_labs_log(tp_number):
     
     try:
         file_size = os.path.getsize(log_file)
-        with open(log_file, 'r') as f:
-            content = f.read()
+        lines = request.args.get('lines', LOG_TAIL_LINES, type=int)
+        content = '\n'.join(tail_lines(log_file, lines))
         
-        # Check if script is still running
-        is_running = False
-        scripts_dir = Path(__file__).parent / 'scripts'
-        try:
-            proc = subprocess.run(['pgrep', '-f', f'tp{tp_number}'], capture_output=True)
-            is_running = proc.returncode == 0
-        except:
-            pass
+        is_running = jobs.is_running(f'tp{tp_number}')
         
         return jsonify({'success': True, 'logs': content, 'size': file_size, 'is_running': is_running})
     except Exception as e:
@@ -2031,63 +2214,34 @@ def api_labs_run_sequence():
     data = request.json or {}
     start_tp = data.get('start', '01')
     end_tp = data.get('end', '03')
-    
-    all_tps = ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10', '11', '12', '13', '14', '15']
+    workers = data.get('workers', 1)
     
     try:
-        start_idx = all_tps.index(start_tp)
-        end_idx = all_tps.index(end_tp) + 1
-        tps_to_run = all_tps[start_idx:end_idx]
-    except ValueError:
+        tps_to_run = lab_range(start_tp, end_tp)
+    except (TypeError, ValueError):
         return jsonify({'success': False, 'error': f'Invalid range: {start_tp} to {end_tp}'})
+    try:
+        workers = max(1, int(workers))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': f'Invalid workers: {workers}'})
     
-    # Create a master script that runs all TPs in sequence
-    scripts_dir = Path(__file__).parent / 'scripts'
+    # Same DAG executor as the CLI: per-lab logs land in /tmp/tpNN.log (the
+    # per-lab log viewer), the combined timeline in the sequence log
     log_file = f'/tmp/tp-sequence-{start_tp}-{end_tp}.log'
-    
-    tp_map = {
-        '01': 'tp01-system-readiness.sh', '02': 'tp02-installation-binaire.sh',
-        '03': 'tp03-creation-instance.sh', '04': 'tp04-fichiers-critiques.sh',
-        '05': 'tp05-gestion-stockage.sh', '06': 'tp06-securite-acces.sh',
-        '07': 'tp07-flashback.sh', '08': 'tp08-rman.sh',
-        '09': 'tp09-dataguard.sh', '10': 'tp10-tuning.sh',
-        '11': 'tp11-patching.sh', '12': 'tp12-multitenant.sh',
-        '13': 'tp13-ai-foundations.sh', '14': 'tp14-mobilite-concurrence.sh',
-        '15': 'tp15-asm-rac-concepts.sh',
-    }
-    
-    script_lines = ['#!/bin/bash', 'set -e', f'echo "=== Running TPs {start_tp} to {end_tp} ==="', f'echo "Started: $(date)"', '']
-    
-    for tp in tps_to_run:
-        script_name = tp_map.get(tp, '')
-        script_path = scripts_dir / script_name
-        if script_path.exists():
-            script_lines.append(f'echo ""')
-            script_lines.append(f'echo "============================================="')
-            script_lines.append(f'echo "=== TP{tp}: {script_name} ==="')
-            script_lines.append(f'echo "============================================="')
-            script_lines.append(f'bash {script_path}')
-            script_lines.append(f'echo "=== TP{tp} completed ==="')
-    
-    script_lines.append('')
-    script_lines.append('echo ""')
-    script_lines.append(f'echo "=== All TPs {start_tp} to {end_tp} completed ==="')
-    script_lines.append(f'echo "Finished: $(date)"')
-    
-    master_script = '/tmp/tp-sequence.sh'
-    with open(master_script, 'w') as f:
-        f.write('\n'.join(script_lines))
-    
-    os.chmod(master_script, 0o755)
-    
-    cmd = f'nohup bash {master_script} > {log_file} 2>&1 &'
-    subprocess.Popen(cmd, shell=True)
+    cmd = f'oradba labs run --from {start_tp} --to {end_tp} --workers {workers} --log-dir /tmp'
+    result = start_job(f'TP sequence {start_tp}-{end_tp}', cmd, log_file, key='tp-sequence',
+                       resource=INSTANCE_EXCLUSIVE)
+    if not result['success']:
+        return jsonify(result)
     
     return jsonify({
         'success': True,
-        'message': f'Running TPs {start_tp} to {end_tp} in sequence',
+        'message': (result.get('message')
+                    or f'Running TPs {start_tp} to {end_tp} ({workers} worker(s))'),
+        'queued': result['queued'],
         'tps': tps_to_run,
-        'log_file': log_file
+        'log_file': log_file,
+        'job_id': result['job_id']
     })
 
 
@@ -2106,21 +2260,62 @@ def api_labs_sequence_log():
     
     try:
         file_size = os.path.getsize(log_file)
-        with open(log_file, 'r') as f:
-            content = f.read()
+        lines = request.args.get('lines', LOG_TAIL_LINES, type=int)
+        content = '\n'.join(tail_lines(log_file, lines))
         
-        is_running = False
-        try:
-            proc = subprocess.run(['pgrep', '-f', 'tp-sequence.sh'], capture_output=True)
-            is_running = proc.returncode == 0
-        except:
-            pass
+        is_running = jobs.is_running('tp-sequence')
         
         return jsonify({'success': True, 'logs': content, 'size': file_size, 'is_running': is_running})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+@app.route('/api/jobs')
+@login_required
+def api_jobs():
+    """API: List background jobs (?key=tp04, ?active=1)"""
+    key = request.args.get('key')
+    active_only = request.args.get('active', '0') in ('1', 'true')
+    return jsonify({'success': True,
+                    'jobs': [j.to_dict() for j in jobs.list(key=key, active_only=active_only)]})
+
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def api_job_status(job_id):
+    """API: Job status, optionally with the tail of its log (?lines=N)"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'})
+
+    result = {'success': True, 'job': job.to_dict(), 'queue_position': jobs.queue_position(job_id)}
+    lines = request.args.get('lines', 0, type=int)
+    if lines and os.path.exists(job.log_file):
+        result['logs'] = '\n'.join(tail_lines(job.log_file, lines))
+    return jsonify(result)
+
+
+@app.route('/api/scheduler')
+@login_required
+def api_scheduler():
+    """API: Running heavy operations, queue with positions, and limits"""
+    return jsonify({'success': True, **jobs.status()})
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+@admin_required
+def api_job_cancel(job_id):
+    """API: Cancel a running job (SIGTERM, then SIGKILL)"""
+    if not jobs.cancel(job_id):
+        return jsonify({'success': False, 'error': f'Job {job_id} is not running'})
+    return jsonify({'success': True, 'message': f'Cancellation requested for job {job_id}'})
+
+
 # ============================================================================
 # MISSING STORAGE API ROUTES (referenced by storage.html)
 # ============================================================================
@@ -2258,12 +2453,14 @@ def api_rman_configure():
     """API: Configure RMAN"""
     data = request.json or {}
     retention = data.get('retention', 7)
+    # Parallelism chosen by `oradba rman tune --apply`, if it was run
+    parallelism = int(load_rman_settings().get('parallelism', 2))
     
     oracle_home = os.environ.get('ORACLE_HOME', '/u01/app/oracle/product/19.3.0/dbhome_1')
     rman_cmds = f"""
 CONFIGURE RETENTION POLICY TO RECOVERY WINDOW OF {retention} DAYS;
 CONFIGURE CONTROLFILE AUTOBACKUP ON;
-CONFIGURE DEVICE TYPE DISK PARALLELISM 2;
+CONFIGURE DEVICE TYPE DISK PARALLELISM {parallelism};
 CONFIGURE BACKUP OPTIMIZATION ON;
 """
     
@@ -2288,7 +2485,11 @@ def api_flashback_database():
     else:
         return jsonify({'success': False, 'error': 'Provide SCN or timestamp'})
     
-    output = run_sqlplus(sql)
+    try:
+        with jobs.hold('Flashback database'):
+            output = run_sqlplus(sql)
+    except SchedulerBusy as e:
+        return jsonify({'success': False, 'error': str(e)})
     return jsonify({'success': True, 'output': output})
 
 
@@ -2447,10 +2648,11 @@ echo "Clients can mount with: mount {server_ip}:{export_path} {mount_point}"
     os.chmod(script_path, 0o755)
     
     log_file = '/tmp/nfs-setup.log'
-    cmd = f'nohup bash {script_path} > {log_file} 2>&1 &'
-    subprocess.Popen(cmd, shell=True)
-    
-    return jsonify({'success': True, 'message': 'NFS configuration started', 'log_file': log_file})
+    result = start_job('NFS configuration', f'bash {script_path}', log_file, key='nfs-setup',
+                       resource=LIGHT)
+    if result['success']:
+        result.setdefault('message', 'NFS configuration started')
+    return jsonify(result)
 
 
 @app.route('/api/cluster/nfs/test')
@@ -2500,7 +2702,12 @@ def api_cluster_asm_status():
 @admin_required
 def api_cluster_start():
     """API: Start cluster services"""
-    output = run_shell_command('crsctl start has 2>/dev/null || echo "Grid not installed"', as_oracle=False)
+    try:
+        with jobs.hold('Start cluster services'):
+            output = run_shell_command('crsctl start has 2>/dev/null || echo "Grid not installed"',
+                                       as_oracle=False)
+    except SchedulerBusy as e:
+        return jsonify({'success': False, 'error': str(e)})
     return jsonify({'success': True, 'output': output})
 
 
@@ -2509,7 +2716,12 @@ def api_cluster_start():
 @admin_required
 def api_cluster_stop():
     """API: Stop cluster services"""
-    output = run_shell_command('crsctl stop has 2>/dev/null || echo "Grid not installed"', as_oracle=False)
+    try:
+        with jobs.hold('Stop cluster services'):
+            output = run_shell_command('crsctl stop has 2>/dev/null || echo "Grid not installed"',
+                                       as_oracle=False)
+    except SchedulerBusy as e:
+        return jsonify({'success': False, 'error': str(e)})
     return jsonify({'success': True, 'output': output})
 
 
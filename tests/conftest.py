@@ -123,6 +123,67 @@ def sample_oracle_zip(tmp_path):
     return str(zip_path)
 
 
+class FakeOracleClient:
+    """OracleClient stand-in answering from registered rules.
+
+    on() / on_plsql() register an answer for statements containing a
+    needle (a substring, or a tuple of substrings that must all appear);
+    the first matching rule wins and unmatched statements get no rows.
+    An answer is a list of rows (DBMS_OUTPUT lines for plsql) or a
+    callable taking the statement and returning them; error= makes the
+    call fail. Every statement is recorded in queries/blocks/spooled.
+    """
+
+    def __init__(self):
+        self.rules = []
+        self.plsql_rules = []
+        self.queries = []
+        self.blocks = []
+        self.spooled = []
+        self.spool_text = ''
+        self.spool_error = None
+
+    def on(self, needle, rows=(), error=None):
+        self.rules.append((needle, rows, error))
+        return self
+
+    def on_plsql(self, needle, lines=(), error=None):
+        self.plsql_rules.append((needle, lines, error))
+        return self
+
+    @staticmethod
+    def _answer(rules, text):
+        for needle, answer, error in rules:
+            needles = (needle,) if isinstance(needle, str) else needle
+            if all(n in text for n in needles):
+                if error:
+                    return False, [], error
+                return True, list(answer(text) if callable(answer) else answer), ''
+        return True, [], ''
+
+    def query(self, sql):
+        self.queries.append(sql)
+        return self._answer(self.rules, sql)
+
+    def plsql(self, block, **kwargs):
+        self.blocks.append(block)
+        return self._answer(self.plsql_rules, block)
+
+    def spool(self, sql, path, **kwargs):
+        self.spooled.append(sql)
+        if self.spool_error:
+            return False, self.spool_error
+        with open(path, 'w') as f:
+            f.write(self.spool_text)
+        return True, ''
+
+
+@pytest.fixture
+def fake_client():
+    """A FakeOracleClient with no rules; tests register their answers"""
+    return FakeOracleClient()
+
+
 @pytest.fixture(autouse=True)
 def reset_env_after_test():
     """Reset environment after each test"""
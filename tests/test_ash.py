@@ -0,0 +1,68 @@
+"""
+Tests for the incremental ASH sampler and activity window
+"""
+
+from oracledba.modules.ash import ActivityWindow, ASHSampler, ash_row
+
+
+def _values(sql_id='a1', wait_class='CPU', event='ON CPU', module='app', session='10,1'):
+    return {'sql_id': sql_id, 'wait_class': wait_class, 'event': event,
+            'module': module, 'session': session}
+
+
+class TestActivityWindow:
+    """Test aggregation over the sliding window"""
+
+    def test_top(self):
+        window = ActivityWindow(window=10)
+        for i in range(6):
+            window.add(100 + i, _values())
+        for i in range(4):
+            window.add(100 + i, _values('b2', 'User I/O', 'db file sequential read'))
+        top = window.top('sql_id')
+        assert top == [('a1', 6, 60.0, 0.6), ('b2', 4, 40.0, 0.4)]
+        assert window.top('wait_class', n=1)[0][0] == 'CPU'
+        # Interned: one code per distinct value
+        assert window.names['session'] == ['10,1']
+
+    def test_prune_and_compact(self):
+        window = ActivityWindow(window=60)
+        for t in range(3000):
+            window.add(float(t), _values(sql_id=f"s{t % 7}"))
+        window.prune(3000)
+        assert len(window) == 60          # samples from t=2940 on
+        assert len(window.times) < 3000   # compacted
+        assert sum(c for _, c, _, _ in window.top('sql_id')) == 60
+
+    def test_recent_seconds_and_timeline(self):
+        window = ActivityWindow(window=60)
+        window.add(100.0, _values('old'))
+        window.add(150.0, _values('new', 'Commit', 'log file sync'))
+        assert [v for v, _, _, _ in window.top('sql_id', seconds=10)] == ['new']
+        assert window.timeline(bucket=60) == [(60, {'CPU': 1}), (120, {'Commit': 1})]
+
+
+class TestSampler:
+    """Test incremental polling by sample_id"""
+
+    def test_incremental(self, fake_client):
+        first = [('101', '2030-01-01 10:00:00', '10', '1', 'a1', 'ON CPU', '', '', 'app'),
+                 ('102', '2030-01-01 10:00:01', '11', '5', '', 'WAITING', 'User I/O',
+                  'db file scattered read', '')]
+        second = [('103', '2030-01-01 10:00:02', '10', '1', 'a1', 'ON CPU', '', '', 'app')]
+        batches = [first, second]
+        client = fake_client.on('v$active_session_history',
+                                lambda sql: batches.pop(0) if batches else [])
+        sampler = ASHSampler(client, window=600)
+        assert sampler.poll() == 2
+        assert 'SYSTIMESTAMP' in client.queries[0]
+        assert sampler.poll() == 1
+        assert 'sample_id > 102' in client.queries[1]
+        assert sampler.top('sql_id')[0][:2] == ('a1', 2)
+        assert ('db file scattered read', 1, 33.3, 0.0) in sampler.top('event')
+        assert sampler.top('module')[1][0] == '-'
+
+    def test_malformed_row(self):
+        assert ash_row(('x', 'bad')) is None
+        assert ash_row(('5', '2030-01-01 10:00:00', '1', '2', '', 'ON CPU', '', '', ''))[2][
+            'wait_class'] == 'CPU'
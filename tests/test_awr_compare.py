@@ -0,0 +1,118 @@
+"""
+Tests for the AWR period comparison engine
+"""
+
+import pytest
+from oracledba.modules.awr_compare import (
+    AWRComparer, build_profile, compare_profiles, deltas, parse_snap_range,
+)
+
+HOUR = 3600
+
+
+def _profile(db_time_s, events=None, sql=None, commits=3600, reads=36000):
+    return build_profile(
+        HOUR,
+        {'DB time': db_time_s * 1e6, 'DB CPU': db_time_s / 2 * 1e6},
+        {'user commits': commits, 'physical reads': reads},
+        events or {},
+        sql or {},
+    )
+
+
+class TestHelpers:
+    """Test range parsing and counter deltas"""
+
+    def test_parse_snap_range(self):
+        assert parse_snap_range('100-110') == (100, 110)
+        with pytest.raises(ValueError):
+            parse_snap_range('110-100')
+        with pytest.raises(ValueError):
+            parse_snap_range('100')
+
+    def test_deltas_drop_restarts(self):
+        assert deltas({'a': 10, 'b': 50, 'c': 1}, {'a': 25, 'b': 5, 'd': 7}) == {'a': 15}
+
+
+class TestProfile:
+    """Test normalization per second, transaction and execution"""
+
+    def test_normalized(self):
+        profile = _profile(
+            1800,
+            events={'db file sequential read': ('User I/O', 360000, 720e6),
+                    'SQL*Net message from client': ('Idle', 10, 9e9)},
+            sql={'abc': (7200, 3600e6, 1800e6, 720000, 0)})
+        assert profile['time_model']['DB time'] == 0.5
+        assert profile['load']['physical reads'] == {'per_sec': 10.0, 'per_txn': 10.0}
+        event = profile['events']['db file sequential read']
+        assert event['aas'] == 0.2 and event['avg_ms'] == 2.0 and event['waits_per_sec'] == 100
+        assert 'SQL*Net message from client' not in profile['events']
+        sql = profile['sql']['abc']
+        assert sql['ela_ms_per_exec'] == 500.0 and sql['gets_per_exec'] == 100
+        assert sql['execs_per_sec'] == 2.0
+
+
+class TestCompare:
+    """Test ranking of regressions"""
+
+    def test_ranking(self):
+        base = _profile(1800,
+                        events={'log file sync': ('Commit', 36000, 36e6)},
+                        sql={'fast': (36000, 36e6, 18e6, 360000, 0),       # 1 ms/exec, 10/s
+                             'rare': (2, 2e6, 1e6, 10, 0)})               # 1 s/exec
+        target = _profile(5400,
+                          events={'log file sync': ('Commit', 36000, 1800e6)},
+                          sql={'fast': (36000, 360e6, 36e6, 3600000, 0),  # 10 ms/exec
+                               'rare': (2, 20e6, 1e6, 10, 0),             # 10 s/exec
+                               'new1': (100, 720e6, 0, 0, 0)},
+                          reads=108000)
+        result = compare_profiles(base, target)
+        names = [(r['kind'], r['name']) for r in result['regressions']]
+        # DB time +1 AAS, log file sync +0.49, new SQL +0.2, fast SQL +0.09
+        assert names[0] == ('time model', 'DB time')
+        assert names.index(('event', 'log file sync')) < names.index(('sql', 'new1'))
+        assert names.index(('sql', 'new1')) < names.index(('sql', 'fast'))
+        # 10x slower but runs twice an hour: below the reporting threshold
+        assert ('sql', 'rare') not in names
+        fast = next(r for r in result['regressions'] if r['name'] == 'fast')
+        assert fast['change_pct'] == 900.0 and fast['impact'] == 0.09
+        assert result['load'] == [{'name': 'physical reads', 'base_per_sec': 10.0,
+                                   'target_per_sec': 30.0, 'change_pct': 200.0,
+                                   'base_per_txn': 10.0, 'target_per_txn': 30.0}]
+
+    def test_no_regressions(self):
+        result = compare_profiles(_profile(1800), _profile(1700))
+        assert result['regressions'] == [] and result['load'] == []
+
+
+class TestComparer:
+    """Test fetching deltas with a fake client"""
+
+    def test_profile(self, fake_client):
+        fake_client.on('end_interval_time', [('3600',)])
+        fake_client.on('dba_hist_sys_time_model', [('1', 'DB time', '0'),
+                                                   ('2', 'DB time', '3600000000')])
+        fake_client.on('dba_hist_system_event', [('1', 'log file sync', 'Commit', '10', '1000'),
+                                                 ('2', 'log file sync', 'Commit', '20', '2001000')])
+        fake_client.on('dba_hist_sqlstat', [('abc', '10', '1000000', '500000', '100', '0')])
+        profile = AWRComparer(fake_client, dbid=1).profile(1, 2)
+        assert profile['time_model']['DB time'] == 1.0
+        assert profile['events']['log file sync']['avg_ms'] == 200.0
+        assert profile['sql']['abc']['ela_ms_per_exec'] == 100.0
+
+    def test_large_counters(self, fake_client):
+        # A long-running instance: counters far past 1e10, small deltas
+        fake_client.on('end_interval_time', [('3600',)])
+        fake_client.on('dba_hist_sys_time_model', [('1', 'DB time', '98765432101234'),
+                                                   ('2', 'DB time', '98768932101234')])
+        fake_client.on('dba_hist_sysstat', [('1', 'user commits', '12345678901234'),
+                                            ('2', 'user commits', '12345678904834')])
+        fake_client.on('dba_hist_system_event',
+                       [('1', 'log file sync', 'Commit', '55555555555', '77777777777777'),
+                        ('2', 'log file sync', 'Commit', '55555555565', '77777779777777')])
+        profile = AWRComparer(fake_client, dbid=1).profile(1, 2)
+        assert all('TO_CHAR(SUM(' in q for q in fake_client.queries[1:])
+        assert profile['time_model']['DB time'] == 3500000000 / 1e6 / 3600
+        assert profile['load']['user commits']['per_sec'] == 1.0
+        assert profile['events']['log file sync']['avg_ms'] == 200.0
@@ -0,0 +1,63 @@
+"""
+Tests for the JSONL event stream
+"""
+
+from oracledba.modules.install import InstallManager
+from oracledba.utils.events import EventStream, read_events, step_progress
+
+
+class TestEventStream:
+    """Test writing, reading and summarizing events"""
+
+    def test_round_trip_and_partial_line(self, tmp_path):
+        path = tmp_path / "run.events.jsonl"
+        stream = EventStream(path)
+        stream.emit('step_start', phase='install', step=1, total=2, title='System')
+        stream.close()
+        with open(path, 'a') as f:
+            f.write('{"ts": 1, "event": "step_')  # writer still busy
+
+        events = read_events(path)
+        assert len(events) == 1
+        assert events[0]['title'] == 'System'
+
+    def test_step_progress(self):
+        events = [
+            {'event': 'run_start', 'steps': ['A', 'B', 'C']},
+            {'event': 'step_start', 'phase': 'install', 'step': 1, 'total': 3},
+            {'event': 'step_end', 'phase': 'install', 'step': 1, 'success': True, 'duration': 4.5},
+            {'event': 'warning', 'message': 'root.sh returned 1 (continuing)'},
+            {'event': 'step_start', 'phase': 'install', 'step': 2, 'total': 3},
+            {'event': 'step_start', 'phase': 'labs', 'step': 9, 'total': 12},
+        ]
+        progress = step_progress(events)
+        assert progress['current_step'] == 2
+        assert progress['total_steps'] == 3
+        assert progress['step_statuses'] == {1: 'complete', 2: 'running'}
+        assert progress['step_durations'] == {1: 4.5}
+        assert progress['warnings'] == ['root.sh returned 1 (continuing)']
+        assert not progress['finished']
+
+    def test_missing_file(self, tmp_path):
+        assert read_events(tmp_path / "none.jsonl") == []
+
+
+class TestInstallManagerEvents:
+    """Test that command execution is recorded"""
+
+    def test_cmd_spawn_and_exit(self, tmp_path):
+        manager = InstallManager()
+        manager.log_dir = tmp_path
+        manager._open_log("unit")
+        try:
+            rc = manager._stream_cmd(['bash', '-c', 'echo hi; exit 3'])
+            manager._warn("disk almost full")
+        finally:
+            manager._close_log()
+
+        assert rc == 3
+        events = read_events(tmp_path / "unit.events.jsonl")
+        assert [e['event'] for e in events] == ['cmd_spawn', 'cmd_exit', 'warning']
+        assert events[1]['rc'] == 3
+        assert events[0]['pid'] == events[1]['pid']
+        assert 'hi' in (tmp_path / "unit.log").read_text()
@@ -0,0 +1,63 @@
+"""
+Tests for the step-duration history and ETA prediction
+"""
+
+import pytest
+from oracledba.utils.events import step_progress
+from oracledba.utils.history import DurationHistory, profile_key
+
+SMALL = {'cpus': 2, 'ram_gb': 8, 'disk': 'hdd'}
+BIG = {'cpus': 32, 'ram_gb': 256, 'disk': 'ssd'}
+
+
+@pytest.fixture
+def history(tmp_path):
+    return DurationHistory(tmp_path / "step-history.json", profile=SMALL)
+
+
+class TestDurationHistory:
+    """Test recording, medians and profile fallback"""
+
+    def test_median_of_own_profile(self, history):
+        for duration in (100, 300, 200):
+            history.record('install', 'database', duration)
+        assert history.expected('install', 'database') == 200
+        assert history.expected('install', 'software') is None
+
+    def test_falls_back_to_other_profiles(self, history, tmp_path):
+        other = DurationHistory(tmp_path / "step-history.json", profile=BIG)
+        other.record('install', 'database', 60)
+        assert history.samples('install', 'database') == ([60], False)
+        history.record('install', 'database', 900)
+        assert history.samples('install', 'database') == ([900], True)
+        assert profile_key(SMALL) == 'cpu2-ram8g-hdd'
+
+
+class TestEstimate:
+    """Test ETA computation from step events"""
+
+    def test_running_step_and_pending_steps(self, history):
+        history.record('install', 'system', 50)
+        history.record('install', 'software', 600)
+        history.record('install', 'database', 1200)
+        events = [
+            {'ts': 1000, 'event': 'run_start', 'phase': 'install',
+             'steps': ['a', 'b', 'c'], 'keys': ['system', 'software', 'database']},
+            {'ts': 1000, 'event': 'step_start', 'phase': 'install', 'step': 1, 'total': 3},
+            {'ts': 1050, 'event': 'step_end', 'phase': 'install', 'step': 1, 'success': True},
+            {'ts': 1050, 'event': 'step_start', 'phase': 'install', 'step': 2, 'total': 3},
+        ]
+        eta = history.estimate(step_progress(events), now=1150)
+        assert eta['steps'][1]['remaining'] == 0
+        assert eta['steps'][2] == {'expected': 600, 'remaining': 500}
+        assert eta['steps'][3]['remaining'] == 1200
+        assert eta['remaining'] == 1700
+        assert eta['eta'] == 1150 + 1700
+        assert eta['complete']
+
+    def test_missing_history_is_partial(self, history):
+        events = [{'ts': 1, 'event': 'run_start', 'phase': 'install',
+                   'steps': ['a'], 'keys': ['database']}]
+        eta = history.estimate(step_progress(events), now=10)
+        assert eta['steps'][1]['remaining'] is None
+        assert not eta['complete']
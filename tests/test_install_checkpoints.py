@@ -0,0 +1,72 @@
+"""
+Tests for checkpointed, resumable install_all
+"""
+
+import pytest
+from oracledba.modules.install import InstallManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """InstallManager whose steps are stubs recording their calls"""
+    mgr = InstallManager()
+    mgr.log_dir = tmp_path
+    mgr.calls = []
+    mgr.fail = set()
+
+    def stub(step_id):
+        def run():
+            mgr.calls.append(step_id)
+            return step_id not in mgr.fail
+        return run
+
+    for step_id in ('system', 'binaries', 'software', 'database'):
+        monkeypatch.setattr(mgr, f'_step_{step_id}', stub(step_id))
+    monkeypatch.setattr(mgr, '_bootstrap', lambda: mgr.calls.append('bootstrap'))
+    monkeypatch.setattr(mgr, '_verify_step', lambda step_id: (True, 'stub'))
+    return mgr
+
+
+class TestResume:
+    """Test skipping, forcing and invalidation of completed steps"""
+
+    def test_rerun_resumes_after_failed_step(self, manager):
+        manager.fail = {'database'}
+        assert not manager.install_all(auto_yes=True)
+        assert manager.calls == ['bootstrap', 'system', 'binaries', 'software', 'database']
+        assert set(manager._load_checkpoints()) == {'system', 'binaries', 'software'}
+
+        manager.fail = set()
+        manager.calls = []
+        assert manager.install_all(auto_yes=True)
+        assert manager.calls == ['bootstrap', 'database']
+
+    def test_nothing_left_skips_bootstrap(self, manager):
+        manager.install_all(auto_yes=True)
+        manager.calls = []
+        assert manager.install_all(auto_yes=True)
+        assert manager.calls == []
+
+    def test_stale_fingerprint_reruns_step(self, manager, monkeypatch):
+        manager.install_all(auto_yes=True)
+        manager.calls = []
+        monkeypatch.setattr(manager, '_verify_step',
+                            lambda step_id: (step_id != 'software', 'root.sh marker missing'))
+        manager.install_all(auto_yes=True)
+        assert manager.calls == ['bootstrap', 'software']
+
+    def test_force_and_from_step(self, manager):
+        manager.install_all(auto_yes=True)
+        manager.calls = []
+        manager.install_all(auto_yes=True, force_steps=['binaries'])
+        assert manager.calls == ['bootstrap', 'binaries']
+
+        manager.calls = []
+        manager.install_all(auto_yes=True, from_step='software')
+        assert manager.calls == ['bootstrap', 'software', 'database']
+
+    def test_no_resume_runs_everything(self, manager):
+        manager.install_all(auto_yes=True)
+        manager.calls = []
+        manager.install_all(auto_yes=True, resume=False)
+        assert manager.calls == ['bootstrap', 'system', 'binaries', 'software', 'database']
@@ -0,0 +1,55 @@
+"""
+Tests for the background job registry
+"""
+
+import pytest
+from oracledba.utils.jobs import JobManager, CANCELLED, FAILED, LOST, SUCCEEDED
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return JobManager(state_file=tmp_path / "jobs.json")
+
+
+class TestJobManager:
+    """Test start, exit codes, cancellation and restart adoption"""
+
+    def test_exit_code_and_log(self, manager, tmp_path):
+        log = tmp_path / "ok.log"
+        job = manager.start('echo', 'echo hello; exit 0', log)
+        job = manager.wait(job.id, timeout=10)
+        assert job.state == SUCCEEDED
+        assert job.rc == 0
+        assert log.read_text().strip() == 'hello'
+
+        failing = manager.wait(manager.start('fail', 'exit 4', tmp_path / "f.log").id, timeout=10)
+        assert failing.state == FAILED
+        assert failing.rc == 4
+
+    def test_is_running_and_cancel(self, manager, tmp_path):
+        job = manager.start('sleeper', 'sleep 30', tmp_path / "s.log", key='tp04')
+        assert manager.is_running('tp04')
+        assert manager.cancel(job.id, grace=2)
+        job = manager.wait(job.id, timeout=10)
+        assert job.state == CANCELLED
+        assert not manager.is_running('tp04')
+
+    def test_restart_reads_rc_file(self, manager, tmp_path):
+        job = manager.wait(manager.start('quick', 'exit 3', tmp_path / "q.log").id, timeout=10)
+
+        # Simulate a server that died while the job was running
+        reloaded = JobManager(state_file=tmp_path / "jobs.json")
+        adopted = reloaded.get(job.id)
+        adopted.state = 'running'
+        reloaded._refresh_adopted()
+        assert adopted.state == FAILED
+        assert adopted.rc == 3
+
+    def test_restart_without_rc_is_lost(self, manager, tmp_path):
+        job = manager.wait(manager.start('quick', 'true', tmp_path / "q.log").id, timeout=10)
+        reloaded = JobManager(state_file=tmp_path / "jobs.json")
+        adopted = reloaded.get(job.id)
+        adopted.state = 'running'
+        adopted.rc_file = str(tmp_path / "missing.rc")
+        reloaded._refresh_adopted()
+        assert adopted.state == LOST
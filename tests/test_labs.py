@@ -0,0 +1,95 @@
+"""
+Tests for the lab catalog and DAG executor
+"""
+
+import time
+import threading
+import pytest
+from oracledba.modules.labs import LABS, LabExecutor, db_mode, lab_range
+
+
+class RecordingRunner:
+    """Fake lab runner that records concurrency"""
+
+    def __init__(self, fail=(), delay=0.05):
+        self.fail = set(fail)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = set()
+        self.overlaps = []
+        self.order = []
+
+    def __call__(self, lab_num, log_file):
+        with self.lock:
+            self.overlaps.append((lab_num, set(self.running)))
+            self.running.add(lab_num)
+            self.order.append(lab_num)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running.discard(lab_num)
+        return lab_num not in self.fail
+
+
+class TestCatalog:
+    """Test the lab catalog"""
+
+    def test_dependencies_exist(self):
+        for lab in LABS.values():
+            assert all(dep in LABS for dep in lab['depends'])
+
+    def test_lab_range(self):
+        assert lab_range('04', '07') == ['04', '05', '06', '07']
+        with pytest.raises(ValueError):
+            lab_range('07', '04')
+
+    def test_db_modes(self):
+        assert db_mode('01') is None
+        assert db_mode('04') == 'exclusive'
+        assert db_mode('05') == 'shared'
+
+
+class TestLabExecutor:
+    """Test ordering, exclusivity and failure propagation"""
+
+    def test_respects_dependencies(self, tmp_path):
+        runner = RecordingRunner()
+        results = LabExecutor(runner, workers=4, log_dir=tmp_path).run(lab_range('01', '15'))
+
+        assert all(r['status'] == 'succeeded' for r in results.values())
+        position = {lab: i for i, lab in enumerate(runner.order)}
+        for lab_num, lab in LABS.items():
+            for dep in lab['depends']:
+                assert position[dep] < position[lab_num]
+        assert results['05']['log_file'] == str(tmp_path / 'tp05.log')
+
+    def test_runs_shared_labs_concurrently(self):
+        runner = RecordingRunner()
+        LabExecutor(runner, workers=3).run(['05', '06', '10'])
+        assert max(len(others) for _, others in runner.overlaps) >= 1
+
+    def test_exclusive_labs_run_alone(self):
+        runner = RecordingRunner()
+        LabExecutor(runner, workers=4).run(lab_range('04', '15'))
+        for lab_num, others in runner.overlaps:
+            if db_mode(lab_num) == 'exclusive':
+                assert not others
+            assert not any(db_mode(o) == 'exclusive' for o in others)
+
+    def test_failure_skips_dependents(self):
+        runner = RecordingRunner(fail={'04'})
+        events = []
+        executor = LabExecutor(runner, workers=2,
+                               on_event=lambda event, **f: events.append((event, f)))
+        results = executor.run(lab_range('04', '10'))
+
+        assert results['04']['status'] == 'failed'
+        for lab_num in ('07', '08', '09'):
+            assert results[lab_num]['status'] == 'skipped'
+            assert 'TP04' in results[lab_num]['reason']
+        for lab_num in ('05', '06', '10'):
+            assert results[lab_num]['status'] == 'succeeded'
+        assert sum(1 for event, _ in events if event == 'step_end') == 7
+
+    def test_unknown_lab(self):
+        with pytest.raises(ValueError):
+            LabExecutor(RecordingRunner()).run(['99'])
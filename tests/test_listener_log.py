@@ -0,0 +1,86 @@
+"""
+Tests for ListenerLogAnalyzer module
+"""
+
+import pytest
+from oracledba.modules.listener_log import ListenerLogAnalyzer, parse_line
+
+
+def _connect(ts, service='GDCPDB', host='10.0.0.5', program='sqlplus', rc=0):
+    return (f"{ts} * (CONNECT_DATA=(SERVICE_NAME={service})(CID=(PROGRAM={program})"
+            f"(HOST=client01)(USER=oracle))) * (ADDRESS=(PROTOCOL=tcp)(HOST={host})"
+            f"(PORT=50123)) * establish * {service} * {rc}\n")
+
+
+@pytest.fixture
+def listener_log(tmp_path):
+    """Listener log with two quiet minutes and one storm minute"""
+    lines = [_connect('19-OCT-2026 10:00:01')]
+    lines.append(_connect('19-OCT-2026 10:01:05', service='BAD', rc=12514))
+    lines.append("TNS-12514: TNS:listener does not currently know of service requested\n")
+    lines.append("19-OCT-2026 10:01:30 * service_update * GDCPROD * 0\n")
+    lines += [_connect('19-OCT-2026 10:02:%02d' % (i % 60), host='10.0.0.9') for i in range(100)]
+    path = tmp_path / "listener.log"
+    path.write_text(''.join(lines))
+    return path
+
+
+class TestParseLine:
+    """Test single-line parsing"""
+
+    def test_establish_record(self):
+        kind, key = parse_line(_connect('19-OCT-2026 10:00:01').strip().encode())
+        assert kind == 'connect'
+        assert key == ('2026-10-19 10:00', 'GDCPDB', '10.0.0.5', 'sqlplus', 0)
+
+    def test_tns_error_line(self):
+        assert parse_line(b"TNS-12541: TNS:no listener") == ('error', 'TNS-12541')
+
+    def test_service_update_ignored(self):
+        assert parse_line(b"19-OCT-2026 10:01:30 * service_update * GDCPROD * 0") is None
+
+
+class TestListenerLogAnalyzer:
+    """Test aggregation, caching and storm detection"""
+
+    def test_analyze_counts(self, listener_log, tmp_path):
+        analyzer = ListenerLogAnalyzer(listener_log, cache_dir=tmp_path / "cache")
+        stats = analyzer.analyze()
+
+        assert stats['total_connections'] == 102
+        assert stats['failed_connections'] == 1
+        assert stats['by_return_code'][12514] == 1
+        assert stats['tns_errors'] == {'TNS-12514': 1}
+        assert stats['per_minute']['2026-10-19 10:02'] == 100
+
+    def test_incremental_rerun_only_reads_new_bytes(self, listener_log, tmp_path):
+        analyzer = ListenerLogAnalyzer(listener_log, cache_dir=tmp_path / "cache")
+        first = analyzer.analyze()
+        assert analyzer.analyze()['new_bytes'] == 0
+
+        with open(listener_log, 'a') as f:
+            f.write(_connect('19-OCT-2026 10:03:00'))
+            f.write("19-OCT-2026 10:03:01 * (CONNECT_DATA=")  # partial line, not consumed
+
+        second = analyzer.analyze()
+        assert second['total_connections'] == first['total_connections'] + 1
+        assert second['offset'] < listener_log.stat().st_size
+
+    def test_chunked_matches_single_pass(self, listener_log, tmp_path):
+        whole = ListenerLogAnalyzer(listener_log, cache_dir=tmp_path / "a").analyze()
+        chunked = ListenerLogAnalyzer(listener_log,
+                                      cache_dir=tmp_path / "b").analyze(chunk_size=512)
+        assert chunked['per_minute'] == whole['per_minute']
+        assert chunked['lines'] == whole['lines']
+
+    def test_truncated_file_resets_cache(self, listener_log, tmp_path):
+        analyzer = ListenerLogAnalyzer(listener_log, cache_dir=tmp_path / "cache")
+        analyzer.analyze()
+        listener_log.write_text(_connect('19-OCT-2026 11:00:00'))
+        assert analyzer.analyze()['total_connections'] == 1
+
+    def test_find_storms(self, listener_log, tmp_path):
+        analyzer = ListenerLogAnalyzer(listener_log, cache_dir=tmp_path / "cache")
+        storms = analyzer.find_storms(analyzer.analyze(), factor=5, min_rate=50)
+        assert [s['minute'] for s in storms] == ['2026-10-19 10:02']
+        assert storms[0]['top_host'] == '10.0.0.9'
@@ -0,0 +1,94 @@
+"""
+Tests for queued logging utility
+"""
+
+import gzip
+import logging
+import queue
+from oracledba.utils.logger import (
+    BatchingQueueListener, GzipRotatingFileHandler, QueuedLogFile,
+)
+
+
+class TestQueuedLogFile:
+    """Test the background-written plain text log"""
+
+    def test_write_then_close_flushes_everything(self, tmp_path):
+        path = tmp_path / "install-all.log"
+        log = QueuedLogFile(path)
+        for i in range(1000):
+            log.write(f"line {i}\n")
+        log.close()
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1000
+        assert lines[-1] == 'line 999'
+
+    def test_truncates_previous_run(self, tmp_path):
+        path = tmp_path / "install-all.log"
+        path.write_text("old run\n")
+        log = QueuedLogFile(path)
+        log.write("new run\n")
+        log.close()
+        assert path.read_text() == "new run\n"
+
+
+class TestGzipRotatingFileHandler:
+    """Test size-based rotation with gzip"""
+
+    def test_rotated_files_are_gzipped(self, tmp_path):
+        path = tmp_path / "oracledba.log"
+        handler = GzipRotatingFileHandler(str(path), maxBytes=200, backupCount=2)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log_queue = queue.SimpleQueue()
+        listener = BatchingQueueListener(log_queue, handler, batch_size=8)
+        listener.start()
+        for i in range(50):
+            log_queue.put_nowait(logging.makeLogRecord({'msg': f"record {i:03d}",
+                                                        'levelno': logging.INFO}))
+        listener.stop()
+        handler.close()
+
+        rotated = tmp_path / "oracledba.log.1.gz"
+        assert rotated.exists()
+        assert not (tmp_path / "oracledba.log.3.gz").exists()
+        assert gzip.open(rotated, 'rt').read().startswith('record')
+        assert path.stat().st_size < 200
+        assert path.read_text().splitlines()[-1] == 'record 049'
+
+    def test_size_counts_encoded_bytes(self, tmp_path):
+        path = tmp_path / "oracledba.log"
+        handler = GzipRotatingFileHandler(str(path), maxBytes=100, backupCount=2)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        for _ in range(4):
+            # 20 characters, 40 bytes in UTF-8
+            handler.emit(logging.makeLogRecord({'msg': 'é' * 20, 'levelno': logging.INFO}))
+        handler.close()
+        assert (tmp_path / "oracledba.log.1.gz").exists()
+        assert path.stat().st_size < 100
+
+
+class TestBatchingQueueListener:
+    """Test that handlers are flushed per batch, not per record"""
+
+    def test_flushes_per_batch(self, tmp_path):
+        class CountingHandler(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.records = []
+                self.flushes = 0
+
+            def emit(self, record):
+                self.records.append(record)
+
+            def flush(self):
+                self.flushes += 1
+
+        handler = CountingHandler()
+        log_queue = queue.SimpleQueue()
+        for i in range(20):
+            log_queue.put_nowait(logging.makeLogRecord({'msg': str(i), 'levelno': logging.INFO}))
+        listener = BatchingQueueListener(log_queue, handler, batch_size=8)
+        listener.start()
+        listener.stop()
+        assert len(handler.records) == 20
+        assert 1 <= handler.flushes <= 5
@@ -0,0 +1,42 @@
+"""
+Tests for the sqlplus script the Oracle client sends
+"""
+
+import subprocess
+from oracledba.utils.oracle_client import OracleClient
+
+
+class TestScriptHeader:
+    """Test that numbers are not printed in scientific notation"""
+
+    def test_query_sets_numwidth(self, monkeypatch):
+        client = OracleClient(oracle_home='/nonexistent')
+        scripts = []
+
+        def run(script, as_sysdba, timeout):
+            scripts.append(script)
+            return True, ['                             10737418240|USERS'], ''
+
+        monkeypatch.setattr(client, '_run', run)
+        ok, rows, _ = client.query("SELECT bytes, tablespace_name FROM dba_data_files")
+        assert ok and rows == [('10737418240', 'USERS')]
+        assert 'SET NUMWIDTH 40' in scripts[0]
+
+    def test_spool_sets_numwidth(self, monkeypatch, tmp_path):
+        scripts = []
+
+        class Proc:
+            returncode = 0
+
+            def __init__(self, cmd, stdin, stdout, stderr, text, env):
+                pass
+
+            def communicate(self, script, timeout):
+                scripts.append(script)
+                return '', ''
+
+        monkeypatch.setattr(subprocess, 'Popen', Proc)
+        client = OracleClient(oracle_home='/nonexistent')
+        ok, _ = client.spool("SELECT 1 FROM dual", tmp_path / 'out.txt')
+        assert ok
+        assert 'NUMWIDTH 40' in scripts[0]
@@ -0,0 +1,109 @@
+"""
+Tests for the plan history store and plan flip detection
+"""
+
+import pytest
+from oracledba.modules.plan_history import PlanHistory, cursor_delta, find_flips
+
+SQL_ID = '7h35uxf5uhmm1'
+
+
+def _stat(sql_id, phv, execs, elapsed_ms, last_seen, gets=1000):
+    return {'sql_id': sql_id, 'plan_hash_value': phv, 'executions': execs,
+            'elapsed_us': elapsed_ms * 1000 * execs, 'buffer_gets': gets * execs,
+            'last_seen': last_seen}
+
+
+class TestFindFlips:
+    """Test detection of slower plans"""
+
+    def test_flip(self):
+        stats = [_stat('a', 111, 100, 5, last_seen=10),
+                 _stat('a', 222, 50, 40, last_seen=20, gets=90000),
+                 _stat('b', 333, 100, 5, last_seen=10),
+                 _stat('b', 444, 100, 6, last_seen=20)]
+        flips = find_flips(stats, factor=2.0)
+        assert len(flips) == 1
+        flip = flips[0]
+        assert (flip['sql_id'], flip['plan_hash_value'], flip['good_plan']) == ('a', 222, 111)
+        assert flip['ratio'] == 8.0 and flip['current_gets'] == 90000
+        assert flip['added_seconds'] == 1.8
+
+    def test_back_on_good_plan(self):
+        stats = [_stat('a', 111, 100, 5, last_seen=30), _stat('a', 222, 50, 40, last_seen=20)]
+        assert find_flips(stats) == []
+
+    def test_min_execs(self):
+        stats = [_stat('a', 111, 3, 5, last_seen=10), _stat('a', 222, 50, 40, last_seen=20)]
+        assert find_flips(stats, min_execs=5) == []
+        assert len(find_flips(stats, min_execs=1)) == 1
+
+
+class TestCursorDelta:
+    """Test deltas from cumulative v$sql counters"""
+
+    def test_delta_and_reload(self):
+        assert cursor_delta((10, 100, 50, 1000), None) == (10, 100, 50, 1000)
+        assert cursor_delta((15, 160, 70, 1500), (10, 100, 50, 1000)) == (5, 60, 20, 500)
+        # Aged out and reloaded: counters restarted
+        assert cursor_delta((3, 30, 10, 300), (10, 100, 50, 1000)) == (3, 30, 10, 300)
+
+
+class TestPlanHistory:
+    """Test capture, flip detection and baselines with a fake client"""
+
+    def test_capture_check_baseline(self, tmp_path, fake_client):
+        cursors = []
+        client = fake_client.on('FROM v$sql ', lambda sql: cursors)
+        client.on('v$sql_plan', [
+            ('222', '0', '-1', '0', 'SELECT STATEMENT', '', '9', ''),
+            ('222', '1', '0', '1', 'TABLE ACCESS FULL', 'ORDERS', '8', '1000')])
+        client.on_plsql('DBMS_SPM', ['1'])
+        history = PlanHistory(tmp_path / 'plans.db', client)
+        cursors[:] = [(SQL_ID, '111', '100', '500000', '400000', '100000', 'APP', 'SELECT 1')]
+        assert history.capture(now=1000) == {'cursors': 1, 'samples': 1, 'new_plans': 1}
+        # Same cursor, no new executions; the plan flips to 222
+        cursors[:] = [(SQL_ID, '111', '100', '500000', '400000', '100000', 'APP', 'SELECT 1'),
+                      (SQL_ID, '222', '20', '800000', '700000', '900000', 'APP', 'SELECT 1')]
+        assert history.capture(now=2000) == {'cursors': 2, 'samples': 1, 'new_plans': 1}
+        assert [s['operation'] for s in history.plan_steps(222)] == [
+            'SELECT STATEMENT', 'TABLE ACCESS FULL']
+
+        flips = history.check(factor=2.0)
+        assert [(f['plan_hash_value'], f['good_plan'], f['ratio']) for f in flips] == [
+            (222, 111, 8.0)]
+        assert flips[0]['sql_text'] == 'SELECT 1'
+
+        assert history.capture_baseline(SQL_ID, 111) == 1
+        assert f"sql_id => '{SQL_ID}', plan_hash_value => 111" in client.blocks[0]
+        assert history.conn.execute("SELECT baseline FROM flip").fetchone()[0]
+        history.close()
+
+    def test_capture_large_sums(self, tmp_path, fake_client):
+        cursors = []
+        fake_client.on('FROM v$sql ', lambda sql: cursors)
+        history = PlanHistory(tmp_path / 'plans.db', fake_client)
+        cursors[:] = [(SQL_ID, '111', '1000000', '98765432101234', '1', '55555555555555',
+                       'APP', 'SELECT 1')]
+        history.capture(now=1000)
+        assert 'TO_CHAR(SUM(elapsed_time))' in fake_client.queries[0]
+        cursors[:] = [(SQL_ID, '111', '1000010', '98765433101234', '1', '55555555555655',
+                       'APP', 'SELECT 1')]
+        assert history.capture(now=2000)['samples'] == 1
+        row = history.conn.execute("SELECT executions, elapsed_us, buffer_gets "
+                                   "FROM cursor_seen").fetchone()
+        assert tuple(row) == (1000010, 98765433101234, 55555555555655)
+
+        cursors[:] = [(SQL_ID, '111', '1000020', '9.8765E+13', '1', '5.5556E+13',
+                       'APP', 'SELECT 1')]
+        with pytest.raises(RuntimeError):
+            history.capture(now=3000)
+        history.close()
+
+    def test_baseline_rejects_bad_sql_id(self, tmp_path, fake_client):
+        history = PlanHistory(tmp_path / 'plans.db', fake_client)
+        for bad in ("a1", "7h35uxf5uhmm'", "x'; HOST id; --"):
+            with pytest.raises(ValueError):
+                history.capture_baseline(bad, 111)
+        assert fake_client.blocks == []
+        history.close()
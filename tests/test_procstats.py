@@ -0,0 +1,52 @@
+"""
+Tests for process tree resource sampling
+"""
+
+import subprocess
+from oracledba.utils.procstats import (
+    ProcessTreeSampler, empty_usage, merge_usage, classify, format_usage,
+)
+
+
+class TestProcessTreeSampler:
+    """Test sampling of a command and its children"""
+
+    def test_counts_cpu_of_grandchildren(self):
+        # bash -> bash (busy loop) -> the busy child is where the CPU goes
+        proc = subprocess.Popen(
+            ['bash', '-c',
+             "bash -c 'end=$((SECONDS+2)); while [ $SECONDS -lt $end ]; do :; done'; true"])
+        with ProcessTreeSampler(proc.pid, interval=0.1) as sampler:
+            proc.wait()
+        usage = sampler.usage()
+        assert usage['processes'] >= 2
+        assert usage['cpu_seconds'] > 0.5
+        assert usage['peak_rss'] > 0
+        assert usage['ctx_switches'] > 0
+
+    def test_counts_written_bytes(self, tmp_path):
+        target = tmp_path / "data"
+        proc = subprocess.Popen(
+            ['bash', '-c', f'dd if=/dev/zero of={target} bs=1M count=20 conv=fsync '
+                           f'status=none; sleep 0.5'])
+        with ProcessTreeSampler(proc.pid, interval=0.1) as sampler:
+            proc.wait()
+        assert sampler.usage()['write_bytes'] >= 20 * 1024 * 1024
+
+
+class TestUsageHelpers:
+    """Test merging, classification and formatting"""
+
+    def test_merge_sums_and_keeps_peak(self):
+        total = empty_usage()
+        merge_usage(total, {'cpu_seconds': 1.5, 'peak_rss': 100, 'read_bytes': 10})
+        merge_usage(total, {'cpu_seconds': 2.0, 'peak_rss': 50, 'read_bytes': 5})
+        assert total['cpu_seconds'] == 3.5
+        assert total['peak_rss'] == 100
+        assert total['read_bytes'] == 15
+
+    def test_classify(self):
+        assert classify({'cpu_seconds': 9}, 10) == 'cpu-bound'
+        assert classify({'cpu_seconds': 1, 'write_bytes': 500 * 1024 * 1024}, 10) == 'io-bound'
+        assert classify({'cpu_seconds': 0.1}, 10).startswith('waiting')
+        assert 'cpu-bound' in format_usage({'cpu_seconds': 9}, wall=10)
@@ -0,0 +1,87 @@
+"""
+Tests for the redo-rate driven archivelog backup decision
+"""
+
+from oracledba.modules.rman import MB, GB
+from oracledba.modules.rman_archwatch import ArchivelogWatcher, decide_archivelog_backup
+
+
+def _state(**overrides):
+    state = {
+        'unbacked_count': 3,
+        'unbacked_bytes': 100 * MB,
+        'oldest_unbacked_minutes': 30,
+        'fra_pct_used': 20.0,
+        'fra_free_bytes': 40 * GB,
+        'redo_bytes_per_min': 1 * MB,
+    }
+    state.update(overrides)
+    return state
+
+
+class TestDecision:
+    """Test when an archivelog backup is triggered"""
+
+    def test_idle_waits(self):
+        backup, reason = decide_archivelog_backup(_state())
+        assert not backup
+        assert '100 MB' in reason
+
+    def test_nothing_to_back_up(self):
+        backup, _ = decide_archivelog_backup(_state(unbacked_count=0, fra_pct_used=95))
+        assert not backup
+
+    def test_fra_pressure(self):
+        backup, reason = decide_archivelog_backup(_state(fra_pct_used=82))
+        assert backup and 'FRA 82%' in reason
+
+    def test_batch_load_fills_fra(self):
+        # 200 MB/min into 5 GB free: full in ~26 minutes
+        backup, reason = decide_archivelog_backup(
+            _state(redo_bytes_per_min=200 * MB, fra_free_bytes=5 * GB))
+        assert backup and 'fills the FRA' in reason
+
+    def test_size_threshold(self):
+        assert decide_archivelog_backup(_state(unbacked_bytes=600 * MB))[0]
+        assert not decide_archivelog_backup(_state(unbacked_bytes=600 * MB),
+                                            {'min_mb': 1024})[0]
+
+    def test_rpo(self):
+        backup, reason = decide_archivelog_backup(_state(oldest_unbacked_minutes=300))
+        assert backup and 'RPO' in reason
+
+
+class FakeManager:
+    def __init__(self, client):
+        self.client = client
+        self.settings = {'archivelog_watch': {'min_mb': 50}}
+        self.backups = []
+
+    def backup(self, backup_type, tag):
+        self.backups.append((backup_type, tag))
+        return True
+
+
+class TestWatcher:
+    """Test sampling and the backup call"""
+
+    def test_run_once(self, fake_client):
+        fake_client.on('backup_count = 0', [('4', str(80 * MB), '12')])
+        fake_client.on('SYSDATE - 1/24 AND', [(str(120 * MB),)])
+        fake_client.on('v$log_history', [('6',)])
+        fake_client.on('v$recovery_area_usage', [('35.5',)])
+        fake_client.on('v$recovery_file_dest', [(str(10 * GB), str(4 * GB), str(GB))])
+        manager = FakeManager(fake_client)
+        result = ArchivelogWatcher(manager).run_once()
+        state = result['state']
+        assert state['unbacked_count'] == 4
+        assert state['redo_bytes_per_min'] == 2 * MB
+        assert state['log_switches_per_hour'] == 6
+        assert state['fra_free_bytes'] == 7 * GB
+        # Saved min_mb of 50 applies
+        assert result['backup'] and result['success']
+        assert manager.backups[0][0] == 'archive'
+
+    def test_override_saved_threshold(self, fake_client):
+        watcher = ArchivelogWatcher(FakeManager(fake_client), min_mb=2048, fra_pct=None)
+        assert watcher.thresholds == {'min_mb': 2048}
@@ -0,0 +1,175 @@
+"""
+Tests for the local RMAN backup catalog
+"""
+
+import pytest
+from oracledba.modules.rman_catalog import BackupCatalog
+
+
+class ControlfileViews:
+    """In-memory rows of the controlfile views the catalog reads"""
+
+    def __init__(self):
+        self.views = {'v$backup_set': [], 'v$backup_piece': [],
+                      'v$backup_datafile': [], 'v$backup_redolog': [], 'v$datafile_copy': []}
+
+    def rows(self, sql):
+        view = sql.split(' FROM ')[1].split()[0]
+        rows = self.views[view]
+        if 'recid >' in sql:
+            last = int(sql.split('recid >')[1].split()[0])
+            rows = [r for r in rows if int(r[0]) > last]
+        if "status <> 'A'" in sql:
+            rows = [(r[0], r[6]) for r in rows if r[6] != 'A']
+        return [tuple(str(v) for v in r) for r in rows]
+
+    def add_set(self, recid, level, completed, files, size=100):
+        """A datafile backup set (files: {file#: (ckp scn, ckp time)})"""
+        btype = 'D' if level in (-1, 0) else 'I'
+        self.views['v$backup_set'].append(
+            (recid, recid, recid, btype, level, 1, completed, completed, 60, 'NO'))
+        self.views['v$backup_piece'].append(
+            (recid, recid, recid, 1, f'/u01/backup/set{recid}', 'TAG', 'A', 'DISK', size,
+             'YES', completed))
+        for i, (file_no, (scn, ckp_time)) in enumerate(files.items()):
+            self.views['v$backup_datafile'].append(
+                (recid * 10 + i, recid, recid, file_no, level, scn, ckp_time, 1000, 10, 8192))
+
+    def add_copy(self, recid, file_no, scn, ckp_time, status='A', tag='ORADBA_MERGE'):
+        self.views['v$datafile_copy'].append(
+            (recid, file_no, f'/u01/fra/copy_{file_no}_{recid}.dbf', tag, status, scn, ckp_time,
+             1000, 8192, ckp_time))
+
+    def add_logs(self, recid, thread, seqs, completed):
+        self.views['v$backup_set'].append(
+            (recid, recid, recid, 'L', -1, 1, completed, completed, 5, 'NO'))
+        self.views['v$backup_piece'].append(
+            (recid, recid, recid, 1, f'/u01/backup/arch{recid}', 'ARCH', 'A', 'DISK', 10,
+             'YES', completed))
+        for seq, first, nxt, first_time, next_time in seqs:
+            self.views['v$backup_redolog'].append(
+                (recid * 10 + seq, recid, recid, thread, seq, first, first_time, nxt, next_time,
+                 2048, 512))
+
+
+@pytest.fixture
+def views():
+    fake = ControlfileViews()
+    fake.add_set(1, 0, '2024-05-01 01:00:00',
+                 {1: (1000, '2024-05-01 00:30:00'), 2: (1000, '2024-05-01 00:30:00'),
+                  0: (1001, '2024-05-01 00:31:00')})
+    fake.add_set(2, 1, '2024-05-02 01:00:00',
+                 {1: (2000, '2024-05-02 00:30:00'), 2: (2000, '2024-05-02 00:30:00')})
+    fake.add_logs(3, 1, [(10, 900, 1500, '2024-05-01 00:00:00', '2024-05-01 12:00:00'),
+                         (11, 1500, 2500, '2024-05-01 12:00:00', '2024-05-02 06:00:00')],
+                  '2024-05-02 07:00:00')
+    return fake
+
+
+@pytest.fixture
+def client(fake_client, views):
+    return fake_client.on(' FROM v$', views.rows)
+
+
+@pytest.fixture
+def catalog(tmp_path, client):
+    cat = BackupCatalog(tmp_path / "catalog.db", client=client)
+    yield cat
+    cat.close()
+
+
+class TestRefresh:
+    """Test incremental refresh by recid"""
+
+    def test_second_refresh_only_fetches_new_records(self, catalog, client, views):
+        assert catalog.refresh()['backup_set'] == 3
+        assert catalog.refresh()['backup_set'] == 0
+        views.add_set(4, 0, '2024-05-03 01:00:00', {1: (3000, '2024-05-03 00:30:00')})
+        added = catalog.refresh()
+        assert added['backup_set'] == 1
+        assert added['backup_datafile'] == 1
+        assert 'recid > 3' in [q for q in client.queries if 'v$backup_set' in q][-1]
+
+    def test_piece_status_changes(self, catalog, views):
+        catalog.refresh()
+        piece = list(views.views['v$backup_piece'][0])
+        piece[6] = 'X'
+        views.views['v$backup_piece'][0] = tuple(piece)
+        catalog.refresh()
+        assert catalog.summary()['pieces'] == 2
+
+    def test_large_scns_and_sizes(self, catalog, views):
+        # Production SCNs and piece sizes are longer than 10 digits
+        views.add_set(4, 0, '2024-05-03 01:00:00', {1: (12345678901234, '2024-05-03 00:30:00')},
+                      size=53687091200)
+        catalog.refresh()
+        query = [q for q in catalog.client.queries if 'v$backup_datafile' in q][0]
+        assert 'TO_CHAR(checkpoint_change#)' in query
+        plan = catalog.restore_plan('2024-05-03 12:00:00')
+        assert plan['datafiles'][1]['checkpoint_change'] == 12345678901234
+        assert '/u01/backup/set4' in {p['handle'] for p in plan['pieces']}
+        assert catalog.summary()['bytes'] == 53687091200 + 100 + 100 + 10
+
+    def test_unparsable_number_is_an_error(self, catalog, views):
+        views.add_set(4, 0, '2024-05-03 01:00:00', {1: ('1.2346E+13', '2024-05-03 00:30:00')})
+        with pytest.raises(RuntimeError):
+            catalog.refresh()
+        assert catalog.summary()['sets'] == 0
+
+    def test_compression_ratio(self, catalog):
+        catalog.refresh()
+        full = [s for s in catalog.backup_sets() if s['recid'] == 1][0]
+        assert full['datafiles'] == 2
+        assert full['compression_ratio'] == round(2 * 1000 * 8192 / 100, 2)
+
+
+class TestRestorePlan:
+    """Test choosing base backups, incrementals and archived logs"""
+
+    def test_before_incremental(self, catalog):
+        catalog.refresh()
+        plan = catalog.restore_plan('2024-05-01 18:00:00')
+        assert plan['datafiles'][1]['incrementals'] == 0
+        assert plan['controlfile']['file'] == 0
+        assert [log['sequence'] for log in plan['archivelogs']] == [10, 11]
+        assert {p['handle'] for p in plan['pieces']} == {'/u01/backup/set1', '/u01/backup/arch3'}
+
+    def test_after_incremental(self, catalog):
+        catalog.refresh()
+        plan = catalog.restore_plan('2024-05-02 03:00:00')
+        assert plan['datafiles'][2]['incrementals'] == 1
+        assert plan['datafiles'][2]['checkpoint_change'] == 2000
+        assert [log['sequence'] for log in plan['archivelogs']] == [11]
+        assert not plan['missing'] and not plan['gaps']
+        assert plan['redo_bytes'] == 2048 * 512
+        assert plan['datafile_bytes'] == 2 * 1000 * 8192
+
+    def test_before_first_backup_is_missing(self, catalog):
+        catalog.refresh()
+        plan = catalog.restore_plan('2024-04-30 00:00:00')
+        assert plan['missing'] == [1, 2]
+
+    def test_image_copy_base(self, tmp_path, fake_client):
+        # Incremental merge: copies rolled forward to SCN 1500, then a level 1
+        # FOR RECOVER OF COPY; no backup set level 0 at all
+        views = ControlfileViews()
+        views.add_copy(1, 1, 1500, '2024-05-01 12:00:00')
+        views.add_copy(2, 2, 1500, '2024-05-01 12:00:00')
+        views.add_copy(3, 2, 900, '2024-04-30 12:00:00', status='D')
+        views.add_set(2, 1, '2024-05-02 01:00:00',
+                      {1: (2000, '2024-05-02 00:30:00'), 2: (2000, '2024-05-02 00:30:00')})
+        fake_client.on(' FROM v$', views.rows)
+        catalog = BackupCatalog(tmp_path / "catalog.db", client=fake_client)
+        assert catalog.refresh()['datafile_copy'] == 3
+        assert catalog.refresh()['datafile_copy'] == 3
+
+        plan = catalog.restore_plan('2024-05-02 03:00:00')
+        assert not plan['missing']
+        assert plan['datafiles'][1]['base']['source'] == 'image copy'
+        assert plan['datafiles'][1]['incrementals'] == 1
+        assert [c['handle'] for c in plan['copies']] == ['/u01/fra/copy_1_1.dbf',
+                                                         '/u01/fra/copy_2_2.dbf']
+        assert {p['handle'] for p in plan['pieces']} == {'/u01/backup/set2'}
+        # Copies already rolled past the target cannot be used
+        assert catalog.restore_plan('2024-05-01 06:00:00')['missing'] == [1, 2]
+        catalog.close()
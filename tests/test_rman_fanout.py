@@ -0,0 +1,98 @@
+"""
+Tests for multi-destination channels and the throttle schedule
+"""
+
+from datetime import datetime
+
+import pytest
+from oracledba.modules.nfs import nfs_source
+from oracledba.modules.rman import (
+    RMANManager, channel_allocations, check_size, current_rate, parse_throttle, merge_commands,
+    FRA, GB,
+)
+
+BUSINESS_HOURS = [parse_throttle('mon-fri 08:00-18:00 20M'),
+                  parse_throttle('fri-sat 22:00-02:00 50M')]
+
+
+class TestThrottle:
+    """Test parsing and evaluating throttle windows"""
+
+    def test_business_hours(self):
+        assert current_rate(BUSINESS_HOURS, '200M', datetime(2024, 5, 1, 9, 30)) == '20M'  # Wed
+        assert current_rate(BUSINESS_HOURS, '200M', datetime(2024, 5, 1, 18, 0)) == '200M'
+        assert current_rate(BUSINESS_HOURS, None, datetime(2024, 5, 4, 9, 30)) is None  # Sat
+
+    def test_window_across_midnight(self):
+        assert current_rate(BUSINESS_HOURS, None, datetime(2024, 5, 3, 23, 0)) == '50M'  # Fri
+        assert current_rate(BUSINESS_HOURS, None, datetime(2024, 5, 4, 1, 0)) == '50M'   # Sat
+        assert current_rate(BUSINESS_HOURS, None, datetime(2024, 5, 6, 1, 0)) is None    # Mon
+
+    def test_bad_window(self):
+        with pytest.raises(ValueError):
+            parse_throttle('weekdays 8-18')
+
+    def test_bad_rate(self):
+        assert check_size('20m', 'RATE') == '20M'
+        assert check_size(1048576, 'RATE') == '1048576'
+        for bad in ('20X', '20M;', '1.5G', ''):
+            with pytest.raises(ValueError):
+                check_size(bad, 'RATE')
+        with pytest.raises(ValueError):
+            parse_throttle('mon-fri 08:00-18:00 20X')
+
+
+class TestChannelAllocations:
+    """Test round-robin channel allocation"""
+
+    def test_round_robin(self):
+        lines = channel_allocations([FRA, '/mnt/nfs/backup/'], 3, rate='20M',
+                                    maxpiecesize='8G').splitlines()
+        assert lines[0] == '  ALLOCATE CHANNEL d1 DEVICE TYPE DISK MAXPIECESIZE 8G RATE 20M;'
+        assert "FORMAT '/mnt/nfs/backup/%d_%U'" in lines[1]
+        assert 'FORMAT' not in lines[2]
+
+    def test_merge_block_keeps_allocations_inside_run(self):
+        script = merge_commands(allocate=channel_allocations([FRA], 2, rate='10M'))
+        assert script.startswith('RUN {\n  ALLOCATE CHANNEL d1')
+        assert script.index('RATE 10M') < script.index('RECOVER COPY')
+
+    def test_nfs_source(self, tmp_path):
+        mounts = tmp_path / "mounts"
+        mounts.write_text("/dev/sda1 / xfs rw 0 0\n"
+                          "nas:/export/rman /mnt/nfs nfs4 rw 0 0\n")
+        assert nfs_source('/mnt/nfs/backup', mounts) == 'nas:/export/rman'
+        assert nfs_source('/mnt/nfsother', mounts) is None
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    mgr = RMANManager()
+    mgr.settings = {'destinations': [str(tmp_path)], 'maxpiecesize': '8G', 'parallelism': 2}
+    mgr.scripts = []
+    monkeypatch.setattr(mgr, '_run_rman', lambda cmds: (mgr.scripts.append(cmds) or True, '', ''))
+    monkeypatch.setattr(mgr, '_record_run', lambda *args: None)
+    monkeypatch.setattr('oracledba.modules.rman.save_settings', lambda settings: None)
+    return mgr
+
+
+class TestFanoutBackup:
+    """Test the RUN block of a fanned-out backup"""
+
+    def test_maxpiecesize_without_sections(self, manager):
+        assert manager.backup('full')
+        assert 'MAXPIECESIZE 8G' in manager.scripts[0]
+
+    def test_no_maxpiecesize_with_section_size(self, manager):
+        manager.settings['section_size'] = 32 * GB
+        assert manager.backup('full')
+        assert 'SECTION SIZE 32G' in manager.scripts[0]
+        assert 'MAXPIECESIZE' not in manager.scripts[0]
+        assert manager.backup('archive')
+        assert 'MAXPIECESIZE 8G' in manager.scripts[1]
+
+    def test_configure_rejects_bad_rate(self, manager, tmp_path):
+        with pytest.raises(ValueError):
+            manager.configure_fanout([str(tmp_path)], rate='20X')
+        assert manager.configure_fanout([str(tmp_path)], rate='20m', maxpiecesize='8g')
+        assert (manager.settings['rate'], manager.settings['maxpiecesize']) == ('20M', '8G')
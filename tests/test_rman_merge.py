@@ -0,0 +1,57 @@
+"""
+Tests for the incremental-merge backup strategy
+"""
+
+import pytest
+from oracledba.modules.rman import RMANManager, merge_commands
+
+
+@pytest.fixture
+def bct():
+    return {'status': 'DISABLED'}
+
+
+@pytest.fixture
+def manager(monkeypatch, fake_client, bct):
+    fake_client.on('v$block_change_tracking', lambda sql: [(bct['status'],)])
+    fake_client.on('v$datafile', [('/u01/app/oracle/oradata/GDCPROD/',)])
+    mgr = RMANManager()
+    mgr.client = fake_client
+    mgr.settings = {}
+    mgr.scripts = []
+    monkeypatch.setattr(mgr, '_run_rman', lambda cmds: (mgr.scripts.append(cmds) or True, '', ''))
+    return mgr
+
+
+class TestIncrementalMerge:
+    """Test BCT enablement and the generated RMAN script"""
+
+    def test_merge_script(self):
+        script = merge_commands()
+        assert "RECOVER COPY OF DATABASE WITH TAG 'ORADBA_MERGE';" in script
+        assert "FOR RECOVER OF COPY WITH TAG 'ORADBA_MERGE' DATABASE" in script
+        assert "UNTIL TIME 'SYSDATE-3'" in merge_commands(lag_days=3)
+
+    def test_backup_enables_bct_first(self, manager):
+        assert manager.backup(strategy='incremental-merge')
+        assert any(sql.startswith('ALTER DATABASE ENABLE BLOCK CHANGE TRACKING USING FILE '
+                                  "'/u01/app/oracle/oradata/GDCPROD/bct.chg'")
+                   for sql in manager.client.queries)
+        assert 'RECOVER COPY OF DATABASE' in manager.scripts[0]
+
+    def test_bct_already_enabled_is_left_alone(self, manager, bct):
+        bct['status'] = 'ENABLED'
+        assert manager.enable_block_change_tracking()
+        assert not any(sql.startswith('ALTER') for sql in manager.client.queries)
+
+    def test_switch_to_copy_restore(self, manager):
+        manager.restore(switch_to_copy=True, channels=2)
+        assert '  SWITCH DATABASE TO COPY;\n  RECOVER DATABASE;' in manager.scripts[0]
+        assert manager.scripts[0].count('ALLOCATE CHANNEL') == 2
+        assert 'RESTORE' not in manager.scripts[0]
+        assert manager.scripts[0].endswith('ALTER DATABASE OPEN;')
+
+    def test_switch_to_copy_pitr(self, manager):
+        manager.restore('2024-05-01 12:00:00', switch_to_copy=True)
+        assert "SET UNTIL TIME \"TO_DATE('2024-05-01 12:00:00'" in manager.scripts[0]
+        assert manager.scripts[0].endswith('ALTER DATABASE OPEN RESETLOGS;')
@@ -0,0 +1,172 @@
+"""
+Tests for the streaming RMAN output parser
+"""
+
+from oracledba.modules.rman_catalog import BackupCatalog
+from oracledba.modules.rman_output import RMANOutputParser, parse_rman_log, parse_rman_output
+
+BACKUP_OUTPUT = """
+Recovery Manager: Release 19.0.0.0.0 - Production on Wed May 1 10:00:00 2024
+
+connected to target database: ORCL (DBID=1601234567)
+
+RMAN>
+Starting backup at 01-MAY-24
+using target database control file instead of recovery catalog
+allocated channel: ORA_DISK_1
+channel ORA_DISK_1: SID=45 device type=DISK
+allocated channel: ORA_DISK_2
+channel ORA_DISK_2: SID=52 device type=DISK
+channel ORA_DISK_1: starting compressed full datafile backup set
+channel ORA_DISK_1: specifying datafile(s) in backup set
+input datafile file number=00001 name=/u01/oradata/ORCL/system01.dbf
+channel ORA_DISK_2: starting compressed full datafile backup set
+channel ORA_DISK_2: specifying datafile(s) in backup set
+input datafile file number=00003 name=/u01/oradata/ORCL/sysaux01.dbf
+channel ORA_DISK_1: starting piece 1 at 01-MAY-24
+channel ORA_DISK_2: starting piece 1 at 01-MAY-24
+channel ORA_DISK_2: finished piece 1 at 01-MAY-24
+piece handle={dir}/piece2.bkp tag=TAG20240501T100001 comment=NONE
+channel ORA_DISK_2: backup set complete, elapsed time: 00:00:45
+channel ORA_DISK_1: finished piece 1 at 01-MAY-24
+piece handle={dir}/piece1.bkp tag=TAG20240501T100001 comment=NONE
+channel ORA_DISK_1: backup set complete, elapsed time: 00:01:05
+Finished backup at 01-MAY-24
+
+Starting backup at 01-MAY-24
+current log archived
+using channel ORA_DISK_1
+channel ORA_DISK_1: starting compressed archived log backup set
+input archived log thread=1 sequence=41 RECID=40 STAMP=1167900000
+input archived log thread=1 sequence=42 RECID=41 STAMP=1167900100
+channel ORA_DISK_1: finished piece 1 at 01-MAY-24
+piece handle=/sbt/arch_1.bkp tag=TAG20240501T100200 comment=NONE
+channel ORA_DISK_1: backup set complete, elapsed time: 00:00:03
+channel ORA_DISK_1: deleting archived log(s)
+archived log file name=/u01/fra/1_41.arc RECID=40 STAMP=1167900000
+archived log file name=/u01/fra/1_42.arc RECID=41 STAMP=1167900100
+RMAN-08137: WARNING: archived log not deleted, needed for standby or upstream capture process
+Finished backup at 01-MAY-24
+
+RMAN>
+
+Recovery Manager complete.
+"""
+
+FAILED_OUTPUT = """
+Starting backup at 01-MAY-24
+allocated channel: ORA_DISK_1
+channel ORA_DISK_1: SID=45 device type=DISK
+channel ORA_DISK_1: starting piece 1 at 01-MAY-24
+RMAN-00571: ===========================================================
+RMAN-00569: =============== ERROR MESSAGE STACK FOLLOWS ===============
+RMAN-00571: ===========================================================
+RMAN-03009: failure of backup command on ORA_DISK_1 channel at 05/01/2024 10:01:00
+ORA-19502: write error on file "/u01/backup/x.bkp", block number 1024 (block size=8192)
+ORA-27072: File I/O error
+
+Recovery Manager complete.
+"""
+
+
+class TestBackupOutput:
+    """Test parsing a successful two-channel backup"""
+
+    def test_channels_and_pieces(self, tmp_path):
+        (tmp_path / 'piece1.bkp').write_bytes(b'x' * 3000)
+        (tmp_path / 'piece2.bkp').write_bytes(b'x' * 1000)
+        result = parse_rman_output(BACKUP_OUTPUT.format(dir=tmp_path))
+
+        channels = {c['name']: c for c in result['channels']}
+        assert channels['ORA_DISK_1']['sid'] == 45
+        assert channels['ORA_DISK_2']['device'] == 'DISK'
+        assert channels['ORA_DISK_1']['pieces'] == 2
+        assert channels['ORA_DISK_1']['elapsed'] == 68
+        assert channels['ORA_DISK_1']['bytes'] == 3000
+        assert channels['ORA_DISK_2']['bytes'] == 1000
+
+        assert result['piece_count'] == 3
+        assert result['pieces'][0]['channel'] == 'ORA_DISK_2'
+        assert result['pieces'][0]['tag'] == 'TAG20240501T100001'
+        assert result['pieces'][2]['bytes'] is None     # not on this host
+        assert result['bytes'] == 4000
+        assert result['elapsed'] == 68
+
+    def test_commands_logs_warnings(self):
+        result = parse_rman_output(BACKUP_OUTPUT.format(dir='/nowhere'))
+        assert [c['command'] for c in result['commands']] == ['backup', 'backup']
+        assert all(c['finished'] == '01-MAY-24' for c in result['commands'])
+        assert result['archived_logs'] == 2
+        assert result['deleted_logs'] == 2
+        assert result['warnings'][0]['code'] == 'RMAN-08137'
+        assert result['errors'] == [] and result['error_stack'] == ''
+
+
+AUTOBACKUP_OUTPUT = """
+Starting backup at 01-MAY-24
+allocated channel: b1
+channel b1: SID=61 device type=DISK
+channel b1: starting compressed full datafile backup set
+channel b1: finished piece 1 at 01-MAY-24
+piece handle=/u01/backup/bench/1a2b3c_1_1 tag=ORADBA_BENCH comment=NONE
+channel b1: backup set complete, elapsed time: 00:00:02
+Finished backup at 01-MAY-24
+
+Starting Control File and SPFILE Autobackup at 01-MAY-24
+piece handle=/u01/backup/cf_c-1601234567-20240501-00 comment=NONE
+Finished Control File and SPFILE Autobackup at 01-MAY-24
+released channel: b1
+"""
+
+
+class TestAutobackup:
+    """Test keeping controlfile autobackup pieces apart"""
+
+    def test_autobackup_not_counted(self):
+        result = parse_rman_output(AUTOBACKUP_OUTPUT)
+        assert result['piece_count'] == 1
+        assert result['autobackups'] == ['/u01/backup/cf_c-1601234567-20240501-00']
+        assert result['pieces'][1]['channel'] is None
+        assert result['channels'][0]['pieces'] == 1
+
+
+class TestErrorStack:
+    """Test extracting RMAN-/ORA- error stacks"""
+
+    def test_stack(self):
+        result = parse_rman_output(FAILED_OUTPUT)
+        assert len(result['errors']) == 1
+        assert [e['code'] for e in result['errors'][0]] == ['RMAN-03009', 'ORA-19502', 'ORA-27072']
+        assert result['error_stack'].startswith('RMAN-03009: failure of backup command')
+        assert 'ORA-27072: File I/O error' in result['error_stack']
+        assert result['commands'][0]['finished'] is None
+
+    def test_stack_at_end_of_stream(self):
+        parser = RMANOutputParser()
+        for line in FAILED_OUTPUT.split('\nRecovery')[0].splitlines():
+            parser.feed(line + '\n')
+        assert parser.result()['error_stack'].count('\n') == 2
+
+    def test_restore_pieces_read(self, tmp_path):
+        log = tmp_path / 'restore.log'
+        log.write_text(
+            "channel ORA_DISK_1: reading from backup piece /u01/fra/p1.bkp\n"
+            "channel ORA_DISK_1: piece handle=/u01/fra/p1.bkp tag=TAG1\n"
+            "channel ORA_DISK_1: restored backup piece 1\n"
+            "channel ORA_DISK_1: restore complete, elapsed time: 00:02:00\n")
+        result = parse_rman_log(log)
+        assert result['piece_count'] == 0
+        assert result['pieces'][0]['kind'] == 'read'
+        assert result['channels'][0]['elapsed'] == 120
+
+
+class TestRecordRun:
+    """Test storing parsed runs in the catalog"""
+
+    def test_record_and_list(self, tmp_path):
+        catalog = BackupCatalog(tmp_path / 'catalog.db', client=object())
+        catalog.record_run('full', parse_rman_output(FAILED_OUTPUT), False, 'T1')
+        run = catalog.runs()[0]
+        assert run['kind'] == 'full' and run['success'] == 0 and run['channels'] == 1
+        assert 'ORA-19502' in run['error_stack']
+        catalog.close()
@@ -0,0 +1,50 @@
+"""
+Tests for RMAN progress summaries
+"""
+
+from oracledba.modules.rman import summarize_progress, MB
+
+
+class TestSummarizeProgress:
+    """Test combining job details, long ops and async I/O rows"""
+
+    def test_running_backup(self):
+        job = {'status': 'RUNNING', 'input_type': 'DB FULL', 'elapsed_seconds': '120',
+               'input_bytes': str(6000 * MB), 'output_bytes': str(1000 * MB)}
+        longops = [
+            {'sid': '45', 'opname': 'RMAN: aggregate input', 'sofar': '250', 'totalwork': '1000',
+             'elapsed': '120', 'remaining': '360'},
+            {'sid': '45', 'opname': 'RMAN: aggregate output', 'sofar': '10', 'totalwork': '0',
+             'elapsed': '120', 'remaining': '0'},
+            {'sid': '51', 'opname': 'RMAN: full datafile backup', 'sofar': '50',
+             'totalwork': '100', 'elapsed': '60', 'remaining': '60'},
+            {'sid': '52', 'opname': 'RMAN: full datafile backup', 'sofar': '10',
+             'totalwork': '100', 'elapsed': '60', 'remaining': '540'},
+        ]
+        aio = [
+            {'sid': '51', 'type': 'INPUT', 'bytes_per_sec': str(40 * MB)},
+            {'sid': '51', 'type': 'INPUT', 'bytes_per_sec': str(10 * MB)},
+            {'sid': '51', 'type': 'OUTPUT', 'bytes_per_sec': str(5 * MB)},
+            {'sid': '52', 'type': 'INPUT', 'bytes_per_sec': str(30 * MB)},
+        ]
+        summary = summarize_progress(job, longops, aio)
+        assert summary['percent'] == 25.0
+        assert summary['eta_seconds'] == 360
+        assert summary['mb_s'] == 80.0
+        assert [c['mb_s'] for c in summary['channels']] == [50.0, 30.0]
+        assert summary['channels'][1]['percent'] == 10.0
+        assert summary['channels'][0]['operation'] == 'full datafile backup'
+
+    def test_eta_extrapolated_without_time_remaining(self):
+        longops = [{'sid': '1', 'opname': 'RMAN: aggregate input', 'sofar': '40',
+                    'totalwork': '100', 'elapsed': '200', 'remaining': '0'}]
+        summary = summarize_progress(None, longops, [])
+        assert summary['status'] == 'RUNNING'
+        assert summary['eta_seconds'] == 300
+
+    def test_completed_job(self):
+        job = {'status': 'COMPLETED', 'input_bytes_per_sec': str(100 * MB)}
+        summary = summarize_progress(job, [], [])
+        assert summary['percent'] == 100.0
+        assert summary['eta_seconds'] == 0
+        assert summary['mb_s'] == 100.0
@@ -0,0 +1,49 @@
+"""
+Tests for restore planning and time estimates
+"""
+
+import pytest
+from oracledba.modules.rman import estimate_restore, restore_commands, GB
+
+
+class TestEstimateRestore:
+    """Test scaling historical throughput to an RTO"""
+
+    PLAN = {'datafile_bytes': 100 * GB, 'bytes': 30 * GB, 'redo_bytes': 4 * GB}
+
+    def test_scales_with_channels(self):
+        two = estimate_restore(self.PLAN, backup_mb_s=200, channels=2, history_channels=2)
+        four = estimate_restore(self.PLAN, backup_mb_s=200, channels=4, history_channels=2)
+        assert two['restore_seconds'] == 512
+        assert four['restore_seconds'] == 256
+        assert four['recover_seconds'] == round(4 * 1024 / 40)
+        assert four['total_seconds'] == 256 + four['recover_seconds']
+
+    def test_destination_caps_rate(self):
+        est = estimate_restore(self.PLAN, backup_mb_s=200, channels=8, dest_mb_s=300)
+        assert est['restore_mb_s'] == 300
+
+    def test_no_history(self):
+        est = estimate_restore(self.PLAN, backup_mb_s=None, channels=4)
+        assert est['restore_seconds'] is None and est['total_seconds'] is None
+
+
+class TestRestoreCommands:
+    """Test the generated RUN block"""
+
+    def test_multichannel_pitr(self):
+        script = restore_commands('2024-05-01 12:00:00', channels=3)
+        assert script.count('ALLOCATE CHANNEL') == 3
+        assert "SET UNTIL TIME \"TO_DATE('2024-05-01 12:00:00'" in script
+        assert 'RECOVER DATABASE;' in script
+
+    def test_preview(self):
+        script = restore_commands(channels=2, preview=True)
+        assert 'RESTORE DATABASE PREVIEW SUMMARY;' in script
+        assert 'RECOVER' not in script
+
+    def test_single_time_format(self):
+        assert "SET UNTIL TIME \"TO_DATE('2024-05-01 12:00:00', 'YYYY-MM-DD HH24:MI:SS')\"" in \
+            restore_commands('2024-05-01 12:00:00')
+        with pytest.raises(ValueError):
+            restore_commands("01-MAY-24\"; HOST id; #")
@@ -0,0 +1,156 @@
+"""
+Tests for the RMAN parallelism / section size planner and benchmark recommendation
+"""
+
+import pytest
+from oracledba.modules.rman import (RMANManager, compute_rman_plan, format_size,
+                                    recommend_config, GB, MB)
+
+
+class TestComputeRmanPlan:
+    """Test channel count and multisection decisions"""
+
+    def test_destination_limits_channels(self):
+        # 150 MB/s destination, 60 MB/s per MEDIUM channel -> 3 channels
+        plan = compute_rman_plan(16, [10 * GB] * 12, dest_mb_s=150)
+        assert plan['parallelism'] == 3
+        assert plan['section_size'] is None
+
+    def test_cpus_limit_channels(self):
+        plan = compute_rman_plan(4, [10 * GB] * 12, dest_mb_s=2000)
+        assert plan['parallelism'] == 3  # one core left for the instance
+
+    def test_bigfile_is_split_across_channels(self):
+        # One 400G bigfile and small system files, 4 channels
+        sizes = [400 * GB, 2 * GB, 1 * GB, 1 * GB]
+        plan = compute_rman_plan(8, sizes, dest_mb_s=240)
+        assert plan['parallelism'] == 4
+        share = sum(sizes) / 4
+        assert plan['section_size'] >= GB
+        assert plan['section_size'] <= share
+        assert plan['section_size'] % GB == 0
+
+    def test_single_channel_no_section(self):
+        plan = compute_rman_plan(1, [50 * GB], dest_mb_s=None)
+        assert plan['parallelism'] == 1
+        assert plan['section_size'] is None
+
+    def test_format_size(self):
+        assert format_size(4 * GB) == '4G'
+        assert format_size(512 * 1024 ** 2) == '512M'
+
+
+class TestRecommendConfig:
+    """Test picking a configuration from benchmark results"""
+
+    RESULTS = [
+        {'algorithm': 'BASIC', 'channels': 2, 'success': True,
+         'mb_s': 40, 'ratio': 5.0, 'cpu_pct': 30},
+        {'algorithm': 'LOW', 'channels': 2, 'success': True,
+         'mb_s': 200, 'ratio': 3.5, 'cpu_pct': 25},
+        {'algorithm': 'LOW', 'channels': 4, 'success': True,
+         'mb_s': 210, 'ratio': 3.5, 'cpu_pct': 95},
+        {'algorithm': 'HIGH', 'channels': 2, 'success': True,
+         'mb_s': 15, 'ratio': 6.0, 'cpu_pct': 50},
+        {'algorithm': 'MEDIUM', 'channels': 4, 'success': False, 'mb_s': 0},
+    ]
+
+    def test_objectives(self):
+        assert recommend_config(self.RESULTS)['algorithm'] == 'LOW'
+        assert recommend_config(self.RESULTS, 'size')['algorithm'] == 'HIGH'
+        # 4 LOW channels are faster but saturate the CPU
+        assert recommend_config(self.RESULTS, 'speed')['channels'] == 2
+
+    def test_nothing_succeeded(self):
+        assert recommend_config([{'algorithm': 'LOW', 'channels': 1, 'success': False}]) is None
+
+
+class TestPlanTuning:
+    """Test reading datafile sizes for the plan"""
+
+    def test_bigfiles_are_planned(self, fake_client):
+        # 10 and 32 GiB: more than the 10 digits of the SQL*Plus default NUMWIDTH
+        fake_client.on('v$datafile', [('10737418240',), ('34359738368',), ('104857600',)])
+        mgr = RMANManager()
+        mgr.client = fake_client
+        plan = mgr.plan_tuning(measure=False)
+        assert 'TO_CHAR(bytes)' in fake_client.queries[0]
+        assert plan['datafiles'] == 3
+        assert plan['largest_bytes'] == 32 * GB
+
+    def test_unparsable_size_is_an_error(self, fake_client):
+        fake_client.on('v$datafile', [('1.0737E+10',)])
+        mgr = RMANManager()
+        mgr.client = fake_client
+        with pytest.raises(RuntimeError):
+            mgr.plan_tuning(measure=False)
+
+
+@pytest.fixture
+def bench_manager(monkeypatch, fake_client, tmp_path):
+    mgr = RMANManager()
+    mgr.tablespace_size = str(100 * MB)
+    fake_client.on('dba_data_files', lambda sql: [(mgr.tablespace_size,)])
+    mgr.client = fake_client
+    mgr.scripts = []
+
+    def sampled(commands):
+        mgr.scripts.append(commands)
+        mgr.last_result = {'pieces': [
+            {'handle': f'{tmp_path}/bench/x1', 'tag': 'ORADBA_BENCH', 'kind': 'backup piece',
+             'bytes': 20 * MB},
+            {'handle': '/u01/backup/cf_c-1601234567-20240501-00', 'tag': None,
+             'kind': 'autobackup', 'bytes': 18 * MB}]}
+        return True, '', '', {'cpu_seconds': 1.0}, 2.0
+
+    monkeypatch.setattr(mgr, '_run_rman', lambda cmds: (mgr.scripts.append(cmds) or True, '', ''))
+    monkeypatch.setattr(mgr, '_run_rman_sampled', sampled)
+    return mgr
+
+
+class TestBench:
+    """Test the benchmark runs and the autobackup setting around them"""
+
+    def test_autobackup_off_during_bench(self, bench_manager, tmp_path):
+        bench_manager.client.on('v$rman_configuration', [('ON',)])
+        results = bench_manager.bench(algorithms=('LOW',), channel_counts=(1,), dest=tmp_path)
+        assert bench_manager.scripts[0] == "CONFIGURE CONTROLFILE AUTOBACKUP OFF;"
+        assert bench_manager.scripts[-1] == "CONFIGURE CONTROLFILE AUTOBACKUP ON;"
+        assert [r['ratio'] for r in results] == [None, 5.0]
+        assert results[1]['pieces'] == 1
+
+    def test_default_autobackup_is_cleared(self, bench_manager, tmp_path):
+        bench_manager.bench(algorithms=('LOW',), channel_counts=(1,), dest=tmp_path)
+        assert bench_manager.scripts[-1] == "CONFIGURE CONTROLFILE AUTOBACKUP CLEAR;"
+
+    def test_autobackup_already_off(self, bench_manager, tmp_path):
+        bench_manager.client.on('v$rman_configuration', [('OFF',)])
+        bench_manager.bench(algorithms=('LOW',), channel_counts=(1,), dest=tmp_path)
+        assert not any('AUTOBACKUP' in script for script in bench_manager.scripts)
+
+    def test_setting_restored_on_error(self, bench_manager, tmp_path, monkeypatch):
+        bench_manager.client.on('v$rman_configuration', [('ON',)])
+
+        def fail(commands):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(bench_manager, '_run_rman_sampled', fail)
+        with pytest.raises(KeyboardInterrupt):
+            bench_manager.bench(dest=tmp_path)
+        assert bench_manager.scripts[-1] == "CONFIGURE CONTROLFILE AUTOBACKUP ON;"
+
+    def test_invalid_tablespace(self, bench_manager, tmp_path):
+        with pytest.raises(ValueError):
+            bench_manager.bench("USERS; HOST id", dest=tmp_path)
+        assert bench_manager.client.queries == []
+
+    def test_large_tablespace(self, bench_manager, tmp_path):
+        bench_manager.tablespace_size = '53687091200'
+        results = bench_manager.bench(algorithms=('LOW',), channel_counts=(1,), dest=tmp_path)
+        assert 'TO_CHAR(SUM(bytes))' in bench_manager.client.queries[0]
+        assert results[0]['input_bytes'] == 50 * GB
+
+    def test_unparsable_size(self, bench_manager, tmp_path):
+        bench_manager.tablespace_size = '5.3687E+10'
+        with pytest.raises(RuntimeError):
+            bench_manager.bench(dest=tmp_path)
@@ -0,0 +1,66 @@
+"""
+Tests for the operation scheduler
+"""
+
+import pytest
+from oracledba.utils.jobs import QUEUED, RUNNING, SUCCEEDED
+from oracledba.utils.scheduler import (
+    OperationScheduler, SchedulerBusy, INSTANCE_EXCLUSIVE, IO_HEAVY, CPU_HEAVY, PRIORITY_HIGH,
+)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    sched = OperationScheduler(state_file=tmp_path / "jobs.json",
+                               limits={IO_HEAVY: 1, CPU_HEAVY: 2})
+    yield sched
+    for job in sched.list(active_only=True):
+        sched.cancel(job.id, grace=1)
+
+
+class TestOperationScheduler:
+    """Test limits, exclusivity, priorities and holds"""
+
+    def test_io_limit_queues_second_job(self, scheduler, tmp_path):
+        first = scheduler.submit('backup 1', 'sleep 30', tmp_path / "a.log", resource=IO_HEAVY)
+        second = scheduler.submit('backup 2', 'true', tmp_path / "b.log", resource=IO_HEAVY)
+        assert first.state == RUNNING
+        assert second.state == QUEUED
+        assert scheduler.queue_position(second.id) == 1
+        assert scheduler.blockers(IO_HEAVY) == ['backup 1']
+
+        scheduler.cancel(first.id, grace=1)
+        assert scheduler.wait(second.id, timeout=10).state == SUCCEEDED
+
+    def test_exclusive_waits_and_blocks_later_jobs(self, scheduler, tmp_path):
+        cpu = scheduler.submit('lab', 'sleep 30', tmp_path / "c.log", resource=CPU_HEAVY)
+        restart = scheduler.submit('restart', 'true', tmp_path / "r.log",
+                                   resource=INSTANCE_EXCLUSIVE)
+        later = scheduler.submit('lab 2', 'true', tmp_path / "d.log", resource=CPU_HEAVY)
+        assert restart.state == QUEUED
+        assert later.state == QUEUED  # would fit, but must not overtake the restart
+
+        scheduler.cancel(cpu.id, grace=1)
+        assert scheduler.wait(restart.id, timeout=10).state == SUCCEEDED
+        assert scheduler.wait(later.id, timeout=10).state == SUCCEEDED
+
+    def test_priority_order(self, scheduler, tmp_path):
+        blocker = scheduler.submit('backup', 'sleep 30', tmp_path / "a.log", resource=IO_HEAVY)
+        low = scheduler.submit('download', 'true', tmp_path / "b.log", resource=IO_HEAVY)
+        high = scheduler.submit('urgent backup', 'true', tmp_path / "c.log",
+                                resource=IO_HEAVY, priority=PRIORITY_HIGH)
+        assert scheduler.queue_position(high.id) == 1
+        assert scheduler.queue_position(low.id) == 2
+        scheduler.cancel(blocker.id, grace=1)
+
+    def test_hold_fails_fast_when_busy(self, scheduler, tmp_path):
+        scheduler.submit('backup', 'sleep 30', tmp_path / "a.log", resource=IO_HEAVY)
+        with pytest.raises(SchedulerBusy, match='backup'):
+            with scheduler.hold('Enable ARCHIVELOG'):
+                pass
+
+    def test_hold_delays_queued_jobs(self, scheduler, tmp_path):
+        with scheduler.hold('Enable ARCHIVELOG'):
+            job = scheduler.submit('backup', 'true', tmp_path / "a.log", resource=IO_HEAVY)
+            assert job.state == QUEUED
+        assert scheduler.wait(job.id, timeout=10).state == SUCCEEDED
@@ -0,0 +1,75 @@
+"""
+Tests for the batch SQL Tuning Advisor runner
+"""
+
+import threading
+import time
+
+from oracledba.modules.sqltune import SQLTuneAdvisor, rank_recommendations, tune_block
+
+
+class TestRanking:
+    """Test consolidating recommendations by estimated savings"""
+
+    def test_rank(self):
+        statements = {'a': {'elapsed_s': 1000.0, 'sql_text': 'SELECT a'},
+                      'b': {'elapsed_s': 50.0, 'sql_text': 'SELECT b'}}
+        recs = [{'sql_id': 'b', 'type': 'SQL PROFILE', 'benefit_pct': 99.0},
+                {'sql_id': 'a', 'type': 'INDEX', 'benefit_pct': 40.0},
+                {'sql_id': 'a', 'type': 'STATISTICS', 'benefit_pct': None}]
+        ranked = rank_recommendations(statements, recs)
+        assert [(r['sql_id'], r['type'], r['saved_s']) for r in ranked] == [
+            ('a', 'INDEX', 400.0), ('b', 'SQL PROFILE', 49.5), ('a', 'STATISTICS', None)]
+        assert ranked[0]['sql_text'] == 'SELECT a'
+
+    def test_tune_block(self):
+        block = tune_block('STS1', 'SYS', 'abc', 'T_abc', 60)
+        assert "basic_filter => 'sql_id = ''abc'''" in block
+        assert 'time_limit => 60' in block and "EXECUTE_TUNING_TASK(task_name => 'T_abc')" in block
+
+
+class Concurrency:
+    """Counts the tuning tasks running at the same time"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, block):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        return []
+
+
+def _recommendations(sql):
+    task = [name for name in sql.split("'") if name.endswith('_a1')][0]
+    return [(task, 'SQL PROFILE', '9500', 'A better plan was found')]
+
+
+class TestAdvise:
+    """Test the full flow with a fake client"""
+
+    def test_advise(self, tmp_path, fake_client):
+        tasks = Concurrency()
+        fake_client.on_plsql(('EXECUTE_TUNING_TASK', "'c3'"),
+                             error='ORA-13639: The current operation was interrupted')
+        fake_client.on_plsql('EXECUTE_TUNING_TASK', tasks)
+        fake_client.on('dba_sqlset_statements', [
+            ('a1', '900', '10', 'SELECT 1'), ('b2', '100', '5', 'SELECT 2'),
+            ('c3', '50', '1', 'SELECT 3')])
+        fake_client.on('USER', [('SYS',)])
+        fake_client.on('dba_advisor_recommendations', _recommendations)
+        fake_client.spool_text = 'GENERAL INFORMATION SECTION\n'
+
+        result = SQLTuneAdvisor(fake_client, tmp_path).advise(top=3, time_limit=30, parallel=2)
+        assert set(result['tasks']) == {'a1', 'b2'}
+        assert 'ORA-13639' in result['errors']['c3']
+        assert tasks.max_running == 2
+        rec = result['recommendations'][0]
+        assert (rec['sql_id'], rec['benefit_pct'], rec['saved_s']) == ('a1', 95.0, 855.0)
+        assert result['report'].read_text().startswith('GENERAL')
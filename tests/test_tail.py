@@ -0,0 +1,97 @@
+"""
+Tests for native tail / follow utility
+"""
+
+import os
+import threading
+import pytest
+from oracledba.utils import tail
+from oracledba.utils.tail import tail_lines, follow
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Log file with 100 numbered lines"""
+    path = tmp_path / "alert.log"
+    path.write_text(''.join(f"line {i}\n" for i in range(100)))
+    return path
+
+
+class TestTailLines:
+    """Test reverse block reading"""
+
+    @pytest.mark.parametrize('block_size', [1, 7, 64, 8192])
+    def test_last_lines(self, log_file, block_size):
+        assert tail_lines(log_file, 3, block_size=block_size) == ['line 97', 'line 98', 'line 99']
+
+    def test_more_lines_than_file(self, log_file):
+        assert len(tail_lines(log_file, 500)) == 100
+
+    def test_no_trailing_newline(self, tmp_path):
+        path = tmp_path / "x.log"
+        path.write_text("a\nb\nc")
+        assert tail_lines(path, 2, block_size=2) == ['b', 'c']
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.log"
+        path.touch()
+        assert tail_lines(path, 10) == []
+
+
+class TestFollow:
+    """Test follow mode (polling, so it runs on any platform)"""
+
+    def _collect(self, gen, count):
+        return [next(gen) for _ in range(count)]
+
+    def test_follow_appended_and_rotated(self, log_file):
+        stop = threading.Event()
+        gen = follow(str(log_file), lines=2, interval=0.01, stop_event=stop, use_inotify=False)
+
+        assert self._collect(gen, 2) == ['line 98', 'line 99']
+
+        with open(log_file, 'a') as f:
+            f.write("appended\npartial")
+        assert next(gen) == 'appended'
+
+        with open(log_file, 'a') as f:
+            f.write(" done\n")
+        assert next(gen) == 'partial done'
+
+        os.rename(log_file, str(log_file) + '.1')
+        log_file.write_text("after rotation\n")
+        assert next(gen) == 'after rotation'
+
+        stop.set()
+        gen.close()
+
+    def test_line_appended_while_tailing_is_yielded_once(self, log_file, monkeypatch):
+        split_tail = tail._split_tail
+
+        def racing(f, end, n, *args):
+            # A writer appends after follow() took the end offset
+            with open(log_file, 'a') as w:
+                w.write("racing\n")
+            return split_tail(f, end, n, *args)
+
+        monkeypatch.setattr(tail, '_split_tail', racing)
+        stop = threading.Event()
+        gen = follow(str(log_file), lines=2, interval=0.01, stop_event=stop, use_inotify=False)
+        assert self._collect(gen, 3) == ['line 98', 'line 99', 'racing']
+        with open(log_file, 'a') as f:
+            f.write("next\n")
+        assert next(gen) == 'next'
+        stop.set()
+        gen.close()
+
+    def test_partial_last_line_held_back(self, tmp_path):
+        path = tmp_path / "x.log"
+        path.write_text("a\nb\npart")
+        stop = threading.Event()
+        gen = follow(str(path), lines=2, interval=0.01, stop_event=stop, use_inotify=False)
+        assert self._collect(gen, 2) == ['a', 'b']
+        with open(path, 'a') as f:
+            f.write("ial\n")
+        assert next(gen) == 'partial'
+        stop.set()
+        gen.close()
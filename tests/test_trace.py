@@ -0,0 +1,115 @@
+"""
+Tests for the 10046 trace file profiler
+"""
+
+from oracledba.modules.trace import TraceProfiler, format_report
+from oracledba.modules.tuning import TuningManager
+
+TRACE = """\
+Trace file /u01/app/oracle/diag/rdbms/orcl/ORCL/trace/ORCL_ora_4242.trc
+*** 2026-10-19T10:00:00.000000+00:00
+PARSING IN CURSOR #140001 len=38 dep=0 uid=104 oct=3 lid=104 tim=1000000 \
+hv=111 ad='7f01' sqlid='aaaa1111'
+SELECT * FROM orders
+ WHERE id = :b1
+END OF STMT
+PARSE #140001:c=100,e=200,p=0,cr=0,cu=0,mis=1,r=0,dep=0,og=1,plh=999,tim=1000200
+PARSING IN CURSOR #140002 len=30 dep=1 uid=0 oct=3 lid=0 tim=1000300 \
+hv=222 ad='7f02' sqlid='bbbb2222'
+select obj# from obj$ where name=:1
+END OF STMT
+EXEC #140002:c=50,e=80,p=0,cr=0,cu=0,mis=0,r=0,dep=1,og=4,plh=5,tim=1000400
+FETCH #140002:c=20,e=40,p=1,cr=3,cu=0,mis=0,r=1,dep=1,og=4,plh=5,tim=1000450
+WAIT #140001: nam='db file sequential read' ela= 300 file#=4 block#=12 blocks=1 obj#=77 tim=1000500
+EXEC #140001:c=500,e=1500,p=2,cr=10,cu=1,mis=0,r=0,dep=0,og=1,plh=999,tim=1001000
+WAIT #140001: nam='SQL*Net message to client' ela= 2 driver id=1 #bytes=1 p3=0 obj#=-1 tim=1001010
+FETCH #140001:c=300,e=5000,p=4,cr=20,cu=0,mis=0,r=1,dep=0,og=1,plh=999,tim=1006000
+WAIT #140001: nam='db file sequential read' ela= 3000 file#=4 block#=13 blocks=1 obj#=77 tim=1006100
+WAIT #140001: nam='SQL*Net message from client' ela= 2000000 driver id=1 #bytes=1 p3=0 \
+obj#=-1 tim=3006100
+STAT #140001 id=1 cnt=1 pid=0 pos=1 obj=0 \
+op='TABLE ACCESS BY INDEX ROWID ORDERS (cr=20 pr=4 pw=0 time=5000 us)'
+STAT #140001 id=2 cnt=1 pid=1 pos=1 obj=78 \
+op='INDEX UNIQUE SCAN ORDERS_PK (cr=2 pr=1 pw=0 time=300 us)'
+CLOSE #140001:c=0,e=5,dep=0,type=1,tim=3006200
+EXEC #140001:c=400,e=900,p=0,cr=8,cu=0,mis=0,r=0,dep=0,og=1,plh=999,tim=3007000
+FETCH #140001:c=200,e=700,p=0,cr=6,cu=0,mis=0,r=1,dep=0,og=1,plh=999,tim=3008000
+STAT #140001 id=1 cnt=1 pid=0 pos=1 obj=0 \
+op='TABLE ACCESS BY INDEX ROWID ORDERS (cr=6 pr=0 pw=0 time=700 us)'
+XCTEND rlbk=0, rd_only=1, tim=3009000
+"""
+
+
+def profile(text=TRACE):
+    return TraceProfiler().parse_lines(text.splitlines(True))
+
+
+class TestTraceProfiler:
+    """Test aggregating trace lines into a profile"""
+
+    def test_calls(self):
+        stmt = profile().statements()[0]
+        assert stmt['sql_id'] == 'aaaa1111' and stmt['plan_hash'] == 999
+        assert stmt['text'] == 'SELECT * FROM orders\n WHERE id = :b1'
+        assert stmt['executions'] == 2
+        assert stmt['calls']['PARSE']['misses'] == 1
+        assert stmt['calls']['FETCH'] == {'count': 2, 'cpu': 500, 'elapsed': 5700, 'disk': 4,
+                                          'query': 26, 'current': 0, 'rows': 2, 'misses': 0}
+        assert stmt['totals']['elapsed'] == 200 + 1500 + 5000 + 900 + 700
+
+    def test_waits(self):
+        waits = {w['event']: w for w in profile().statements()[0]['waits']}
+        reads = waits['db file sequential read']
+        assert (reads['count'], reads['total_us'], reads['max_us']) == (2, 3300, 3000)
+        assert reads['histogram'] == {'<512us': 1, '<4ms': 1}
+        assert waits['SQL*Net message from client']['idle']
+        assert waits['SQL*Net message from client']['histogram'] == {'>=1s': 1}
+        assert profile().statements()[0]['wait_us'] == 3302
+
+    def test_call_tree(self):
+        stmts = {s['key']: s for s in profile().statements()}
+        # The recursive calls precede the EXEC that ran them
+        assert stmts['aaaa1111']['children'] == [
+            {'key': 'bbbb2222', 'calls': 2, 'elapsed_us': 120}]
+        assert stmts['bbbb2222']['depth'] == 1
+
+    def test_plan_first_stat_set(self):
+        plan = profile().statements()[0]['plan']
+        assert [(p['id'], p['parent'], p['rows']) for p in plan] == [(1, 0, 1), (2, 1, 1)]
+
+    def test_overall(self):
+        overall = profile().overall()
+        assert overall['user']['statements'] == 1
+        assert overall['recursive']['calls']['FETCH']['count'] == 1
+        assert overall['trace_seconds'] == 2.009
+        assert overall['transactions'] == 1
+
+    def test_unknown_cursor_and_sort(self):
+        stmts = profile(TRACE + "EXEC #5:c=9000,e=9000,p=0,cr=0,cu=0,mis=0,r=0,dep=0,og=1,tim=1\n"
+                        "WAIT #0: nam='log file sync' ela= 10 buffer#=1 p2=0 p3=0 obj#=-1 tim=2\n")
+        keys = [s['key'] for s in stmts.statements(sort='cpu')]
+        assert keys[0] == '#5' and '#0' in keys
+        assert [s['key'] for s in stmts.statements(sort='elapsed', top=1,
+                                                   include_recursive=False)] == ['#5']
+
+    def test_format_report(self):
+        report = format_report(profile())
+        assert 'SQL ID: aaaa1111  Plan Hash: 999' in report
+        assert '  INDEX UNIQUE SCAN ORDERS_PK' in report
+        assert 'bbbb2222' in report
+
+
+class TestTraceReport:
+    """Test locating and profiling a session's trace file"""
+
+    def test_report_for_sid(self, tmp_path, fake_client):
+        trace = tmp_path / 'ORCL_ora_4242.trc'
+        trace.write_text(TRACE)
+        fake_client.on(('v$process', 's.sid = 42'), [(str(trace),)])
+        output = tmp_path / 'report.txt'
+        profiler = TuningManager(fake_client, tmp_path).trace_report(sid=42, output=str(output))
+        assert profiler.statements()[0]['sql_id'] == 'aaaa1111'
+        assert 'Misses in library cache during parse: 1' in output.read_text()
+
+    def test_unknown_sid(self, tmp_path, fake_client):
+        assert TuningManager(fake_client, tmp_path).trace_report(sid=7) is None
@@ -0,0 +1,109 @@
+"""
+Tests for AWR snapshot selection and report generation
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from oracledba.modules.tuning import TuningManager, awr_report_sql, peak_window, select_window
+
+T0 = datetime(2024, 5, 1, 0, 0)
+
+
+def _snaps(ids, startup='2024-04-30 08:00:00', step=30):
+    return [{'snap_id': i, 'startup': startup, 'end_time': T0 + timedelta(minutes=step * i)}
+            for i in ids]
+
+
+class TestSelectWindow:
+    """Test picking snapshots for the last N hours"""
+
+    def test_last_hour(self):
+        # Half-hourly snapshots 1..10: the last hour is 8 -> 10
+        assert select_window(_snaps(range(1, 11)), hours=1) == (8, 10)
+
+    def test_shorter_history(self):
+        assert select_window(_snaps(range(1, 4)), hours=6) == (1, 3)
+
+    def test_restart_in_window(self):
+        snaps = _snaps(range(1, 6)) + _snaps(range(6, 9), startup='2024-05-01 02:50:00')
+        assert select_window(snaps, hours=4) == (6, 8)
+
+    def test_not_enough_snapshots(self):
+        assert select_window(_snaps([1]), hours=1) is None
+        snaps = _snaps(range(1, 4)) + _snaps([4], startup='2024-05-01 01:55:00')
+        assert select_window(snaps, hours=1) is None
+
+
+class TestPeakWindow:
+    """Test finding the busiest DB time interval"""
+
+    SAMPLES = [
+        # snap, instance, startup, cumulative DB time (us)
+        (1, 1, 'a', 0), (2, 1, 'a', 10e6), (3, 1, 'a', 100e6), (4, 1, 'a', 110e6),
+        (1, 2, 'b', 0), (2, 2, 'b', 5e6), (3, 2, 'b', 20e6), (4, 2, 'b', 140e6),
+    ]
+
+    def test_summed_over_instances(self):
+        # 2->3: 90+15, 3->4: 10+120
+        assert peak_window(self.SAMPLES) == (3, 4, 130.0)
+
+    def test_width(self):
+        assert peak_window(self.SAMPLES, width=2) == (2, 4, 235.0)
+
+    def test_restart_skipped(self):
+        samples = [(1, 1, 'a', 50e6), (2, 1, 'a', 60e6), (3, 1, 'b', 1e6), (4, 1, 'b', 3e6)]
+        assert peak_window(samples) == (1, 2, 10.0)
+        assert peak_window(samples, width=3) is None
+
+    def test_large_db_time(self, tmp_path, fake_client):
+        # After weeks of uptime DB time has 14 digits; the intervals differ
+        # well below the 5 significant digits of the default SQL*Plus NUMWIDTH
+        fake_client.on('v$database', [('123', '1')])
+        fake_client.on('dba_hist_sys_time_model', [
+            (str(snap), '1', '2024-04-01 08:00:00', str(50000000000000 + value))
+            for snap, value in ((1, 0), (2, 100000000), (3, 400000000), (4, 600000000))])
+        assert TuningManager(fake_client, tmp_path).peak_snapshots() == (2, 3, 300.0)
+        assert 'TO_CHAR(t.value)' in fake_client.queries[-1]
+
+
+class TestReportSql:
+    """Test the DBMS_WORKLOAD_REPOSITORY calls"""
+
+    def test_instance_and_global(self):
+        assert 'AWR_REPORT_HTML(123, 1, 10, 12)' in awr_report_sql(123, 1, 10, 12)
+        assert 'AWR_REPORT_TEXT' in awr_report_sql(123, 1, 10, 12, fmt='text')
+        assert "AWR_GLOBAL_REPORT_HTML(123, '', 10, 12)" in awr_report_sql(
+            123, 1, 10, 12, rac_global=True)
+
+    def test_rejects_non_numeric(self):
+        with pytest.raises(ValueError):
+            awr_report_sql(1, 1, '1, 2));\nHOST id\n--', 5)
+
+
+@pytest.fixture
+def client(fake_client):
+    fake_client.on('v$database', [('123', '1')])
+    fake_client.on('dba_hist_snapshot', [(str(i), '2024-04-30 08:00:00', '',
+                                          f'2024-05-01 0{i}:00:00') for i in range(1, 5)])
+    fake_client.spool_text = '<html>report</html>\n'
+    return fake_client
+
+
+class TestGenerate:
+    """Test generate_awr end to end with a fake client"""
+
+    def test_last_hours(self, tmp_path, client):
+        path = TuningManager(client, tmp_path).generate_awr(hours=2)
+        assert path == tmp_path / 'awr_123_1_2_4.html'
+        assert path.read_text().startswith('<html>')
+        assert 'AWR_REPORT_HTML(123, 1, 2, 4)' in client.spooled[0]
+
+    def test_explicit_snapshots_text(self, tmp_path, client):
+        path = TuningManager(client, tmp_path).generate_awr(5, 9, fmt='text')
+        assert path.name == 'awr_123_1_5_9.txt'
+
+    def test_invalid_snapshots(self, tmp_path, client):
+        assert TuningManager(client, tmp_path).generate_awr('1); HOST id', 9) is None
+        assert client.spooled == []